@@ -21,7 +21,7 @@ class PsiObject():
 
     """Special class to handle internal array and functions of Psi adaptive psychophysical method (Kontsevich & Tyler, 1999)."""
     
-    def __init__(self, x, alpha, beta, xPrecision, aPrecision, bPrecision, delta=0, stepType='lin', TwoAFC=False, prior=None):
+    def __init__(self, x, alpha, beta, xPrecision, aPrecision, bPrecision, delta=0, stepType='lin', TwoAFC=False, prior=None, dtype=None):
         global stats
         from scipy import stats  # takes a while to load so do it lazy
 
@@ -62,26 +62,48 @@ class PsiObject():
             self._probResponseGivenLambdaX = (1-self._r) + (2*self._r-1) * ((.5 + .5 * stats.norm.cdf(self._x, self._alpha, self._beta)) * (1 - self.delta) + self.delta / 2)
         else: # Yes/No
             self._probResponseGivenLambdaX = (1-self._r) + (2*self._r-1) * (stats.norm.cdf(self._x, self._alpha, self._beta)*(1-self.delta)+self.delta/2)
-        
-    def update(self, response=None):
-        if response is not None:    #response should only be None when Psi is first initialized
-            self._probLambda = self._probLambdaGivenXResponse[response,:,:,self.nextIntensityIndex].reshape((1,len(self.alpha),len(self.beta),1))
-            
+
+        # Optionally keep the tensors at lower precision (e.g. float32) to save memory
+        if dtype is not None:
+            self._probLambda = self._probLambda.astype(dtype)
+            self._probResponseGivenLambdaX = self._probResponseGivenLambdaX.astype(dtype)
+
+    def update(self, response=None, state=None):
+        """Update the posterior with a response to the last intensity and choose the next one.
+        A state already worked out for the response with getState (e.g. on another thread) can be given instead."""
+        if state is None:
+            if response is not None:    #response should only be None when Psi is first initialized
+                state = self.getState(self.getPosterior(response))
+            else:
+                state = self.getState(self._probLambda)
+
+        (self._probLambda, self._probResponseGivenX, self._probLambdaGivenXResponse,
+         self._entropyXResponse, self._expectedEntropyX, self.nextIntensityIndex) = state
+        self.nextIntensity = self.x[self.nextIntensityIndex]
+
+    def getPosterior(self, response):
+        """P(lambda) after a response to the next intensity."""
+        return self._probLambdaGivenXResponse[response,:,:,self.nextIntensityIndex].reshape((1,len(self.alpha),len(self.beta),1))
+
+    def getState(self, probLambda):
+        """Work out the tensors and next intensity index for P(lambda), without changing this object."""
         #Create P(r | x)
-        self._probResponseGivenX = sum(self._probResponseGivenLambdaX * self._probLambda, axis=(1,2)).reshape((len(self.r),1,1,len(self.x)))
+        probResponseGivenX = sum(self._probResponseGivenLambdaX * probLambda, axis=(1,2)).reshape((len(self.r),1,1,len(self.x)))
         
         #Create P(lambda | x, r)
-        self._probLambdaGivenXResponse = self._probLambda*self._probResponseGivenLambdaX/self._probResponseGivenX
+        probLambdaGivenXResponse = probLambda*self._probResponseGivenLambdaX/probResponseGivenX
         
         #Create H(x, r)
-        self._entropyXResponse = -1* sum(self._probLambdaGivenXResponse * log10(self._probLambdaGivenXResponse), axis=(1,2)).reshape((len(self.r),1,1,len(self.x)))
+        entropyXResponse = -1* sum(probLambdaGivenXResponse * log10(probLambdaGivenXResponse), axis=(1,2)).reshape((len(self.r),1,1,len(self.x)))
         
         #Create E[H(x)]
-        self._expectedEntropyX = sum(self._entropyXResponse * self._probResponseGivenX, axis=0).reshape((1,1,1,len(self.x)))
+        expectedEntropyX = sum(entropyXResponse * probResponseGivenX, axis=0).reshape((1,1,1,len(self.x)))
         
         #Generate next intensity
-        self.nextIntensityIndex = argmin(self._expectedEntropyX, axis=3)[0][0][0]
-        self.nextIntensity = self.x[self.nextIntensityIndex]
+        nextIntensityIndex = argmin(expectedEntropyX, axis=3)[0][0][0]
+
+        return (probLambda, probResponseGivenX, probLambdaGivenXResponse,
+                entropyXResponse, expectedEntropyX, nextIntensityIndex)
         
     def estimateLambda(self):
         return (sum(sum(self._alpha.reshape((len(self.alpha),1))*self._probLambda.squeeze(), axis=1)), sum(sum(self._beta.reshape((1,len(self.beta)))*self._probLambda.squeeze(), axis=1)))
@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Columnar storage for the entries of an
+:class:`~psychopy.data.ExperimentHandler`.
+
+Rather than keeping one dict per trial, values are held in one typed array per
+column (bool, int, float, string codes or a generic object fallback) which grow
+by doubling as rows are appended. Rows can still be read and written as if they
+were dicts via :class:`ColumnarRow`, so code which expects
+`ExperimentHandler.entries` to be a list of dicts keeps working.
+"""
+
+from collections.abc import MutableMapping
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['ColumnarEntryStore', 'ColumnarRow']
+
+# range of values which fit in an int64 column
+_INT_MIN = -2 ** 63
+_INT_MAX = 2 ** 63 - 1
+
+
+def _kindOf(value):
+    """Get the kind of column needed to store a value exactly.
+
+    Only exact built-in types are stored in typed arrays (so that values come
+    back out as the same type and format identically), anything else goes into
+    an object column.
+    """
+    valueType = type(value)
+    if valueType is bool:
+        return 'bool'
+    if valueType is int:
+        if _INT_MIN <= value <= _INT_MAX:
+            return 'int'
+        return 'object'
+    if valueType is float:
+        return 'float'
+    if valueType is str:
+        return 'str'
+    return 'object'
+
+
+def _quote(text):
+    """Quote a formatted cell in the same way as
+    :meth:`~psychopy.data.ExperimentHandler.saveAsWideText`.
+    """
+    if ',' in text or '\n' in text:
+        return '"%s"' % text
+    return text
+
+
+class _Column:
+    """A single column of data, stored as a typed array plus a mask of which
+    rows have a value.
+
+    Parameters
+    ----------
+    kind : str
+        One of 'bool', 'int', 'float', 'str' or 'object'
+    capacity : int
+        Number of rows to allocate space for
+    """
+    _dtypes = {
+        'bool': np.bool_,
+        'int': np.int64,
+        'float': np.float64,
+        'str': np.int32,  # strings are stored as codes into `categories`
+        'object': object,
+    }
+
+    def __init__(self, kind, capacity):
+        self.kind = kind
+        self.present = np.zeros(capacity, dtype=bool)
+        self.values = np.zeros(capacity, dtype=self._dtypes[kind])
+        if kind == 'str':
+            self.categories = []
+            self._codes = {}
+
+    def __len__(self):
+        return len(self.present)
+
+    def grow(self, capacity):
+        """Resize this column to hold `capacity` rows."""
+        present = np.zeros(capacity, dtype=bool)
+        values = np.zeros(capacity, dtype=self.values.dtype)
+        n = min(capacity, len(self.present))
+        present[:n] = self.present[:n]
+        values[:n] = self.values[:n]
+        self.present = present
+        self.values = values
+
+    def copy(self, capacity):
+        """Make an independent copy of this column, resized to `capacity`."""
+        dupe = _Column.__new__(_Column)
+        dupe.kind = self.kind
+        dupe.present = self.present
+        dupe.values = self.values
+        if self.kind == 'str':
+            dupe.categories = list(self.categories)
+            dupe._codes = dict(self._codes)
+        dupe.grow(capacity)
+
+        return dupe
+
+    def _toObject(self):
+        """Convert this column to an object column, e.g. because a value was
+        given which doesn't fit the current type.
+        """
+        values = np.empty(len(self.present), dtype=object)
+        for i in np.flatnonzero(self.present):
+            values[i] = self.get(i)
+        if self.kind == 'str':
+            del self.categories, self._codes
+        self.kind = 'object'
+        self.values = values
+
+    def get(self, i):
+        if not self.present[i]:
+            raise KeyError(i)
+        if self.kind == 'str':
+            return self.categories[self.values[i]]
+        if self.kind == 'object':
+            return self.values[i]
+        # convert numpy scalars back to builtins
+        return self.values[i].item()
+
+    def set(self, i, value):
+        if self.kind != 'object' and _kindOf(value) != self.kind:
+            self._toObject()
+        if self.kind == 'str':
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.categories)
+                self.categories.append(value)
+            value = code
+        self.values[i] = value
+        self.present[i] = True
+
+    def unset(self, i):
+        if not self.present[i]:
+            raise KeyError(i)
+        self.present[i] = False
+        if self.kind == 'object':
+            # drop reference to the value
+            self.values[i] = None
+
+    def formatted(self, n):
+        """Get the first `n` rows of this column as a list of (quoted)
+        strings, with missing values as blank strings.
+        """
+        present = self.present[:n].tolist()
+        if self.kind == 'str':
+            # each unique string only needs formatting once
+            categories = [_quote(cat) for cat in self.categories]
+            codes = self.values[:n].tolist()
+            return [categories[code] if here else ''
+                    for code, here in zip(codes, present)]
+        if self.kind == 'object':
+            return [_quote(str(val)) if here else ''
+                    for val, here in zip(self.values[:n], present)]
+        # numbers never need quoting
+        values = map(str, self.values[:n].tolist())
+        return [val if here else '' for val, here in zip(values, present)]
+
+    @property
+    def nbytes(self):
+        return self.present.nbytes + self.values.nbytes
+
+
+class ColumnarRow(MutableMapping):
+    """Dict-like view onto a single row of a :class:`ColumnarEntryStore`.
+
+    Reading and writing keys reads and writes the underlying columns, so
+    `exp.entries[n]['resp.rt'] = 0.5` works as it would with a list of dicts.
+    """
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._store.getValue(self._index, name)
+
+    def __setitem__(self, name, value):
+        self._store.setValue(self._index, name, value)
+
+    def __delitem__(self, name):
+        self._store.delValue(self._index, name)
+
+    def __iter__(self):
+        return iter(self._store.getRowNames(self._index))
+
+    def __len__(self):
+        return len(self._store.getRowNames(self._index))
+
+    def __contains__(self, name):
+        return self._store.hasValue(self._index, name)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ColumnarEntryStore:
+    """A list-like store of experiment entries, holding each column as a typed
+    array rather than each row as a dict.
+
+    Supports the parts of the list interface used by
+    :class:`~psychopy.data.ExperimentHandler` (`append`, `len`, indexing,
+    iteration and copying), with each row given as a :class:`ColumnarRow`.
+
+    Parameters
+    ----------
+    entries : iterable of dict, optional
+        Entries to start off with
+    capacity : int
+        Number of rows to initially allocate space for, space is doubled
+        whenever it runs out.
+    """
+
+    def __init__(self, entries=None, capacity=64):
+        self._columns = {}
+        self._nRows = 0
+        self._capacity = max(int(capacity), 1)
+        if entries is not None:
+            for entry in entries:
+                self.append(entry)
+
+    def __len__(self):
+        return self._nRows
+
+    def __iter__(self):
+        for i in range(self._nRows):
+            yield ColumnarRow(self, i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ColumnarRow(self, i)
+                    for i in range(*index.indices(self._nRows))]
+        return ColumnarRow(self, self._checkIndex(index))
+
+    def __copy__(self):
+        return self.copy()
+
+    def __eq__(self, other):
+        try:
+            if len(self) != len(other):
+                return False
+            return all(dict(mine) == dict(theirs)
+                       for mine, theirs in zip(self, other))
+        except TypeError:
+            return False
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "<ColumnarEntryStore: %d rows, %d columns>" % (
+            self._nRows, len(self._columns))
+
+    def _checkIndex(self, index):
+        """Convert a (possibly negative) row index to a positive one, raising
+        an IndexError if it is out of range.
+        """
+        index = int(index)
+        if index < 0:
+            index += self._nRows
+        if not 0 <= index < self._nRows:
+            raise IndexError("ColumnarEntryStore index out of range")
+        return index
+
+    def _grow(self, capacity):
+        self._capacity = capacity
+        for col in self._columns.values():
+            col.grow(capacity)
+
+    @property
+    def columnNames(self):
+        """Names of all columns, in the order they were first given a value."""
+        return list(self._columns)
+
+    @property
+    def nbytes(self):
+        """Approximate memory used by the column arrays, in bytes (excluding
+        the objects referenced by object and string columns)."""
+        return sum(col.nbytes for col in self._columns.values())
+
+    def append(self, entry):
+        """Add an entry (a dict or other mapping of column name to value) as
+        a new row.
+        """
+        if self._nRows >= self._capacity:
+            self._grow(self._capacity * 2)
+        index = self._nRows
+        self._nRows += 1
+        columns = self._columns
+        for name, value in entry.items():
+            col = columns.get(name)
+            if col is None:
+                col = columns[name] = _Column(_kindOf(value), self._capacity)
+            col.set(index, value)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def copy(self):
+        """Make an independent copy of this store."""
+        dupe = ColumnarEntryStore(capacity=self._capacity)
+        dupe._nRows = self._nRows
+        dupe._columns = {name: col.copy(self._capacity)
+                         for name, col in self._columns.items()}
+
+        return dupe
+
+    def getValue(self, index, name):
+        """Get the value of column `name` at row `index`, raising a KeyError
+        if it has no value.
+        """
+        index = self._checkIndex(index)
+        if name not in self._columns:
+            raise KeyError(name)
+        try:
+            return self._columns[name].get(index)
+        except KeyError:
+            raise KeyError(name)
+
+    def setValue(self, index, name, value):
+        """Set the value of column `name` at row `index`."""
+        index = self._checkIndex(index)
+        col = self._columns.get(name)
+        if col is None:
+            col = self._columns[name] = _Column(_kindOf(value), self._capacity)
+        col.set(index, value)
+
+    def delValue(self, index, name):
+        """Remove the value of column `name` at row `index`."""
+        index = self._checkIndex(index)
+        if name not in self._columns:
+            raise KeyError(name)
+        try:
+            self._columns[name].unset(index)
+        except KeyError:
+            raise KeyError(name)
+
+    def hasValue(self, index, name):
+        """Does row `index` have a value for column `name`?"""
+        index = self._checkIndex(index)
+        return name in self._columns and bool(self._columns[name].present[index])
+
+    def getRowNames(self, index):
+        """Get the names of all columns which have a value in row `index`."""
+        index = self._checkIndex(index)
+        return [name for name, col in self._columns.items()
+                if col.present[index]]
+
+    def toDicts(self):
+        """Iterate through all rows as plain dicts."""
+        for row in self:
+            yield dict(row)
+
+    def toDataFrame(self, columns=None):
+        """Get the entries as a :class:`pandas.DataFrame`, in the same form
+        as `pandas.DataFrame(listOfDicts, columns=columns)` would give.
+        """
+        return pd.DataFrame(list(self.toDicts()), columns=columns)
+
+    def iterWideTextLines(self, names, delim):
+        """Iterate through the rows of this store as lines of a wide text
+        file, formatted the same as
+        :meth:`~psychopy.data.ExperimentHandler.saveAsWideText`.
+
+        Each column is formatted in one pass, so repeated strings only need
+        converting once.
+
+        Parameters
+        ----------
+        names : list[str]
+            Columns to include, in order
+        delim : str
+            Delimiter to follow each cell with
+        """
+        blank = [''] * self._nRows
+        cells = [self._columns[name].formatted(self._nRows)
+                 if name in self._columns else blank
+                 for name in names]
+        for row in zip(*cells):
+            yield delim.join(row) + delim + '\n'
+        if not names:
+            # no columns, but still one (empty) line per row
+            for i in range(self._nRows):
+                yield '\n'
@@ -15,6 +15,8 @@ from psychopy.tools.filetools import (openOutputFile, genDelimiter,
 from psychopy.localization import _translate
 from .utils import checkValidFilePath
 from .base import _ComparisonMixin
+from .columnar import ColumnarEntryStore
+from .streaming import WideTextStreamer, formatWideTextRow
 
 
 class ExperimentHandler(_ComparisonMixin):
@@ -40,7 +42,9 @@ class ExperimentHandler(_ComparisonMixin):
                  sortColumns=False,
                  dataFileName='',
                  autoLog=True,
-                 appendFiles=False):
+                 appendFiles=False,
+                 columnarEntries=False,
+                 streamWideText=False):
         """
         :parameters:
 
@@ -82,6 +86,22 @@ class ExperimentHandler(_ComparisonMixin):
 
 
             autoLog : True (default) or False
+
+            columnarEntries : True or False (default)
+                If True, completed entries are stored as one typed array per
+                column (see :class:`~psychopy.data.columnar.ColumnarEntryStore`)
+                rather than as a list of dicts. This uses much less memory for
+                long experiments with many columns, and makes saving to a
+                wide text file faster.
+
+            streamWideText : True or False (default)
+                If True (and a dataFileName is given), each entry is written
+                to the wide text (.csv) data file as soon as nextEntry() is
+                called, on a background thread, rather than all at once when
+                the experiment ends. Columns which first appear part way
+                through are appended to the end of each row and the file is
+                padded to a full header when it's saved, so no data is lost
+                if the experiment crashes.
         """
         self.loops = []
         self.loopsUnfinished = []
@@ -98,7 +118,11 @@ class ExperimentHandler(_ComparisonMixin):
         self.dataFileName = handleFileCollision(dataFileName, "rename")
         self.sortColumns = sortColumns
         self.thisEntry = {}
-        self.entries = []  # chronological list of entries
+        # chronological list of entries
+        if columnarEntries:
+            self.entries = ColumnarEntryStore()
+        else:
+            self.entries = []
         self._paramNamesSoFar = []
         self.dataNames = ['thisRow.t', 'notes']  # names of all the data (eg. resp.keys)
         self.columnPriority = {
@@ -112,6 +136,13 @@ class ExperimentHandler(_ComparisonMixin):
         self._nextSaveCollision = {}
         # list of call profiles for connected save methods
         self.connectedSaveMethods = []
+        # writer for streaming entries to disk (created on first entry)
+        self.streamWideText = streamWideText
+        self._streamer = None
+        # column names given to the writer, and whether rows have been edited
+        # since they were streamed
+        self._streamNames = None
+        self._streamDirty = False
 
         if dataFileName in ['', None]:
             logging.warning('ExperimentHandler created with no dataFileName'
@@ -125,6 +156,13 @@ class ExperimentHandler(_ComparisonMixin):
     def __del__(self):
         self.close()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # background writer can't be pickled (and isn't needed to reload data)
+        state['_streamer'] = None
+        state['_streamNames'] = None
+        return state
+
     @property
     def currentLoop(self):
         """
@@ -275,6 +313,9 @@ class ExperimentHandler(_ComparisonMixin):
         entry = self.thisEntry
         if row is not None:
             entry = self.entries[row]
+            if self._streamer is not None:
+                # row may have been streamed already, so file needs rewriting
+                self._streamDirty = True
         entry[name] = value
 
         # set priority if given
@@ -586,6 +627,12 @@ class ExperimentHandler(_ComparisonMixin):
         if type(self.extraInfo) == dict:
             this.update(self.extraInfo)
         self.entries.append(this)
+        # write to disk now if streaming
+        if self.streamWideText and self.dataFileName not in ['', None]:
+            if self._streamer is None:
+                self._streamer = WideTextStreamer(self.dataFileName + '.csv')
+            # copy the entry, as it's written later on the writer thread
+            self._streamer.addEntry(dict(this), self._getStreamNames(this))
         # add new entry with its
         self.thisEntry = {}
 
@@ -775,20 +822,90 @@ class ExperimentHandler(_ComparisonMixin):
         elif fileCollisionMethod is None:
             fileCollisionMethod = "rename"
 
-        # create the file or send to stdout
         fileName = genFilenameFromDelimiter(fileName, delim)
+        names = self._getWideTextNames(sortColumns)
+        if len(names) < 1:
+            logging.error("No data was found, so data file may not look as expected.")
+
+        # if entries are being streamed to this file, just complete it
+        streamer = self._streamer
+        if (streamer is not None and streamer.isOpen and not matrixOnly
+                and not appendFile and fileName == streamer.requestedFileName):
+            tail = [self.thisEntry] if self.thisEntry else []
+            savedName = self._completeStream(names, delim, encoding, tail)
+            logging.info('saved data to %r' % savedName)
+            return savedName
+
+        # create the file or send to stdout
         f = openOutputFile(fileName, append=appendFile,
                            fileCollisionMethod=fileCollisionMethod,
                            encoding=encoding)
 
+        # write a header line
+        if not matrixOnly:
+            for heading in names:
+                f.write(u'%s%s' % (heading, delim))
+            f.write('\n')
+
+        # write the data for each entry
+        f.writelines(self._iterWideTextLines(self.getAllEntries(), names, delim))
+        if f != sys.stdout:
+            f.close()
+        logging.info('saved data to %r' % f.name)
+
+        return fileName
+
+    def _completeStream(self, names, delim, encoding, tail):
+        """Make the file entries are being streamed to complete, writing it
+        again if the columns need reordering or rows have been edited since
+        they were streamed.
+
+        Returns
+        -------
+        str
+            The name of the file written to
+        """
+        streamer = self._streamer
+        if (names == streamer.names and delim == streamer.delim
+                and encoding == streamer.encoding and not self._streamDirty):
+            # only need to add any late columns to the header
+            savedName = streamer.finalise(tail=tail)
+        else:
+            savedName = streamer.rewrite(
+                names, self._iterWideTextLines(self.entries, names, delim),
+                tail=tail, delim=delim, encoding=encoding)
+            self._streamDirty = False
+
+        return savedName
+
+    def _getStreamNames(self, entry):
+        """Get the names of the columns to stream an entry with, only working
+        them out again when a new column appears.
+        """
+        if (self._streamNames is None
+                or self._streamNames[0] != len(self.dataNames)
+                or not self._streamNames[1].issuperset(entry)):
+            names = self._getWideTextNames(sortColumns=None)
+            self._streamNames = (len(self.dataNames), set(names), names)
+
+        return self._streamNames[2]
+
+    def _getWideTextNames(self, sortColumns=False):
+        """Get the names of every column to write to a wide text file, in
+        order.
+
+        Parameters
+        ----------
+        sortColumns : str, bool or None
+            How (if at all) to sort columns, see `saveAsWideText`. None to
+            use this handler's default.
+        """
         names = self._getAllParamNames()
         for name in self.dataNames:
             if name not in names:
                 names.append(name)
         # names from the extraInfo dictionary
         names.extend(self._getExtraInfo()[0])
-        if len(names) < 1:
-            logging.error("No data was found, so data file may not look as expected.")
         # if sort columns not specified, use default from self
         if sortColumns is None:
             sortColumns = self.sortColumns
@@ -803,30 +920,17 @@ class ExperimentHandler(_ComparisonMixin):
                 priority = self.columnPriority.get(name, self._guessPriority(name))
                 priorityMap.append((priority, name))
             names = [name for priority, name in sorted(priorityMap, reverse=True)]
-        # write a header line
-        if not matrixOnly:
-            for heading in names:
-                f.write(u'%s%s' % (heading, delim))
-            f.write('\n')
 
-        # write the data for each entry
-        for entry in self.getAllEntries():
-            for name in names:
-                if name in entry:
-                    ename = str(entry[name])
-                    if ',' in ename or '\n' in ename:
-                        fmt = u'"%s"%s'
-                    else:
-                        fmt = u'%s%s'
-                    f.write(fmt % (entry[name], delim))
-                else:
-                    f.write(delim)
-            f.write('\n')
-        if f != sys.stdout:
-            f.close()
-        logging.info('saved data to %r' % f.name)
+        return names
 
-        return fileName
+    @staticmethod
+    def _iterWideTextLines(entries, names, delim):
+        """Iterate through entries as formatted lines of a wide text file.
+        """
+        if isinstance(entries, ColumnarEntryStore):
+            # columnar entries can format a whole column at a time
+            return entries.iterWideTextLines(names, delim)
+        return (formatWideTextRow(entry, names, delim) for entry in entries)
 
     def saveAsPickle(self, fileName, fileCollisionMethod=None):
         """Basically just saves a copy of self (with data) to a pickle file.
@@ -909,7 +1013,11 @@ class ExperimentHandler(_ComparisonMixin):
         # get columns which meet threshold
         cols = [col for col in self.dataNames if self.getPriority(col) >= priorityThreshold]
         # convert just relevant entries to a DataFrame
-        trials = pd.DataFrame(self.entries, columns=cols).fillna(value="")
+        if isinstance(self.entries, ColumnarEntryStore):
+            trials = self.entries.toDataFrame(columns=cols)
+        else:
+            trials = pd.DataFrame(self.entries, columns=cols)
+        trials = trials.fillna(value="")
         # put in context
         context = {
             'type': "trials_data",
@@ -925,6 +1033,12 @@ class ExperimentHandler(_ComparisonMixin):
         self.save()
         self.abort()
         self.autoLog = False
+        # make sure any streamed data file is complete, then stop streaming
+        if self._streamer is not None and self._streamer.isOpen:
+            self._completeStream(
+                self._streamer.names, self._streamer.delim,
+                self._streamer.encoding, tail=[self.thisEntry])
+            self._streamer.close()
 
     def abort(self):
         """Inform the ExperimentHandler that the run was aborted.
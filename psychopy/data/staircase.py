@@ -5,7 +5,10 @@ import sys
 import os
 import pickle
 import copy
+import threading
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import numpy as np
 from packaging.version import Version
 
@@ -37,6 +40,57 @@ except ImportError:
     haveOpenpyxl = False
 
 
+class _SpeculativeUpdate:
+    """Updates of an adaptive staircase for each possible response to the
+    current trial, worked out on a worker thread while the trial runs, so that
+    `addResponse` only has to pick one.
+
+    Parameters
+    ----------
+    intensity : float
+        Intensity of the trial the updates are for.
+    updates : dict
+        Function to work out the update for each possible response, called with
+        no arguments on the worker thread. These mustn't change the staircase.
+    """
+    _executor = None  # shared by all staircases
+    _lock = threading.Lock()
+
+    def __init__(self, intensity, updates):
+        with _SpeculativeUpdate._lock:
+            if _SpeculativeUpdate._executor is None:
+                _SpeculativeUpdate._executor = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="StairSpeculation")
+        self.intensity = intensity
+        self._futures = {response: self._executor.submit(update)
+                         for response, update in updates.items()}
+
+    def get(self, intensity, response):
+        """Get the update for a response, waiting for it if need be. Returns
+        `None` if it wasn't worked out for this intensity and response.
+        """
+        if intensity != self.intensity:
+            return None
+        try:
+            future = self._futures[response]
+        except (KeyError, TypeError):
+            return None
+        for other in self._futures.values():
+            if other is not future:
+                other.cancel()  # not needed, if not yet started
+        try:
+            return future.result()
+        except Exception as err:
+            # work it out again, so errors are raised from there
+            logging.debug("Speculative staircase update failed: %s" % err)
+            return None
+
+    def cancel(self):
+        """Cancel updates which haven't started yet."""
+        for future in self._futures.values():
+            future.cancel()
+
+
 class StairHandler(_BaseTrialHandler):
     """Class to handle smoothly the selection of the next trial
     and report current values etc.
@@ -201,6 +255,24 @@ class StairHandler(_BaseTrialHandler):
         self.originPath, self.origin = self.getOriginPathAndFile(originPath)
         self._exp = None  # the experiment handler that owns me!
 
+    def __getstate__(self):
+        # speculative updates are running on a worker thread, so aren't kept
+        state = self.__dict__.copy()
+        if state.get('_speculation') is not None:
+            state['_speculation'] = None
+        return state
+
+    def _getSpeculated(self, intensity, response):
+        """Get the speculative update for the response to the last trial (if
+        one was started and matches) and stop any others.
+        """
+        speculation = getattr(self, '_speculation', None)
+        if speculation is None:
+            return None
+        self._speculation = None
+
+        return speculation.get(intensity, response)
+
     def __iter__(self):
         return self
 
@@ -764,6 +836,7 @@ class QuestHandler(StairHandler):
                  originPath=None,
                  name='',
                  autoLog=True,
+                 speculative=False,
                  **kwargs):
         """
         Typical values for pThreshold are:
@@ -850,6 +923,11 @@ class QuestHandler(StairHandler):
                 if you have it. You can also call the importData function
                 directly.
 
+            speculative: *False* or True
+                Update the posterior for both possible responses on a worker
+                thread as soon as each trial's intensity is chosen, so that
+                `addResponse` only has to pick one.
+
             Additional keyword arguments will be ignored.
 
         :Notes:
@@ -864,6 +942,8 @@ class QuestHandler(StairHandler):
             self, startVal, nTrials=nTrials, extraInfo=extraInfo,
             method=method, stepType='lin', minVal=minVal,
             maxVal=maxVal, name=name, autoLog=autoLog)
+        self.speculative = speculative
+        self._speculation = None
 
         self.startVal = startVal
         self.startValSd = startValSd
@@ -931,7 +1011,11 @@ class QuestHandler(StairHandler):
                 self.intensities.pop()  # remove the auto-generated one
             self.intensities.append(intensity)
         # Update quest
-        self._quest.update(intensity, result)
+        quest = self._getSpeculated(intensity, result)
+        if quest is not None:
+            self._quest = quest
+        else:
+            self._quest.update(intensity, result)
         # Update other things
         self.data.append(result)
         # add the current data to experiment if poss
@@ -1068,12 +1152,31 @@ class QuestHandler(StairHandler):
             # update pointer for next trial
             self.thisTrialN += 1
             self.intensities.append(self._nextIntensity)
+            if self.speculative:
+                self._speculate(self._nextIntensity)
             return self._nextIntensity
         else:
             self._terminate()
 
     next = __next__  # allows user to call without a loop `val = trials.next()`
 
+    def _speculate(self, intensity):
+        """Start updating the posterior for both responses to this intensity
+        on the worker thread.
+        """
+        quest = self._quest
+
+        def update(response):
+            updated = copy.copy(quest)
+            updated.intensity = list(quest.intensity)
+            updated.response = list(quest.response)
+            updated.update(intensity, response)
+            return updated
+
+        self._speculation = _SpeculativeUpdate(
+            intensity, {response: partial(update, response)
+                        for response in (0, 1)})
+
     def _checkFinished(self):
         """checks if we are finished
         Updates attribute: `finished`
@@ -1141,7 +1244,9 @@ class PsiHandler(StairHandler):
                  prior=None,
                  fromFile=False,
                  extraInfo=None,
-                 name=''):
+                 name='',
+                 speculative=False,
+                 dtype=None):
         """Initializes the handler and creates an internal Psi Object for
         grid approximation.
 
@@ -1214,6 +1319,19 @@ class PsiHandler(StairHandler):
                 Optional name for the PsiHandler used in PsychoPy's built-in
                 logging system.
 
+            speculative (bool)
+                Work out the posterior and next intensity for both possible
+                responses on a worker thread as soon as each trial's intensity
+                is chosen, so that `addResponse` only has to pick one rather
+                than updating the whole grid between trials. This needs memory
+                for two more copies of the grid.
+
+            dtype   (str or None)
+                Data type of the grid, e.g. 'float32' to halve the memory it
+                needs. Defaults to float64. The next intensity may then differ
+                from float64 where two intensities have almost the same
+                expected entropy.
+
         :Raises:
 
             NotImplementedError
@@ -1246,9 +1364,11 @@ class PsiHandler(StairHandler):
         self._psi = PsiObject_(
             intensRange, alphaRange, betaRange, intensPrecision,
             alphaPrecision, betaPrecision, delta=delta,
-            stepType=stepType, TwoAFC=twoAFC, prior=prior)
+            stepType=stepType, TwoAFC=twoAFC, prior=prior, dtype=dtype)
 
         self._psi.update(None)
+        self.speculative = speculative
+        self._speculation = None
 
     def addResponse(self, result, intensity=None):
         """Add a 1 or 0 to signify a correct / detected or
@@ -1267,7 +1387,9 @@ class PsiHandler(StairHandler):
         if self.getExp() is not None:
             # update the experiment handler too
             self.getExp().addData(self.name + ".response", result)
-        self._psi.update(result)
+        # Psi always updates for its own next intensity
+        state = self._getSpeculated(self._psi.nextIntensityIndex, result)
+        self._psi.update(result, state)
 
     def __next__(self):
         """Advances to next trial and returns it.
@@ -1277,12 +1399,24 @@ class PsiHandler(StairHandler):
             # update pointer for next trial
             self.thisTrialN += 1
             self.intensities.append(self._psi.nextIntensity)
+            if self.speculative:
+                self._speculate()
             return self._psi.nextIntensity
         else:
             self._terminate()
 
     next = __next__  # allows user to call without a loop `val = trials.next()`
 
+    def _speculate(self):
+        """Start working out the posterior and next intensity for both
+        responses to the next intensity on the worker thread.
+        """
+        psi = self._psi
+        self._speculation = _SpeculativeUpdate(
+            psi.nextIntensityIndex,
+            {response: partial(psi.getState, psi.getPosterior(response))
+             for response in (0, 1)})
+
     def _checkFinished(self):
         """checks if we are finished.
         Updates attribute: `finished`
@@ -1349,7 +1483,8 @@ class QuestPlusHandler(StairHandler):
                  psychometricFunc='weibull', stimScale='log10',
                  stimSelectionMethod='minEntropy',
                  stimSelectionOptions=None, paramEstimationMethod='mean',
-                 extraInfo=None, name='', label='', **kwargs):
+                 extraInfo=None, name='', label='', speculative=False,
+                 **kwargs):
         """
         QUEST+ implementation. Currently only supports parameter estimation of
         a Weibull-shaped psychometric function.
@@ -1459,6 +1594,13 @@ class QuestPlusHandler(StairHandler):
         label : str
             Only used by :class:`MultiStairHandler`, and otherwise ignored.
 
+        speculative : bool
+            Work out the posterior and next intensity for both possible
+            responses on a worker thread as soon as each trial's intensity is
+            chosen, so that `addResponse` only has to pick one. Only used with
+            `stimSelectionMethod='minEntropy'`, as the random choice of
+            `minNEntropy` can't be made ahead of time.
+
         kwargs : dict
             Additional keyword arguments. These might be passed, for example,
             through a :class:`MultiStairHandler`, and will be ignored. A
@@ -1526,6 +1668,9 @@ class QuestPlusHandler(StairHandler):
         self.stimSelectionOptions = stimSelectionOptions
         self.paramEstimationMethod = paramEstimationMethod
         self._prior = prior
+        self.speculative = speculative
+        self._speculation = None
+        self._qpNextIntensity = None  # worked out by a speculative update
 
         # questplus uses different parameter names.
         if self.stimSelectionMethod == 'minEntropy':
@@ -1616,8 +1761,12 @@ class QuestPlusHandler(StairHandler):
         if self.getExp() is not None:
             # update the experiment handler too
             self.getExp().addData(self.name + ".response", response)
-        self._qp.update(intensity=self.intensities[-1],
-                        response=response)
+        speculated = self._getSpeculated(self.intensities[-1], response)
+        if speculated is not None:
+            self._qp, self._qpNextIntensity = speculated
+        else:
+            self._qp.update(intensity=self.intensities[-1],
+                            response=response)
 
     def __next__(self):
         self._checkFinished()
@@ -1626,8 +1775,13 @@ class QuestPlusHandler(StairHandler):
             self.thisTrialN += 1
             if self.thisTrialN == 0 and self.startIntensity is not None:
                 self.intensities.append(self.startVal)
+            elif self._qpNextIntensity is not None:
+                self.intensities.append(self._qpNextIntensity)
             else:
                 self.intensities.append(self._qp.next_intensity)
+            self._qpNextIntensity = None
+            if self.speculative and self.stimSelectionMethod == 'minEntropy':
+                self._speculate(self.intensities[-1])
 
             # We never actually use self._nextIntensity in the
             # QuestPlusHandler; it's mere purpose here is to make the
@@ -1639,6 +1793,23 @@ class QuestPlusHandler(StairHandler):
 
     next = __next__
 
+    def _speculate(self, intensity):
+        """Start working out the posterior and next intensity for both
+        responses to this intensity on the worker thread.
+        """
+        qp_ = self._qp
+
+        def update(response):
+            updated = copy.copy(qp_)  # shares the likelihoods
+            updated.stim_history = list(qp_.stim_history)
+            updated.resp_history = list(qp_.resp_history)
+            updated.update(intensity=intensity, response=response)
+            return updated, updated.next_intensity
+
+        self._speculation = _SpeculativeUpdate(
+            intensity, {response: partial(update, response)
+                        for response in self.responseVals})
+
     def _checkFinished(self):
         if self.nTrials is not None and len(self.intensities) >= self.nTrials:
             self.finished = True
@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Incremental writing of wide text (csv/tsv) data files, so that each entry of
+an :class:`~psychopy.data.ExperimentHandler` reaches the disk as soon as it is
+complete rather than only when the experiment ends.
+"""
+
+import os
+import json
+import queue
+import codecs
+import threading
+from array import array
+
+from psychopy import logging
+from psychopy.tools.fileerrortools import handleFileCollision
+from .columnar import _quote
+
+__all__ = ['WideTextStreamer', 'formatWideTextRow']
+
+
+def formatWideTextRow(entry, names, delim):
+    """Format a single entry (dict of column name to value) as a line of a
+    wide text file, the same as
+    :meth:`~psychopy.data.ExperimentHandler.saveAsWideText` would.
+
+    Parameters
+    ----------
+    entry : dict
+        Values for this row
+    names : list[str]
+        Columns to include, in order
+    delim : str
+        Delimiter to follow each cell with
+
+    Returns
+    -------
+    str
+        The formatted line, including its final newline
+    """
+    cells = [_quote(str(entry[name])) if name in entry else ''
+             for name in names]
+    if not cells:
+        return '\n'
+    return delim.join(cells) + delim + '\n'
+
+
+class WideTextStreamer:
+    """Appends rows to a wide text file on a background thread as they are
+    given, so that data is on disk even if the experiment crashes.
+
+    The header is written with the columns known when the first row arrives.
+    Columns which appear later are appended to the end of each subsequent row
+    and listed in a sidecar file (the data file name plus ``.columns``, one JSON
+    object per line giving the first row they appear in and their names), so
+    that :meth:`finalise` can rewrite the file with a complete header and padded
+    rows in a single pass, without needing to parse any cells.
+
+    Parameters
+    ----------
+    fileName : str
+        Path of the file to write to
+    delim : str
+        Delimiter to use between cells
+    encoding : str
+        Encoding to write the file in
+    fileCollisionMethod : str
+        Collision method passed to
+        :func:`~psychopy.tools.fileerrortools.handleFileCollision` if the file
+        already exists.
+    """
+
+    def __init__(self, fileName, delim=',', encoding='utf-8-sig',
+                 fileCollisionMethod='rename'):
+        self.requestedFileName = fileName
+        if os.path.exists(fileName):
+            fileName = handleFileCollision(
+                fileName, fileCollisionMethod=fileCollisionMethod)
+        self.fileName = fileName
+        self.sidecarFileName = fileName + '.columns'
+        self.delim = delim
+        self.encoding = encoding
+        # all column names, in the order they're written in each row
+        self.names = []
+        # column names in the header currently on disk
+        self.headerNames = []
+        # byte offset of the end of the header, the end of each row and the
+        # number of cells in each row
+        self._headerWritten = False
+        self._headerEnd = 0
+        self._rowEnds = array('q')
+        self._rowWidths = array('i')
+        # byte offset of any uncommitted (orphan) rows at the end of the file
+        self._tailStart = None
+        self._file = open(fileName, 'wb')
+        self._encoder = codecs.getincrementalencoder(encoding)()
+        # rows are written on a background thread
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._writerLoop, name="WideTextStreamer", daemon=True)
+        self._thread.start()
+
+    @property
+    def nRows(self):
+        """Number of (committed) rows written to the file so far."""
+        return len(self._rowEnds)
+
+    @property
+    def isOpen(self):
+        return self._file is not None
+
+    def addEntry(self, entry, names):
+        """Queue an entry to be written as the next row of the file. Returns
+        immediately, the row is formatted and written on the writer thread.
+
+        Parameters
+        ----------
+        entry : dict
+            Values for this row (should not be modified afterwards)
+        names : list[str]
+            All column names known so far, in the order they should appear.
+            Any which haven't been seen before are added to the end of the
+            file's columns.
+        """
+        if not self.isOpen:
+            raise RuntimeError(
+                "Cannot add entries to a WideTextStreamer after it's closed")
+        self._queue.put((entry, names))
+
+    def _writerLoop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                with self._lock:
+                    self._writeRow(*item)
+                    # flush once we've caught up, so data is on disk
+                    if self._queue.empty():
+                        self._file.flush()
+            except Exception as err:
+                logging.error(
+                    "Failed to stream data to %s: %s" % (self.fileName, err))
+            finally:
+                self._queue.task_done()
+
+    def _encode(self, text):
+        return self._encoder.encode(text)
+
+    def _dropTail(self):
+        """Remove any uncommitted rows from the end of the file."""
+        if self._tailStart is not None:
+            self._file.seek(self._tailStart)
+            self._file.truncate()
+            self._tailStart = None
+
+    def _addNames(self, names):
+        """Add any new names to the end of this file's columns."""
+        known = set(self.names)
+        newNames = [name for name in names if name not in known]
+        if not self._headerWritten:
+            # nothing written yet, so these can go in the header
+            self.names.extend(newNames)
+            self._writeHeader()
+            return
+        if not newNames:
+            return
+        # otherwise note them in the sidecar file
+        self.names.extend(newNames)
+        with open(self.sidecarFileName, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'row': self.nRows, 'names': newNames}) + '\n')
+
+    def _formatHeader(self):
+        # headings are written as-is, without quoting
+        return ''.join('%s%s' % (name, self.delim) for name in self.names) + '\n'
+
+    def _writeHeader(self):
+        self.headerNames = list(self.names)
+        self._file.write(self._encode(self._formatHeader()))
+        self._headerEnd = self._file.tell()
+        self._headerWritten = True
+
+    def _writeRow(self, entry, names):
+        self._dropTail()
+        self._addNames(names)
+        line = formatWideTextRow(entry, self.names, self.delim)
+        self._file.write(self._encode(line))
+        self._rowEnds.append(self._file.tell())
+        self._rowWidths.append(len(self.names))
+
+    def flush(self):
+        """Block until every queued row has been written to disk."""
+        self._queue.join()
+        if self.isOpen:
+            with self._lock:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+
+    def finalise(self, tail=()):
+        """Make the file complete: write the full header and pad any rows
+        written before later columns were added, so every row has a cell for
+        every column. This only copies each row once, it doesn't need to
+        reformat or parse any of them.
+
+        Parameters
+        ----------
+        tail : list[dict]
+            Uncommitted entries (e.g. an unfinished trial) to write at the end
+            of the file. These are removed again if more rows are added.
+
+        Returns
+        -------
+        str
+            The name of the file written to
+        """
+        self.flush()
+        with self._lock:
+            self._dropTail()
+            if self.headerNames != self.names:
+                self._padRows()
+            self._writeTail(tail)
+            self._file.flush()
+
+        return self.fileName
+
+    def rewrite(self, names, lines, tail=(), delim=None, encoding=None):
+        """Replace the contents of the file entirely, e.g. because columns are
+        to be sorted or a different delimiter is wanted.
+
+        Parameters
+        ----------
+        names : list[str]
+            All column names, in order
+        lines : iterable of str
+            Formatted lines for each committed entry (see
+            :func:`formatWideTextRow`)
+        tail : list[dict]
+            Uncommitted entries to write at the end of the file
+        delim : str or None
+            New delimiter to use, or None to keep the current one
+        encoding : str or None
+            New encoding to use, or None to keep the current one
+
+        Returns
+        -------
+        str
+            The name of the file written to
+        """
+        self.flush()
+        with self._lock:
+            if delim is not None:
+                self.delim = delim
+            if encoding is not None:
+                self.encoding = encoding
+            self._file.seek(0)
+            self._file.truncate()
+            self._encoder = codecs.getincrementalencoder(self.encoding)()
+            self.names = list(names)
+            self._writeHeader()
+            self._rowEnds = array('q')
+            self._rowWidths = array('i')
+            for line in lines:
+                self._file.write(self._encode(line))
+                self._rowEnds.append(self._file.tell())
+                self._rowWidths.append(len(self.names))
+            self._tailStart = None
+            self._writeTail(tail)
+            self._file.flush()
+            self._removeSidecar()
+
+        return self.fileName
+
+    def _padRows(self):
+        """Rewrite the file with a full header, appending blank cells to any
+        rows which were written before the final columns were known.
+        """
+        tmpName = self.fileName + '.tmp'
+        nNames = len(self.names)
+        padding = {}
+        self._file.flush()
+        with open(self.fileName, 'rb') as src, open(tmpName, 'wb') as dst:
+            # header goes at the start of a new file, so needs a new encoder
+            self._encoder = codecs.getincrementalencoder(self.encoding)()
+            self.headerNames = list(self.names)
+            dst.write(self._encode(self._formatHeader()))
+            newHeaderEnd = dst.tell()
+            newline = self._encode('\n')
+            src.seek(self._headerEnd)
+            start = self._headerEnd
+            rowEnds = array('q')
+            for end, width in zip(self._rowEnds, self._rowWidths):
+                line = src.read(end - start)
+                start = end
+                if width < nNames:
+                    if width not in padding:
+                        padding[width] = self._encode(
+                            self.delim * (nNames - width) + '\n')
+                    # swap the final newline for any blank cells needed
+                    line = line[:-len(newline)] + padding[width]
+                dst.write(line)
+                rowEnds.append(dst.tell())
+        self._file.close()
+        os.replace(tmpName, self.fileName)
+        self._file = open(self.fileName, 'r+b')
+        self._file.seek(0, os.SEEK_END)
+        self._headerEnd = newHeaderEnd
+        self._rowEnds = rowEnds
+        self._rowWidths = array('i', [nNames] * len(rowEnds))
+        self._removeSidecar()
+
+    def _writeTail(self, tail):
+        tail = [entry for entry in tail if entry]
+        if not tail:
+            return
+        self._tailStart = self._file.tell()
+        for entry in tail:
+            self._file.write(self._encode(
+                formatWideTextRow(entry, self.names, self.delim)))
+
+    def _removeSidecar(self):
+        if os.path.isfile(self.sidecarFileName):
+            os.remove(self.sidecarFileName)
+
+    def close(self):
+        """Write any queued rows and stop the writer thread. Call
+        :meth:`finalise` first to make sure the file is complete.
+        """
+        if not self.isOpen:
+            return
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        with self._lock:
+            self._file.close()
+            self._file = None
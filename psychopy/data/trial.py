@@ -5,6 +5,7 @@ import json
 import os
 import sys
 import copy
+import itertools
 import numpy as np
 import pandas as pd
 
@@ -834,6 +835,124 @@ class Trial(dict):
         return data
 
 
+class _LazyTrials:
+    """Upcoming trials of a :class:`TrialHandler2` in lazy mode, which are
+    only made into :class:`Trial` objects when they're asked for.
+
+    Behaves like the list of upcoming trials the handler otherwise keeps:
+    trials can be indexed (making them if need be, so the same object is
+    given each time until it's taken), taken from the front with `pop()` and
+    trials put back in front with `trials + upcoming` (which leaves this
+    sequence as it was). Iterating gives the same trials as indexing, so
+    changes made to them while iterating are kept, though it means every
+    trial iterated over is kept in memory until it's taken.
+
+    Parameters
+    ----------
+    parent : TrialHandler2
+        Handler the trials belong to, whose `trialList` gives the conditions.
+    indices : ndarray
+        Index in the conditions of each trial, in order.
+    repNs, trialNs : ndarray
+        Repeat of each trial, and the number of each trial within its repeat.
+    firstN : int
+        Number of the first trial (`thisN`), following on from the trials
+        which have elapsed.
+
+    """
+    def __init__(self, parent, indices, repNs, trialNs, firstN=0):
+        self.parent = parent
+        self.indices = indices
+        self.repNs = repNs
+        self.trialNs = trialNs
+        self.firstN = firstN
+        self._pos = 0  # position of the next trial in the arrays
+        self._head = []  # trials put back in front of the arrays
+        self._made = {}  # trials which have been asked for, by position
+
+    def _make(self, pos):
+        """Make the trial at a position in the arrays."""
+        thisIndex = int(self.indices[pos])
+        return Trial(
+            self.parent,
+            thisN=self.firstN + pos,
+            thisRepN=int(self.repNs[pos]),
+            thisTrialN=int(self.trialNs[pos]),
+            thisIndex=thisIndex,
+            # if None then use empty dict
+            data=self.parent.trialList[thisIndex] or {}
+        )
+
+    def _get(self, pos):
+        """Get the trial at a position in the arrays, making it if it hasn't
+        been asked for before."""
+        trial = self._made.get(pos)
+        if trial is None:
+            trial = self._made[pos] = self._make(pos)
+
+        return trial
+
+    def __len__(self):
+        return len(self._head) + len(self.indices) - self._pos
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("upcoming trial index out of range")
+        if i < len(self._head):
+            return self._head[i]
+
+        return self._get(self._pos + i - len(self._head))
+
+    def __iter__(self):
+        for trial in self._head:
+            yield trial
+        for pos in range(self._pos, len(self.indices)):
+            yield self._get(pos)
+
+    def __radd__(self, other):
+        upcoming = copy.copy(self)
+        upcoming._head = list(other) + self._head
+        upcoming._made = dict(self._made)
+
+        return upcoming
+
+    def __eq__(self, other):
+        try:
+            if len(self) != len(other):
+                return False
+        except TypeError:
+            return False
+
+        # comparing doesn't change the trials, so no need to keep them
+        mine = itertools.chain(self._head, (
+            self._made.get(pos) or self._make(pos)
+            for pos in range(self._pos, len(self.indices))))
+        return all(a == b for a, b in zip(mine, other))
+
+    def __repr__(self):
+        return "<{} upcoming trials (lazy)>".format(len(self))
+
+    def pop(self, index=0):
+        """Take the next trial, which is the only one which can be taken.
+        """
+        if index not in (0, -len(self)):
+            raise IndexError("only the next upcoming trial can be taken")
+        if self._head:
+            return self._head.pop(0)
+        if self._pos >= len(self.indices):
+            raise IndexError("pop from empty upcoming trials")
+        trial = self._made.pop(self._pos, None)
+        if trial is None:
+            trial = self._make(self._pos)
+        self._pos += 1
+
+        return trial
+
+
 class TrialHandler2(_BaseTrialHandler):
     """Class to handle trial sequencing and data storage.
 
@@ -861,7 +980,8 @@ class TrialHandler2(_BaseTrialHandler):
                  seed=None,
                  originPath=None,
                  name='',
-                 autoLog=True):
+                 autoLog=True,
+                 lazy=False):
         """
 
         :Parameters:
@@ -900,6 +1020,14 @@ class TrialHandler2(_BaseTrialHandler):
                 copy of the script where it was
                 created. If `OriginPath==-1` then nothing will be stored.
 
+            lazy: True/False
+                If True then the upcoming trials are kept as an array of
+                indices into the conditions for each repeat, and only made
+                into Trial objects when they're reached or looked ahead to
+                (e.g. with :func:`getFutureTrials`). This saves time and
+                memory for designs with very many trials, and gives the same
+                trials in the same order as when False.
+
         :Attributes (after creation):
 
             .data - a dictionary of numpy arrays, one for each data type
@@ -960,6 +1088,7 @@ class TrialHandler2(_BaseTrialHandler):
         self.method = method
         self.extraInfo = extraInfo
         self.seed = seed
+        self.lazy = lazy
         self._rng = np.random.default_rng(seed=seed)
         self._trialAborted = False
 
@@ -1142,6 +1271,9 @@ class TrialHandler2(_BaseTrialHandler):
         Args:
             fromIndex (int, optional): the point in the sequnce from where to rebuild. Defaults to -1.
         """
+        if self.lazy:
+            self._calculateUpcomingLazy()
+            return
         # clear upcoming
         self.upcomingTrials = []
         # start off at 0 trial
@@ -1209,6 +1341,70 @@ class TrialHandler2(_BaseTrialHandler):
             thisTrialN += 1  # number of trial this pass
             thisN += 1  # number of trial in total
 
+    def _calculateUpcomingLazy(self):
+        """Rebuild the sequence of upcoming trials as :func:`calculateUpcoming`
+        does, as arrays of indices from which trials are made when needed.
+        """
+        # clear upcoming
+        self.upcomingTrials = []
+        nConds = len(self.trialList)
+        nTotal = self.nReps * nConds
+        elapsed = self.elapsedTrials[:nTotal]
+        nElapsed = len(elapsed)
+        thisNs = np.arange(nTotal)
+        if self.method == 'fullRandom':
+            # NB permutation *returns* a shuffled array
+            indices = self._rng.permutation(
+                np.tile(np.arange(nConds), self.nReps))
+            # the repeat of each trial is how many times its condition has
+            # come up before, so count up through each condition in turn
+            repNs = np.empty_like(indices)
+            repNs[np.argsort(indices, kind='stable')] = thisNs % self.nReps
+            # the elapsed trials take the first times their conditions come up
+            counts = np.zeros(nConds, dtype=int)
+            for thisTrial in elapsed:
+                if counts[thisTrial.thisIndex] >= self.nReps:
+                    raise ValueError(
+                        "Trial {} can't be found in the trial sequence".format(
+                            thisTrial.thisIndex))
+                thisTrial.thisRepN = int(counts[thisTrial.thisIndex])
+                counts[thisTrial.thisIndex] += 1
+            keep = repNs >= counts[indices]
+            indices = indices[keep]
+            repNs = repNs[keep]
+            trialNs = thisNs[nElapsed:]
+        elif self.method in ('sequential', 'random'):
+            sequences = []
+            for thisRepN in range(self.nReps):
+                sequence = np.arange(nConds)
+                if self.method == 'random':
+                    self._rng.shuffle(sequence)  # shuffle (is in-place)
+                # take out the trials which have elapsed in this repeat
+                repElapsed = elapsed[thisRepN * nConds:
+                                     (thisRepN + 1) * nConds]
+                if repElapsed:
+                    keep = np.ones(nConds, dtype=bool)
+                    positions = np.argsort(sequence)
+                    for thisTrial in repElapsed:
+                        pos = positions[thisTrial.thisIndex]
+                        if not keep[pos]:
+                            raise ValueError(
+                                "Trial {} can't be found in repeat {}".format(
+                                    thisTrial.thisIndex, thisRepN))
+                        keep[pos] = False
+                    sequence = sequence[keep]
+                sequences.append(sequence)
+            indices = np.concatenate(sequences) if sequences else thisNs
+            # the upcoming trials follow on from the elapsed ones
+            repNs = thisNs[nElapsed:] // nConds
+            trialNs = thisNs[nElapsed:] % nConds
+        else:
+            # we've finished
+            return
+
+        self.upcomingTrials = _LazyTrials(
+            self, indices, repNs, trialNs, firstN=nElapsed)
+
     def abortCurrentTrial(self, action='random'):
         """Abort the current trial.
 
@@ -1352,7 +1548,7 @@ class TrialHandler2(_BaseTrialHandler):
         int
             Index of the current trial in this list
         """
-        return (self.elapsedTrials or []) + [self.thisTrial] + (self.upcomingTrials or []), len(self.elapsedTrials)
+        return (self.elapsedTrials or []) + [self.thisTrial] + list(self.upcomingTrials or []), len(self.elapsedTrials)
 
     def getFutureTrial(self, n=1):
         """
@@ -1717,6 +1913,9 @@ class TrialHandler2(_BaseTrialHandler):
         self_copy = copy.deepcopy(self)
         self_copy._rng_state = self_copy._rng.bit_generator.state
         del self_copy._rng
+        # make any lazy upcoming trials, as they refer back to the handler
+        if isinstance(self_copy.upcomingTrials, _LazyTrials):
+            self_copy.upcomingTrials = list(self_copy.upcomingTrials)
 
         r = (super(TrialHandler2, self_copy)
              .saveAsJson(fileName=fileName,
@@ -8,7 +8,11 @@
 import os
 import re
 import ast
+import csv
+import copy
+import sys
 import pickle
+import threading
 import time, datetime
 import numpy as np
 import pandas as pd
@@ -36,6 +40,19 @@ haveXlrd = False
 
 _nonalphanumeric_re = re.compile(r'\W')  # will match all bad var name chars
 
+# separator and decimal of csv files, in the order they're tried
+_csvFormats = [
+    # most common in US, EU
+    (',', '.'),
+    (';', ','),
+    # other possible formats
+    ('\t', '.'),
+    ('\t', ','),
+    (';', '.')
+]
+# characters which mean a single heading is probably several
+_csvDelims = (",", ".", ";", "\t")
+
 
 def checkValidFilePath(filepath, makeValid=True):
     """Checks whether file path location (e.g. is a valid folder)
@@ -213,6 +230,308 @@ def listFromString(val, excludeEmpties=False):
     return asList
 
 
+# values of these types can't be changed in place, so can be shared
+_immutableTypes = (str, bytes, int, float, complex, type(None), np.generic)
+
+
+class ConditionsCache:
+    """Conditions imported from files, shared by all calls to
+    :func:`importConditions`.
+
+    Files are looked up by path, modification time and size, so a file which is
+    changed is imported again. Once the total (estimated) size of cached
+    conditions is more than `maxBytes`, the least recently used are removed.
+    The values of each parameter are kept as columns, from which new (deep
+    copied) conditions are made each time they're got, so changing those
+    returned doesn't change the cache.
+
+    Parameters
+    ----------
+    maxBytes : int
+        Budget for cached conditions, in bytes.
+
+    """
+    def __init__(self, maxBytes=128 * 2 ** 20):
+        self.maxBytes = maxBytes
+        self.nBytes = 0
+        self._lock = threading.Lock()
+        # (version, fieldNames, columns, trialType, mutableFields, nBytes) by
+        # path, most recently used last
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def _getKey(fileName):
+        """Path of a file and its version (modification time and size), or
+        None if it can't be found."""
+        try:
+            stat = os.stat(fileName)
+        except (OSError, TypeError, ValueError):
+            return None, None
+
+        return os.path.abspath(fileName), (stat.st_mtime_ns, stat.st_size)
+
+    def _pop(self, path):
+        """Remove the conditions of a file, returning them if there were
+        any."""
+        entry = self._cache.pop(path, None)
+        if entry is not None:
+            self.nBytes -= entry[-1]
+
+        return entry
+
+    def get(self, fileName):
+        """Get the conditions of a file, if they're cached.
+
+        Parameters
+        ----------
+        fileName : str
+            Path to the conditions file.
+
+        Returns
+        -------
+        tuple or None
+            New list of conditions and the field names, or `None` if the file
+            (as it is now) isn't cached.
+
+        """
+        path, version = self._getKey(fileName)
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is None:
+                return None
+            if entry[0] != version:  # changed since, so no longer needed
+                self._pop(path)
+                return None
+            self._cache.move_to_end(path)
+
+        _, fieldNames, columns, trialType, mutableFields, _ = entry
+        trialList = [trialType(zip(fieldNames, row)) for row in zip(*columns)]
+        # deep copy each trial, only values which can't be changed in place
+        # can be shared
+        for fieldName in mutableFields:
+            for trial in trialList:
+                trial[fieldName] = copy.deepcopy(trial[fieldName])
+
+        return trialList, list(fieldNames)
+
+    def add(self, fileName, trialList, fieldNames):
+        """Cache the conditions imported from a file."""
+        path, version = self._getKey(fileName)
+        if path is None or not trialList:
+            return
+
+        columns = []
+        mutableFields = []
+        for fieldName in fieldNames:
+            column = [trial[fieldName] for trial in trialList]
+            # values which can be changed in place (e.g. lists or arrays) are
+            # copied in and out of the cache
+            if not all(isinstance(val, _immutableTypes) for val in column):
+                column = copy.deepcopy(column)
+                mutableFields.append(fieldName)
+            columns.append(column)
+        nBytes = _estimateColumnsSize(columns)
+        if nBytes > self.maxBytes:
+            return  # would push everything else out
+
+        entry = (version, list(fieldNames), columns, type(trialList[0]),
+                 mutableFields, nBytes)
+        with self._lock:
+            self._pop(path)
+            self._cache[path] = entry
+            self.nBytes += nBytes
+            self._evict()
+
+    def _evict(self):
+        """Remove least recently used conditions until within the budget."""
+        while self.nBytes > self.maxBytes and self._cache:
+            self._pop(next(iter(self._cache)))
+
+    def isCached(self, fileName):
+        """Have the conditions of this file (as it is now) been cached?"""
+        path, version = self._getKey(fileName)
+        with self._lock:
+            entry = self._cache.get(path)
+            return entry is not None and entry[0] == version
+
+    def clear(self):
+        """Remove all conditions from the cache."""
+        with self._lock:
+            self._cache.clear()
+            self.nBytes = 0
+
+
+def _estimateColumnsSize(columns):
+    """Rough size of columns of values in bytes, from the first few values."""
+    nBytes = 0
+    for column in columns:
+        sample = column[:10]
+        valBytes = sum(sys.getsizeof(val) for val in sample) / len(sample)
+        nBytes += int(len(column) * (valBytes + 8))  # and the pointer
+
+    return nBytes
+
+
+#: Cache of imported conditions files, used by :func:`importConditions`.
+conditionsCache = ConditionsCache()
+
+
+def setConditionsCacheSize(maxBytes):
+    """Set the budget for conditions cached by :func:`importConditions`,
+    removing the least recently used if over it. Set to `0` to not cache
+    conditions at all.
+
+    Parameters
+    ----------
+    maxBytes : int
+        Budget in bytes.
+
+    """
+    with conditionsCache._lock:
+        conditionsCache.maxBytes = maxBytes
+        conditionsCache._evict()
+
+
+def _sniffCsvFormat(fileName, sampleSize=65536):
+    """Guess the separator and decimal of a csv file from its heading, without
+    reading the whole file.
+
+    Returns the first of `_csvFormats` whose separator doesn't leave a single
+    heading containing a delimiter (as that means the separator is wrong), or
+    `None` if the file can't be read.
+    """
+    try:
+        with open(fileName, 'r', encoding='utf-8-sig', newline='') as f:
+            sample = f.read(sampleSize)
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    # blank lines before the heading are skipped, as by pandas
+    lines = [line for line in sample.splitlines() if line.strip()]
+    if not lines:
+        return None
+
+    for sep, dec in _csvFormats:
+        names = next(csv.reader([lines[0]], delimiter=sep), [])
+        if len(names) == 1 and any(delim in names[0] for delim in _csvDelims):
+            continue
+        return sep, dec
+
+    return None
+
+
+def _factorizeObjects(values):
+    """Like `pd.factorize` for an array of objects, but values of different
+    types which compare equal (e.g. True, 1 and 1.0, as can be in the same
+    column of an xlsx file) are kept apart.
+
+    Returns
+    -------
+    codes : ndarray
+        Index of each value in `uniques`, or -1 for missing values.
+    uniques : ndarray
+        Each distinct value, in the order first found.
+    """
+    codes, uniques = pd.factorize(values)
+    types = np.array([type(val) for val in values], dtype=object)
+    typeCodes, distinctTypes = pd.factorize(types)
+    if len(distinctTypes) == 1:
+        return codes, uniques
+
+    # tell apart values by their type as well
+    found = codes >= 0
+    pairs = (codes[found].astype(np.int64) * len(distinctTypes)
+             + typeCodes[found])
+    pairCodes, _ = pd.factorize(pairs)
+    _, first = np.unique(pairCodes, return_index=True)
+    codes = codes.copy()
+    codes[found] = pairCodes
+    uniques = np.asarray(values, dtype=object)[found][first]
+
+    return codes, uniques
+
+
+def _convertDecimalCommas(dataframe):
+    """Convert strings which are numbers with decimal commas (e.g. "1,5") to
+    floats, in place.
+
+    Each distinct string is only converted once, so this is quick even for
+    long files, where conditions repeat.
+    """
+    for col in dataframe.columns:
+        values = dataframe[col].to_numpy()
+        if values.dtype != object:
+            continue
+        codes, uniques = _factorizeObjects(values)
+        converted = np.empty(len(uniques), dtype=object)
+        anyConverted = False
+        for i, val in enumerate(uniques):
+            converted[i] = val
+            if isinstance(val, str):
+                try:
+                    converted[i] = float(val.replace(",", "."))
+                    anyConverted = True
+                except ValueError:
+                    pass
+        if not anyConverted:
+            continue
+        values = values.copy()
+        found = codes >= 0  # missing values are left as they are
+        values[found] = converted[codes[found]]
+        dataframe[col] = pd.Series(values, index=dataframe.index, dtype=object)
+
+
+def _columnToConditions(column):
+    """Values of a column of a record array as they should be in each
+    condition: escaped new lines in strings replaced, strings which look like
+    lists evaluated and missing numbers as `None`."""
+    def convert(val):
+        if isinstance(val, str):
+            val = val.replace('\\n', '\n')
+            if val.startswith('[') and val.endswith(']'):
+                val = eval(val)
+        elif type(val) == np.string_:
+            val = str(val.decode('utf-8-sig'))
+            # if it looks like a list, convert it:
+            if val.startswith('[') and val.endswith(']'):
+                val = eval(val)
+        elif np.isnan(val):
+            val = None
+        return val
+
+    kind = column.dtype.kind
+    if kind in 'iub':  # nothing to change
+        return list(column)
+    if kind == 'f':
+        values = list(column)
+        for i in np.flatnonzero(np.isnan(column)):
+            values[i] = None
+        return values
+    if kind != 'O':
+        return [convert(val) for val in column]
+
+    # conditions repeat, so convert each distinct value once (missing values
+    # have code -1)
+    codes, uniques = _factorizeObjects(column)
+    converted = np.empty(len(uniques) + 1, dtype=object)  # last is None
+    for i, val in enumerate(uniques):
+        converted[i] = convert(val)
+    values = converted[codes].tolist()
+    # lists are made for each condition, so changing one doesn't change all
+    listCodes = [i for i, val in enumerate(converted[:-1])
+                 if isinstance(val, list)]
+    if listCodes:
+        # rows of each distinct value, found in one go
+        order = np.argsort(codes, kind='stable')
+        starts = np.searchsorted(codes[order], listCodes)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        for i, start in zip(listCodes, starts):
+            for j in order[start + 1:start + counts[i]]:
+                values[j] = convert(uniques[i])
+
+    return values
+
+
 def importConditions(fileName, returnFieldNames=False, selection=""):
     """Imports a list of conditions from an .xlsx, .csv, or .pkl file
 
@@ -248,6 +567,10 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
     - slice(-10, 2, None)  # the same as above
     - random(5) * 8  # five random vals 0-7
 
+    Files are only read once while they're unchanged, after which their
+    conditions come from :data:`conditionsCache` (see
+    :func:`setConditionsCacheSize`). The selection is made each time.
+
     """
 
     def _attemptImport(fileName):
@@ -261,17 +584,25 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
             trialsArr = None
             errs = []
             # list of possible delimiters
-            delims = (",", ".", ";", "\t")
-            # try a variety of separator / decimal pairs
-            for sep, dec in [
-                # most common in US, EU
-                (',', '.'), 
-                (';', ','),
-                # other possible formats
-                ('\t', '.'), 
-                ('\t', ','), 
-                (';', '.')
-            ]:
+            delims = _csvDelims
+            # try the format guessed from the heading first, so the file is
+            # usually only parsed once
+            csvFormat = _sniffCsvFormat(fileName)
+            if csvFormat is not None:
+                try:
+                    thisAttempt = pd.read_csv(
+                        fileName, encoding='utf-8-sig', sep=csvFormat[0],
+                        decimal=csvFormat[1]
+                    )
+                except Exception:
+                    thisAttempt = None
+                if thisAttempt is not None and not (
+                        len(thisAttempt.columns) == 1 and any(
+                            delim in thisAttempt.columns[0] for delim in delims)):
+                    trialsArr = thisAttempt
+                    _assertValidVarNames(trialsArr.columns, fileName)
+            # otherwise try a variety of separator / decimal pairs
+            for sep, dec in (_csvFormats if trialsArr is None else []):
                 # try to load
                 try:
                     thisAttempt = pd.read_csv(
@@ -307,14 +638,7 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
                     _translate("Could not parse file {}.").format(fileName)
                 )
             # if we made it herre, we successfully loaded the file
-            for col in trialsArr.columns:
-                for row, cell in enumerate(trialsArr[col]):
-                    if isinstance(cell, str):
-                        tryVal = cell.replace(",", ".")
-                        try:
-                            trialsArr[col][row] = float(tryVal)
-                        except ValueError:
-                            pass
+            _convertDecimalCommas(trialsArr)
             logging.debug(u"Read csv file with pandas: {}".format(fileName))
         elif fileName.endswith(('.xlsx', '.xlsm')):
             trialsArr = pd.read_excel(fileName, engine='openpyxl')
@@ -367,41 +691,24 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
         """
         # convert the resulting dataframe to a numpy recarray
         trialsArr = dataframe.to_records(index=False)
-        # Check for new line characters in strings, and replace escaped characters
-        for record in trialsArr:
-            for idx, element in enumerate(record):
-                if isinstance(element, str):
-                    record[idx] = element.replace('\\n', '\n')
         if trialsArr.shape == ():
             # convert 0-D to 1-D with one element:
             trialsArr = trialsArr[np.newaxis]
         fieldNames = list(trialsArr.dtype.names)
         _assertValidVarNames(fieldNames, fileName)
 
-        # convert the record array into a list of dicts
-        trialList = []
-        for trialN, trialType in enumerate(trialsArr):
-            thisTrial = OrderedDict()
-            for fieldN, fieldName in enumerate(fieldNames):
-                val = trialsArr[trialN][fieldN]
-
-                if isinstance(val, str):
-                    if val.startswith('[') and val.endswith(']'):
-                        # val = eval('%s' %unicode(val.decode('utf8')))
-                        val = eval(val)
-                elif type(val) == np.string_:
-                    val = str(val.decode('utf-8-sig'))
-                    # if it looks like a list, convert it:
-                    if val.startswith('[') and val.endswith(']'):
-                        # val = eval('%s' %unicode(val.decode('utf8')))
-                        val = eval(val)
-                elif np.isnan(val):
-                    val = None
-                thisTrial[fieldName] = val
-            trialList.append(thisTrial)
+        # convert the record array into a list of dicts, a column at a time
+        columns = [_columnToConditions(trialsArr[fieldName])
+                   for fieldName in fieldNames]
+        trialList = [OrderedDict(zip(fieldNames, row))
+                     for row in zip(*columns)]
         return trialList, fieldNames
 
-    if (fileName.endswith(('.csv', '.tsv'))
+    cached = conditionsCache.get(fileName)
+    if cached is not None:
+        trialList, fieldNames = cached
+
+    elif (fileName.endswith(('.csv', '.tsv'))
             or (fileName.endswith(('.xlsx', '.xls', '.xlsm')) and haveXlrd)):
         trialList, fieldNames = _attemptImport(fileName=fileName)
 
@@ -506,6 +813,9 @@ def importConditions(fileName, returnFieldNames=False, selection=""):
             translated=_translate('Your conditions file should be an xlsx, csv, dlm, tsv or pkl file')
         )
 
+    if cached is None:
+        conditionsCache.add(fileName, trialList, fieldNames)
+
     # if we have a selection then try to parse it
     if isinstance(selection, str) and len(selection) > 0:
         selection = indicesFromString(selection)
@@ -209,6 +209,13 @@ class StaticComponent(BaseComponent):
                 "%(name)s.start({})\n"
             ).format(durationSecsStr)
             buff.writeIndentedLines(code % self.params)
+            # prefetch images while the screen is static
+            if self.currentLoop != "thisExp":
+                code = (
+                    "# decode any images needed by the next trial of %s\n"
+                    "visual.imagePrefetcher.prefetchTrials(%s)\n"
+                ) % (self.currentLoop, self.currentLoop)
+                buff.writeIndentedLines(code)
         
         return needsUnindent
 
@@ -167,6 +167,153 @@ class KeyPress(BaseResponse):
         return self.name != other
 
 
+class KeyResponseBuffer:
+    """Store of the responses received by a :class:`KeyboardDevice`, indexed
+    by key and by whether the key has been released.
+
+    This is used in place of a list for `KeyboardDevice.responses`, so that
+    `getKeys()` only needs to look at the responses for the keys asked for,
+    rather than every response kept, which can be thousands of them when keys
+    aren't cleared. Adding and removing a response takes the same time however
+    many are stored.
+
+    Each KeyPress is only stored once, in the order it was first received.
+    The same object is received again when the key is released (its
+    `duration` is then set), which moves it from the pressed to the released
+    keys rather than adding it twice.
+
+    Parameters
+    ----------
+    responses : iterable of KeyPress
+        Responses to start with.
+    """
+
+    def __init__(self, responses=()):
+        # [order received, response, released] by id, in the order received
+        self._entries = {}
+        # responses by key value, by id, for pressed [0] and released [1] keys
+        self._index = ({}, {})
+        self._nReceived = 0
+        self.extend(responses)
+
+    @staticmethod
+    def _isReleased(resp):
+        return getattr(resp, "duration", None) is not None
+
+    def append(self, resp):
+        """Add a response, or move it to the released keys if it's already
+        stored and has since been released."""
+        released = self._isReleased(resp)
+        entry = self._entries.get(id(resp))
+        if entry is None:
+            self._entries[id(resp)] = [self._nReceived, resp, released]
+            self._nReceived += 1
+        elif entry[2] == released:
+            return
+        else:
+            self._unindex(entry)
+            entry[2] = released
+        self._index[released].setdefault(resp.value, {})[id(resp)] = resp
+
+    def extend(self, responses):
+        """Add several responses."""
+        for resp in responses:
+            self.append(resp)
+
+    def __iadd__(self, responses):
+        self.extend(responses)
+        return self
+
+    def _unindex(self, entry):
+        resp, released = entry[1], entry[2]
+        index = self._index[released]
+        keyResps = index[resp.value]
+        del keyResps[id(resp)]
+        if not keyResps:
+            del index[resp.value]
+
+    def remove(self, resp):
+        """Remove a response."""
+        self._unindex(self._entries.pop(id(resp)))
+
+    def clear(self):
+        """Remove all responses."""
+        self._entries.clear()
+        for index in self._index:
+            index.clear()
+
+    def getResponses(self, keyList=None, ignoreKeys=None, released=True,
+                     clear=False):
+        """Get stored responses, see :meth:`KeyboardDevice.getKeys`.
+
+        Parameters
+        ----------
+        keyList : list or None
+            Only get responses with one of these values (if given).
+        ignoreKeys : list or None
+            Don't get responses with any of these values.
+        released : bool
+            If True get keys which have been released, otherwise get keys
+            which are still pressed.
+        clear : bool
+            If True remove the responses got.
+
+        Returns
+        -------
+        list of KeyPress
+            Matching responses, in the order they were received.
+        """
+        # only the keys of the responses stored are compared with the lists
+        def _wantedKeys(index):
+            return [key for key in index
+                    if (not keyList or key in keyList)
+                    and not (ignoreKeys and key in ignoreKeys)]
+
+        index = self._index[released]
+        resps = [resp for key in _wantedKeys(index)
+                 for resp in index[key].values()]
+        if released:
+            # keys released without the release being received again
+            pressedIndex = self._index[False]
+            for key in _wantedKeys(pressedIndex):
+                for resp in list(pressedIndex[key].values()):
+                    if self._isReleased(resp):
+                        self.append(resp)
+                        resps.append(resp)
+        else:
+            # keys released since they were received are moved, not got
+            stillPressed = []
+            for resp in resps:
+                if self._isReleased(resp):
+                    self.append(resp)
+                else:
+                    stillPressed.append(resp)
+            resps = stillPressed
+
+        entries = self._entries
+        resps.sort(key=lambda resp: entries[id(resp)][0])
+        if clear:
+            for resp in resps:
+                self.remove(resp)
+
+        return resps
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter([entry[1] for entry in self._entries.values()])
+
+    def __getitem__(self, i):
+        return list(self)[i]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, list(self))
+
+
 def getKeyboards():
     """Get info about the available keyboards.
 
@@ -454,6 +601,19 @@ class KeyboardDevice(BaseResponseDevice, aliases=["keyboard"]):
     def close(self):
         self.stop()
 
+    @property
+    def responses(self):
+        """Responses received and not yet cleared, as a
+        :class:`KeyResponseBuffer`. Can be set with a list of KeyPress
+        objects."""
+        return self._responses
+
+    @responses.setter
+    def responses(self, value):
+        if not isinstance(value, KeyResponseBuffer):
+            value = KeyResponseBuffer(value)
+        self._responses = value
+
     @staticmethod
     def getAvailableDevices():
         devices = []
@@ -494,37 +654,10 @@ class KeyboardDevice(BaseResponseDevice, aliases=["keyboard"]):
         """
         # dispatch messages
         self.dispatchMessages()
-        # filter
-        keys = []
-        toClear = []
-        for i, resp in enumerate(self.responses):
-            # start off assuming we want the key
-            wanted = True
-            # if we're waiting on release, only store if it has a duration
-            wasRelease = hasattr(resp, "duration") and resp.duration is not None
-            if waitRelease:
-                wanted = wanted and wasRelease
-            else:
-                wanted = wanted and not wasRelease
-            # if we're looking for a key list, only store if it's in the list
-            if keyList:
-                if resp.value not in keyList:
-                    wanted = False
-            # if we're ignoring some keys, never store if ignored
-            if ignoreKeys:
-                if resp.value in ignoreKeys:
-                    wanted = False
-            # if we got this far and the key is still wanted and not present, add it to output
-            if wanted and not any(k is resp for k in keys):
-                keys.append(resp)
-            # if clear=True, mark wanted responses as toClear
-            if wanted and clear:
-                toClear.append(i)
-        # pop any responses marked as to clear
-        for i in sorted(toClear, reverse=True):
-            self.responses.pop(i)
-
-        return keys
+        # responses are indexed by key, so only those wanted are looked at
+        return self.responses.getResponses(
+            keyList=keyList, ignoreKeys=ignoreKeys, released=waitRelease,
+            clear=clear)
 
     def getState(self, keys):
         """
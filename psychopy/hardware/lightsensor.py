@@ -615,9 +615,12 @@ class BaseLightSensorGroup(base.BaseResponseDevice):
 
 
 class ScreenBufferSampler(BaseLightSensorGroup):
-    def __init__(self, win, threshold=0.5, pos=None, size=None, units=None):
+    def __init__(self, win, threshold=0.5, pos=None, size=None, units=None,
+                 asyncReadback=False):
         # store win
         self.win = win
+        # read pixels without stalling, at the cost of a frame of latency
+        self.asyncReadback = asyncReadback
         # default rect
         self.rect = None
         # initialise base class
@@ -650,17 +653,28 @@ class ScreenBufferSampler(BaseLightSensorGroup):
         w = int(w)
         h = int(h)
         # read front buffer luminances for specified area
-        pixels = self.win._getPixels(
-            buffer="front",
-            rect=(left, bottom, w, h),
-            makeLum=True
-        )
+        if self.asyncReadback:
+            # pixels come back a frame or so later, tagged with their flip time
+            pixels, frameTime = self.win._getPixelsAsync(
+                buffer="front",
+                rect=(left, bottom, w, h),
+                makeLum=True
+            )
+            if pixels is None:
+                return
+        else:
+            pixels = self.win._getPixels(
+                buffer="front",
+                rect=(left, bottom, w, h),
+                makeLum=True
+            )
+            frameTime = self.win._frameTimes[-1] if self.win._frameTimes else None
         # work out whether it's brighter than threshold
         state = pixels.mean() > (255 - self.getThreshold() * 255)
         # if state has changed, make an event
         if state != self.state[0]:
-            if self.win._frameTimes:
-                frameT = logging.defaultClock.getTime() - self.win._frameTimes[-1]
+            if frameTime is not None:
+                frameT = logging.defaultClock.getTime() - frameTime
             else:
                 frameT = 0
             resp = LightSensorResponse(
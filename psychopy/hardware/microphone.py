@@ -273,11 +273,11 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         self._statusFlag = NOT_STARTED
 
         # recording buffer information
-        self._recording = []  # use a list
         self._totalSamples = 0
         self._maxRecordingSize = (
             -1 if maxRecordingSize is None else int(maxRecordingSize))
         self._policyWhenFull = policyWhenFull
+        self._recording = self._createRecordingBuffer()
 
         # internal state
         self._possiblyAsleep = False
@@ -677,7 +677,7 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         # reset timer for possibly asleep
         self._possiblyAsleep = False
         # reset the recording buffer
-        self._recording = []
+        self._recording = self._createRecordingBuffer()
         self._totalSamples = 0
 
         # reset warnings
@@ -884,7 +884,7 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
     def recordingEmpty(self):
         """`True` if the recording buffer is empty (`bool`).
         """
-        return len(self._recording) == 0
+        return self._recording.nSamples == 0
     
     @property
     def recordingFull(self):
@@ -963,9 +963,8 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
 
         # add samples to recording buffer
         if len(audioData):
-            # add samples to recording buffer
-            self._recording.append(
-                AudioClip(audioData, sampleRateHz=self._sampleRateHz))
+            # copy samples into the recording buffer
+            self._recording.write(audioData)
             self._totalSamples += audioData.shape[0]
 
         if self.recordingFull and not self._policyWhenFull == 'ignore':
@@ -978,49 +977,32 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
 
         return 0
     
-    def _mergeAudioFragments(self):
-        """Merge audio fragments into a single segment.
-        
-        This merges all audio fragments in the recoding buffer into a single
-        `AudioClip` object. The recording buffer is then cleared and the first
-        element is set to the merged segment.
+    def _createRecordingBuffer(self):
+        """Create an empty buffer to hold a recording.
+
+        Recordings can grow as long as needed, unless `policyWhenFull` is
+        'roll' or 'rolling' in which case only the most recent
+        `maxRecordingSize` worth of samples are kept.
 
         Returns
         -------
-        bool
-            `False` if the recording buffer has no fragments to merge, `True`
-            otherwise.
+        RecordingRingBuffer
+            New recording buffer.
 
         """
-        if len(self._recording) < 2:
-            return False
-        
-        # get the sum of all audio samples in the recording buffer
-        totalSamples = sum(
-            [segment.samples.shape[0] for segment in self._recording])
-
-        # create a new array to hold all samples
-        fullSegment = np.zeros(
-            (totalSamples, self._recording[0].channels), 
-            dtype=np.float32, 
-            order='C')
-        
-        # copy samples from each segment into the full segment
-        idx = 0
-        for segment in self._recording:
-            nSamples = segment.samples.shape[0]
-            fullSegment[idx:idx + nSamples, :] = segment.samples
-            idx += nSamples
-
-        # set the recording
-        self._recording = [
-            AudioClip(fullSegment, sampleRateHz=self._sampleRateHz)]  
-
-        return True
-    
+        rolling = self._policyWhenFull in ('roll', 'rolling')
+        return RecordingRingBuffer(
+            sampleRateHz=self._sampleRateHz,
+            channels=self._channels,
+            maxRecordingSize=self._maxRecordingSize if rolling else -1,
+            policyWhenFull=self._policyWhenFull)
+
     def _getSegment(self, start=0, end=None):
         """Get a segment of audio samples from the recording buffer.
 
+        The returned clip is a view of the recording buffer, so no samples are
+        copied.
+
         Parameters
         ----------
         start : float
@@ -1038,25 +1020,8 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         """
         if self.recordingEmpty:
             return None
-        
-        self._mergeAudioFragments()  # merge audio fragments
-
-        if not len(self._recording[0].samples):
-            raise AudioStreamError(
-                "Could not access recording as microphone has sent no samples."
-            )
-        
-        if start == 0 and end is None:  # return full recording
-            return self._recording[0]
 
-        # get a range of samples within the recording buffer
-        idxStart = int(start * self._sampleRateHz)
-        idxEnd = -1 if end is None else int(end * self._sampleRateHz)
-        
-        return AudioClip(
-            np.array(self._recording[0].samples[idxStart:idxEnd, :],
-                     dtype=np.float32, order='C'),
-            sampleRateHz=self._sampleRateHz)
+        return self._recording.getSegment(start, end)
 
     def getRecording(self):
         """Get audio data from the last microphone recording.
@@ -1108,25 +1073,11 @@ class MicrophoneDevice(BaseDevice, aliases=["mic", "microphone"]):
         if self.recordingEmpty:
             return 0.0
 
-        # merge last few recording fragments into a single segment
-        requiredSamples = int(timeframe * self._sampleRateHz)
-        sampleBuffers = []
-        for segment in reversed(self._recording):
-            nSamples = segment.samples.shape[0]
-            requiredSamples -= nSamples
-            if requiredSamples < 0:
-                sampleBuffers.insert(0, segment.samples[requiredSamples:, :])
-                break
-            sampleBuffers.insert(0, segment.samples)
-
-        # merge the samples
-        sampleBuffer = np.concatenate(
-            sampleBuffers, axis=0, dtype=np.float32)
-
-        clip = AudioClip(sampleBuffer, sampleRateHz=self._sampleRateHz)
-
-        # get average volume
-        rms = clip.rms() * 10
+        # get average volume of the most recent samples from the running sums
+        requiredSamples = max(int(timeframe * self._sampleRateHz), 1)
+        rms = self._recording.getRMS(requiredSamples) * 10
+        if len(rms) == 1:
+            rms = rms[0]
 
         # round
         rms = np.round(rms.astype(np.float64), decimals=3)
@@ -1581,4 +1532,318 @@ class RecordingBuffer:
         return AudioClip(
             np.array(self._samples[idxStart:idxEnd, :],
                      dtype=np.float32, order='C'),
-            sampleRateHz=self._sampleRateHz)
\ No newline at end of file
+            sampleRateHz=self._sampleRateHz)
+
+class RecordingRingBuffer(RecordingBuffer):
+    """Recording buffer which keeps its samples in one preallocated,
+    contiguous array so that segments can be taken without copying.
+
+    Samples from each `write()` are copied into place, rather than being kept
+    as separate fragments which need merging. If the buffer has no maximum
+    size it doubles in capacity whenever it runs out of space, otherwise it
+    behaves as a ring buffer holding the most recent `maxRecordingSize` worth
+    of samples (if `policyWhenFull` is 'roll' or 'rolling'). Rather than
+    wrapping around, the ring is backed by an array twice as long as needed
+    and the retained samples are moved back to the start of a new array once
+    it fills up, so the recording is always a single contiguous block and
+    `getSegment()` can return views of it. Arrays are never written to once
+    samples have been handed out, so views remain valid after `clear()`.
+
+    Running sums of squares are kept for each block of samples, so the RMS of
+    the most recent samples (see `getRMS()`) is found without needing to
+    revisit most of them.
+
+    Used internally by the `MicrophoneDevice` class, users usually do not
+    create instances of this class themselves.
+
+    Parameters
+    ----------
+    sampleRateHz : int
+        Sampling rate for audio recording in Hertz (Hz).
+    channels : int
+        Number of channels to record samples to `1=Mono` and `2=Stereo`.
+    maxRecordingSize : int or None
+        Maximum recording size in kilobytes (Kb). If `None` or negative, the
+        buffer will grow as needed to hold the whole recording.
+    policyWhenFull : str
+        What to do when the recording buffer is full, see `RecordingBuffer`.
+        If 'roll' or 'rolling', the oldest samples are dropped to make room for
+        new ones.
+    initialSecs : float
+        Length of recording to initially allocate space for in seconds, if
+        `maxRecordingSize` is not given.
+
+    """
+    # number of samples in each block of running sums
+    blockSize = 1024
+
+    def __init__(self, sampleRateHz=SAMPLE_RATE_48kHz, channels=2,
+                 maxRecordingSize=None, policyWhenFull='ignore',
+                 initialSecs=10.0):
+        self._initialSecs = float(initialSecs)
+        self._start = 0  # index of the first retained sample
+        self._blockSums = None  # set in `_allocRecBuffer`
+        self._samplesDropped = 0
+        RecordingBuffer.__init__(
+            self,
+            sampleRateHz=sampleRateHz,
+            channels=channels,
+            maxRecordingSize=-1 if maxRecordingSize is None else maxRecordingSize,
+            policyWhenFull=policyWhenFull)
+
+    @property
+    def isBounded(self):
+        """`True` if the buffer has a maximum size (`bool`)."""
+        return self._maxRecordingSize > 0
+
+    @property
+    def isRolling(self):
+        """`True` if the oldest samples are dropped when full (`bool`)."""
+        return self.isBounded and self._policyWhenFull in ('roll', 'rolling')
+
+    @property
+    def maxSamples(self):
+        """Maximum number of samples retained, or `None` if unbounded."""
+        if not self.isBounded:
+            return None
+        nBytes = self._maxRecordingSize * 1000
+        return int((nBytes / self._channels) / np.float32().itemsize)
+
+    @property
+    def nSamples(self):
+        """Number of samples currently held in the buffer (`int`)."""
+        return self._offset - self._start
+
+    @property
+    def samplesDropped(self):
+        """Number of samples dropped from the start of the recording to make
+        room for newer ones (`int`). Times given to `getSegment()` are
+        relative to the oldest retained sample.
+        """
+        return self._samplesDropped
+
+    @property
+    def spaceRemaining(self):
+        if not self.isBounded or self.isRolling:
+            return np.inf
+        return self.maxSamples - self.nSamples
+
+    @property
+    def isFull(self):
+        return self.spaceRemaining <= 0
+
+    @property
+    def totalSamples(self):
+        """Total number samples the recording buffer can hold without being
+        reallocated (`int`)."""
+        return len(self._samples)
+
+    @property
+    def bufferSecs(self):
+        """Capacity of the recording buffer in seconds (`float`)."""
+        if self.isBounded:
+            return self.maxSamples / self._sampleRateHz
+        return np.inf
+
+    def __len__(self):
+        return self.nSamples
+
+    def _allocRecBuffer(self, capacity=None):
+        """Allocate new (empty) arrays for the recording buffer."""
+        if capacity is None:
+            if self.isRolling:
+                capacity = 2 * self.maxSamples
+            elif self.isBounded:
+                capacity = self.maxSamples
+            else:
+                capacity = int(self._initialSecs * self._sampleRateHz)
+        capacity = max(int(capacity), self.blockSize)
+
+        self._samples = np.zeros(
+            (capacity, self._channels), dtype=np.float32, order='C')
+        # cumulative sums of squares at the start of each block
+        self._blockSums = np.zeros(
+            (capacity // self.blockSize + 1, self._channels), dtype=np.float64)
+        self._start = self._offset = self._lastSample = 0
+        self._totalSamples = capacity
+        self._spaceRemaining = self.spaceRemaining
+
+    def _reallocRecBuffer(self, capacity, keep):
+        """Move the last `keep` samples to the start of a new array of size
+        `capacity`.
+        """
+        keep = min(keep, self.nSamples)
+        recorded = self._samples[self._offset - keep:self._offset]
+        self._allocRecBuffer(capacity)
+        self._samples[:keep] = recorded
+        self._offset = self._lastSample = keep
+        self._updateBlockSums(0, keep)
+
+    def _updateBlockSums(self, fromIdx, toIdx):
+        """Update running sums for any blocks completed by writing samples
+        between `fromIdx` and `toIdx`."""
+        fromBlock = fromIdx // self.blockSize
+        toBlock = toIdx // self.blockSize
+        if toBlock <= fromBlock:
+            return
+        blocks = self._samples[fromBlock * self.blockSize:
+                               toBlock * self.blockSize].reshape(
+            (toBlock - fromBlock, self.blockSize, self._channels))
+        sums = np.sum(np.square(blocks, dtype=np.float64), axis=1)
+        np.cumsum(sums, axis=0, out=self._blockSums[fromBlock + 1:toBlock + 1])
+        self._blockSums[fromBlock + 1:toBlock + 1] += self._blockSums[fromBlock]
+
+    def _sumOfSquares(self, fromIdx, toIdx):
+        """Sum of squared samples between two indices of the array."""
+        if toIdx - fromIdx < 2 * self.blockSize:
+            return np.sum(
+                np.square(self._samples[fromIdx:toIdx], dtype=np.float64),
+                axis=0)
+        # whole blocks come from the running sums, partial ones are summed
+        firstBlock = -(-fromIdx // self.blockSize)
+        lastBlock = toIdx // self.blockSize
+        total = self._blockSums[lastBlock] - self._blockSums[firstBlock]
+        total = total + self._sumOfSquares(fromIdx, firstBlock * self.blockSize)
+        total += self._sumOfSquares(lastBlock * self.blockSize, toIdx)
+
+        return total
+
+    def write(self, samples):
+        """Write samples to the recording buffer.
+
+        Parameters
+        ----------
+        samples : ArrayLike
+            Samples to write to the recording buffer, usually of a stream. Must
+            have the same number of dimensions as the internal array.
+
+        Returns
+        -------
+        int
+            Number of samples overflowed. If this is zero then all samples have
+            been recorded, if not, the number of samples rejected is given.
+
+        """
+        nSamples = len(samples)
+        if not nSamples:  # no samples came out of the stream, just return
+            return 0
+
+        overflow = 0
+        if self.isRolling:
+            maxSamples = self.maxSamples
+            self._samplesDropped += max(self.nSamples + nSamples - maxSamples, 0)
+            if nSamples > maxSamples:  # only the most recent samples fit
+                samples = samples[-maxSamples:]
+                nSamples = maxSamples
+            if self._offset + nSamples > len(self._samples):
+                # move what's left of the ring to the start of a new array
+                self._reallocRecBuffer(
+                    len(self._samples), maxSamples - nSamples)
+            # drop samples from the start of the ring
+            self._start = max(self._start, self._offset + nSamples - maxSamples)
+        elif self.isBounded:
+            if self.isFull:
+                # let the base class deal with the full buffer policy
+                return RecordingBuffer.write(self, samples)
+            if nSamples > self.spaceRemaining:
+                overflow = nSamples - self.spaceRemaining
+                samples = samples[:self.spaceRemaining]
+                nSamples = len(samples)
+        elif self._offset + nSamples > len(self._samples):
+            # grow to fit, doubling capacity so writes are amortized O(1)
+            capacity = len(self._samples)
+            while capacity < self._offset + nSamples:
+                capacity *= 2
+            self._reallocRecBuffer(capacity, self.nSamples)
+
+        end = self._offset + nSamples
+        self._samples[self._offset:end] = samples
+        self._updateBlockSums(self._offset, end)
+        self._offset = self._lastSample = end
+        self._spaceRemaining = self.spaceRemaining
+
+        return overflow
+
+    def clear(self):
+        """Remove all samples from the buffer. Segments previously taken from
+        the buffer are not affected."""
+        self._samplesDropped = 0
+        self._warnedRecBufferFull = False
+        self._allocRecBuffer()
+
+    def getLatest(self, nSamples):
+        """Get the most recent samples in the buffer, without copying them.
+
+        Parameters
+        ----------
+        nSamples : int
+            Number of samples to get. Fewer are returned if the buffer doesn't
+            hold that many.
+
+        Returns
+        -------
+        ndarray
+            Read-only view of the samples.
+
+        """
+        nSamples = max(min(int(nSamples), self.nSamples), 0)
+        view = self._samples[self._offset - nSamples:self._offset]
+        view.flags.writeable = False
+
+        return view
+
+    def getRMS(self, nSamples):
+        """Get the root mean square (RMS) of the most recent samples for each
+        channel, using the running sums of squares.
+
+        Parameters
+        ----------
+        nSamples : int
+            Number of samples to compute the RMS over. If the buffer doesn't
+            hold that many, all samples are used.
+
+        Returns
+        -------
+        ndarray
+            RMS of each channel, zero if there are no samples.
+
+        """
+        nSamples = max(min(int(nSamples), self.nSamples), 0)
+        if not nSamples:
+            return np.zeros((self._channels,), dtype=np.float64)
+        sumSq = self._sumOfSquares(self._offset - nSamples, self._offset)
+        # rounding can leave tiny negative sums for silent input
+        return np.sqrt(np.maximum(sumSq, 0.0) / nSamples)
+
+    def getSegment(self, start=0, end=None):
+        """Get a segment of recording data as an `AudioClip`, without copying
+        the samples.
+
+        Parameters
+        ----------
+        start : float or int
+            Time in seconds for the start of the clip, relative to the oldest
+            sample in the buffer.
+        end : float or int
+            Time in seconds for the end of the clip. If `None` the time at the
+            last sample is used.
+
+        Returns
+        -------
+        AudioClip
+            Audio clip object with samples between `start` and `end`. Its
+            samples are a view of the buffer, so changing them in place (e.g.
+            with `AudioClip.gain()`) changes the recording too.
+
+        """
+        if not self.nSamples:
+            raise AudioStreamError(
+                "Could not access recording as microphone has sent no samples."
+            )
+
+        idxStart = self._start + max(int(start * self._sampleRateHz), 0)
+        idxEnd = self._offset if end is None else min(
+            self._start + int(end * self._sampleRateHz), self._offset)
+        view = self._samples[idxStart:max(idxStart, idxEnd)]
+
+        return AudioClip(view, sampleRateHz=self._sampleRateHz)
@@ -7,6 +7,7 @@
 import os
 import sys
 import time
+from collections import deque
 import subprocess
 import json
 import signal
@@ -230,6 +231,11 @@ class ioHubDevices():
     def getNames(self):
         return self._devicesByName.keys()
 
+
+# types of event values that _convertList() changes
+_NEEDS_CONVERSION = frozenset((bytes, list, tuple, dict))
+
+
 class ioHubConnection():
     """ioHubConnection is responsible for creating, sending requests to, and
     reading replies from the ioHub Process. This class is also used to
@@ -258,6 +264,8 @@ class ioHubConnection():
         # >> mouse position:  [-211.0, 371.0]
     """
     ACTIVE_CONNECTION = None
+    # max number of events sent in each reply to a filtered getEvents() call
+    GET_EVENTS_CHUNK_SIZE = 512
 
     def __init__(self, ioHubConfig=None, ioHubConfigAbsPath=None):
         if ioHubConfig:
@@ -295,6 +303,11 @@ class ioHubConnection():
         self._shutdown_attempted = False
         self._cv_order = None
         self._message_cache = []
+        # shared memory event transport, if enabled in the ioHub config
+        self._shared_events = None
+        self._unread_events = deque()
+        self._oversize_count = 0
+        self._device_event_types = None
         self.iohub_status = self._startServer(ioHubConfig, ioHubConfigAbsPath)
         if self.iohub_status != 'OK':
             raise RuntimeError('Error starting ioHub server: {}'.format(self.iohub_status))
@@ -332,7 +345,8 @@ class ioHubConnection():
         """
         return self.devices.getDevice(deviceName)
 
-    def getEvents(self, device_label=None, as_type='namedtuple'):
+    def getEvents(self, device_label=None, as_type='namedtuple',
+                  event_type=None, since_event_id=None, since_time=None):
         """Retrieve any events that have been collected by the ioHub Process
         from monitored devices since the last call to getEvents() or
         clearEvents().
@@ -348,6 +362,20 @@ class ioHubConnection():
         providing a valid device name as the device_label argument will
         result in only events from that device being returned.
 
+        Events can also be filtered by type, and only events newer than a
+        given event_id or time can be requested, in which case the filtering
+        is done by the ioHub Process so only matching events are sent back.
+        When since_event_id or since_time is given, events are *not* removed
+        from the ioHub Global Event Buffer, so that an experiment can
+        incrementally read new events by passing the event_id of the last
+        event it received. Events already retrieved from the ioHub Process
+        during a delay() call are not included in filtered results.
+
+        If the shared_event_buffer setting is enabled, events from all devices
+        are read from shared memory rather than requested from the ioHub
+        Process, and filtering is done locally. Events from a single device
+        are always requested from the ioHub Process.
+
         Events can be received in one of several object types by providing the
         optional as_type property to the method. Valid values for as_type are
         the following str values:
@@ -365,11 +393,29 @@ class ioHubConnection():
 
             as_type (str): Returned event object type. Default: 'namedtuple'.
 
+            event_type (int, str or list): EventConstants event type id(s) or
+                                name(s) to retrieve. If None ( the default )
+                                events of any type are returned.
+
+            since_event_id (int): Only return events with an event_id greater
+                                than this.
+
+            since_time (float): Only return events with an ioHub time later
+                                than this.
+
         Returns:
             tuple: List of event objects; object type controlled by 'as_type'.
         """
         r = None
-        if device_label is None:
+        incremental = since_event_id is not None or since_time is not None
+        if self._shared_events is not None and (
+                device_label is None or incremental):
+            r = self._getSharedEvents(device_label, event_type,
+                                      since_event_id, since_time)
+        elif incremental or (event_type is not None and device_label is None):
+            r = self._getFilteredEvents(device_label, event_type,
+                                        since_event_id, since_time)
+        elif device_label is None:
             events = self._sendToHubServer(('GET_EVENTS',))[1]
             if events is None:
                 r = self.allEvents
@@ -377,6 +423,9 @@ class ioHubConnection():
                 self.allEvents.extend(events)
                 r = self.allEvents
             self.allEvents = []
+        elif event_type is not None:
+            r = self.devices.getDevice(device_label).getEvents(
+                event_type_id=event_type)
         else:
             r = self.devices.getDevice(device_label).getEvents()
 
@@ -398,6 +447,151 @@ class ioHubConnection():
 
         return []
 
+    def _getFilteredEvents(self, device_label=None, event_type=None,
+                           since_event_id=None, since_time=None):
+        """Request events matching the given filters from the ioHub Global
+        Event Buffer. Large results are sent in several replies of at most
+        GET_EVENTS_CHUNK_SIZE events, so they do not hit UDP size limits.
+        """
+        options = dict(max_events=self.GET_EVENTS_CHUNK_SIZE)
+        if device_label is not None:
+            if isinstance(device_label, str):
+                device_label = [device_label]
+            options['devices'] = list(device_label)
+        if event_type is not None:
+            if isinstance(event_type, (int, str)):
+                event_type = [event_type]
+            options['event_types'] = list(event_type)
+        if since_time is not None:
+            options['since_time'] = since_time
+        incremental = since_event_id is not None or since_time is not None
+
+        events = []
+        chunks = 0
+        while True:
+            if since_event_id is not None:
+                options['since_event_id'] = since_event_id
+            _, chunk, remaining = self._sendToHubServer(('GET_EVENTS', options))
+            if not chunk:
+                break
+            events.extend(chunk)
+            chunks += 1
+            if not remaining:
+                break
+            if incremental:
+                # continue from the last event sent
+                since_event_id = max(
+                    e[DeviceEvent.EVENT_ID_INDEX] for e in chunk)
+
+        if chunks > 1:
+            events.sort(key=lambda e: e[DeviceEvent.EVENT_HUB_TIME_INDEX])
+        return events
+
+    def _pollSharedEvents(self):
+        """Move any new events from the shared event buffer to the local
+        buffer of unread events, also requesting any events that were too
+        large for the shared event buffer from the ioHub Process.
+        """
+        unread = self._unread_events
+        events = self._shared_events.read()
+        if events:
+            # only convert events with bytes or nested values, which are
+            # rare, as converting every event takes longer than reading it
+            unread.extend(
+                e if _NEEDS_CONVERSION.isdisjoint(map(type, e))
+                else self._convertList(e) for e in events)
+
+        oversize_count = self._shared_events.getOversizeCount()
+        if oversize_count != self._oversize_count:
+            self._oversize_count = oversize_count
+            events = self._sendToHubServer(('GET_EVENTS',))[1]
+            if events:
+                unread.extend(events)
+                events = sorted(unread,
+                                key=lambda e: e[DeviceEvent.EVENT_HUB_TIME_INDEX])
+                unread.clear()
+                unread.extend(events)
+        return unread
+
+    def _getSharedEventTypeFilter(self, device_label=None, event_type=None):
+        """Get the set of event type ids to return for the device_label and
+        event_type filters of getEvents(), or None if events of any type
+        should be returned.
+        """
+        eventTypes = None
+        if device_label is not None:
+            if isinstance(device_label, str):
+                device_label = [device_label]
+            if self._device_event_types is None:
+                self._device_event_types = self._sendToHubServer(
+                    ('RPC', 'getDeviceEventTypes'))[2]
+            eventTypes = set()
+            for label in device_label:
+                eventTypes.update(self._device_event_types.get(label, ()))
+        if event_type is not None:
+            if isinstance(event_type, (int, str)):
+                event_type = [event_type]
+            typeIDs = {getattr(EventConstants, etype)
+                       if isinstance(etype, str) else etype
+                       for etype in event_type}
+            eventTypes = typeIDs if eventTypes is None else eventTypes & typeIDs
+        return eventTypes
+
+    def _getSharedEvents(self, device_label=None, event_type=None,
+                         since_event_id=None, since_time=None):
+        """Get events from the shared event buffer, with the same filtering
+        as _getFilteredEvents() does on the ioHub Process.
+        """
+        unread = self._pollSharedEvents()
+        eventTypes = self._getSharedEventTypeFilter(device_label, event_type)
+        incremental = since_event_id is not None or since_time is not None
+
+        if eventTypes is None and not incremental:
+            self.allEvents.extend(unread)
+            unread.clear()
+            events = self.allEvents
+            self.allEvents = []
+            return events
+
+        idIndex = DeviceEvent.EVENT_ID_INDEX
+        typeIndex = DeviceEvent.EVENT_TYPE_ID_INDEX
+        timeIndex = DeviceEvent.EVENT_HUB_TIME_INDEX
+        events = [e for e in unread
+                  if (eventTypes is None or e[typeIndex] in eventTypes)
+                  and (since_event_id is None or e[idIndex] > since_event_id)
+                  and (since_time is None or e[timeIndex] > since_time)]
+        if events and not incremental:
+            returned = set(map(id, events))
+            keep = [e for e in unread if id(e) not in returned]
+            unread.clear()
+            unread.extend(keep)
+        return events
+
+    def _clearSharedEvents(self):
+        if self._shared_events is not None:
+            self._shared_events.skip()
+            self._oversize_count = self._shared_events.getOversizeCount()
+            self._unread_events.clear()
+
+    def _attachSharedEventBuffer(self):
+        """Start reading events from the ioHub Process's shared event buffer,
+        if it has one."""
+        name = self._sendToHubServer(
+            ('RPC', 'getSharedEventBufferName'))[2]
+        if not name:
+            return
+        from ..sharedevents import SharedEventBuffer
+        try:
+            self._shared_events = SharedEventBuffer(name)
+        except Exception: # pylint: disable=broad-except
+            print2err('Could not open ioHub shared event buffer {}, '
+                      'events will be requested over UDP.'.format(name))
+            printExceptionDetailsToStdErr()
+            return
+        unread_length = self._iohub_server_config.get('global_event_buffer')
+        self._unread_events = deque(maxlen=unread_length)
+        self._oversize_count = self._shared_events.getOversizeCount()
+
     def clearEvents(self, device_label='all'):
         """Clears unread events from the ioHub Server's Event Buffer(s)
         so that unneeded events are not discarded.
@@ -426,6 +620,7 @@ class ioHubConnection():
             if device_label == 'all':
                 self.allEvents = []
                 self._sendToHubServer(('RPC', 'clearEventBuffer', [True, ]))
+                self._clearSharedEvents()
                 try:
                     self.getDevice('keyboard')._clearLocalEvents()
                 except:
@@ -437,6 +632,7 @@ class ioHubConnection():
         elif device_label in [None, '', False]:
             self.allEvents = []
             self._sendToHubServer(('RPC', 'clearEventBuffer', [False, ]))
+            self._clearSharedEvents()
             try:
                 self.getDevice('keyboard')._clearLocalEvents()
             except:
@@ -852,6 +1048,29 @@ class ioHubConnection():
         r = self._sendToHubServer(('RPC', 'flushIODataStoreFile'))
         return r
 
+    def getDataStoreStats(self):
+        """Get throughput statistics for the iohub datastore, which stages
+        events in memory and writes them to the hdf5 file in batches.
+
+        Args:
+            None
+
+        Returns:
+            dict: Contains:
+
+                * events_received: number of events given to the datastore.
+                * events_written: number of events written to the file.
+                * events_pending: number of events staged but not yet written.
+                * table_appends: number of batched writes made.
+                * events_per_sec: events written per second.
+                * flush_latency_mean, flush_latency_max, flush_latency_last:
+                  seconds taken to write recent batches.
+
+            None is returned if the datastore is not enabled.
+        """
+        r = self._sendToHubServer(('RPC', 'getIODataStoreStats'))
+        return r[2]
+
     def startCustomTasklet(self, task_name, task_class_path, **class_kwargs):
         """
         Instruct the iohub server to start running a custom tasklet given
@@ -1023,6 +1242,8 @@ class ioHubConnection():
         self.udp_client = UDPClientConnection(remote_port=server_udp_port)
         # <<<<< Done Creating open UDP port to ioHub Server
 
+        self._attachSharedEventBuffer()
+
         # <<<<< Done starting iohub subprocess
 
         ioHubConnection.ACTIVE_CONNECTION = proxy(self)
@@ -1339,6 +1560,9 @@ class ioHubConnection():
                     Computer.iohub_process.kill()
                 printExceptionDetailsToStdErr()
             finally:
+                if self._shared_events is not None:
+                    self._shared_events.close()
+                    self._shared_events = None
                 ioHubConnection.ACTIVE_CONNECTION = None
                 self._server_process = None
                 Computer.iohub_process_id = None
@@ -6,9 +6,12 @@
 
 import os
 import atexit
+import weakref
+from collections import deque
 import numpy as np
 from packaging.version import Version
 from ..server import DeviceEvent
+from ..devices import Computer
 from ..constants import EventConstants
 from ..errors import ioHubError, printExceptionDetailsToStdErr, print2err
 
@@ -43,6 +46,54 @@ FILE_VERSION = '0.9.1.2'
 SCHEMA_AUTHORS = 'Sol Simpson'
 SCHEMA_MODIFIED_DATE = 'October 27, 2021'
 
+getTime = Computer.getTime
+
+
+class EventTableBuffer():
+    """Staging buffer for the events destined for one DataStore table.
+
+    Events are copied into a preallocated numpy structured array as they
+    arrive, and only appended to the table (in one call) when the buffer is
+    full, its oldest event is older than a given age, or it is explicitly
+    flushed.
+    """
+    def __init__(self, table, dtype, length=256):
+        self.table = table
+        self.length = max(int(length), 1)
+        self.rows = np.zeros(self.length, dtype=dtype)
+        self.count = 0
+        self.firstEventTime = None
+
+    def add(self, event):
+        """Copy an event into the buffer.
+
+        Returns True if the buffer is now full and should be written.
+        """
+        self.rows[self.count] = tuple(event)
+        if self.count == 0:
+            self.firstEventTime = getTime()
+        self.count += 1
+        return self.count >= self.length
+
+    def age(self, now=None):
+        """Seconds since the oldest event in the buffer was added."""
+        if self.count == 0:
+            return 0.0
+        if now is None:
+            now = getTime()
+        return now - self.firstEventTime
+
+    def write(self):
+        """Append any buffered events to the table, returning the number
+        of events written."""
+        count = self.count
+        if count:
+            # reset first, so a failed append doesn't keep being retried
+            self.count = 0
+            self.firstEventTime = None
+            self.table.append(self.rows[:count])
+        return count
+
 
 class DataStoreFile():
     def __init__(self, fileName, folderPath, fmode='a', iohub_settings=None):
@@ -61,11 +112,18 @@ class DataStoreFile():
         self.flushCounter = self.settings.get('flush_interval', 32)
         self._eventCounter = 0
 
+        # events are staged per table and appended in batches
+        self.eventBufferLength = self.settings.get('event_buffer_length', 256)
+        self.eventBufferMaxAge = self.settings.get('event_buffer_max_age', 0.25)
+        self._eventBuffers = dict()
+        self._initStats()
+
         self.TABLES = dict()
         self._eventGroupMappings = dict()
         self.emrtFile = open_file(self.filePath, mode=fmode)
 
         atexit.register(close_open_data_files, False)
+        _dataStoreFiles.add(self)
 
         if len(self.emrtFile.title) == 0:
             self.buildOutTemplate()
@@ -308,19 +366,28 @@ class DataStoreFile():
                 return True
             return False
 
+    def _getEventBuffer(self, eventClass):
+        table_label = eventClass.IOHUB_DATA_TABLE
+        ebuffer = self._eventBuffers.get(table_label)
+        if ebuffer is None:
+            ebuffer = EventTableBuffer(self.TABLES[table_label], eventClass.NUMPY_DTYPE,
+                                       self.eventBufferLength)
+            self._eventBuffers[table_label] = ebuffer
+        return ebuffer
+
     def _handleEvent(self, event):
         try:
             if self.checkForExperimentAndSessionIDs(event) is False:
                 return False
             etype = event[DeviceEvent.EVENT_TYPE_ID_INDEX]
             eventClass = EventConstants.getClass(etype)
-            etable = self.TABLES[eventClass.IOHUB_DATA_TABLE]
+            ebuffer = self._getEventBuffer(eventClass)
             event[DeviceEvent.EVENT_EXPERIMENT_ID_INDEX] = self.active_experiment_id
             event[DeviceEvent.EVENT_SESSION_ID_INDEX] = self.active_session_id
 
-            np_array = np.array([tuple(event), ], dtype=eventClass.NUMPY_DTYPE)
-            etable.append(np_array)
-            self.bufferedFlush()
+            self._stats['events_received'] += 1
+            if ebuffer.add(event):
+                self._writeEventBuffer(ebuffer)
         except Exception:
             print2err("Error saving event: ", event)
             printExceptionDetailsToStdErr()
@@ -334,22 +401,96 @@ class DataStoreFile():
 
             etype = event[DeviceEvent.EVENT_TYPE_ID_INDEX]
             eventClass = EventConstants.getClass(etype)
-            etable = self.TABLES[eventClass.IOHUB_DATA_TABLE]
+            ebuffer = self._getEventBuffer(eventClass)
 
-            np_events = []
             for event in events:
                 event[DeviceEvent.EVENT_EXPERIMENT_ID_INDEX] = self.active_experiment_id
                 event[DeviceEvent.EVENT_SESSION_ID_INDEX] = self.active_session_id
-                np_events.append(tuple(event))
-
-            np_array = np.array(np_events, dtype=eventClass.NUMPY_DTYPE)
-            etable.append(np_array)
-            self.bufferedFlush(len(np_events))
+                self._stats['events_received'] += 1
+                if ebuffer.add(event):
+                    self._writeEventBuffer(ebuffer)
         except ioHubError as e:
             print2err(e)
         except Exception:
             printExceptionDetailsToStdErr()
 
+    def _writeEventBuffer(self, ebuffer):
+        """Append the events staged in an EventTableBuffer to its table."""
+        stime = getTime()
+        count = ebuffer.write()
+        if count:
+            self._updateStats(count, getTime() - stime)
+            self.bufferedFlush(count)
+        return count
+
+    def flushEventBuffers(self, maxAge=None):
+        """
+        Append staged events to their tables. If maxAge is given, only
+        buffers whose oldest event was added more than maxAge seconds ago
+        are written, otherwise all buffers are.
+        """
+        now = getTime()
+        count = 0
+        for ebuffer in self._eventBuffers.values():
+            if maxAge is None or ebuffer.age(now) >= maxAge:
+                try:
+                    count += self._writeEventBuffer(ebuffer)
+                except Exception:
+                    print2err("Error saving events to table: ", ebuffer.table)
+                    printExceptionDetailsToStdErr()
+        return count
+
+    def checkEventBuffers(self):
+        """
+        Write any event buffers holding events older than the
+        event_buffer_max_age setting. Called periodically by the ioHub
+        Server so events reach the file even when few are arriving.
+        """
+        return self.flushEventBuffers(self.eventBufferMaxAge)
+
+    def _initStats(self):
+        self._stats = dict(events_received=0, events_written=0, table_appends=0,
+                           first_write_time=None, last_write_time=None)
+        self._flushLatencies = deque(maxlen=256)
+
+    def _updateStats(self, count, latency):
+        stats = self._stats
+        now = getTime()
+        if stats['first_write_time'] is None:
+            stats['first_write_time'] = now - latency
+        stats['last_write_time'] = now
+        stats['events_written'] += count
+        stats['table_appends'] += 1
+        self._flushLatencies.append(latency)
+
+    def getStats(self):
+        """
+        Return a dict of DataStore throughput statistics:
+
+        * events_received: number of events given to the DataStore.
+        * events_written: number of events appended to tables.
+        * events_pending: number of events staged but not yet written.
+        * table_appends: number of batched appends made to tables.
+        * events_per_sec: events written per second, between the first and
+          most recent table append.
+        * flush_latency_mean, flush_latency_max, flush_latency_last: time (sec)
+          taken by the most recent (up to 256) table appends.
+        """
+        stats = self._stats
+        latencies = np.asarray(self._flushLatencies, dtype=np.float64)
+        duration = 0.0
+        if stats['first_write_time'] is not None:
+            duration = stats['last_write_time'] - stats['first_write_time']
+        return dict(
+            events_received=stats['events_received'],
+            events_written=stats['events_written'],
+            events_pending=sum(b.count for b in self._eventBuffers.values()),
+            table_appends=stats['table_appends'],
+            events_per_sec=stats['events_written'] / duration if duration > 0 else 0.0,
+            flush_latency_mean=float(latencies.mean()) if len(latencies) else 0.0,
+            flush_latency_max=float(latencies.max()) if len(latencies) else 0.0,
+            flush_latency_last=float(latencies[-1]) if len(latencies) else 0.0)
+
     def bufferedFlush(self, eventCount=1):
         """
         If flushCounter threshold is >=0 then do some checks. If it is < 0,
@@ -358,16 +499,22 @@ class DataStoreFile():
         """
         if self.flushCounter >= 0:
             if self.flushCounter == 0:
-                self.flush()
+                self._flushFile()
                 return True
             if self.flushCounter <= self._eventCounter:
-                self.flush()
+                self._flushFile()
                 self._eventCounter = 0
                 return True
             self._eventCounter += eventCount
             return False
 
     def flush(self):
+        """Write any staged events to their tables, then flush the file."""
+        if self._eventBuffers and self.emrtFile and self.emrtFile.isopen:
+            self.flushEventBuffers()
+        self._flushFile()
+
+    def _flushFile(self):
         try:
             if self.emrtFile:
                 self.emrtFile.flush()
@@ -390,8 +537,17 @@ class DataStoreFile():
 
 ## -------------------- Utility Functions ------------------------ ##
 
+# DataStoreFile instances, so staged events can be written before files close
+_dataStoreFiles = weakref.WeakSet()
+
 
 def close_open_data_files(verbose):
+    for dsfile in list(_dataStoreFiles):
+        try:
+            dsfile.flush()
+        except Exception:
+            printExceptionDetailsToStdErr()
+
     open_files = tables.file._open_files
     clall = hasattr(open_files, 'close_all')
     if clall:
@@ -22,6 +22,8 @@ if Version(tables.__version__) < Version('3'):
     list_nodes = "listNodes"
     get_node = "getNode"
     read_where = "readWhere"
+    read_coordinates = "readCoordinates"
+    get_where_list = "getWhereList"
 else:
     from tables import open_file
 
@@ -29,9 +31,18 @@ else:
     list_nodes = "list_nodes"
     get_node = "get_node"
     read_where = "read_where"
+    read_coordinates = "read_coordinates"
+    get_where_list = "get_where_list"
 
 _hubFiles = []
 
+# Event table columns indexed by createEventTableIndexes to speed up trial
+# window queries.
+DEFAULT_INDEX_COLUMNS = ('time', 'session_id', 'experiment_id', 'type')
+# Maximum size, in bytes, of the event rows read from a table at once by
+# ExperimentDataAccessUtility.iterEventsInWindows.
+DEFAULT_CHUNK_BYTES = 32 * 1024 * 1024
+
 
 def openHubFile(filepath, filename, mode):
     """
@@ -310,37 +321,33 @@ def saveEventReport(hdf5FilePath=None, eventType=None, eventFields=[], useCondit
         output_file.write('\t'.join(column_names))
         output_file.write('\n')
 
-        event_groupings = []
         if trial_times:
-            # Split events into trials
-            for tindex, tstart, tstop in trial_times:
-                if eventType == 'MessageEvent':
-                    event_groupings.append(event_table[(event_table['time'] >= tstart) & (event_table['time']
-                                                                                          <= tstop)])
-                else:
-                    event_groupings.append(event_table.where("(time >= %f) & (time <= %f)" % (tstart, tstop)))
+            windows = [(tstart, tstop) for tindex, tstart, tstop in trial_times]
         else:
             # Report events without splitting them into trials
-            if eventType == 'MessageEvent':
-                event_groupings.append(event_table)
+            windows = None
+
+        if eventType == 'MessageEvent':
+            if windows is None:
+                event_groupings = [(0, event_table)]
             else:
-                event_groupings.append(event_table.iterrows())
+                event_groupings = [(tid, event_table[(event_table['time'] >= tstart) &
+                                                     (event_table['time'] <= tstop)])
+                                   for tid, (tstart, tstop) in enumerate(windows)]
+        else:
+            # Read events in chunks rather than row by row
+            event_groupings = datafile.iterEventsInWindows(event_table, windows, fields=eventFields)
 
         # Save a row for each event within the trial period
-        for tid, trial_events in enumerate(event_groupings):
-            for event in trial_events:
-                event_data = []
-                for c in eventFields:
-                    cv = event[c]
-                    if type(cv) == numpy.bytes_:
-                        cv = event[c].decode('utf-8')
-                    if type(cv) == str and len(cv) == 0:
-                        cv = '.'
-                    event_data.append(str(cv))
-                if trial_times:
+        prefix_tid = prefix = None
+        for tid, trial_events in event_groupings:
+            event_rows = _formatEventFields(trial_events, eventFields)
+            if trial_times:
+                # trial columns are the same for each chunk of a trial's events
+                if tid != prefix_tid:
                     tindex, tstart, tstop = trial_times[tid]
                     if useConditionsTable:
-                        cvRow=cvTable.read(tindex, tindex+1)
+                        cvRow = cvTable.read(tindex, tindex+1)
                         cvrowdat = [cvRow[c][0] for c in columnNames]
                         for ri, cv in enumerate(cvrowdat):
                             if type(cv) == numpy.bytes_:
@@ -349,23 +356,41 @@ def saveEventReport(hdf5FilePath=None, eventType=None, eventFields=[], useCondit
                                 cvrowdat[ri] = str(cvrowdat[ri])
                             if type(cv) == str and len(cv) == 0:
                                 cvrowdat[ri] = '.'
-                        output_file.write('\t'.join(cvrowdat + event_data))
                     elif hasattr(psychoResults, 'columns'):
                         drow = psychoResults.iloc[tindex]
-                        prowdat = [str(drow[c]) for c in columnNames]
-                        output_file.write('\t'.join(prowdat + event_data))
+                        cvrowdat = [str(drow[c]) for c in columnNames]
                     else:
-                        output_file.write('\t'.join([str(tindex), str(tstart), str(tstop)] + event_data))
-                else:
-                    output_file.write('\t'.join(event_data))
-                output_file.write('\n')
-                ecount += 1
+                        cvrowdat = [str(tindex), str(tstart), str(tstop)]
+                    prefix_tid = tid
+                    prefix = '\t'.join(cvrowdat)
+                    if eventFields:
+                        prefix += '\t'
+                event_rows = [prefix + row for row in event_rows]
+            output_file.writelines(row + '\n' for row in event_rows)
+            ecount += len(event_rows)
 
     # Done report creation, close input file
     datafile.close()
     return output_file_name, ecount
 
 
+def _formatEventFields(events, eventFields):
+    """
+    Format the given fields of a structured array of events as the tab
+    delimited rows written by saveEventReport, one column at a time.
+    """
+    columns = []
+    for c in eventFields:
+        values = events[c]
+        if values.dtype.kind == 'S':
+            columns.append([v.decode('utf-8') or '.' for v in values.tolist()])
+        else:
+            columns.append([str(v) for v in values])
+    if not columns:
+        return [''] * len(events)
+    return ['\t'.join(row) for row in zip(*columns)]
+
+
 ########### Experiment / Experiment Session Based Data Access #################
 
 
@@ -419,6 +444,8 @@ class ExperimentDataAccessUtility:
         self._experimentCode = experimentCode
         self._sessionCodes = sessionCodes
         self._lastWhereClause = None
+        # class_table_mapping lookups, read once on first use
+        self._eventTablePaths = None
 
         try:
             self.hdfFile = openHubFile(hdfFilePath, hdfFileName, mode)
@@ -515,45 +542,45 @@ class ExperimentDataAccessUtility:
 
         """
         if self.hdfFile:
-            klassTables = self.hdfFile.root.class_table_mapping
-            event_column = None
-            event_value = None
-
             if isinstance(event_type, str):
-                if event_type.find('Event') >= 0:
-                    event_column = 'class_name'
-                    event_value = event_type
-                else:
+                if event_type.find('Event') < 0:
                     event_value = ''
                     tokens = event_type.split('_')
                     for t in tokens:
                         event_value += t[0].upper() + t[1:].lower()
-                    event_value = event_type + 'Event'
-            elif isinstance(event_type, numbers.Integral):
-                event_column = 'class_id'
-                event_value = event_type
-            else:
+                    event_type = event_value + 'Event'
+            elif not isinstance(event_type, numbers.Integral):
                 print2err(
                     'getEventTable error: event_type argument must be a string or and int')
                 return None
 
-            result = []
-            where_cls = '(%s == b"%s") & (class_type_id == 1)' % (event_column, event_value)
-            for row in klassTables.where(where_cls):
-                result.append(row.fetch_all_fields())
-
-            if len(result) == 0:
-                return None
-
-            if len(result) != 1:
-                print2err('event_type_id passed to getEventAttribute can only return one row from CLASS_MAPPINGS.')
+            tablePathString = self._getEventTablePaths().get(event_type)
+            if tablePathString is None:
                 return None
-            tablePathString = result[0][3]
-            if isinstance(tablePathString, bytes):
-                tablePathString = tablePathString.decode('utf-8')
             return getattr(self.hdfFile, get_node)(tablePathString)
         return None
 
+    def _getEventTablePaths(self):
+        """
+        Returns a dict of event class name and event type id -> DataStore table
+        path, read from the class_table_mapping table the first time it is needed.
+        """
+        if self._eventTablePaths is None:
+            paths = dict()
+            for row in self.hdfFile.root.class_table_mapping.read():
+                if row['class_type_id'] != 1:
+                    continue
+                tablePathString = row['table_path']
+                if isinstance(tablePathString, bytes):
+                    tablePathString = tablePathString.decode('utf-8')
+                className = row['class_name']
+                if isinstance(className, bytes):
+                    className = className.decode('utf-8')
+                paths[className] = tablePathString
+                paths[int(row['class_id'])] = tablePathString
+            self._eventTablePaths = paths
+        return self._eventTablePaths
+
     def getEventMappingInformation(self):
         """Returns details on how ioHub Event Types are mapped to tables within
         the given DataStore file."""
@@ -725,17 +752,9 @@ class ExperimentDataAccessUtility:
             condition variable filter, starting condition filer, and ending condition filter criteria.
         """
         if self.hdfFile:
-            klassTables = self.hdfFile.root.class_table_mapping
-
-            deviceEventTable = None
-
-            result = [row.fetch_all_fields() for row in klassTables.where('(class_id == %d) &'
-                                                                          ' (class_type_id == 1)' % (event_type_id))]
-            if len(result) != 1:
-                raise ExperimentDataAccessException("event_type_id returned > 1 row from CLASS_MAPPINGS.")
-            tablePathString = result[0][3]
-            if isinstance(tablePathString, bytes):
-                tablePathString = tablePathString.decode('utf-8')
+            tablePathString = self._getEventTablePaths().get(event_type_id)
+            if tablePathString is None:
+                raise ExperimentDataAccessException("event_type_id not found in CLASS_MAPPINGS.")
             deviceEventTable = getattr(self.hdfFile, get_node)(tablePathString)
 
             for ename in event_attribute_names:
@@ -767,7 +786,7 @@ class ExperimentDataAccessUtility:
                 if startConditions is None and endConditions is None:
                     for cv in filteredConditionVariableList:
 
-                        wclause = '( experiment_id == {0} ) & ( SESSION_ID == {1} )'.format(self._experimentID,
+                        wclause = '( experiment_id == {0} ) & ( session_id == {1} )'.format(self._experimentID,
                                                                                             cv.SESSION_ID)
 
                         wclause += ' & ( type == {0} ) '.format(event_type_id)
@@ -775,10 +794,8 @@ class ExperimentDataAccessUtility:
                         if filter_id is not None:
                             wclause += '& ( filter_id == {0} ) '.format(filter_id)
 
-                        resultSetList.append([])
-
-                        for ename in event_attribute_names:
-                            resultSetList[-1].append(getattr(deviceEventTable, read_where)(wclause, field=ename))
+                        resultSetList.append(self._readEventAttributes(deviceEventTable, wclause,
+                                                                       event_attribute_names))
                         resultSetList[-1].append(wclause)
                         resultSetList[-1].append(cv)
 
@@ -819,8 +836,8 @@ class ExperimentDataAccessUtility:
                         wclause = wclause[:-3]
                         wclause += ' ) '
 
-                    for ename in event_attribute_names:
-                        resultSetList[-1].append(getattr(deviceEventTable, read_where)(wclause, field=ename))
+                    resultSetList[-1].extend(self._readEventAttributes(deviceEventTable, wclause,
+                                                                       event_attribute_names))
                     resultSetList[-1].append(wclause)
                     resultSetList[-1].append(cv)
 
@@ -831,6 +848,123 @@ class ExperimentDataAccessUtility:
 
             return None
 
+    def _readEventAttributes(self, table, wclause, event_attribute_names):
+        """
+        Read the given columns of the rows of table matching wclause, reading
+        the matching rows once rather than once per column.
+        """
+        coords = getattr(table, get_where_list)(wclause, sort=True)
+        rows = getattr(table, read_coordinates)(coords)
+        return [rows[ename].copy() for ename in event_attribute_names]
+
+    def createEventTableIndexes(self, event_type, columns=DEFAULT_INDEX_COLUMNS):
+        """
+        Create PyTables column indexes for an event table, so that queries on
+        those columns (for example selecting the events in a trial's time
+        window) do not need to scan the whole table. Indexes are saved in the
+        DataStore file, so only need to be created once. Queries never create
+        indexes themselves, so reading a file does not change it.
+
+        The file must have been opened with a writable mode ('a' or 'r+').
+
+        Args:
+            event_type (str, int or tables.Table): The event type, or event table, to index.
+
+            columns (list): Names of the columns to index.
+
+        Returns:
+            list: Names of the columns which are indexed.
+        """
+        if self.hdfFile.mode == 'r':
+            raise ExperimentDataAccessException('createEventTableIndexes: DataStore file was opened read only; '
+                                                'use mode="a" to create indexes.')
+        table = self._resolveEventTable(event_type)
+        for name in columns:
+            if name in table.colnames:
+                column = table.cols._f_col(name)
+                if not column.is_indexed:
+                    column.create_index()
+        return [name for name in columns if name in table.colnames and table.cols._f_col(name).is_indexed]
+
+    def _resolveEventTable(self, event_type):
+        if isinstance(event_type, tables.Table):
+            return event_type
+        table = self.getEventTable(event_type)
+        if table is None:
+            raise ExperimentDataAccessException('No DataStore table found for event type: %s' % (event_type,))
+        return table
+
+    def iterEventsInWindows(self, event_type, windows=None, fields=None, condition=None, asDataFrame=False,
+                            maxChunkBytes=DEFAULT_CHUNK_BYTES):
+        """
+        Iterate through the events of a type which fall within each of a list
+        of time windows (for example the start and end time of each trial),
+        in chunks of at most maxChunkBytes of event data.
+
+        Each window is selected with an in-kernel query (which uses the time
+        column's index, if createEventTableIndexes has been called), and the
+        matching rows are then read in chunks with read_coordinates, so the
+        memory used at once is at most maxChunkBytes of event rows plus 8
+        bytes per event in the current window (for the row numbers of its
+        events), however large the table.
+
+        Args:
+            event_type (str, int or tables.Table): The event type, or event table, to read events from.
+
+            windows (list): (start_time, end_time) of each window, inclusive. If None, all events are read.
+
+            fields (list): Names of the event fields to return. If None, all fields are returned.
+
+            condition (str): Extra PyTables condition events must match, for example 'session_id == 2'.
+
+            asDataFrame (bool): If True, chunks are given as pandas DataFrames rather than numpy structured arrays.
+
+            maxChunkBytes (int): Maximum size, in bytes, of the event rows read at once.
+
+        Returns:
+            iterator: (window_index, events) for each chunk of events, in table order within each window.
+            Windows with no events give no chunks.
+        """
+        table = self._resolveEventTable(event_type)
+        if fields is None:
+            fields = list(table.colnames)
+        for name in fields:
+            if name not in table.colnames:
+                raise ExperimentDataAccessException('iterEventsInWindows: %s does not have a column named %s' %
+                                                    (table.title, name))
+        chunkRows = max(1, int(maxChunkBytes) // table.dtype.itemsize)
+        dtype = numpy.dtype([(name, table.dtype[name]) for name in fields])
+
+        def selectFields(rows):
+            events = numpy.empty(len(rows), dtype=dtype)
+            for name in fields:
+                events[name] = rows[name]
+            if asDataFrame:
+                import pandas
+                return pandas.DataFrame(events)
+            return events
+
+        if windows is None:
+            for start in range(0, table.nrows, chunkRows):
+                stop = min(start + chunkRows, table.nrows)
+                if condition:
+                    rows = getattr(table, read_where)(condition, start=start, stop=stop)
+                else:
+                    rows = table.read(start, stop)
+                if len(rows):
+                    yield 0, selectFields(rows)
+            return
+
+        wclause = '(time >= window_start) & (time <= window_end)'
+        if condition:
+            wclause += ' & (%s)' % condition
+        for window_index, (window_start, window_end) in enumerate(windows):
+            condvars = dict(window_start=float(window_start), window_end=float(window_end))
+            coords = getattr(table, get_where_list)(wclause, condvars=condvars, sort=True)
+            for start in range(0, len(coords), chunkRows):
+                rows = getattr(table, read_coordinates)(coords[start:start + chunkRows])
+                yield window_index, selectFields(rows)
+
     def getEventIterator(self, event_type):
         """
         **Docstr TBC.**
@@ -851,6 +985,7 @@ class ExperimentDataAccessUtility:
             _hubFiles.remove(self.hdfFile)
         self.hdfFile.close()
 
+        self._eventTablePaths = None
         self.experimentCodes = None
         self.hdfFilePath = None
         self.hdfFileName = None
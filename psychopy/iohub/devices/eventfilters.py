@@ -5,6 +5,7 @@
 
 import numpy as np
 from collections import deque
+from numpy.lib.stride_tricks import sliding_window_view
 
 from ..util import NumPyRingBuffer
 from . import Device, DeviceEvent, Computer
@@ -140,7 +141,11 @@ class MovingWindowFilter():
 
     The base class implements a moving window averaging filter, no weights.
     To change the filter used, extend this class and replace the filteredValue
-    method.
+    method, and the _filterWindows method used by filterArray.
+
+    filterArray can be used to filter a whole array of values offline (for
+    example a column read from the ioHub DataStore file) in one call, giving
+    exactly the same values as adding each value in turn.
 
     """
 
@@ -189,6 +194,44 @@ class MovingWindowFilter():
         """
         return self._filtering_buffer.mean()
 
+    @property
+    def length(self):
+        """Number of values in the moving window."""
+        return self._filtering_buffer.max_size
+
+    @property
+    def sample_delay(self):
+        """Number of values added after a value before add() returns the
+        event for it, i.e. the event returned by the n'th call to add()
+        is the one given in the (n - sample_delay)'th call.
+        """
+        return self.length - 1 - self._active_index
+
+    def _filterWindows(self, windows):
+        """Returns the filtered value of each row of windows, a 2D array
+        holding one full moving window per row (oldest value first). Sub
+        classes which replace filteredValue must replace this too.
+        """
+        return windows.mean(axis=1)
+
+    def filterArray(self, values):
+        """Filter a whole array of values at once, with the same result as
+        adding each value in turn to an empty window using add(). The
+        state of this filter is not used or changed.
+
+        Returns a tuple of two arrays (indices, filtered). filtered holds
+        the value each call to add() would return once the window is full,
+        and indices holds the index within values of the event each one
+        would be returned with.
+        """
+        values = np.asarray(values, dtype=self._filtering_buffer._dtype)
+        length = self.length
+        if len(values) < length:
+            return np.zeros(0, dtype=int), values[:0]
+        windows = np.ascontiguousarray(sliding_window_view(values, length))
+        indices = np.arange(length - 1, len(values)) - self.sample_delay
+        return indices, self._filterWindows(windows)
+
     def add(self, event):
         """Add the given iohub event ( in list form ) to the moving window. The
         value of the specified event attribute when the filter was created is
@@ -238,6 +281,9 @@ class PassThroughFilter(MovingWindowFilter):
     def filteredValue(self):
         return self._filtering_buffer[0]
 
+    def _filterWindows(self, windows):
+        return windows[:, 0]
+
 # ------
 
 
@@ -254,6 +300,9 @@ class MedianFilter(MovingWindowFilter):
     def filteredValue(self):
         return np.median(self._filtering_buffer.getElements())
 
+    def _filterWindows(self, windows):
+        return np.median(windows, axis=1)
+
 # ------
 
 
@@ -279,7 +328,16 @@ class WeightedAverageFilter(MovingWindowFilter):
         return np.convolve(
             self._filtering_buffer.getElements(),
             self._weights,
-            'valid')
+            'valid')[0]
+
+    def filterArray(self, values):
+        values = np.asarray(values, dtype=self._filtering_buffer._dtype)
+        if len(values) < self.length:
+            return np.zeros(0, dtype=int), np.zeros(0)
+        indices = np.arange(self.length - 1, len(values)) - self.sample_delay
+        # one convolution over all the values gives the same result as one
+        # per window
+        return indices, np.convolve(values, self._weights, 'valid')
 
 
 # ------
@@ -320,6 +378,32 @@ class StampFilter(MovingWindowFilter):
             return (e1 + e3) / 2.0
         return e2
 
+    @property
+    def sample_delay(self):
+        if self.sub_filter:
+            # each level adds the event to its window as well as the sub
+            # filter's value, so the latest event is the one returned.
+            return 0
+        return MovingWindowFilter.sample_delay.fget(self)
+
+    def _filterWindows(self, windows):
+        e1, e2, e3 = windows[:, 0], windows[:, 1], windows[:, 2]
+        filtered = np.where(
+            ~((e1 < e2) & (e2 < e3)) | ~((e3 < e2) & (e2 < e1)),
+            (e1 + e3).astype(np.float64) / 2.0, e2)
+        return filtered
+
+    def filterArray(self, values):
+        if not self.sub_filter:
+            return MovingWindowFilter.filterArray(self, values)
+        # the values are those of the first level filter, but returned with
+        # the latest event rather than the centre one
+        base = self.sub_filter
+        while base.sub_filter:
+            base = base.sub_filter
+        indices, filtered = base.filterArray(values)
+        return indices + 1, filtered
+
     def add(self, event):
         if self.sub_filter:
             sub_result = self.sub_filter.add(event)
@@ -183,7 +183,7 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
             pos_filter_class, pos_filter_kwargs = eventfilters.PassThroughFilter, {}
 
         if velocity_filter:
-            vel_filter_class_name = position_filter.get(
+            vel_filter_class_name = velocity_filter.get(
                 'name', 'PassThroughFilter')
             vel_filter_class = getattr(eventfilters, vel_filter_class_name)
             del velocity_filter['name']
@@ -192,10 +192,10 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
             vel_filter_class, vel_filter_kwargs = eventfilters.PassThroughFilter, {}
 
         self.adaptive_x_vthresh_buffer = np.zeros(
-            self.vel_thresh_history_dur * sampling_rate)
+            int(self.vel_thresh_history_dur * sampling_rate))
         self.x_vthresh_buffer_index = 0
         self.adaptive_y_vthresh_buffer = np.zeros(
-            self.vel_thresh_history_dur * sampling_rate)
+            int(self.vel_thresh_history_dur * sampling_rate))
         self.y_vthresh_buffer_index = 0
 
         pos_filter_kwargs['event_type'] = MONOCULAR_EYE_SAMPLE
@@ -256,8 +256,9 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
                     if self.last_valid_sample:
                         samples_for_processing.extend(
                             self.interpolateMissingData(current_mono_evt))
-                        self._addVelocity(
-                            samples_for_processing[-1], current_mono_evt)
+                        if samples_for_processing:
+                            self._addVelocity(
+                                samples_for_processing[-1], current_mono_evt)
                     # Discard all invalid samples that occurred prior
                     # to the first valid sample.
                     del self.invalid_samples_run[:]
@@ -289,6 +290,337 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
 
         self.clearInputEvents()
 
+    def parseSamples(self, samples):
+        """Parse a whole recording of eye samples offline, for example the
+        BinocularEyeSampleEvent table read from an ioHub DataStore file.
+
+        Sample conversion, position filtering, velocity calculation and
+        velocity filtering are done for all samples at once using numpy
+        array operations; the parser's event detection is then replayed over
+        the results. The events returned are the same as those the parser
+        outputs when given each sample online (as they are when output),
+        including the event_id given to each one.
+
+        The parser is reset before and after the samples are parsed.
+
+        Args:
+            samples: A numpy structured array with a field per sample
+                     attribute, or a list of samples in iohub list form.
+
+        Returns:
+            list: The events output by the parser, in iohub list form.
+        """
+        self.reset()
+        self.sample_type = None
+        if len(samples) == 0:
+            return []
+        self.initializeForSampleType(samples[0])
+        fields = self.io_event_fields
+        io_ix = self.io_event_ix
+        n = len(samples)
+
+        columns = self._sampleColumns(samples)
+        status = np.asarray(columns['status'])
+        if samples[0][DeviceEvent.EVENT_TYPE_ID_INDEX] == BINOCULAR_EYE_SAMPLE:
+            columns = self._convertColumnsToMonoAveraged(columns, status)
+            valid = status != 22
+        else:
+            valid = status == 0
+
+        angle_x = np.array(columns['angle_x'], dtype=np.float64)
+        angle_y = np.array(columns['angle_y'], dtype=np.float64)
+        angle_x[valid], angle_y[valid] = self.pix2deg(
+            np.asarray(columns['gaze_x'], dtype=np.float64)[valid],
+            np.asarray(columns['gaze_y'], dtype=np.float64)[valid])
+        times = np.asarray(columns['time'], dtype=np.float64)
+
+        # Order in which samples are added to the field filters: valid
+        # samples, with any run of invalid samples between two valid ones
+        # interpolated and added before the valid sample ending the run.
+        stream = []
+        runs = []
+        run = []
+        last_valid = None
+        for i in range(n):
+            if valid[i]:
+                if run and last_valid is not None:
+                    runs.append((len(stream), len(run)))
+                    stream.extend(run)
+                run = []
+                stream.append(i)
+                last_valid = i
+            else:
+                run.append(i)
+        stream = np.asarray(stream, dtype=int)
+        position = np.full(n, -1, dtype=int)
+        position[stream] = np.arange(len(stream))
+
+        sx = angle_x[stream]
+        sy = angle_y[stream]
+        sp = np.asarray(columns['pupil_measure1'], dtype=np.float64)[stream]
+        st = times[stream]
+
+        # The filters change the field values of a sample in place, so
+        # whether a later calculation sees the filtered or unfiltered
+        # position of a sample depends on when the filter returns it.
+        pos_delay = self.x_position_filter.sample_delay
+        pos_len = self.x_position_filter.length
+        vel_delay = self.xy_velocity_filter.sample_delay
+        vel_len = self.xy_velocity_filter.length
+
+        for start, count in runs:
+            last = start - 1
+            end = start + count
+            start_x = start_y = None
+            if pos_delay == 0:
+                start_x = self._filteredValueAt(self.x_position_filter, sx, last)
+                start_y = self._filteredValueAt(self.y_position_filter, sy, last)
+            if start_x is None:
+                start_x, start_y = sx[last], sy[last]
+            sx[start:end] = np.linspace(start_x, sx[end], num=count + 2)[1:-1]
+            sy[start:end] = np.linspace(start_y, sy[end], num=count + 2)[1:-1]
+            sp[start:end] = np.linspace(sp[last], sp[end], num=count + 2)[1:-1]
+
+        filtered_x = self.x_position_filter.filterArray(sx)[1]
+        filtered_y = self.y_position_filter.filterArray(sy)[1]
+
+        def positionAt(q, added):
+            # position of the sample at stream index q, once the samples up
+            # to stream index 'added' have been given to the filters
+            a = q + pos_delay
+            if pos_len - 1 <= a <= added:
+                return filtered_x[a - pos_len + 1], filtered_y[a - pos_len + 1]
+            return sx[q], sy[q]
+
+        # velocity of each sample when added to the filters, which uses the
+        # position of the sample added before it
+        prev_x = sx[:-1].copy()
+        prev_y = sy[:-1].copy()
+        if pos_delay == 0:
+            prev_x[pos_len - 1:] = filtered_x[:len(stream) - pos_len]
+            prev_y[pos_len - 1:] = filtered_y[:len(stream) - pos_len]
+        vel_x = np.array(columns['velocity_x'], dtype=np.float64)[stream]
+        vel_y = np.array(columns['velocity_y'], dtype=np.float64)[stream]
+        vel_xy = np.array(columns['velocity_xy'], dtype=np.float64)[stream]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vel_x[1:], vel_y[1:], vel_xy[1:] = self._velocity(
+                prev_x, prev_y, st[:-1], sx[1:], sy[1:], st[1:])
+
+        conv_x = np.array(columns['velocity_x'], dtype=np.float64)
+        conv_y = np.array(columns['velocity_y'], dtype=np.float64)
+        conv_xy = np.array(columns['velocity_xy'], dtype=np.float64)
+        conv_x[valid] = vel_x[position[valid]]
+        conv_y[valid] = vel_y[position[valid]]
+        conv_xy[valid] = vel_xy[position[valid]]
+
+        # Valid samples following invalid ones: their velocity is calculated
+        # from the (unconverted) invalid sample, then recalculated from the
+        # last filtered sample if the run was interpolated.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i in np.flatnonzero(valid[1:] & ~valid[:-1]) + 1:
+                p = position[i]
+                velocity = self._velocity(angle_x[i - 1], angle_y[i - 1],
+                                          times[i - 1], sx[p], sy[p], st[p])
+                conv_x[i], conv_y[i], conv_xy[i] = velocity
+                if p > 0 and p - 1 >= vel_len - 1:
+                    q = p - 1 - vel_delay
+                    qx, qy = positionAt(q, p - 1)
+                    velocity = self._velocity(qx, qy, st[q],
+                                              sx[p], sy[p], st[p])
+                vel_x[p], vel_y[p], vel_xy[p] = velocity
+
+        filtered_vx = self.x_velocity_filter.filterArray(vel_x)[1]
+        filtered_vy = self.y_velocity_filter.filterArray(vel_y)[1]
+        filtered_vxy = self.xy_velocity_filter.filterArray(vel_xy)[1]
+
+        # velocity thresholds are given to the samples the filters return
+        # when a valid sample is added
+        added = position[valid]
+        added = added[added >= vel_len - 1] - (vel_len - 1)
+        thresholds_x = np.full(len(stream), np.NaN)
+        thresholds_y = np.full(len(stream), np.NaN)
+        thresholds_x[added] = self._adaptiveVelocityThresholds(
+            filtered_vx[added], len(self.adaptive_x_vthresh_buffer))
+        thresholds_y[added] = self._adaptiveVelocityThresholds(
+            filtered_vy[added], len(self.adaptive_y_vthresh_buffer))
+
+        # Replay the parser over the converted and filtered values
+        columns['angle_x'] = angle_x
+        columns['angle_y'] = angle_y
+        columns['velocity_x'] = conv_x
+        columns['velocity_y'] = conv_y
+        columns['velocity_xy'] = conv_xy
+        rows = [list(row) for row in zip(*[columns[f] for f in fields])]
+
+        ax_ix, ay_ix = io_ix('angle_x'), io_ix('angle_y')
+        vx_ix, vy_ix = io_ix('velocity_x'), io_ix('velocity_y')
+        vxy_ix = io_ix('velocity_xy')
+        ps_ix = io_ix('pupil_measure1')
+        raw_x_ix, raw_y_ix = io_ix('raw_x'), io_ix('raw_y')
+
+        def addToFieldFilters(p):
+            if p >= pos_len - 1:
+                sample = rows[stream[p - pos_delay]]
+                sample[ax_ix] = filtered_x[p - pos_len + 1]
+                sample[ay_ix] = filtered_y[p - pos_len + 1]
+            if p >= vel_len - 1:
+                sample = rows[stream[p - vel_delay]]
+                sample[vx_ix] = filtered_vx[p - vel_len + 1]
+                sample[vy_ix] = filtered_vy[p - vel_len + 1]
+                sample[vxy_ix] = filtered_vxy[p - vel_len + 1]
+                return sample
+
+        events = []
+        run = []
+        for i in range(n):
+            current = rows[i]
+            if valid[i]:
+                samples_for_processing = []
+                if run:
+                    if self.last_valid_sample:
+                        for r in run:
+                            p = position[r]
+                            invalid = rows[r]
+                            invalid[ax_ix] = sx[p]
+                            invalid[ay_ix] = sy[p]
+                            invalid[ps_ix] = sp[p]
+                            invalid[vx_ix] = vel_x[p]
+                            invalid[vy_ix] = vel_y[p]
+                            invalid[vxy_ix] = vel_xy[p]
+                            filtered_event = addToFieldFilters(p)
+                            if filtered_event:
+                                samples_for_processing.append(filtered_event)
+                        if samples_for_processing:
+                            p = position[i]
+                            current[vx_ix] = vel_x[p]
+                            current[vy_ix] = vel_y[p]
+                            current[vxy_ix] = vel_xy[p]
+                    run = []
+
+                p = position[i]
+                filtered_event = addToFieldFilters(p)
+                if filtered_event:
+                    filtered_event[raw_x_ix] = thresholds_x[p - vel_len + 1]
+                    filtered_event[raw_y_ix] = thresholds_y[p - vel_len + 1]
+                    samples_for_processing.append(filtered_event)
+                self.last_valid_sample = current
+
+                for s in samples_for_processing:
+                    self.parseEvent(s)
+                    if self.isValidSample(s):
+                        self.addOutputEvent(s)
+            else:
+                run.append(i)
+                self.addOutputEvent(current)
+
+            events.extend(list(e) for e in self._removeOutputEvents())
+
+        self.reset()
+        self.sample_type = None
+        return events
+
+    @staticmethod
+    def _sampleColumns(samples):
+        """Returns a dict of each sample field's values for all samples."""
+        if isinstance(samples, np.ndarray) and samples.dtype.names:
+            return {name: samples[name] for name in samples.dtype.names}
+        fields = EventConstants.getClass(
+            samples[0][DeviceEvent.EVENT_TYPE_ID_INDEX]).CLASS_ATTRIBUTE_NAMES
+        return dict(zip(fields, zip(*samples)))
+
+    def _convertColumnsToMonoAveraged(self, columns, status):
+        """Array version of _convertToMonoAveraged, without the position
+        and velocity calculations."""
+        unknown = ~np.isin(status, (0, 2, 20, 22))
+        if unknown.any():
+            raise ValueError('Unknown Sample Status: %d' % (status[unknown][0]))
+        both_eyes = status == 0
+        right_eye = status == 20
+
+        mono_columns = dict()
+        for field in self.io_event_fields:
+            if field in columns:
+                mono_columns[field] = columns[field]
+            elif field == 'eye':
+                mono_columns[field] = np.full(len(status), LEFT_EYE)
+            elif field.endswith('_type'):
+                mono_columns[field] = np.asarray(
+                    columns['left_%s' % (field)]).astype(int)
+            else:
+                left = np.asarray(columns['left_%s' % (field)], dtype=np.float64)
+                right = np.asarray(columns['right_%s' % (field)], dtype=np.float64)
+                mono_columns[field] = np.where(
+                    both_eyes, (left + right) / 2.0,
+                    np.where(right_eye, right, left))
+        mono_columns['type'] = np.full(len(status), MONOCULAR_EYE_SAMPLE)
+        return mono_columns
+
+    @staticmethod
+    def _adaptiveVelocityThresholds(velocities, history_length, chunk_size=512):
+        """Array version of addVelocityToAdaptiveThreshold for one axis,
+        giving the threshold returned for each of a sequence of velocities
+        (starting with an empty velocity history)."""
+        velocities = np.asarray(velocities, dtype=np.float64)
+        thresholds = np.full(len(velocities), np.NaN)
+        positive = np.flatnonzero(velocities > 0.0)
+        history = velocities[positive]
+        # thresholds are calculated once the history buffer is full
+        writes = np.arange(history_length, len(positive))
+        slots = np.arange(history_length)
+        for start in range(0, len(writes), chunk_size):
+            written = writes[start:start + chunk_size, np.newaxis]
+            # the buffer contents after each write, in buffer (not time) order
+            buffers = history[written - (written - slots) % history_length]
+            thresholds[positive[written[:, 0]]] = \
+                EyeTrackerEventParser._velocityThresholds(buffers)
+        return thresholds
+
+    @staticmethod
+    def _velocityThresholds(buffers):
+        """The adaptive velocity threshold for each row of buffers.
+
+        Each iteration of the threshold calculation uses the velocities below
+        the last threshold; rows with the same number of those are stacked so
+        their mean and std are taken over the same values, in the same order,
+        as for a single buffer.
+        """
+        thresholds = buffers.min(axis=1) + buffers.std(axis=1) * 3.0
+        below = buffers < thresholds[:, np.newaxis]
+        active = np.arange(len(buffers))
+        while len(active):
+            counts = below[active].sum(axis=1)
+            new_thresholds = np.full(len(active), np.NaN)
+            for count in np.unique(counts):
+                if count == 0:
+                    # mean of no velocities
+                    continue
+                in_group = counts == count
+                group = active[in_group]
+                values = buffers[group][below[group]].reshape(len(group), count)
+                new_thresholds[in_group] = (
+                    values.mean(axis=1) + 3.0 * values.std(axis=1))
+            change = np.abs(new_thresholds - thresholds[active])
+            thresholds[active] = new_thresholds
+            below[active] = buffers[active] < new_thresholds[:, np.newaxis]
+            active = active[change >= 1.0]
+        return thresholds
+
+    @staticmethod
+    def _filteredValueAt(field_filter, values, index):
+        """Returns the value field_filter gives when values[index] is added,
+        or None if its window is not full yet."""
+        if index < field_filter.length - 1:
+            return None
+        return field_filter.filterArray(
+            values[index - field_filter.length + 1:index + 1])[1][0]
+
+    @staticmethod
+    def _velocity(prev_x, prev_y, prev_time, x, y, time):
+        dx = np.abs(x - prev_x)
+        dy = np.abs(y - prev_y)
+        dt = time - prev_time
+        return dx / dt, dy / dt, np.hypot(dx / dt, dy / dt)
+
     def parseEvent(self, sample):
         if self._last_parser_sample:
             last_sec = self.getSampleEventCategory(self._last_parser_sample)
@@ -465,7 +797,8 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
         self.io_sample_class = EventConstants.getClass(self.sample_type)
         self.io_event_fields = self.io_sample_class.CLASS_ATTRIBUTE_NAMES
         #print2err("self.io_sample_class: ",self.io_sample_class,", ",len(self.io_event_fields),"\n>>",self.io_event_fields)
-        self.io_event_ix = self.io_sample_class.CLASS_ATTRIBUTE_NAMES.index
+        self.io_event_ix = {name: i for i, name in enumerate(
+            self.io_event_fields)}.__getitem__
 
         if in_evt[DeviceEvent.EVENT_TYPE_ID_INDEX] == BINOCULAR_EYE_SAMPLE:
             self.convertEvent = self._convertToMonoAveraged
@@ -532,27 +865,19 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
     def _addVelocity(self, prev_event, current_event):
         io_ix = self.io_event_ix
 
-        dx = np.abs(
-            current_event[
-                io_ix('angle_x')] -
-            prev_event[
-                io_ix('angle_x')])
-        dy = np.abs(
-            current_event[
-                io_ix('angle_y')] -
-            prev_event[
-                io_ix('angle_y')])
-        dt = current_event[io_ix('time')] - prev_event[io_ix('time')]
-
-        current_event[io_ix('velocity_x')] = dx / dt
-        current_event[io_ix('velocity_y')] = dy / dt
-        current_event[io_ix('velocity_xy')] = np.hypot(dx / dt, dy / dt)
+        (current_event[io_ix('velocity_x')],
+         current_event[io_ix('velocity_y')],
+         current_event[io_ix('velocity_xy')]) = self._velocity(
+            prev_event[io_ix('angle_x')], prev_event[io_ix('angle_y')],
+            prev_event[io_ix('time')], current_event[io_ix('angle_x')],
+            current_event[io_ix('angle_y')], current_event[io_ix('time')])
 
     def _convertMonoFields(self, prev_event, current_event):
         if self.isValidSample(current_event):
-            self._convertPosToAngles(self, current_event)
+            self._convertPosToAngles(current_event)
             if prev_event:
                 self._addVelocity(prev_event, current_event)
+        return current_event
 
     def _convertToMonoAveraged(self, prev_event, current_event):
         mono_evt = []
@@ -606,7 +931,7 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
                                     'left_%s' %
                                     (field))]))
                 else:
-                    ValueError('Unknown Sample Status: %d' % (status))
+                    raise ValueError('Unknown Sample Status: %d' % (status))
         mono_evt[self.io_event_fields.index(
             'type')] = EventConstants.MONOCULAR_EYE_SAMPLE
         if self.isValidSample(mono_evt):
@@ -825,7 +1150,7 @@ class EyeTrackerEventParser(eventfilters.DeviceEventFilter):
                     'time')] - existing_start_event[self.io_event_ix('time')],
                 xDiff,
                 yDiff,
-                np.rad2deg(np.arctan(yDiff, xDiff)),
+                np.rad2deg(np.arctan2(yDiff, xDiff)),
                 existing_start_event[gx],
                 existing_start_event[gy],
                 0.0,
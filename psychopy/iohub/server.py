@@ -25,6 +25,7 @@ except ImportError:
 from . import IOHUB_DIRECTORY, EXP_SCRIPT_DIRECTORY, _DATA_STORE_AVAILABLE
 from .errors import print2err, printExceptionDetailsToStdErr, ioHubError
 from .net import MAX_PACKET_SIZE
+from .sharedevents import SharedEventBuffer
 from .util import convertCamelToSnake, win32MessagePump
 from .util import yload, yLoader
 from .constants import DeviceConstants, EventConstants
@@ -103,7 +104,7 @@ class udpServer(DatagramServer):
                                payload, replyTo], replyTo)
             return True
         elif request_type == 'GET_EVENTS':
-            return self.handleGetEvents(replyTo)
+            return self.handleGetEvents(replyTo, request[0] if request else None)
         elif request_type == 'EXP_DEVICE':
             return self.handleExperimentDeviceRequest(request, replyTo)
         elif request_type == 'CUSTOM_TASK':
@@ -215,9 +216,13 @@ class udpServer(DatagramServer):
         edata = ('CUSTOM_TASK_REPLY', request)
         self.sendResponse(edata, replyTo)
 
-    def handleGetEvents(self, replyTo):
+    def handleGetEvents(self, replyTo, options=None):
         try:
             self.iohub.processDeviceEvents()
+            if options:
+                return self.handleFilteredGetEvents(
+                    convertByteStrings(options), replyTo)
+
             currentEvents = list(self.iohub.eventBuffer)
             self.iohub.eventBuffer.clear()
 
@@ -236,6 +241,92 @@ class udpServer(DatagramServer):
             self.sendResponse('IOHUB_GET_EVENTS_ERROR', replyTo)
             return False
 
+    def _getEventTypeFilter(self, options):
+        """Get the set of event type ids matching the 'devices' and
+        'event_types' options of a GET_EVENTS request, or None if events of
+        any type match.
+        """
+        eventTypes = None
+
+        devices = options.get('devices')
+        if devices:
+            devices = {d.decode('utf-8') if isinstance(d, bytes) else d
+                       for d in devices}
+            eventTypes = set()
+            for device in self.iohub.devices:
+                if device.name in devices or device.__class__.__name__ in devices:
+                    eventTypes.update(device._event_listeners.keys())
+
+        requestedTypes = options.get('event_types')
+        if requestedTypes:
+            typeIDs = set()
+            for etype in requestedTypes:
+                if isinstance(etype, bytes):
+                    etype = etype.decode('utf-8')
+                if isinstance(etype, str):
+                    etype = getattr(EventConstants, etype)
+                typeIDs.add(etype)
+            eventTypes = typeIDs if eventTypes is None else eventTypes & typeIDs
+
+        return eventTypes
+
+    def handleFilteredGetEvents(self, options, replyTo):
+        """Reply with the events in the global event buffer which match the
+        options of a GET_EVENTS request, so that filtering happens here rather
+        than after sending every event to the client.
+
+        Supported options are:
+
+        * devices: names (or class names) of devices to get events from.
+        * event_types: event type ids (or EventConstants names) to get.
+        * since_event_id: only get events with a greater event_id.
+        * since_time: only get events with a later hub time.
+        * max_events: maximum number of events in the reply.
+
+        If since_event_id or since_time are given, events are left in the
+        buffer so that the request acts as an incremental cursor, otherwise
+        the events returned are removed from the buffer (other events are
+        kept). The reply is ('GET_EVENTS_RESULT', events, remaining) where
+        remaining is the number of matching events which did not fit in the
+        reply, and can be fetched with another request.
+        """
+        eventTypes = self._getEventTypeFilter(options)
+        sinceID = options.get('since_event_id')
+        sinceTime = options.get('since_time')
+        maxEvents = options.get('max_events')
+        incremental = sinceID is not None or sinceTime is not None
+
+        idIndex = DeviceEvent.EVENT_ID_INDEX
+        typeIndex = DeviceEvent.EVENT_TYPE_ID_INDEX
+        timeIndex = DeviceEvent.EVENT_HUB_TIME_INDEX
+
+        eventBuffer = self.iohub.eventBuffer
+        matching = [e for e in eventBuffer
+                    if (eventTypes is None or e[typeIndex] in eventTypes)
+                    and (sinceID is None or e[idIndex] > sinceID)
+                    and (sinceTime is None or e[timeIndex] > sinceTime)]
+
+        remaining = 0
+        if maxEvents and len(matching) > maxEvents:
+            # send the oldest events first, so any later request continuing
+            # from the last event_id sent doesn't miss any
+            matching.sort(key=itemgetter(idIndex))
+            remaining = len(matching) - maxEvents
+            matching = matching[:maxEvents]
+
+        if matching and not incremental:
+            sent = set(map(id, matching))
+            keep = [e for e in eventBuffer if id(e) not in sent]
+            eventBuffer.clear()
+            eventBuffer.extend(keep)
+
+        if matching:
+            matching.sort(key=itemgetter(timeIndex))
+            self.sendResponse(('GET_EVENTS_RESULT', matching, remaining), replyTo)
+        else:
+            self.sendResponse(('GET_EVENTS_RESULT', None, 0), replyTo)
+        return True
+
     def handleExperimentDeviceRequest(self, request, replyTo):
         request_type = request.pop(0)
         if not isinstance(request_type, str):
@@ -488,6 +579,21 @@ class udpServer(DatagramServer):
             return dsfile.extendConditionVariableTable(exp_id, sess_id, data)
         return False
 
+    def getSharedEventBufferName(self):
+        sharedEvents = self.iohub.sharedEventBuffer
+        if sharedEvents:
+            return sharedEvents.name
+        return None
+
+    def getDeviceEventTypes(self):
+        eventTypes = dict()
+        for device in self.iohub.devices:
+            types = list(device._event_listeners.keys())
+            eventTypes[device.name] = types
+            eventTypes.setdefault(device.__class__.__name__, [])
+            eventTypes[device.__class__.__name__].extend(types)
+        return eventTypes
+
     def clearEventBuffer(self, clear_device_level_buffers=False):
         """
 
@@ -544,10 +650,16 @@ class udpServer(DatagramServer):
     def flushIODataStoreFile(self):
         dsfile = self.iohub.dsfile
         if dsfile:
-            dsfile.emrtFile.flush()
+            dsfile.flush()
             return True
         return False
 
+    def getIODataStoreStats(self):
+        dsfile = self.iohub.dsfile
+        if dsfile:
+            return dsfile.getStats()
+        return None
+
     def shutDown(self):
         try:
             self.setPriority('normal')
@@ -608,6 +720,8 @@ class ioServer():
         self._all_dev_conf_errors = []
         ebuf_sz = config.get('global_event_buffer', 2048)
         ioServer.eventBuffer = deque(maxlen=ebuf_sz)
+        self.sharedEventBuffer = None
+        self._initSharedEventBuffer(config)
 
         self._running = True
         # start UDP service
@@ -618,6 +732,21 @@ class ioServer():
 
         self._addPubSubListeners()
 
+    def _initSharedEventBuffer(self, config):
+        seb_conf = config.get('shared_event_buffer') or {}
+        if not seb_conf.get('enable', False):
+            return
+        try:
+            self.sharedEventBuffer = SharedEventBuffer(
+                length=seb_conf.get('length', 2048),
+                slot_size=seb_conf.get('slot_size', 512))
+            self.log('Shared Event Buffer: {0}'.format(
+                self.sharedEventBuffer.name))
+        except Exception:
+            print2err('Error creating shared event buffer, '
+                      'events will be sent over UDP.')
+            printExceptionDetailsToStdErr()
+
     def _initDataStore(self, config, script_dir):
         try:
             # initial dataStore setup
@@ -978,6 +1107,8 @@ class ioServer():
         while self._running:
             stime = Computer.getTime()
             self.processDeviceEvents()
+            if self.dsfile:
+                self.dsfile.checkEventBuffers()
             dur = sleep_interval - (Computer.getTime() - stime)
             gevent.sleep(max(0, dur))
 
@@ -1012,7 +1143,11 @@ class ioServer():
                 print2err('--------------------------------------')
 
     def _handleEvent(self, event):
-        self.eventBuffer.append(event)
+        # events too large for the shared event buffer are kept in the
+        # global event buffer, for the client to request over UDP
+        if self.sharedEventBuffer is None or \
+                not self.sharedEventBuffer.write(event):
+            self.eventBuffer.append(event)
 
     def clearEventBuffer(self, call_proc_events=True):
         if call_proc_events is True:
@@ -1062,6 +1197,10 @@ class ioServer():
 
             self.closeDataStoreFile()
 
+            if self.sharedEventBuffer:
+                self.sharedEventBuffer.close()
+                self.sharedEventBuffer = None
+
             while self.devices:
                 self.devices.pop(0)._close()
         except Exception:
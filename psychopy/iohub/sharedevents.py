@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# Part of the PsychoPy library
+# Copyright (C) 2012-2020 iSolver Software Solutions (C) 2021 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""Shared memory transport for ioHub device events.
+
+When the ``shared_event_buffer`` setting is enabled, the ioHub Process writes
+each event added to the Global Event Buffer into a ring buffer in shared
+memory, which the experiment process reads directly instead of requesting
+events over UDP. UDP is still used for all other requests.
+"""
+import struct
+import sys
+
+import msgpack
+try:
+    import msgpack_numpy
+    msgpack_numpy.patch()
+except ImportError:
+    pass
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+# pylint: disable=protected-access
+
+
+class SharedEventBuffer():
+    """Single producer, single consumer ring buffer of ioHub events, held in a
+    ``multiprocessing.shared_memory`` block.
+
+    The buffer has a fixed number of slots of a fixed size. Each slot holds one
+    msgpack packed event, preceded by the sequence number of the event (the
+    number of events written before it) and its packed length. Writing never
+    blocks: once the buffer is full the oldest events are overwritten, like
+    the Global Event Buffer deque, and the reader skips any events it missed.
+    Events too large for a slot are not written, they are counted instead so
+    that the reader knows to fetch them some other way.
+
+    A reader attached to an existing buffer starts with the oldest event it
+    holds. Only the writer changes the header and slots, the reader keeps its
+    own position, so no locks are needed. A slot's sequence number is set to -1
+    while it is being written, and the reader checks it is unchanged after
+    copying an event, so events overwritten while being read are dropped
+    rather than returned corrupted.
+
+    Args:
+        name (str): Name of an existing buffer to attach to, or None to
+            create a new one.
+        length (int): Number of events the buffer can hold, when creating it.
+        slot_size (int): Maximum size in bytes of each event (including a 12
+            byte slot header), when creating it.
+    """
+    # slot count, slot size, events written, events too large to write
+    HEADER = struct.Struct('<IIqq')
+    WRITE_COUNT_OFFSET = 8
+    OVERSIZE_COUNT_OFFSET = 16
+    # event sequence number and packed length
+    SLOT_HEADER = struct.Struct('<qI')
+    _COUNT = struct.Struct('<q')
+
+    def __init__(self, name=None, length=2048, slot_size=512):
+        if shared_memory is None:
+            raise RuntimeError('The ioHub shared event buffer needs '
+                               'multiprocessing.shared_memory (Python 3.8+).')
+        self._owner = name is None
+        if self._owner:
+            if slot_size <= self.SLOT_HEADER.size:
+                raise ValueError('slot_size must be larger than %d bytes.'
+                                 % self.SLOT_HEADER.size)
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=self.HEADER.size + length * slot_size)
+            self.HEADER.pack_into(self._shm.buf, 0, length, slot_size, 0, 0)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            _untrackSharedMemory(self._shm)
+        self.name = self._shm.name
+        self._buf = self._shm.buf
+        self.length, self.slot_size = self.HEADER.unpack_from(self._buf, 0)[:2]
+        self._payload_size = self.slot_size - self.SLOT_HEADER.size
+
+        self._packer = msgpack.Packer()
+        self._unpackb = msgpack.unpackb
+        # writer state; only one process writes, so this can be kept locally
+        self._write_count = self._getCount(self.WRITE_COUNT_OFFSET)
+        self._oversize_count = self._getCount(self.OVERSIZE_COUNT_OFFSET)
+        # reader state, starting from the oldest event still in the buffer
+        self._read_count = max(0, self._write_count - self.length)
+        self.lost_count = 0
+
+    def _getCount(self, offset):
+        return self._COUNT.unpack_from(self._buf, offset)[0]
+
+    def _slotOffset(self, seq):
+        return self.HEADER.size + (seq % self.length) * self.slot_size
+
+    def write(self, event):
+        """Add an event to the buffer, overwriting the oldest event if it is
+        full.
+
+        Args:
+            event (list): ioHub event, in list form.
+
+        Returns:
+            bool: True if the event was written, False if it was too large for
+            a slot.
+        """
+        data = self._packer.pack(event)
+        size = len(data)
+        if size > self._payload_size:
+            self._oversize_count += 1
+            self._COUNT.pack_into(self._buf, self.OVERSIZE_COUNT_OFFSET,
+                                  self._oversize_count)
+            return False
+        seq = self._write_count
+        offset = self._slotOffset(seq)
+        start = offset + self.SLOT_HEADER.size
+        self.SLOT_HEADER.pack_into(self._buf, offset, -1, size)
+        self._buf[start:start + size] = data
+        self.SLOT_HEADER.pack_into(self._buf, offset, seq, size)
+        self._write_count = seq + 1
+        self._COUNT.pack_into(self._buf, self.WRITE_COUNT_OFFSET,
+                              self._write_count)
+        return True
+
+    def read(self):
+        """Get all events written since the last call to read() or skip().
+
+        If more events than the buffer can hold were written since then, the
+        oldest are lost, and lost_count is increased by the number missed.
+
+        Returns:
+            list: The events, oldest first.
+        """
+        end = self._getCount(self.WRITE_COUNT_OFFSET)
+        seq = self._read_count
+        if end - seq > self.length:
+            self.lost_count += end - self.length - seq
+            seq = end - self.length
+
+        buf = self._buf
+        unpack_header = self.SLOT_HEADER.unpack_from
+        header_size = self.SLOT_HEADER.size
+        slots_offset = self.HEADER.size
+        slot_size = self.slot_size
+        length = self.length
+        unpackb = self._unpackb
+        events = []
+        while seq < end:
+            offset = slots_offset + (seq % length) * slot_size
+            slot_seq, size = unpack_header(buf, offset)
+            if slot_seq == seq:
+                start = offset + header_size
+                data = bytes(buf[start:start + size])
+                if unpack_header(buf, offset)[0] == seq:
+                    events.append(unpackb(data))
+                    seq += 1
+                    continue
+            # overwritten before it could be read
+            self.lost_count += 1
+            seq += 1
+        self._read_count = end
+        return events
+
+    def skip(self):
+        """Discard any events that have not been read yet.
+
+        Returns:
+            int: Number of events discarded.
+        """
+        end = self._getCount(self.WRITE_COUNT_OFFSET)
+        skipped = min(end - self._read_count, self.length)
+        self._read_count = end
+        return skipped
+
+    def getOversizeCount(self):
+        """Number of events that were not written because they were larger
+        than a slot."""
+        return self._getCount(self.OVERSIZE_COUNT_OFFSET)
+
+    def close(self):
+        """Close this process's access to the buffer. The buffer is also
+        removed if it was created by this process."""
+        if self._shm is None:
+            return
+        self._buf = None
+        shm, self._shm = self._shm, None
+        shm.close()
+        if self._owner:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+
+def _untrackSharedMemory(shm):
+    """Stop the multiprocessing resource tracker of this process removing a
+    shared memory block it did not create when the process exits."""
+    if sys.platform == 'win32':
+        return
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:  # pylint: disable=broad-except
+        pass
+
+# pylint: enable=protected-access
@@ -19,6 +19,12 @@ for messages to enter the log. For example, setting a level of INFO will
 result in INFO, EXP, DATA, WARNING and ERROR messages to be recorded but not
 DEBUG messages.
 
+Messages are only written to their targets when :func:`flush` is called
+(PsychoPy does this at times that aren't time-critical, e.g. between
+routines). Alternatively, calling :func:`setAsync` makes a background thread
+write messages in batches as they are logged, so flushing doesn't hold up the
+script at all.
+
 By default, PsychoPy will record messages of WARNING level and above to
 the console. The user can silence that by setting it to receive only CRITICAL
 messages, (which PsychoPy doesn't use) using the commands::
@@ -29,13 +35,15 @@ messages, (which PsychoPy doesn't use) using the commands::
 """
 
 # Much of the code below is based conceptually, if not syntactically, on the
-# python logging module but it's simpler (no threading) and maintaining a
-# stack of log entries for later writing (don't want files written while
-# drawing)
+# python logging module but it's simpler and maintains a stack of log entries
+# for later writing (don't want files written while drawing), either by the
+# main thread on flush() or by a writer thread in the background
 
 from os import path
 import atexit
 import sys
+import threading
+from collections import deque
 import codecs
 import locale
 from pathlib import Path
@@ -251,6 +259,11 @@ class _Logger():
         self.toFlush = []
         self.format = format
         self.lowestTarget = 50
+        # background writing, see setAsync()
+        self._writer = None
+        self._wakeWriter = None
+        self._stopWriter = False
+        self.asyncInterval = 0.1
 
     def __del__(self):
         self.flush()
@@ -294,33 +307,177 @@ class _Logger():
         self.toFlush.append(
             _LogEntry(t=t, level=level, levelname=levelname, message=message, obj=obj))
 
-    def flush(self):
-        """Process all current messages to each target
-        """
-        # loop through targets then entries in toFlush
-        # so that stream.flush can be called just once
+    def _writeEntries(self, entries):
+        """Format and write entries to each target, with a single write per
+        target."""
         formatted = {}  # keep a dict - so only do the formatting once
-        for target in self.targets:
-            for thisEntry in self.toFlush:
+        for target in list(self.targets):
+            lines = []
+            for thisEntry in entries:
                 if thisEntry.level >= target.level:
                     if not thisEntry in formatted:
                         # convert the entry into a formatted string
-                        formatted[thisEntry] = self.format.format(**thisEntry.__dict__)
-                    target.write(formatted[thisEntry] + '\n')
+                        formatted[thisEntry] = self.format.format(
+                            **thisEntry.__dict__) + '\n'
+                    lines.append(formatted[thisEntry])
+            if lines:
+                target.write(''.join(lines))
             if hasattr(target.stream, 'flush'):
                 target.stream.flush()
         # finished processing entries - move them to self.flushed
-        self.flushed.extend(self.toFlush)
+        self.flushed.extend(entries)
+
+    def flush(self, timeout=None):
+        """Process all current messages to each target
+
+        If messages are being written in the background (see
+        :meth:`setAsync`), this waits until the writer thread has written all
+        messages logged before the call and flushed the targets.
+
+        Parameters
+        ----------
+        timeout : float or None
+            Longest time (s) to wait for the writer thread. `None` (default)
+            waits until everything is written. Ignored unless writing in the
+            background.
+
+        Returns
+        -------
+        bool
+            `True` if all messages were written, `False` if the timeout
+            passed first.
+
+        """
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            if threading.current_thread() is writer:
+                return False
+            done = threading.Event()
+            self.toFlush.append(done)  # set once everything before is written
+            self._wakeWriter.set()
+            return done.wait(timeout)
+
+        # loop through targets then entries in toFlush
+        # so that stream.flush can be called just once
+        toFlush = self.toFlush
         self.toFlush = []  # a new empty list
+        self._writeEntries([e for e in toFlush if isinstance(e, _LogEntry)])
+        # release any flush() calls left waiting if the writer stopped
+        for marker in toFlush:
+            if not isinstance(marker, _LogEntry):
+                marker.set()
+        return True
+
+    @property
+    def isAsync(self):
+        """`True` if messages are being written by a background thread."""
+        return self._writer is not None
+
+    def setAsync(self, value=True, interval=None):
+        """Write messages in the background rather than on flush().
+
+        When on, logged messages are added to a queue, and a writer thread
+        takes them off it every `interval` seconds (or sooner if
+        :meth:`flush` is called), formats them and writes them to each target
+        with a single write and flush per target. Logging a message then
+        costs about the same as before, but nothing is written by the thread
+        doing the logging, so flushing doesn't hold it up. Calling
+        :meth:`flush` still blocks until all messages logged so far are
+        written.
+
+        Parameters
+        ----------
+        value : bool
+            `True` to start writing in the background, `False` to stop (after
+            writing any messages waiting).
+        interval : float or None
+            Longest time (s) a message waits in the queue before it is
+            written. If `None` the current value of `asyncInterval` (0.1 s by
+            default) is used.
+
+        """
+        if interval is not None:
+            self.asyncInterval = interval
+        if value and self._writer is None:
+            # append and popleft are thread-safe, so log() needs no lock
+            pending, self.toFlush = self.toFlush, deque()
+            self._writeEntries(pending)  # anything logged so far
+            self._wakeWriter = threading.Event()
+            self._stopWriter = False
+            self._writer = threading.Thread(
+                target=self._writeInBackground, name='psychopy.logging',
+                daemon=True)
+            self._writer.start()
+        elif not value and self._writer is not None:
+            self._stopWriter = True
+            self._wakeWriter.set()
+            self._writer.join()
+            self._writer = None
+            queue, self.toFlush = self.toFlush, []
+            leftover = []
+            while queue:  # anything logged while the writer was stopping
+                leftover.append(queue.popleft())
+            self.toFlush[:0] = leftover
+            self.flush()
+
+    def _writeInBackground(self):
+        """Write queued messages until asked to stop, run by the writer
+        thread."""
+        queue = self.toFlush
+        while True:
+            self._wakeWriter.wait(self.asyncInterval)
+            self._wakeWriter.clear()
+            stop = self._stopWriter
+            entries = []
+            markers = []
+            while True:
+                try:
+                    item = queue.popleft()
+                except IndexError:
+                    break
+                if isinstance(item, _LogEntry):
+                    entries.append(item)
+                else:
+                    markers.append(item)
+            try:
+                if entries or markers:
+                    self._writeEntries(entries)
+            except Exception as err:  # keep writing later messages
+                sys.stderr.write(
+                    'Failed to write log messages: {}\n'.format(err))
+            finally:
+                for marker in markers:
+                    marker.set()
+            if stop:
+                return
 
 root = _Logger()
 console = LogFile(level=WARNING)
 
 
-def flush(logger=root):
+def flush(logger=root, timeout=None):
     """Send current messages in the log to all targets
+
+    If messages are being written in the background (see :func:`setAsync`),
+    waits up to `timeout` seconds (or for as long as it takes, if `None`) for
+    them to be written, returning `False` if the timeout passed first. See
+    :meth:`_Logger.flush`.
+    """
+    return logger.flush(timeout=timeout)
+
+
+def setAsync(value=True, interval=None, logger=root):
+    """Write logged messages to their targets from a background thread.
+
+    Messages are written in batches, within `interval` seconds of being
+    logged, so that writing files doesn't cause dropped frames. :func:`flush`
+    still blocks until every message logged before it is written. See
+    :meth:`_Logger.setAsync`.
+
+    usage::
+        logging.setAsync(True)
     """
-    logger.flush()
+    logger.setAsync(value, interval=interval)
 
 # make sure this function gets called as python closes
 atexit.register(flush)
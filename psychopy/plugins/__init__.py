@@ -36,6 +36,7 @@ import importlib, importlib.metadata
 from psychopy import logging
 from psychopy.preferences import prefs
 from .util import PluginStub, PluginRequiredError
+from .index import EntryPointIndex, getEntryPointIndexFile
 
 # Configure the environment to use our custom site-packages location for
 # user-installed packages (i.e. plugins).
@@ -55,6 +56,11 @@ _loaded_plugins_ = collections.OrderedDict()  # use OrderedDict for Py2 compatib
 # calling `scanPlugins`. We are caching entry points to avoid having to rescan
 # packages for them.
 _installed_plugins_ = collections.OrderedDict()
+_plugins_scanned_ = False
+
+# On-disk index of entry points used by `scanPlugins`, so that only packages
+# which have changed since the last scan need reading.
+_entry_point_index_ = None
 
 # Keep track of plugins that failed to load here
 _failed_plugins_ = []
@@ -410,7 +416,7 @@ def installPlugin(package, local=True, upgrade=False, forceReinstall=False,
         noDeps=noDeps)
 
 
-def scanPlugins():
+def scanPlugins(useIndex=True):
     """Scan the system for installed plugins.
 
     This function scans installed packages for the current Python environment
@@ -420,6 +426,17 @@ def scanPlugins():
     called automatically when PsychoPy starts, so you do not need to call this
     unless packages have been added since the session began.
 
+    The entry points found are kept in an index in the user's cache folder
+    (see :class:`~psychopy.plugins.index.EntryPointIndex`), so only folders
+    on the search path where packages were added or removed since the last
+    scan are read again.
+
+    Parameters
+    ----------
+    useIndex : bool
+        Use the index of entry points. If `False`, every installed package is
+        read and the index isn't changed.
+
     Returns
     -------
     int
@@ -427,20 +444,30 @@ def scanPlugins():
         return the names of the found plugins.
 
     """
-    global _installed_plugins_
+    global _installed_plugins_, _plugins_scanned_, _entry_point_index_
     _installed_plugins_ = {}  # clear the cache
+    searchPath = sys.path + [USER_PACKAGES_PATH]
+    if useIndex:
+        if _entry_point_index_ is None:
+            _entry_point_index_ = EntryPointIndex(getEntryPointIndexFile())
+        distEntryPoints = _entry_point_index_.scan(searchPath)
+    else:
+        distEntryPoints = []
+        for dist in importlib.metadata.distributions(path=searchPath):
+            if sys.version.startswith("3.8"):
+                distName = dist.metadata['name']
+            else:
+                distName = dist.name
+            distEntryPoints.append((distName, dist.entry_points))
+
     # iterate through installed packages
-    for dist in importlib.metadata.distributions(path=sys.path + [USER_PACKAGES_PATH]):
+    for distName, entryPoints in distEntryPoints:
         # map all entry points
-        for ep in dist.entry_points:
+        for ep in entryPoints:
             # skip entry points which don't target PsychoPy
             if not ep.group.startswith("psychopy"):
                 continue
             # make sure we have an entry for this distribution
-            if sys.version.startswith("3.8"):
-                distName = dist.metadata['name']
-            else:
-                distName = dist.name
             if distName not in _installed_plugins_:
                 _installed_plugins_[distName] = {}
             # make sure we have an entry for this group
@@ -448,7 +475,8 @@ def scanPlugins():
                 _installed_plugins_[distName][ep.group] = {}
             # map entry point
             _installed_plugins_[distName][ep.group][ep.name] = ep
-    
+    _plugins_scanned_ = True
+
     return len(_installed_plugins_)
 
 
@@ -525,6 +553,8 @@ def listPlugins(which='all'):
     elif which == 'failed':
         return list(_failed_plugins_)  # copy
     else:
+        if not _plugins_scanned_:
+            scanPlugins()
         return list(_installed_plugins_.keys())
 
 
@@ -1051,8 +1081,8 @@ def pluginMetadata(plugin):
 def pluginEntryPoints(plugin, parse=False):
     """Get the entry point mapping for a specified plugin.
 
-    You must call `scanPlugins` before calling this function to get the entry
-    points for a given plugin.
+    Plugins are scanned for the first time this is called, if
+    :func:`scanPlugins` hasn't been called already.
 
     Note this function is intended for internal use by the PsychoPy plugin
     system only.
@@ -1072,6 +1102,8 @@ def pluginEntryPoints(plugin, parse=False):
 
     """
     global _installed_plugins_
+    if not _plugins_scanned_:
+        scanPlugins()
     if plugin in _installed_plugins_.keys():
         if not parse:
             return _installed_plugins_[plugin]
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2025 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+"""On-disk index of the PsychoPy entry points of installed packages.
+
+Finding plugins means reading the entry points of every installed
+distribution, which takes a while when there are hundreds of packages. This
+index keeps the entry points found in each directory on the search path, along
+with the modification time of the directory and of each distribution's
+metadata folder, so that only directories which have changed since the last
+scan (i.e. where packages were installed or removed) are read again.
+"""
+
+__all__ = [
+    'EntryPointIndex',
+    'getEntryPointIndexFile'
+]
+
+import os
+import sys
+import json
+import hashlib
+import importlib.metadata
+from pathlib import Path
+
+from psychopy import logging
+from psychopy.preferences import prefs
+
+# distribution metadata folders (or files) looked for by importlib.metadata
+_DIST_SUFFIXES = ('.dist-info', '.egg-info')
+
+
+def getEntryPointIndexFile():
+    """Get the path of the index file for this Python installation.
+
+    Each Python installation has its own index, as they each have their own
+    packages.
+
+    Returns
+    -------
+    str
+        Path of the index file, in the user's cache folder.
+
+    """
+    version = '%d.%d' % sys.version_info[:2]
+    # name after the interpreter, as virtual environments share the cache
+    exeHash = hashlib.md5(sys.executable.encode('utf-8')).hexdigest()[:10]
+    return os.path.join(
+        prefs.paths['userCacheDir'], 'plugins',
+        'entryPoints-py{}-{}.json'.format(version, exeHash))
+
+
+def _getMTime(path):
+    """Modification time of a path in ns, or `None` if it doesn't exist."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _readDistribution(dist, groupPrefix):
+    """Get the name of a distribution and its entry points in groups starting
+    with `groupPrefix`, as a dict which can be saved as JSON."""
+    entryPoints = [[ep.group, ep.name, ep.value] for ep in dist.entry_points
+                   if ep.group.startswith(groupPrefix)]
+    return {'name': dist.metadata['Name'], 'entryPoints': entryPoints}
+
+
+class EntryPointIndex:
+    """Entry points of installed packages, cached on disk.
+
+    Parameters
+    ----------
+    fileName : str or None
+        File to keep the index in. If `None`, the index is only kept in
+        memory.
+    groupPrefix : str
+        Only entry points in groups starting with this are kept.
+
+    Examples
+    --------
+    Get the PsychoPy entry points of packages on the search path::
+
+        index = EntryPointIndex(getEntryPointIndexFile())
+        for distName, entryPoints in index.scan(sys.path):
+            for ep in entryPoints:
+                print(distName, ep.group, ep.name, ep.value)
+
+    """
+    # increase if the format of the file changes
+    formatVersion = 1
+
+    def __init__(self, fileName=None, groupPrefix='psychopy'):
+        self.fileName = fileName
+        self.groupPrefix = groupPrefix
+        self._paths = None  # loaded from the file when first needed
+        self._changed = False
+        # number of directories and distributions read by the last scan
+        self.nPathsRead = 0
+        self.nDistsRead = 0
+
+    def _load(self):
+        """Load the index from disk, or start a new one if there isn't a
+        usable index file."""
+        self._paths = {}
+        if not self.fileName or not os.path.isfile(self.fileName):
+            return
+        try:
+            with open(self.fileName, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as err:
+            logging.debug(
+                "Couldn't read plugin index `{}`: {}".format(
+                    self.fileName, err))
+            return
+        if data.get('version') == self.formatVersion and \
+                data.get('groupPrefix') == self.groupPrefix:
+            self._paths = data.get('paths', {})
+
+    def save(self):
+        """Write the index to disk, if it has changed since it was loaded."""
+        if not self.fileName or not self._changed:
+            return
+        from psychopy.tools.filetools import openAtomicFile
+
+        data = {
+            'version': self.formatVersion,
+            'groupPrefix': self.groupPrefix,
+            'paths': self._paths}
+        try:
+            with openAtomicFile(self.fileName, encoding='utf-8') as f:
+                json.dump(data, f)
+        except OSError as err:
+            logging.debug(
+                "Couldn't write plugin index `{}`: {}".format(
+                    self.fileName, err))
+            return
+        self._changed = False
+
+    def _scanPath(self, path, mtime, cached):
+        """Get the distributions in a directory (or zip file) on the search
+        path, reusing those in `cached` that haven't changed."""
+        self.nPathsRead += 1
+        cachedDists = cached.get('dists', {}) if cached else {}
+        dists = {}
+        if not os.path.isdir(path):
+            # zip files etc. are read as a whole
+            for dist in importlib.metadata.distributions(path=[path]):
+                self.nDistsRead += 1
+                distInfo = _readDistribution(dist, self.groupPrefix)
+                if distInfo['name'] is not None:
+                    dists[distInfo['name']] = distInfo
+            return {'mtime': mtime, 'dists': dists}
+
+        try:
+            children = os.listdir(path)
+        except OSError:
+            children = []
+        for child in children:
+            if not child.lower().endswith(_DIST_SUFFIXES):
+                continue
+            childPath = os.path.join(path, child)
+            childMTime = _getMTime(childPath)
+            distInfo = cachedDists.get(child)
+            if distInfo is None or distInfo.get('mtime') != childMTime:
+                dist = importlib.metadata.PathDistribution(Path(childPath))
+                try:
+                    distInfo = _readDistribution(dist, self.groupPrefix)
+                except Exception as err:
+                    # skip broken metadata rather than failing the scan
+                    logging.debug(
+                        "Couldn't read package metadata `{}`: {}".format(
+                            childPath, err))
+                    continue
+                if distInfo['name'] is None:
+                    continue
+                distInfo['mtime'] = childMTime
+                self.nDistsRead += 1
+            dists[child] = distInfo
+
+        return {'mtime': mtime, 'dists': dists}
+
+    def scan(self, paths):
+        """Get the entry points of distributions on the search path.
+
+        Only directories which have changed since they were last scanned are
+        read again, and of those only distributions which have changed. The
+        index file is updated if anything changed.
+
+        Parameters
+        ----------
+        paths : list of str
+            Search path, e.g. `sys.path`.
+
+        Returns
+        -------
+        list of tuple
+            Pairs of distribution name and list of
+            `importlib.metadata.EntryPoint`, in the order the distributions
+            are found on the search path. Only distributions with entry points
+            in the group prefix are included.
+
+        """
+        if self._paths is None:
+            self._load()
+        self.nPathsRead = self.nDistsRead = 0
+
+        found = []
+        seenPaths = set()
+        for path in paths:
+            path = os.path.abspath(path or '.')
+            if path in seenPaths:
+                continue
+            seenPaths.add(path)
+            mtime = _getMTime(path)
+            if mtime is None:  # not there, so nothing to find
+                if self._paths.pop(path, None) is not None:
+                    self._changed = True
+                continue
+            cached = self._paths.get(path)
+            if cached is None or cached.get('mtime') != mtime:
+                self._paths[path] = cached = self._scanPath(path, mtime, cached)
+                self._changed = True
+
+            for distInfo in cached['dists'].values():
+                if not distInfo['entryPoints']:
+                    continue
+                entryPoints = [
+                    importlib.metadata.EntryPoint(
+                        name=name, value=value, group=group)
+                    for group, name, value in distInfo['entryPoints']]
+                found.append((distInfo['name'], entryPoints))
+
+        self.save()
+
+        return found
+
+    def clear(self):
+        """Remove everything from the index, so the next scan reads all
+        distributions again."""
+        self._paths = {}
+        self._changed = True
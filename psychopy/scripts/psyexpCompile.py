@@ -9,17 +9,37 @@ import io
 import sys
 import os
 import argparse
+import hashlib
+import json
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
 from subprocess import PIPE, Popen
 from pathlib import Path
+from xml.etree import ElementTree
 
 from psychopy import __version__
 
 # DO NOT IMPORT ANY OTHER PSYCHOPY SUB-PACKAGES OR THEY WON'T SWITCH VERSIONS
 
 parser = argparse.ArgumentParser(description='Compile your python file from here')
-parser.add_argument('infile', help='The input (psyexp) file to be compiled')
+parser.add_argument('infile', nargs='+', help='The input (psyexp) file to be compiled, or several to compile as a batch')
 parser.add_argument('--version', '-v', help='The PsychoPy version to use for compiling the script. e.g. 1.84.1')
 parser.add_argument('--outfile', '-o', help='The output (py) file to be generated (defaults to the ')
+parser.add_argument('--targets', '-t', nargs='+', choices=['PsychoPy', 'PsychoJS'], help='Batch: targets to compile each experiment for (defaults to PsychoPy)')
+parser.add_argument('--jobs', '-j', type=int, help='Batch: number of worker processes (defaults to the number of CPUs)')
+parser.add_argument('--outdir', help='Batch: folder to write the scripts to (defaults to beside each psyexp file)')
+parser.add_argument('--cache-dir', help='Batch: folder of the compile cache (defaults to one in the user cache folder)')
+parser.add_argument('--no-cache', action='store_true', help='Batch: compile every experiment, even if unchanged')
+
+
+# increase if the way scripts are compiled changes, so cached scripts are remade
+_compileCacheVersion = 1
+# extension of the script of each target
+_targetExts = {'PsychoPy': '.py', 'PsychoJS': '.js'}
+# spreadsheets a loop might use when its conditions file is set by code
+_conditionsPatterns = ['*.xlsx', '*.xls', '*.csv', '*.tsv']
+# phases of compiling timed by compileBatch
+_compilePhases = ['hash', 'load', 'compile', 'write']
 
 
 class LegacyScriptError(ChildProcessError):
@@ -85,6 +105,56 @@ def generateScript(exp, outfile, target="PsychoPy"):
     return outfile
 
 
+def _makeScripts(thisExp, outfile, target):
+    """
+    Generate the script(s) of an experiment for a target.
+
+    Parameters
+    ----------
+    thisExp : experiment.Experiment object
+        The experiment to generate scripts for.
+    outfile : str
+        The output file of the script.
+    target : str
+        PsychoPy or PsychoJS. For PsychoJS a script for legacy browsers (with
+        no JS modules) is made too.
+
+    Returns
+    -------
+    list
+        File name and text of each script, as tuples.
+    """
+    if target == "PsychoJS":
+        # Write module JS code
+        script = thisExp.writeScript(outfile, target=target, modular=True)
+        # Write no module JS code
+        outfileNoModule = outfile.replace('.js', '-legacy-browsers.js')  # For no JS module script
+        scriptNoModule = thisExp.writeScript(outfileNoModule, target=target, modular=False)
+        # Store scripts in list
+        scripts = [(outfile, script), (outfileNoModule, scriptNoModule)]
+    else:
+        script = thisExp.writeScript(outfile, target=target)
+        scripts = [(outfile, script)]
+
+    scriptTexts = []
+    for outfile, script in scripts:
+        if not type(script) in (str, type(u'')):
+            # We have a stringBuffer not plain string/text
+            scriptText = script.getvalue()
+        else:
+            # We already have the text
+            scriptText = script
+        scriptTexts.append((outfile, scriptText))
+
+    return scriptTexts
+
+
+def _saveScript(outfile, scriptText):
+    """Write the text of a script to file."""
+    with io.open(outfile, 'w', encoding='utf-8-sig') as f:
+        f.write(scriptText)
+
+
 def compileScript(infile=None, version=None, outfile=None):
     """
     Compile either Python or JS PsychoPy script from .psyexp file.
@@ -188,29 +258,9 @@ def compileScript(infile=None, version=None, outfile=None):
         targetOutput : string
             The Python or JavaScript target type
         """
-        # Write script
-        if targetOutput == "PsychoJS":
-            # Write module JS code
-            script = thisExp.writeScript(outfile, target=targetOutput, modular=True)
-            # Write no module JS code
-            outfileNoModule = outfile.replace('.js', '-legacy-browsers.js')  # For no JS module script
-            scriptNoModule = thisExp.writeScript(outfileNoModule, target=targetOutput, modular=False)
-            # Store scripts in list
-            scriptDict = [(outfile, script), (outfileNoModule, scriptNoModule)]
-        else:
-            script = thisExp.writeScript(outfile, target=targetOutput)
-            scriptDict = [(outfile, script)]
-
         # Output script to file
-        for outfile, script in scriptDict:
-            if not type(script) in (str, type(u'')):
-                # We have a stringBuffer not plain string/text
-                scriptText = script.getvalue()
-            else:
-                # We already have the text
-                scriptText = script
-            with io.open(outfile, 'w', encoding='utf-8-sig') as f:
-                f.write(scriptText)
+        for outfile, scriptText in _makeScripts(thisExp, outfile, targetOutput):
+            _saveScript(outfile, scriptText)
 
         return 1
 
@@ -221,9 +271,404 @@ def compileScript(infile=None, version=None, outfile=None):
     _makeTarget(thisExp, outfile, targetOutput)
 
 
+def getCompileCacheDir():
+    """
+    Get the default folder for cached scripts (in the user's cache folder).
+    """
+    from psychopy.preferences import prefs
+    return os.path.join(prefs.paths['userCacheDir'], 'compiledScripts')
+
+
+def _hashFile(filename):
+    """SHA1 of the contents of a file, or None if it can't be read."""
+    sha = hashlib.sha1()
+    try:
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(2 ** 20), b''):
+                sha.update(chunk)
+    except OSError:
+        return None
+
+    return sha.hexdigest()
+
+
+def findConditionsFiles(infile):
+    """
+    Find the conditions files of the loops in a .psyexp file, without loading
+    the experiment.
+
+    Parameters
+    ----------
+    infile : str or Path
+        The psyexp file.
+
+    Returns
+    -------
+    list
+        Paths of the conditions files which exist, sorted. Where a conditions
+        file is set by code, every spreadsheet in the folder of the experiment
+        is included, as any of them might be used.
+    """
+    expDir = os.path.dirname(os.path.abspath(infile))
+    files = set()
+    for param in ElementTree.parse(str(infile)).getroot().iter('Param'):
+        if param.get('name') != 'conditionsFile':
+            continue
+        val = (param.get('val') or '').strip()
+        if not val:
+            continue
+        if val.startswith('$'):
+            for pattern in _conditionsPatterns:
+                files.update(str(path) for path in Path(expDir).glob(pattern))
+        else:
+            filename = os.path.normpath(os.path.join(expDir, val))
+            if os.path.isfile(filename):
+                files.add(filename)
+
+    return sorted(files)
+
+
+def getCompileKey(infile, outfile, target):
+    """
+    Get the key of a compiled script in the compile cache.
+
+    Scripts depend on the contents of the experiment and its conditions files,
+    the version of PsychoPy, the target and where the script is saved (which
+    is written into the script), so the key is a hash of all of these. Other
+    files the experiment uses (e.g. images) are known only by name, and aren't
+    copied to the resources folder of PsychoJS scripts when these come from
+    the cache, so after changing those compile again without the cache.
+
+    Parameters
+    ----------
+    infile : str or Path
+        The psyexp file.
+    outfile : str or Path
+        The output file of the script.
+    target : str
+        PsychoPy or PsychoJS.
+
+    Returns
+    -------
+    str
+        Hex digest of the hash.
+    """
+    expHash = _hashFile(infile)
+    if expHash is None:
+        raise FileNotFoundError("Can't read experiment file '{}'".format(infile))
+
+    expDir = os.path.dirname(os.path.abspath(infile))
+    parts = [str(_compileCacheVersion), __version__, target,
+             os.path.abspath(outfile), expHash]
+    for filename in findConditionsFiles(infile):
+        parts.append('{} {}'.format(
+            os.path.relpath(filename, expDir), _hashFile(filename)))
+
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _getOutfile(infile, target, outdir=None):
+    """The file a script is compiled to, beside the psyexp file unless an
+    output folder is given."""
+    root = os.path.splitext(os.path.basename(infile))[0]
+    folder = os.path.dirname(os.path.abspath(infile)) if outdir is None else outdir
+
+    return os.path.join(str(folder), root + _targetExts[target])
+
+
+def _loadCached(cacheFile):
+    """Scripts saved in the compile cache, or None if they aren't there."""
+    try:
+        with io.open(cacheFile, 'r', encoding='utf-8') as f:
+            return [tuple(script) for script in json.load(f)]
+    except (OSError, ValueError):
+        return None
+
+
+def _saveCached(cacheFile, scripts):
+    """Save scripts to the compile cache."""
+    from psychopy import logging
+    from psychopy.tools.filetools import openAtomicFile
+
+    try:
+        with openAtomicFile(cacheFile, encoding='utf-8') as f:
+            json.dump(scripts, f)
+    except OSError as err:
+        logging.warning(
+            "Couldn't save compiled script to cache `{}`: {}".format(
+                cacheFile, err))
+
+
+def _saveScripts(scripts):
+    """Write scripts to file, skipping those whose file already holds the same
+    text. Returns the number written."""
+    nWritten = 0
+    for outfile, scriptText in scripts:
+        try:
+            with io.open(outfile, 'r', encoding='utf-8-sig') as f:
+                if f.read() == scriptText:
+                    continue
+        except (OSError, ValueError):
+            pass
+        _saveScript(outfile, scriptText)
+        nWritten += 1
+
+    return nWritten
+
+
+def _initCompileWorker():
+    """Import the experiment package and find its components once per worker
+    process, as this takes longer than compiling most experiments."""
+    from psychopy import experiment
+    experiment.Experiment()
+
+
+def _compileExperiment(infile, outfiles, cacheFiles):
+    """
+    Compile an experiment for each of its targets, in a worker process.
+
+    Parameters
+    ----------
+    infile : str
+        The psyexp file.
+    outfiles : dict
+        Output file of each target to compile.
+    cacheFiles : dict
+        File in the compile cache to save the scripts of each target to, if
+        any.
+
+    Returns
+    -------
+    dict
+        Time spent on each phase of the compile, in seconds.
+    """
+    from psychopy import experiment
+
+    times = dict.fromkeys(_compilePhases[1:], 0.0)
+    t0 = time.perf_counter()
+    # load once for all targets
+    thisExp = experiment.Experiment()
+    thisExp.loadFromXML(infile)
+    times['load'] = time.perf_counter() - t0
+
+    for target, outfile in outfiles.items():
+        t0 = time.perf_counter()
+        scripts = _makeScripts(thisExp, outfile, target)
+        t1 = time.perf_counter()
+        _saveScripts(scripts)
+        cacheFile = cacheFiles.get(target)
+        if cacheFile is not None:
+            _saveCached(cacheFile, scripts)
+        t2 = time.perf_counter()
+        times['compile'] += t1 - t0
+        times['write'] += t2 - t1
+
+    return times
+
+
+def compileBatch(infiles, targets=("PsychoPy",), outdir=None, cache=True,
+                 nWorkers=None):
+    """
+    Compile many .psyexp files at once, in parallel, skipping those which
+    haven't changed since they were last compiled.
+
+    Each experiment is loaded once for all of its targets, in a pool of worker
+    processes. Compiled scripts are kept in a cache keyed on a hash of
+    everything the script depends on (see :func:`getCompileKey`), so an
+    experiment which is compiled again unchanged is written from the cache
+    without being loaded. Scripts are only written if their text has changed.
+    As with :func:`compileScript` given a file, the scripts are compiled with
+    this version of PsychoPy whatever 'Use version' is set to.
+
+    Parameters
+    ----------
+    infiles : list
+        The psyexp files to compile.
+    targets : list
+        Targets to compile each experiment for, PsychoPy (.py) and/or
+        PsychoJS (.js, with a -legacy-browsers.js script too).
+    outdir : str or Path or None
+        Folder to write the scripts to. If `None` each is written beside its
+        psyexp file.
+    cache : bool or str or Path
+        Folder of the compile cache, `True` for the default (see
+        :func:`getCompileCacheDir`) or `False` to compile everything.
+    nWorkers : int or None
+        Number of worker processes, by default the number of CPUs. With `1`
+        experiments are compiled in this process.
+
+    Returns
+    -------
+    list
+        A dict for each experiment, in the order given, with the psyexp file
+        (`'infile'`), its scripts (`'outfiles'`, by target), whether they came
+        from the cache (`'cached'`), the time spent on each phase in seconds
+        (`'times'`, see :func:`printCompileReport`) and the error raised if it
+        couldn't be compiled (`'error'`, otherwise `None`).
+
+    Examples
+    --------
+    Compile all the experiments in a folder for both targets::
+
+        results = compileBatch(glob.glob('experiments/*.psyexp'),
+                               targets=['PsychoPy', 'PsychoJS'])
+        printCompileReport(results)
+    """
+    from psychopy import logging
+
+    for target in targets:
+        if target not in _targetExts:
+            raise ValueError("Unknown compile target '{}', expected one of "
+                             "{}".format(target, list(_targetExts)))
+    if cache is True:
+        cache = getCompileCacheDir()
+
+    results = []
+    toCompile = []
+    for infile in infiles:
+        infile = str(infile)
+        result = {
+            'infile': infile,
+            'outfiles': {target: _getOutfile(infile, target, outdir)
+                         for target in targets},
+            'cached': False,
+            'times': dict.fromkeys(_compilePhases, 0.0),
+            'error': None}
+        results.append(result)
+
+        # scripts of any target which aren't in the cache need compiling
+        t0 = time.perf_counter()
+        cacheFiles = {}
+        cachedScripts = []
+        try:
+            for target, outfile in result['outfiles'].items():
+                if not cache:
+                    break
+                key = getCompileKey(infile, outfile, target)
+                cacheFiles[target] = os.path.join(str(cache), key + '.json')
+                indexFile = os.path.join(os.path.dirname(outfile), 'index.html')
+                if target == "PsychoJS" and not os.path.isfile(indexFile):
+                    # compiling writes the page which runs the script too
+                    cachedScripts.append(None)
+                else:
+                    cachedScripts.append(_loadCached(cacheFiles[target]))
+        except (OSError, ElementTree.ParseError) as err:
+            result['error'] = err
+            logging.error("Failed to compile '{}': {}".format(infile, err))
+            continue
+        result['times']['hash'] = time.perf_counter() - t0
+
+        if cache and None not in cachedScripts:
+            t0 = time.perf_counter()
+            for scripts in cachedScripts:
+                _saveScripts(scripts)
+            result['times']['write'] = time.perf_counter() - t0
+            result['cached'] = True
+        else:
+            toCompile.append((result, cacheFiles))
+
+    if nWorkers is None:
+        nWorkers = os.cpu_count() or 1
+    nWorkers = min(nWorkers, len(toCompile))
+
+    if nWorkers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=nWorkers, initializer=_initCompileWorker)
+        submit = pool.submit
+    else:
+        pool = None
+        submit = _runNow
+
+    try:
+        futures = [
+            (result, submit(_compileExperiment, result['infile'],
+                            result['outfiles'], cacheFiles))
+            for result, cacheFiles in toCompile]
+        for result, future in futures:
+            try:
+                result['times'].update(future.result())
+            except Exception as err:
+                result['error'] = err
+                logging.error("Failed to compile '{}': {}".format(
+                    result['infile'], err))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return results
+
+
+def _runNow(fcn, *args):
+    """Run a function straight away, returning a finished future."""
+    future = Future()
+    try:
+        future.set_result(fcn(*args))
+    except Exception as err:
+        future.set_exception(err)
+
+    return future
+
+
+def printCompileReport(results, file=None):
+    """
+    Print the time spent on each phase of a batch compile.
+
+    The phases are hashing the experiment and its conditions files to look up
+    the cache (hash), loading the experiment (load), generating its scripts
+    (compile), and writing them to file and the cache (write). Times of
+    experiments compiled in parallel are the time spent in their worker, so
+    add up to more than the time the batch took.
+
+    Parameters
+    ----------
+    results : list
+        As returned by :func:`compileBatch`.
+    file : file-like or None
+        Where to print the report, `sys.stdout` if `None`.
+    """
+    file = sys.stdout if file is None else file
+    rows = []
+    for result in results:
+        if result['error'] is not None:
+            status = 'failed'
+        else:
+            status = 'cached' if result['cached'] else 'compiled'
+        rows.append([os.path.basename(result['infile']), status] + [
+            '{:.1f}'.format(result['times'][phase] * 1e3)
+            for phase in _compilePhases])
+    rows.append(['total', '{} compiled'.format(
+        sum(1 for row in rows if row[1] == 'compiled'))] + [
+        '{:.1f}'.format(sum(r['times'][phase] for r in results) * 1e3)
+        for phase in _compilePhases])
+
+    headers = ['experiment', 'status'] + [
+        '{} (ms)'.format(phase) for phase in _compilePhases]
+    widths = [max(len(str(row[i])) for row in [headers] + rows)
+              for i in range(len(headers))]
+    for row in [headers] + rows:
+        file.write('  '.join(
+            str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip()
+            + '\n')
+
+
 if __name__ == "__main__":
     # define args
     args = parser.parse_args()
-    if args.outfile is None:
-        args.outfile = args.infile.replace(".psyexp", ".py")
-    compileScript(args.infile, args.version, args.outfile)
+    batchArgs = [args.targets, args.jobs, args.outdir, args.cache_dir,
+                 args.no_cache]
+    if len(args.infile) > 1 or any(batchArgs):
+        if args.outfile or args.version:
+            parser.error("--outfile and --version can't be used with a batch")
+        results = compileBatch(
+            args.infile, targets=args.targets or ["PsychoPy"],
+            outdir=args.outdir,
+            cache=False if args.no_cache else (args.cache_dir or True),
+            nWorkers=args.jobs)
+        printCompileReport(results)
+        if any(result['error'] is not None for result in results):
+            sys.exit(1)
+    else:
+        infile = args.infile[0]
+        if args.outfile is None:
+            args.outfile = infile.replace(".psyexp", ".py")
+        compileScript(infile, args.version, args.outfile)
@@ -0,0 +1,34 @@
+"""Benchmarks for performance-sensitive parts of PsychoPy.
+
+These are not tests (they make no assertions and are not collected by pytest),
+they're scripts which time and measure alternative implementations of the same
+thing so that changes can be compared. Run one as a module, e.g.::
+
+    python -m psychopy.tests.benchmarks.bench_ExperimentHandler
+"""
+
+import time
+
+
+def timeCall(fcn, *args, repeats=1, **kwargs):
+    """Call a function `repeats` times, returning the best time taken (in s)
+    and the value returned by the last call.
+    """
+    best = float('inf')
+    value = None
+    for n in range(repeats):
+        t0 = time.perf_counter()
+        value = fcn(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+
+    return best, value
+
+
+def printTable(headers, rows):
+    """Print the results of a benchmark as a plain text table."""
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max([len(str(head))] + [len(row[i]) for row in rows])
+              for i, head in enumerate(headers)]
+    print("  ".join(str(head).rjust(w) for head, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(cell.rjust(w) for cell, w in zip(row, widths)))
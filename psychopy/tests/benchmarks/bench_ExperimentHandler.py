@@ -0,0 +1,72 @@
+"""Compare memory use and save time of dict-based and columnar entry storage
+in :class:`~psychopy.data.ExperimentHandler`.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_ExperimentHandler [nRows] [nCols]
+"""
+
+import os
+import sys
+import shutil
+import tracemalloc
+from tempfile import mkdtemp
+
+import numpy as np
+
+from psychopy import data, logging
+from psychopy.tests.benchmarks import timeCall, printTable
+
+
+def fillExperiment(exp, nRows, nCols):
+    """Add `nRows` entries of `nCols` columns (a mix of numbers, repeated
+    strings and booleans) to an ExperimentHandler.
+    """
+    rng = np.random.default_rng(0)
+    words = ["left", "right", "up", "down"]
+    for row in range(nRows):
+        for col in range(nCols):
+            kind = col % 4
+            if kind == 0:
+                value = float(rng.random())
+            elif kind == 1:
+                value = int(row)
+            elif kind == 2:
+                value = words[(row + col) % len(words)]
+            else:
+                value = bool(row % 2)
+            exp.addData("col%d" % col, value)
+        exp.nextEntry()
+
+
+def run(nRows=20000, nCols=200):
+    logging.console.setLevel(logging.ERROR)
+    tmpDir = mkdtemp(prefix='psychopy-bench-exp')
+    results = []
+    try:
+        for columnar in (False, True):
+            exp = data.ExperimentHandler(savePickle=False, saveWideText=False,
+                                         columnarEntries=columnar)
+            tracemalloc.start()
+            fillTime, _ = timeCall(fillExperiment, exp, nRows, nCols)
+            mem, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            fileName = os.path.join(tmpDir, "columnar%s.csv" % columnar)
+            saveTime, _ = timeCall(exp.saveAsWideText, fileName,
+                                   fileCollisionMethod='overwrite')
+            results.append([
+                "columnar" if columnar else "dict",
+                "%.1f" % (mem / 1e6),
+                "%.2f" % fillTime,
+                "%.2f" % saveTime,
+            ])
+            exp.abort()
+    finally:
+        shutil.rmtree(tmpDir, ignore_errors=True)
+
+    print("ExperimentHandler with %d rows x %d columns" % (nRows, nCols))
+    printTable(["store", "memory (MB)", "fill (s)", "save (s)"], results)
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
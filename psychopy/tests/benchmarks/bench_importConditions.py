@@ -0,0 +1,113 @@
+"""Time importing long conditions files with
+:func:`~psychopy.data.importConditions`, parsing each cell in Python (as it
+used to) compared to the vectorised import, and importing the file again
+unchanged, which comes from the conditions cache.
+
+The files have `nRows` rows (default 100000) of five columns, with commas and
+decimal points (US), or semicolons and decimal commas (EU), which used to be
+found by trying to parse the file each way in turn.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_importConditions [nRows]
+"""
+
+import os
+import sys
+import tempfile
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from psychopy.data import utils
+from psychopy.tests.benchmarks import timeCall, printTable
+
+
+def makeConditions(fileName, nRows, sep=',', dec='.'):
+    rng = np.random.default_rng(0)
+    words = np.array(['red', 'green', 'blue', 'yellow'])
+    df = pd.DataFrame({
+        'word': words[rng.integers(0, 4, nRows)],
+        'color': words[rng.integers(0, 4, nRows)],
+        'congruent': rng.integers(0, 2, nRows),
+        'duration': rng.choice([0.5, 0.75, 1.25], nRows),
+        'corrAns': np.array(['left', 'right'])[rng.integers(0, 2, nRows)]})
+    df.to_csv(fileName, sep=sep, decimal=dec, index=False)
+
+
+def oldImportCsv(fileName):
+    """Import a csv file as importConditions used to."""
+    trialsArr = None
+    for sep, dec in utils._csvFormats:
+        try:
+            thisAttempt = pd.read_csv(
+                fileName, encoding='utf-8-sig', sep=sep, decimal=dec)
+            if len(thisAttempt.columns) == 1:
+                for delim in utils._csvDelims:
+                    if delim in thisAttempt.columns[0]:
+                        raise ValueError(delim)
+            trialsArr = thisAttempt
+        except Exception:
+            continue
+        else:
+            break
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for col in trialsArr.columns:
+            for row, cell in enumerate(trialsArr[col]):
+                if isinstance(cell, str):
+                    try:
+                        trialsArr[col][row] = float(cell.replace(",", "."))
+                    except ValueError:
+                        pass
+
+    trialsArr = trialsArr.to_records(index=False)
+    for record in trialsArr:
+        for idx, element in enumerate(record):
+            if isinstance(element, str):
+                record[idx] = element.replace('\\n', '\n')
+    fieldNames = list(trialsArr.dtype.names)
+    trialList = []
+    for trialN, trialType in enumerate(trialsArr):
+        thisTrial = OrderedDict()
+        for fieldN, fieldName in enumerate(fieldNames):
+            val = trialsArr[trialN][fieldN]
+            if isinstance(val, str):
+                if val.startswith('[') and val.endswith(']'):
+                    val = eval(val)
+            elif np.isnan(val):
+                val = None
+            thisTrial[fieldName] = val
+        trialList.append(thisTrial)
+
+    return trialList
+
+
+def importUncached(fileName):
+    utils.conditionsCache.clear()
+    return utils.importConditions(fileName)
+
+
+def run(nRows=100000):
+    results = []
+    with tempfile.TemporaryDirectory() as tmpDir:
+        for label, sep, dec in [("US", ',', '.'), ("EU", ';', ',')]:
+            fileName = os.path.join(tmpDir, label + '.csv')
+            makeConditions(fileName, nRows, sep, dec)
+            oldTime, expected = timeCall(oldImportCsv, fileName)
+            newTime, got = timeCall(importUncached, fileName, repeats=3)
+            cachedTime, cached = timeCall(
+                utils.importConditions, fileName, repeats=3)
+            results.append([
+                label, "%.0f" % (oldTime * 1e3), "%.0f" % (newTime * 1e3),
+                "%.0f" % (cachedTime * 1e3), got == expected == cached])
+
+    print("Importing csv conditions files of %i rows" % nRows)
+    printTable(["format", "per cell (ms)", "vectorised (ms)", "cached (ms)",
+                "same"], results)
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
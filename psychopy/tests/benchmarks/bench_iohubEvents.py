@@ -0,0 +1,153 @@
+"""Time getting events from an ioHub server process with
+:meth:`~psychopy.iohub.client.ioHubConnection.getEvents`, using UDP requests
+compared to reading from the shared event buffer.
+
+The server process only runs the ioHub UDP server, with no devices, and adds
+events to its global event buffer (or shared event buffer) when asked to, so
+only the cost of transferring events is measured.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_iohubEvents [repeats]
+"""
+
+import signal
+import subprocess
+import sys
+import time
+from collections import deque
+
+from psychopy.tests.benchmarks import printTable
+
+PORT = 9036
+BATCH_SIZES = [0, 1, 10, 100, 1000]
+
+
+def makeEvent(eventID):
+    # about the size of a keyboard event
+    return [0, 0, 0, eventID, 22, time.time(), time.time(), time.time(),
+            0.0, 0.0, 0, 'a', 65, 'a', 0, 0, 'KEY_A', 0, 0, 0, 0.0]
+
+
+def serve(port):
+    """Run an ioHub UDP server with no devices until terminated."""
+    from psychopy.iohub.devices import Computer
+    Computer.is_iohub_process = True
+    from psychopy.iohub.server import udpServer
+    from psychopy.iohub.sharedevents import SharedEventBuffer
+
+    class BenchHub:
+        def __init__(self):
+            self.eventBuffer = deque(maxlen=4096)
+            self.sharedEventBuffer = SharedEventBuffer(length=4096,
+                                                       slot_size=512)
+            self.devices = []
+            self.nextEventID = 1
+
+        def log(self, text, level=None):
+            pass
+
+        def processDeviceEvents(self):
+            pass
+
+        def getStatus(self):
+            return 'RUNNING'
+
+    class BenchServer(udpServer):
+        def addEvents(self, count, shared):
+            hub = self.iohub
+            for i in range(count):
+                event = makeEvent(hub.nextEventID)
+                hub.nextEventID += 1
+                if shared:
+                    hub.sharedEventBuffer.write(event)
+                else:
+                    hub.eventBuffer.append(event)
+            return count
+
+    hub = BenchHub()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        BenchServer(hub, ':%d' % port).serve_forever()
+    finally:
+        hub.sharedEventBuffer.close()
+
+
+def connect(port):
+    """Make an ioHubConnection to the benchmark server, without starting an
+    ioHub process."""
+    from psychopy.iohub.client import ioHubConnection
+    from psychopy.iohub.net import UDPClientConnection
+
+    conn = ioHubConnection.__new__(ioHubConnection)
+    conn.allEvents = []
+    conn._shared_events = None
+    conn._unread_events = deque()
+    conn._oversize_count = 0
+    conn._device_event_types = None
+    conn._iohub_server_config = {'global_event_buffer': 4096}
+    conn._shutdown_attempted = True
+    conn.udp_client = UDPClientConnection(remote_port=port, timeout=0.1)
+    # wait for the server to start
+    for attempt in range(100):
+        try:
+            if conn._sendToHubServer(('GET_IOHUB_STATUS',)):
+                break
+        except Exception:
+            pass
+        time.sleep(0.1)
+    conn.udp_client.close()
+    conn.udp_client = UDPClientConnection(remote_port=port)
+    return conn
+
+
+def timeGetEvents(conn, count, shared, repeats):
+    """Best time (in s) to get `count` events which are already waiting on the
+    server."""
+    best = float('inf')
+    for n in range(repeats):
+        conn._sendToHubServer(('RPC', 'addEvents', [count, shared]))
+        t0 = time.perf_counter()
+        events = conn.getEvents(as_type='list')
+        best = min(best, time.perf_counter() - t0)
+        assert len(events) == count
+    return best
+
+
+def run(repeats=50):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'psychopy.tests.benchmarks.bench_iohubEvents',
+         '--serve', str(PORT)])
+    try:
+        conn = connect(PORT)
+        conn._attachSharedEventBuffer()
+        sharedEvents = conn._shared_events
+        results = []
+        for count in BATCH_SIZES:
+            conn._shared_events = None
+            udpTime = timeGetEvents(conn, count, False, repeats)
+            conn._shared_events = sharedEvents
+            sharedTime = timeGetEvents(conn, count, True, repeats)
+            results.append([
+                count, "%.1f" % (udpTime * 1e6), "%.1f" % (sharedTime * 1e6),
+                "%.0f" % (count / udpTime) if count else "-",
+                "%.0f" % (count / sharedTime) if count else "-",
+                "%.1f" % (udpTime / sharedTime)])
+        sharedEvents.close()
+        conn.udp_client.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+    print("ioHubConnection.getEvents(), best of %d calls" % repeats)
+    printTable(
+        ["events", "UDP (us)", "shared (us)", "UDP (events/s)",
+         "shared (events/s)", "speedup"],
+        results)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ['--serve']:
+        serve(int(sys.argv[2]))
+    else:
+        run(*[int(arg) for arg in sys.argv[1:2]])
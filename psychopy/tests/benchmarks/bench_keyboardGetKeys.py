@@ -0,0 +1,83 @@
+"""Time getting keys from 10,000 buffered keyboard responses with
+:class:`~psychopy.hardware.keyboard.KeyResponseBuffer` (as used by
+`KeyboardDevice.getKeys`), compared to the linear scan of a list it replaced.
+
+The buffer holds presses of the letter keys which were never cleared (as when
+several keyboard components poll with `clear=False`), a few presses of 'space'
+and one key still held down, which is typical of a long Builder routine.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_keyboardGetKeys [nResponses]
+"""
+
+import string
+import sys
+
+from psychopy.hardware.keyboard import KeyResponseBuffer
+from psychopy.tests.benchmarks import timeCall, printTable
+from psychopy.tests.test_hardware.test_keyboard import _getKeysLinear, _Resp
+
+REPEATS = 20
+
+CASES = [
+    ("keyList=['space'], clear=False",
+     dict(keyList=['space'], waitRelease=True, clear=False)),
+    ("keyList=['left','right'], clear=False",
+     dict(keyList=['left', 'right'], waitRelease=True, clear=False)),
+    ("waitRelease=False, clear=False",
+     dict(waitRelease=False, clear=False)),
+    ("ignoreKeys=letters, clear=True",
+     dict(ignoreKeys=list(string.ascii_lowercase), waitRelease=True,
+          clear=True)),
+]
+
+
+def makeResponses(nResponses):
+    responses = [_Resp(string.ascii_lowercase[i % 26], duration=0.1)
+                 for i in range(nResponses - 6)]
+    responses += [_Resp('space', duration=0.1) for i in range(5)]
+    responses.append(_Resp('left'))  # still held down
+    return responses
+
+
+def run(nResponses=10000):
+    results = []
+    for label, kwargs in CASES:
+        def getLinear():
+            return _getKeysLinear(list(responses), **kwargs)
+
+        def getIndexed():
+            buffer = KeyResponseBuffer(responses) if kwargs['clear'] else kept
+            return buffer.getResponses(
+                keyList=kwargs.get('keyList'),
+                ignoreKeys=kwargs.get('ignoreKeys'),
+                released=kwargs['waitRelease'], clear=kwargs['clear'])
+
+        responses = makeResponses(nResponses)
+        kept = KeyResponseBuffer(responses)
+        linearTime, expected = timeCall(getLinear, repeats=REPEATS)
+        indexedTime, got = timeCall(getIndexed, repeats=REPEATS)
+        if kwargs['clear']:
+            # copying the responses into a new buffer is part of the time, so
+            # also time the lookup on its own
+            buffers = [KeyResponseBuffer(responses) for i in range(REPEATS)]
+            indexedTime = min(
+                timeCall(buffer.getResponses, released=True,
+                         ignoreKeys=kwargs['ignoreKeys'], clear=True)[0]
+                for buffer in buffers)
+        same = [id(r) for r in got] == [id(r) for r in expected]
+        results.append([
+            label, len(expected), "%.1f" % (linearTime * 1e6),
+            "%.1f" % (indexedTime * 1e6), "%.0f" % (linearTime / indexedTime),
+            same])
+
+    print("getKeys() with %i buffered responses, best of %i calls"
+          % (nResponses, REPEATS))
+    printTable(
+        ["call", "keys", "linear (us)", "indexed (us)", "speedup", "same"],
+        results)
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
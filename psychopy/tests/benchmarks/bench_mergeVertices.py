@@ -0,0 +1,70 @@
+"""Time :func:`~psychopy.tools.gltools.mergeVertices` on unwelded meshes of
+increasing size, compared to checking every vertex against every other one
+(only run for the smaller meshes, as it takes quadratic time).
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_mergeVertices [maxVerts]
+"""
+
+import sys
+
+import numpy as np
+
+from psychopy.tools.gltools import mergeVertices
+from psychopy.tests.benchmarks import timeCall, printTable
+from psychopy.tests.test_tools.test_gltools import _mergeVerticesReference
+
+# largest mesh to run the brute force version on
+MAX_REFERENCE_VERTS = 10000
+
+
+def makeUnweldedGrid(nVerts):
+    """Make a flat grid mesh where every triangle has its own vertices (so
+    each interior vertex is doubled up to 6 times), with about `nVerts`
+    vertices in total.
+    """
+    n = max(int(np.sqrt(nVerts / 6.0)), 1)
+    x, y = np.meshgrid(np.linspace(-1, 1, n + 1), np.linspace(-1, 1, n + 1))
+    points = np.stack([x.ravel(), y.ravel(), np.zeros(x.size)], -1)
+    texCoords = (points[:, :2] + 1) / 2.
+    corners = np.arange((n + 1) * (n + 1)).reshape((n + 1, n + 1))
+    a, b = corners[:-1, :-1].ravel(), corners[:-1, 1:].ravel()
+    c, d = corners[1:, :-1].ravel(), corners[1:, 1:].ravel()
+    faces = np.concatenate([np.stack([a, b, d], -1), np.stack([a, d, c], -1)])
+    indices = faces.ravel()
+    newFaces = np.arange(len(indices), dtype=np.uint32).reshape((-1, 3))
+
+    return (points[indices].astype(np.float32),
+            texCoords[indices].astype(np.float32),
+            newFaces)
+
+
+def run(maxVerts=1000000):
+    results = []
+    nVerts = 1000
+    while nVerts <= maxVerts:
+        vertices, texCoords, faces = makeUnweldedGrid(nVerts)
+        mergeTime, merged = timeCall(
+            mergeVertices, vertices, faces, texCoords, texDist=0.01)
+        if len(vertices) <= MAX_REFERENCE_VERTS:
+            refTime, expected = timeCall(
+                _mergeVerticesReference, vertices, faces, texCoords,
+                texDist=0.01)
+            same = all(np.array_equal(got, want)
+                       for got, want in zip(merged, expected))
+            refTime = "%.3f" % refTime
+        else:
+            refTime = same = "-"
+        results.append([
+            len(vertices), len(merged[0]), "%.3f" % mergeTime, refTime, same])
+        nVerts *= 10
+
+    print("mergeVertices on unwelded grid meshes")
+    printTable(
+        ["vertices", "merged", "spatial hash (s)", "brute force (s)", "same"],
+        results)
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,99 @@
+"""Time finding plugins with :func:`~psychopy.plugins.scanPlugins`, reading
+every installed package compared to using the on-disk entry point index.
+
+A folder of fake installed packages (a few of them plugins) is added to the
+search path, to stand in for a large lab installation. Each scan is run in a
+new process, as at startup, and timed from the start of the process to after
+importing `psychopy.plugins` and scanning, so the times are comparable to what
+starting PsychoPy costs.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_pluginScan [nPackages]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from psychopy.tests.benchmarks import printTable
+from psychopy.tests.test_plugins.test_plugin_index import makeDist
+
+REPEATS = 5
+
+SCAN_SCRIPT = '''
+import sys, time
+t0 = time.perf_counter()
+sys.path.append(sys.argv[1])
+from psychopy import plugins
+from psychopy.plugins.index import EntryPointIndex
+tImport = time.perf_counter()
+useIndex = sys.argv[2] != '-'
+if useIndex:
+    plugins._entry_point_index_ = EntryPointIndex(sys.argv[2])
+n = plugins.scanPlugins(useIndex=useIndex)
+t1 = time.perf_counter()
+print(n, tImport - t0, t1 - tImport)
+'''
+
+
+def makeSite(siteDir, nPackages):
+    for i in range(nPackages):
+        if i % 50 == 0:
+            entryPoints = {"psychopy.visual": {"Stim%d" % i: "plugin%d:Stim" % i}}
+            name = "psychopy-plugin%d" % i
+        else:
+            entryPoints = {"console_scripts": {"tool%d" % i: "pkg%d:main" % i}}
+            name = "package%d" % i
+        makeDist(siteDir, name, entryPoints)
+
+
+def timeScan(siteDir, indexFile, repeats=REPEATS):
+    """Best time (s) to import and scan in a new process."""
+    best = None
+    for n in range(repeats):
+        out = subprocess.run(
+            [sys.executable, '-c', SCAN_SCRIPT, str(siteDir), indexFile],
+            capture_output=True, text=True, check=True).stdout.split()
+        nPlugins, tImport, tScan = int(out[0]), float(out[1]), float(out[2])
+        if best is None or tScan < best[2]:
+            best = (nPlugins, tImport, tScan)
+    return best
+
+
+def run(nPackages=400):
+    results = []
+    with tempfile.TemporaryDirectory() as tmpDir:
+        siteDir = Path(tmpDir) / 'site-packages'
+        siteDir.mkdir()
+        makeSite(siteDir, nPackages)
+        indexFile = os.path.join(tmpDir, 'entryPoints.json')
+
+        for label, fileName in [
+                ("read all packages", '-'),
+                ("index (warm)", indexFile)]:
+            if fileName != '-':
+                timeScan(siteDir, fileName)  # build the index first
+            nPlugins, tImport, tScan = timeScan(siteDir, fileName)
+            results.append([label, nPlugins, "%.1f" % (tImport * 1e3),
+                            "%.1f" % (tScan * 1e3),
+                            "%.1f" % ((tImport + tScan) * 1e3)])
+
+        # one new package, so the folder is read again but only the new
+        # package's metadata is
+        makeDist(siteDir, "psychopy-new", {"psychopy.visual": {"New": "new:New"}})
+        nPlugins, tImport, tScan = timeScan(siteDir, indexFile, repeats=1)
+        results.append(["index (1 new package)", nPlugins,
+                        "%.1f" % (tImport * 1e3), "%.1f" % (tScan * 1e3),
+                        "%.1f" % ((tImport + tScan) * 1e3)])
+
+    print("scanPlugins() in a new process with %i extra packages, best of %i"
+          % (nPackages, REPEATS))
+    printTable(["scan", "plugins", "import (ms)", "scan (ms)", "total (ms)"],
+               results)
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,69 @@
+"""Time hit-testing gaze samples against ROIs with
+:func:`~psychopy.visual.helpers.pointsInPolygons`, compared to calling
+:func:`~psychopy.visual.helpers.pointInPolygon` for each sample and ROI.
+
+The ROIs are circles (64 vertices, as `visual.Circle` uses by default) spread
+over a 1920x1080 screen, and the samples are what a 1 kHz eyetracker gives in
+one 60 Hz frame. No window is needed: the ROIs stand in for stimuli, keeping
+their vertices in pixels as stimuli do.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_pointsInPolygons [nROIs]
+"""
+
+import sys
+
+import numpy as np
+
+from psychopy.tests.benchmarks import timeCall, printTable
+from psychopy.visual.helpers import pointInPolygon, pointsInPolygons
+
+REPEATS = 20
+N_SAMPLES = 17  # 1000 Hz / 60 Hz
+
+
+class _ROI:
+    """Stand-in for a stimulus, with its vertices in pixels."""
+
+    def __init__(self, pos, radius, nVertices=64):
+        angles = np.linspace(0, 2 * np.pi, nVertices, endpoint=False)
+        self.verticesPix = np.column_stack(
+            [np.cos(angles), np.sin(angles)]) * radius + pos
+
+
+def makeROIs(nROIs, rng):
+    return [_ROI(rng.uniform((-960, -540), (960, 540)), rng.uniform(30, 120))
+            for i in range(nROIs)]
+
+
+def run(nROIs=50):
+    rng = np.random.default_rng(0)
+    rois = makeROIs(nROIs, rng)
+    results = []
+    for label, nSamples in [("1 sample", 1),
+                            ("1 frame of samples", N_SAMPLES),
+                            ("1 s of samples", 1000)]:
+        samples = rng.uniform((-960, -540), (960, 540), (nSamples, 2))
+
+        def eachPair():
+            return np.array([[pointInPolygon(x, y, roi) for roi in rois]
+                             for x, y in samples])
+
+        loopTime, expected = timeCall(
+            eachPair, repeats=max(1, REPEATS // nSamples))
+        batchTime, got = timeCall(pointsInPolygons, samples, rois,
+                                  repeats=REPEATS)
+        results.append([
+            label, nSamples * nROIs, "%.3f" % (loopTime * 1e3),
+            "%.3f" % (batchTime * 1e3), "%.0f" % (loopTime / batchTime),
+            bool((got == expected).all())])
+
+    print("Testing gaze samples against %i ROIs" % nROIs)
+    printTable(
+        ["samples", "tests", "each (ms)", "batched (ms)", "speedup", "same"],
+        results)
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
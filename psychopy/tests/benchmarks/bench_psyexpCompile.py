@@ -0,0 +1,77 @@
+"""Time compiling a batch of experiments for both PsychoPy and PsychoJS, one
+at a time and loading each experiment for each target (as compileScript does)
+compared to a batch compile, which loads each once and runs in a pool of
+worker processes, and then the batch compiled again unchanged, which comes
+from the compile cache.
+
+The experiments are `nExps` copies (default 8) of the ghost Stroop experiment
+from the test data, with its conditions file. The batch compile uses a worker
+for each CPU, and the first experiment in each worker includes the time to
+start it.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_psyexpCompile [nExps]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+from psychopy import experiment
+from psychopy.scripts import psyexpCompile
+from psychopy.tests.benchmarks import timeCall, printTable
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+TARGETS = ['PsychoPy', 'PsychoJS']
+
+
+def compileEach(infiles):
+    for infile in infiles:
+        for target, ext in [('PsychoPy', '.py'), ('PsychoJS', '.js')]:
+            thisExp = experiment.Experiment()
+            thisExp.loadFromXML(infile)
+            outfile = infile.replace('.psyexp', ext)
+            for name, text in psyexpCompile._makeScripts(
+                    thisExp, outfile, target):
+                psyexpCompile._saveScript(name, text)
+
+
+def run(nExps=8):
+    with tempfile.TemporaryDirectory() as tmpDir:
+        shutil.copy(os.path.join(TESTS_DATA_PATH, 'ghost_trialTypes.xlsx'),
+                    tmpDir)
+        infiles = []
+        for i in range(nExps):
+            infile = os.path.join(tmpDir, 'ghost%d.psyexp' % i)
+            shutil.copy(os.path.join(TESTS_DATA_PATH, 'ghost_stroop.psyexp'),
+                        infile)
+            infiles.append(infile)
+        cacheDir = os.path.join(tmpDir, 'cache')
+
+        compileEach(infiles[:1])  # find components before timing
+        eachTime, _ = timeCall(compileEach, infiles)
+        batchTime, results = timeCall(
+            psyexpCompile.compileBatch, infiles, targets=TARGETS,
+            cache=cacheDir)
+        cachedTime, cached = timeCall(
+            psyexpCompile.compileBatch, infiles, targets=TARGETS,
+            cache=cacheDir)
+
+    print("Compiling %i experiments for PsychoPy and PsychoJS, %i CPUs"
+          % (nExps, os.cpu_count() or 1))
+    printTable(["compile", "total (ms)", "compiled", "cached"], [
+        ["one at a time", "%.0f" % (eachTime * 1e3), nExps, 0],
+        ["batch", "%.0f" % (batchTime * 1e3),
+         sum(not r['cached'] for r in results),
+         sum(r['cached'] for r in results)],
+        ["batch unchanged", "%.0f" % (cachedTime * 1e3),
+         sum(not r['cached'] for r in cached),
+         sum(r['cached'] for r in cached)]])
+    print()
+    psyexpCompile.printCompileReport(results)
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,90 @@
+"""Time the gap between a response and the next trial's intensity for the
+Bayesian staircases, updating when the response is given (as they used to)
+compared to speculatively updating for both responses while the trial runs.
+
+The Psi grid is what's needed for a threshold to 0.05 and a slope to 0.05 over
+100 intensities, and the QUEST+ grid has 41 thresholds, 10 slopes and 5 lapse
+rates. Each trial lasts `trialDur` seconds (default 0.5) between choosing the
+intensity and the response.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_staircaseSpeculation [trialDur]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from psychopy import data
+from psychopy.tests.benchmarks import printTable
+
+N_TRIALS = 8
+
+
+def makePsi(**kwargs):
+    return data.PsiHandler(nTrials=N_TRIALS, intensRange=[0.1, 10],
+                           alphaRange=[0.1, 10], betaRange=[0.1, 3],
+                           intensPrecision=0.1, alphaPrecision=0.05,
+                           betaPrecision=0.05, delta=0.01, **kwargs)
+
+
+def makeQuest(**kwargs):
+    return data.QuestHandler(0.5, 0.3, nTrials=N_TRIALS, grain=0.001,
+                             range=4, **kwargs)
+
+
+def makeQuestPlus(**kwargs):
+    return data.QuestPlusHandler(
+        nTrials=N_TRIALS, intensityVals=np.arange(-40, 1),
+        thresholdVals=np.arange(-40, 1), slopeVals=np.linspace(1, 10, 10),
+        lowerAsymptoteVals=0.5, lapseRateVals=np.linspace(0, 0.04, 5),
+        responseVals=[1, 0], stimScale='dB', **kwargs)
+
+
+def runTrials(stairs, responses, trialDur):
+    """Run the trials, returning the intensities and the median time from a
+    response to the next intensity."""
+    intensities = []
+    gaps = []
+    intensities.append(next(stairs))
+    for response in responses:
+        time.sleep(trialDur)  # the trial
+        t0 = time.perf_counter()
+        stairs.addResponse(response)
+        try:
+            intensities.append(next(stairs))
+        except StopIteration:
+            break
+        gaps.append(time.perf_counter() - t0)
+
+    return intensities, float(np.median(gaps))
+
+
+def run(trialDur=0.5):
+    rng = np.random.default_rng(0)
+    responses = [int(r) for r in rng.integers(0, 2, N_TRIALS)]
+    results = []
+    for label, make, gridSize in [
+            ("Psi", makePsi, lambda s: s._psi._probLambdaGivenXResponse.nbytes),
+            ("Psi float32", lambda **kw: makePsi(dtype='float32', **kw),
+             lambda s: s._psi._probLambdaGivenXResponse.nbytes),
+            ("QUEST", makeQuest, lambda s: s._quest.pdf.nbytes),
+            ("QUEST+", makeQuestPlus, lambda s: s._qp.likelihoods.nbytes)]:
+        stairs = make()
+        expected, syncGap = runTrials(stairs, responses, trialDur)
+        got, specGap = runTrials(make(speculative=True), responses, trialDur)
+        results.append([
+            label, "%.1f" % (gridSize(stairs) / 2 ** 20),
+            "%.2f" % (syncGap * 1e3), "%.2f" % (specGap * 1e3),
+            got == expected])
+
+    print("Median time from response to next intensity, %.2f s trials"
+          % trialDur)
+    printTable(["staircase", "grid (MB)", "on response (ms)",
+                "speculative (ms)", "same"], results)
+
+
+if __name__ == "__main__":
+    run(*[float(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,78 @@
+"""Time starting a long trial sequence with
+:class:`~psychopy.data.TrialHandler2`, and the memory it takes, making every
+upcoming trial up front (as it used to) compared to lazy mode, which keeps an
+array of condition indices and only makes the trials which are reached or
+looked ahead to.
+
+The conditions are 1000 rows of five columns, repeated `nReps` times (default
+100) for 100000 trials. The look ahead is the next 3 trials on each of the
+first 1000 trials, as when prefetching their images.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_trialHandler2 [nReps]
+"""
+
+import sys
+import tracemalloc
+
+from psychopy import data
+from psychopy.tests.benchmarks import timeCall, printTable
+
+N_CONDS = 1000
+N_TRIALS_RUN = 1000
+
+
+def makeConditions():
+    return [
+        {'word': 'red', 'color': 'green', 'congruent': i % 2,
+         'duration': 0.5 + (i % 3) * 0.25, 'corrAns': 'left'}
+        for i in range(N_CONDS)]
+
+
+def startTrials(conditions, nReps, lazy):
+    """Make a handler and move on to its first trial."""
+    trials = data.TrialHandler2(conditions, nReps=nReps, seed=1,
+                                autoLog=False, lazy=lazy)
+    trials.__next__()
+    return trials
+
+
+def runTrials(trials):
+    """Run trials, looking ahead to the next few on each, returning the
+    conditions index of each."""
+    indices = []
+    for i in range(N_TRIALS_RUN):
+        trials.getFutureTrials(3)
+        trials.addData('resp', i)
+        indices.append(trials.thisIndex)
+        trials.__next__()
+    return indices
+
+
+def run(nReps=100):
+    conditions = makeConditions()
+    results = []
+    sequences = []
+    for label, lazy in [("up front", False), ("lazy", True)]:
+        startTime, _ = timeCall(startTrials, conditions, nReps, lazy,
+                                repeats=3)
+        tracemalloc.start()
+        trials = startTrials(conditions, nReps, lazy)
+        nBytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        runTime, indices = timeCall(runTrials, trials)
+        sequences.append(indices)
+        results.append([
+            label, "%.1f" % (startTime * 1e3), "%.1f" % (nBytes / 2 ** 20),
+            "%.1f" % (runTime * 1e3)])
+
+    print("Starting %i trials (%i conditions x %i repeats), then running %i"
+          % (N_CONDS * nReps, N_CONDS, nReps, N_TRIALS_RUN))
+    printTable(["trials made", "start (ms)", "memory (MB)", "run (ms)"],
+               results)
+    print("Same trials: %s" % (sequences[0] == sequences[1]))
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
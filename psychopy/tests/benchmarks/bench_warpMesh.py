@@ -0,0 +1,79 @@
+"""Time making the meshes of a :class:`~psychopy.visual.windowwarp.Warper`,
+looping over the grid (as it used to) compared to the vectorised functions,
+and loading them from the mesh cache.
+
+Uses the default spherical grid (300x300) and a warpfile of the same size, as
+made for a dome projector. No window is needed, as only the arrays are made.
+
+Usage::
+
+    python -m psychopy.tests.benchmarks.bench_warpMesh [gridSize]
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from psychopy.tests.benchmarks import timeCall, printTable
+from psychopy.tests.test_visual.test_windowwarp import (
+    _quadsLoop, _sphericalTexCoords, _Warper, makeWarpfile)
+from psychopy.visual import windowwarp
+
+REPEATS = 3
+
+
+def loopSpherical(gridSize):
+    xy = np.dstack(np.meshgrid(np.linspace(-1, 1, gridSize),
+                               np.linspace(-1, 1, gridSize)))
+    uv = _sphericalTexCoords(gridSize, (0.5, 0.5), 40.0, 30.0, 57.0, False)
+    return _quadsLoop(xy), _quadsLoop(uv)
+
+
+def loopWarpfile(fileName):
+    # read twice, as it used to be
+    with open(fileName) as f:
+        cols, rows = map(int, f.readlines()[1].split())
+    data = np.loadtxt(fileName, skiprows=2)
+    return _quadsLoop(data.reshape((rows, cols, 5)))
+
+
+def run(gridSize=300):
+    results = []
+    with tempfile.TemporaryDirectory() as tmpDir:
+        fileName = os.path.join(tmpDir, 'dome.data')
+        makeWarpfile(fileName, gridSize, gridSize)
+        cacheDir = os.path.join(tmpDir, 'cache')
+
+        def cachedWarp(warp, warpfile=None):
+            warper = _Warper(meshCache=cacheDir)  # a new session
+            warper.warpGridsize = gridSize
+            warper.changeProjection(warp, warpfile)
+            return warper.buffers
+
+        for label, loop, vectorised in [
+                ("spherical", lambda: loopSpherical(gridSize),
+                 lambda: windowwarp.makeSphericalMesh(
+                     gridSize, gridSize, (0.5, 0.5), 40.0, 30.0, 57.0)),
+                ("warpfile", lambda: loopWarpfile(fileName),
+                 lambda: windowwarp.makeWarpfileMesh(
+                     *windowwarp.readWarpfile(fileName)[3:0:-1]))]:
+            loopTime, expected = timeCall(loop, repeats=REPEATS)
+            vecTime, got = timeCall(vectorised, repeats=REPEATS)
+            cachedWarp(label, fileName)  # fill the cache
+            cacheTime, cached = timeCall(cachedWarp, label, fileName,
+                                         repeats=REPEATS)
+            results.append([
+                label, "%.1f" % (loopTime * 1e3), "%.1f" % (vecTime * 1e3),
+                "%.1f" % (cacheTime * 1e3),
+                all(np.array_equal(a, b) for a, b in zip(got, cached))])
+
+    print("Making warp meshes for a %ix%i grid, best of %i"
+          % (gridSize, gridSize, REPEATS))
+    printTable(["warp", "loop (ms)", "vectorised (ms)", "cached (ms)",
+                "same"], results)
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
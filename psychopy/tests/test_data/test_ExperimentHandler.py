@@ -6,7 +6,7 @@ import os, glob, shutil
 import io
 from tempfile import mkdtemp
 
-from psychopy.tools.filetools import openOutputFile
+from psychopy.tools.filetools import openOutputFile, fromFile
 
 logging.console.setLevel(logging.DEBUG)
 
@@ -165,6 +165,121 @@ class TestExperimentHandler():
                 # If failed, remove and store character which failed
                 raise UnicodeEncodeError(*err.args[:4], "character failing to save to csv")
 
+    def test_columnar_matches_dict_entries(self):
+        # a columnar ExperimentHandler should give the same output as a dict-based one
+        exps = {}
+        for columnar in (False, True):
+            exp = data.ExperimentHandler(
+                name='testExp',
+                extraInfo={'participant': 'jwp', 'ori': 45},
+                savePickle=False,
+                saveWideText=False,
+                dataFileName=self.tmpDir + 'columnar%s' % columnar,
+                columnarEntries=columnar
+            )
+            trials = data.TrialHandler(
+                trialList=[{'word': 'red, green', 'size': 1}, {'word': 'blue', 'size': 2.5}],
+                nReps=3, method='sequential'
+            )
+            exp.addLoop(trials)
+            for n, trial in enumerate(trials):
+                exp.addData('resp.rt', n * 0.1)
+                exp.addData('resp.corr', n % 2 == 0)
+                exp.addData('resp.keys', ['left', 'right'][n % 2])
+                if n == 3:
+                    # type changes partway through a column
+                    exp.addData('resp.rt', None)
+                    exp.addData('late', 'a\nb')
+                exp.nextEntry()
+            # add data to a previous row
+            exp.addData('resp.rt', 'changed', row=1)
+            # leave an orphan entry
+            exp.addData('orphan', [1, 2])
+            exps[columnar] = exp
+
+        dictExp, colExp = exps[False], exps[True]
+        assert [dict(e) for e in colExp.getAllEntries()] == dictExp.getAllEntries()
+        assert colExp.entries == dictExp.entries
+        assert colExp.entries[1]['resp.rt'] == 'changed'
+        assert 'late' not in colExp.entries[0]
+        # wide text output should be identical
+        for sortColumns in (False, True, "priority"):
+            contents = []
+            for exp in (dictExp, colExp):
+                fileName = exp.saveAsWideText(
+                    exp.dataFileName + '.csv', fileCollisionMethod='overwrite',
+                    sortColumns=sortColumns
+                )
+                with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+                    contents.append(f.read())
+            assert contents[0] == contents[1]
+        # as should JSON output
+        assert dictExp.getJSON() == colExp.getJSON()
+        # pickled data should contain every entry, including the orphan
+        fileName = colExp.saveAsPickle(colExp.dataFileName, fileCollisionMethod='overwrite')
+        loaded = fromFile(fileName)
+        assert len(loaded.entries) == len(colExp.entries) + 1
+        assert loaded.entries[-1]['orphan'] == [1, 2]
+
+    def test_stream_wide_text(self):
+        # streamed data file should end up the same as one saved at the end
+        for sortColumns in (False, True):
+            contents = []
+            for stream in (False, True):
+                exp = data.ExperimentHandler(
+                    name='testExp',
+                    extraInfo={'participant': 'jwp'},
+                    savePickle=False,
+                    saveWideText=True,
+                    sortColumns=sortColumns,
+                    dataFileName=self.tmpDir + 'stream%s%s' % (sortColumns, stream),
+                    streamWideText=stream
+                )
+                for n in range(5):
+                    exp.addData('resp.rt', n * 0.1)
+                    exp.addData('resp.keys', 'a, b')
+                    if n >= 2:
+                        # column which only appears part way through
+                        exp.addData('late', n)
+                    exp.nextEntry()
+                if stream:
+                    # rows should already be on disk, with late columns in the sidecar
+                    exp._streamer.flush()
+                    with io.open(exp._streamer.fileName, 'r', encoding='utf-8-sig') as f:
+                        assert len(f.readlines()) == 6
+                    assert os.path.isfile(exp._streamer.sidecarFileName)
+                # leave an unfinished entry
+                exp.addData('orphan', 1)
+                fileName = exp.saveAsWideText(exp.dataFileName + '.csv')
+                exp.close()
+                with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+                    contents.append(f.read())
+                assert not os.path.isfile(fileName + '.columns')
+            assert contents[0] == contents[1]
+
+    def test_stream_wide_text_edited_row(self, tmp_path):
+        # editing a row after it's been streamed should still reach the file
+        contents = []
+        for stream in (False, True):
+            exp = data.ExperimentHandler(
+                savePickle=False,
+                dataFileName=str(tmp_path / ('edited%s' % stream)),
+                streamWideText=stream
+            )
+            for n in (1, 2):
+                exp.addData('a', n)
+                exp.nextEntry()
+            if stream:
+                # make sure both rows are on disk before editing
+                exp._streamer.flush()
+            exp.addData('a', 99, row=0)
+            fileName = exp.saveAsWideText(exp.dataFileName + '.csv')
+            exp.close()
+            with io.open(fileName, 'r', encoding='utf-8-sig') as f:
+                contents.append(f.read())
+        assert contents[0] == contents[1]
+        assert contents[1].splitlines()[1].split(',')[2] == '99'
+
 
 if __name__ == '__main__':
     import pytest
@@ -1226,6 +1226,91 @@ def test_QuesPlusHandler_unknown_stimSelectionOptions():
                              stimSelectionMethod=stim_selection_method,
                              stimSelectionOptions=stim_selection_options)
 
+def _runStaircase(stairs, responses):
+    """Run a staircase with the given responses, returning its intensities."""
+    intensities = []
+    for intensity, response in zip(stairs, responses):
+        intensities.append(intensity)
+        stairs.addResponse(response)
+    return intensities
+
+
+def _makePsiHandler(**kwargs):
+    return data.PsiHandler(nTrials=15, intensRange=[0.1, 10],
+                           alphaRange=[0.1, 10], betaRange=[0.1, 3],
+                           intensPrecision=0.1, alphaPrecision=0.1,
+                           betaPrecision=0.1, delta=0.01, **kwargs)
+
+
+def test_PsiHandler_speculative():
+    responses = makeBasicResponseCycles(cycles=4, nCorrect=3, nIncorrect=1,
+                                        length=15)
+    expected = _runStaircase(_makePsiHandler(), responses)
+
+    p = _makePsiHandler(speculative=True)
+    assert _runStaircase(p, responses) == expected
+    assert p._speculation is None  # used up by the last response
+
+    # a speculative update still running isn't saved
+    p = _makePsiHandler(speculative=True)
+    next(p)
+    assert p._speculation is not None
+    p.origin = ''
+    loaded = json_tricks.loads(p.saveAsJson())
+    assert loaded._speculation is None
+    p.addResponse(1)
+    loaded.addResponse(1)
+    assert p._psi.nextIntensity == loaded._psi.nextIntensity
+
+
+def test_PsiHandler_float32():
+    responses = makeBasicResponseCycles(cycles=4, nCorrect=3, nIncorrect=1,
+                                        length=15)
+    p = _makePsiHandler(dtype='float32')
+    intensities = _runStaircase(p, responses)
+    assert p._psi._probLambdaGivenXResponse.dtype == np.float32
+    expected = _makePsiHandler()
+    assert np.allclose(intensities, _runStaircase(expected, responses),
+                       atol=0.11)  # at most a step apart
+    assert np.allclose(p.estimateLambda(), expected.estimateLambda(),
+                       atol=0.05)  # within half a step of the grid
+
+
+def test_QuestHandler_speculative():
+    responses = makeBasicResponseCycles(cycles=3, nCorrect=2, nIncorrect=2,
+                                        length=10)
+    kwargs = dict(pThreshold=0.82, nTrials=10, minVal=0, maxVal=100)
+    expected = data.QuestHandler(50, 50, **kwargs)
+    q = data.QuestHandler(50, 50, speculative=True, **kwargs)
+    assert _runStaircase(q, responses) == _runStaircase(expected, responses)
+    assert q._quest.intensity == expected._quest.intensity
+    assert np.allclose(q.mean(), expected.mean())
+
+    # giving another intensity doesn't use the speculative update
+    q = data.QuestHandler(50, 50, speculative=True, **kwargs)
+    next(q)
+    q.addResponse(1, intensity=40)
+    assert q._quest.intensity == [40]
+
+
+def test_QuestPlusHandler_speculative():
+    thresholds = np.arange(-40, 0 + 1)
+    responses = ['Correct', 'Correct', 'Incorrect', 'Correct', 'Incorrect',
+                 'Incorrect', 'Correct', 'Correct', 'Correct', 'Correct']
+
+    def makeHandler(**kwargs):
+        return data.QuestPlusHandler(
+            nTrials=len(responses), intensityVals=thresholds.copy(),
+            thresholdVals=thresholds, slopeVals=3.5, lowerAsymptoteVals=0.5,
+            lapseRateVals=0.02, responseVals=['Correct', 'Incorrect'],
+            stimScale='dB', **kwargs)
+
+    expected = makeHandler()
+    q = makeHandler(speculative=True)
+    assert _runStaircase(q, responses) == _runStaircase(expected, responses)
+    assert q.paramEstimate == expected.paramEstimate
+    assert q._qp.resp_history == expected._qp.resp_history
+
 
 if __name__ == '__main__':
     test_QuestPlusHandler()
@@ -1239,3 +1324,4 @@ if __name__ == '__main__':
     test_QuesPlusHandler_prior()
     test_QuesPlusHandler_invalid_prior_params()
     test_QuesPlusHandler_unknown_stimSelectionOptions()
+
@@ -421,6 +421,104 @@ class TestTrialHandler2:
         t.skipTrials(n=100)
         assert t.finished
 
+    @pytest.mark.parametrize("method", ["random", "sequential", "fullRandom"])
+    def test_lazy_same_trials(self, method):
+        """
+        Check that a lazy TrialHandler2 gives the same trials as one which makes them all up front,
+        including when skipping, rewinding and aborting trials.
+        """
+        handlers = [
+            data.TrialHandler2(
+                self.conditions, nReps=4, method=method, seed=self.random_seed, autoLog=False,
+                lazy=lazy
+            )
+            for lazy in (False, True)
+        ]
+        moves = ["next", "next", "skip", "next", "abort", "next", "next", "rewind", "next",
+                 "next", "finished", "unfinished", "next", "skip", "next"]
+        for move in moves:
+            for t in handlers:
+                if move == "next":
+                    t.__next__()
+                    t.addData('resp', t.thisN)
+                elif move == "skip":
+                    t.skipTrials(2)
+                elif move == "rewind":
+                    t.rewindTrials(3)
+                elif move == "abort":
+                    t.abortCurrentTrial()
+                else:
+                    t.finished = move == "finished"
+            eager, lazy = handlers
+            for attr in ("thisN", "thisIndex", "thisRepN", "thisTrialN"):
+                assert getattr(lazy, attr) == getattr(eager, attr)
+            assert lazy.getFutureTrials() == eager.getFutureTrials()
+            assert [trial and trial.getDict() for trial in lazy.getFutureTrials(3)] == [
+                trial and trial.getDict() for trial in eager.getFutureTrials(3)
+            ]
+        # run the rest of the trials and check the data match
+        for t in handlers:
+            for trial in t:
+                t.addData('resp', t.thisN)
+        assert lazy.data.equals(eager.data)
+
+    def test_lazy_look_ahead(self):
+        """
+        Check that a lazy TrialHandler2 only makes the trials which are asked for, and that a
+        trial looked ahead to is the one which is then run.
+        """
+        conditions = [dict(foo=i) for i in range(1000)]
+        t = data.TrialHandler2(conditions, nReps=100, seed=self.random_seed, lazy=True)
+        t.__next__()
+        assert len(t.upcomingTrials) == t.nTotal - 1
+        assert not t.upcomingTrials._made
+        # look ahead a few trials
+        future = t.getFutureTrials(3)
+        assert [trial.thisN for trial in future] == [1, 2, 3]
+        assert len(t.upcomingTrials._made) == 3
+        future[1]['bar'] = "baz"
+        # the trials looked ahead to are the ones which are run
+        t.__next__()
+        t.__next__()
+        assert t.thisTrial is future[1]
+        assert t.thisTrial['bar'] == "baz"
+        assert len(t.upcomingTrials._made) == 1
+        # skip to the last repeat and come back
+        t.skipTrials(99000)
+        assert t.thisRepN == 99
+        t.rewindTrials(2)
+        assert t.thisN == 98999
+        assert t.getFutureTrial(2).thisN == 99001
+
+    def test_lazy_iter(self):
+        """
+        Check that changes made to lazy upcoming trials while iterating over them are kept, as
+        they would be in a list.
+        """
+        conditions = [dict(foo=i) for i in range(10)]
+        t = data.TrialHandler2(conditions, nReps=2, seed=self.random_seed, lazy=True)
+        t.__next__()
+        for trial in t.upcomingTrials:
+            trial['bar'] = trial.thisN
+        assert [trial['bar'] for trial in t.upcomingTrials] == list(range(1, 20))
+        t.__next__()
+        assert t.thisTrial['bar'] == 1
+
+    def test_lazy_json_dump(self):
+        t = data.TrialHandler2(self.conditions, nReps=5, lazy=True)
+        t.addData('foo', 'bar')
+        t.__next__()
+        dump = t.saveAsJson()
+
+        t.origin = ''
+
+        t_loaded = json_tricks.loads(dump)
+        t_loaded._rng = np.random.default_rng()
+        t_loaded._rng.bit_generator.state = t_loaded._rng_state
+        del t_loaded._rng_state
+
+        assert t == t_loaded
+
 
 class TestTrialHandler2Output():
     def setup_class(self):
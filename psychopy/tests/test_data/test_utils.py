@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import pickle
 import pytest
 import numpy as np
 
@@ -165,5 +166,96 @@ def test_listFromString():
     # this would create a syntax error in ast.literal_eval
     assert ["Don't", "Do"] == utils.listFromString("Don't, Do")
 
+
+def test_importConditions_csvFormats(tmp_path):
+    # decimal commas, separated by semicolons
+    fileName = tmp_path / 'eu.csv'
+    fileName.write_text("text;val;pos\nred;1,5;[0, 1]\ngreen;2,5;\n")
+    conds = utils.importConditions(str(fileName))
+    assert conds == [{'text': 'red', 'val': 1.5, 'pos': [0, 1]},
+                     {'text': 'green', 'val': 2.5, 'pos': None}]
+    # tabs, with blank lines before the heading
+    fileName = tmp_path / 'tabs.tsv'
+    fileName.write_text("\n\ntext\tval\nred\t1,5\nline\\nbreak\t\n")
+    conds = utils.importConditions(str(fileName))
+    assert conds == [{'text': 'red', 'val': 1.5},
+                     {'text': 'line\nbreak', 'val': None}]
+    # a row which doesn't match the heading
+    fileName = tmp_path / 'ragged.csv'
+    fileName.write_text("a,b\n1,2,3\n4,5\n")
+    assert len(utils.importConditions(str(fileName))) == 2
+
+
+def test_importConditions_mixedTypes(tmp_path):
+    # values which compare equal but are of different types are kept apart
+    column = np.array([True, 1, 1.0, 'a', None, 1.0, True], dtype=object)
+    values = utils._columnToConditions(column)
+    assert values == [True, 1, 1.0, 'a', None, 1.0, True]
+    assert [type(val) for val in values] == [
+        bool, int, float, str, type(None), float, bool]
+
+    pytest.importorskip('openpyxl')
+    import pandas as pd
+    fileName = str(tmp_path / 'mixed.xlsx')
+    pd.DataFrame({'val': [True, 1, 1.5, 'a', True]}).to_excel(
+        fileName, index=False)
+    conds = utils.importConditions(fileName)
+    assert [type(cond['val']) for cond in conds] == [
+        bool, int, float, str, bool]
+
+
+def test_conditionsCache(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, 'conditionsCache', utils.ConditionsCache())
+    fileName = str(tmp_path / 'conds.csv')
+    with open(fileName, 'w') as f:
+        f.write("text,pos\n" + 'red,"[0, 1]"\n' * 5)
+
+    conds = utils.importConditions(fileName)
+    assert utils.conditionsCache.isCached(fileName)
+    # changing the conditions returned doesn't change the cache
+    conds[0]['text'] = 'blue'
+    conds[0]['pos'].append(2)
+    # each condition has its own list
+    assert conds[1]['pos'] == [0, 1]
+    again, fieldNames = utils.importConditions(fileName, returnFieldNames=True)
+    assert again[0] == {'text': 'red', 'pos': [0, 1]}
+    assert fieldNames == ['text', 'pos']
+    # selections are made from the cached conditions
+    assert len(utils.importConditions(fileName, selection="1:3")) == 2
+
+    # changed files are imported again
+    with open(fileName, 'a') as f:
+        f.write('green,"[1, 0]"\n')
+    assert len(utils.importConditions(fileName)) == 6
+
+    # least recently used are removed when over the budget
+    otherName = str(tmp_path / 'other.csv')
+    with open(otherName, 'w') as f:
+        f.write("text\n" + "red\n" * 5)
+    utils.importConditions(otherName)
+    utils.setConditionsCacheSize(utils.conditionsCache.nBytes - 1)
+    assert not utils.conditionsCache.isCached(fileName)
+    assert utils.conditionsCache.isCached(otherName)
+    utils.setConditionsCacheSize(0)
+    assert utils.conditionsCache.nBytes == 0
+    utils.importConditions(otherName)
+    assert not utils.conditionsCache.isCached(otherName)
+
+
+def test_conditionsCache_copies(tmp_path, monkeypatch):
+    # values which can be changed in place, such as arrays, are never shared
+    monkeypatch.setattr(utils, 'conditionsCache', utils.ConditionsCache())
+    fileName = str(tmp_path / 'conds.pkl')
+    with open(fileName, 'wb') as f:
+        pickle.dump([['pos'], [np.array([0, 1])], [np.array([1, 0])]], f)
+
+    conds = utils.importConditions(fileName)
+    conds[0]['pos'][0] = 5
+    again = utils.importConditions(fileName)
+    assert again[0]['pos'].tolist() == [0, 1]
+    again[1]['pos'][0] = 5
+    assert utils.importConditions(fileName)[1]['pos'].tolist() == [1, 0]
+
+
 if __name__ == '__main__':
     pytest.main()
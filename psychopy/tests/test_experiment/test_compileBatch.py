@@ -0,0 +1,92 @@
+"""Tests for compiling batches of experiments with the compile cache
+"""
+import shutil
+from pathlib import Path
+
+import pytest
+
+from psychopy.scripts import psyexpCompile
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+
+@pytest.fixture
+def experiments(tmp_path):
+    """Copies of an experiment which uses a conditions file."""
+    src = Path(TESTS_DATA_PATH)
+    shutil.copy(src / 'ghost_trialTypes.xlsx', tmp_path)
+    infiles = []
+    for i in range(2):
+        infile = tmp_path / 'ghost{}.psyexp'.format(i)
+        shutil.copy(src / 'ghost_stroop.psyexp', infile)
+        infiles.append(str(infile))
+    return infiles
+
+
+def test_compileKey(experiments, tmp_path):
+    infile = experiments[0]
+    condsFile = str(tmp_path / 'ghost_trialTypes.xlsx')
+    assert psyexpCompile.findConditionsFiles(infile) == [condsFile]
+
+    key = psyexpCompile.getCompileKey(infile, 'ghost0.py', 'PsychoPy')
+    assert psyexpCompile.getCompileKey(infile, 'ghost0.py', 'PsychoPy') == key
+    assert psyexpCompile.getCompileKey(infile, 'ghost0.js', 'PsychoJS') != key
+    assert psyexpCompile.getCompileKey(infile, 'other.py', 'PsychoPy') != key
+    # changing the conditions changes the key
+    with open(condsFile, 'ab') as f:
+        f.write(b'\0')
+    assert psyexpCompile.getCompileKey(infile, 'ghost0.py', 'PsychoPy') != key
+
+
+def test_compileBatch(experiments, tmp_path):
+    cacheDir = tmp_path / 'cache'
+    kwargs = dict(targets=['PsychoPy', 'PsychoJS'], cache=cacheDir,
+                  nWorkers=1)
+
+    results = psyexpCompile.compileBatch(experiments, **kwargs)
+    assert [r['error'] for r in results] == [None, None]
+    assert not any(r['cached'] for r in results)
+    scripts = {}
+    for infile in experiments:
+        for ext in ['.py', '.js', '-legacy-browsers.js']:
+            outfile = Path(infile.replace('.psyexp', ext))
+            scripts[outfile] = outfile.read_text(encoding='utf-8-sig')
+    assert len(list(cacheDir.iterdir())) == 4
+
+    # unchanged, so the same scripts come from the cache
+    for outfile in scripts:
+        outfile.unlink()
+    results = psyexpCompile.compileBatch(experiments, **kwargs)
+    assert all(r['cached'] for r in results)
+    assert results[0]['times']['load'] == 0.0
+    for outfile, text in scripts.items():
+        assert outfile.read_text(encoding='utf-8-sig') == text
+
+    # changed conditions mean compiling again
+    with open(tmp_path / 'ghost_trialTypes.xlsx', 'ab') as f:
+        f.write(b'\0')
+    results = psyexpCompile.compileBatch(experiments[:1], **kwargs)
+    assert not results[0]['cached']
+    assert results[0]['times']['load'] > 0.0
+
+
+def test_compileBatchErrors(experiments, tmp_path):
+    bad = tmp_path / 'bad.psyexp'
+    bad.write_text('<PsychoPy2experiment')
+    results = psyexpCompile.compileBatch(
+        [experiments[0], str(bad), str(tmp_path / 'missing.psyexp')],
+        cache=tmp_path / 'cache', nWorkers=1)
+    assert results[0]['error'] is None
+    assert results[1]['error'] is not None
+    assert results[2]['error'] is not None
+    with pytest.raises(ValueError):
+        psyexpCompile.compileBatch(experiments, targets=['Python'])
+
+
+def test_compileBatchPool(experiments, tmp_path):
+    outdir = tmp_path / 'scripts'
+    outdir.mkdir()
+    results = psyexpCompile.compileBatch(
+        experiments, outdir=outdir, cache=False, nWorkers=2)
+    assert [r['error'] for r in results] == [None, None]
+    assert sorted(p.name for p in outdir.iterdir()) == [
+        'ghost0.py', 'ghost1.py']
@@ -48,4 +48,20 @@ class TestStaticComponent(BaseComponentTests):
             for phrase in case['avoid']:
                 assert not _find_global_resource_in_js_experiment(script, phrase), (
                     f"'{phrase}' was found in resources for {case['exp']}.psyexp"
-                )
\ No newline at end of file
+                )
+
+    def test_prefetch_images(self):
+        """
+        Check that a static period in a loop decodes images for the next trial
+        """
+        exp = experiment.Experiment()
+        # static period within a loop
+        exp.loadFromXML(Path(TESTS_DATA_PATH) / "test_get_resources" / "handledbystatic_strloop.psyexp")
+        script = exp.writeScript(target="PsychoPy")
+        loops = [entry for entry in exp.flow if entry.getType() == 'LoopInitiator']
+        assert f"visual.imagePrefetcher.prefetchTrials({loops[0].loop.params['name']})" in script
+        # static period outside of any loop
+        exp = experiment.Experiment()
+        exp.loadFromXML(Path(TESTS_DATA_PATH) / "test_get_resources" / "handledbystatic_noloop.psyexp")
+        script = exp.writeScript(target="PsychoPy")
+        assert "imagePrefetcher" not in script
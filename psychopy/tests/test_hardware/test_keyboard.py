@@ -239,3 +239,92 @@ class TestEventKeyboard(_TestBaseKeyboard, _MillikeyMixin):
 
     def teardown_method(self):
         self.kb.getKeys(clear=True)
+
+
+class _Resp:
+    """Stands in for a KeyPress, so the buffer can be tested without a
+    keyboard backend."""
+
+    def __init__(self, value, duration=None):
+        self.value = value
+        self.duration = duration
+
+    def __eq__(self, other):
+        return self.value == other
+
+
+def _getKeysLinear(responses, keyList=None, ignoreKeys=None, waitRelease=True,
+                   clear=True):
+    """The original linear scan of a list of responses by `getKeys`, to check
+    the indexed buffer against."""
+    keys = []
+    toClear = []
+    for i, resp in enumerate(responses):
+        wasRelease = resp.duration is not None
+        wanted = wasRelease if waitRelease else not wasRelease
+        if keyList and resp.value not in keyList:
+            wanted = False
+        if ignoreKeys and resp.value in ignoreKeys:
+            wanted = False
+        if wanted and not any(k is resp for k in keys):
+            keys.append(resp)
+        if wanted and clear:
+            toClear.append(i)
+    for i in sorted(toClear, reverse=True):
+        responses.pop(i)
+    return keys
+
+
+class TestKeyResponseBuffer:
+
+    def testPressAndRelease(self):
+        buffer = keyboard.KeyResponseBuffer()
+        a, b, a2 = _Resp("a"), _Resp("b"), _Resp("a")
+        buffer += [a, b, a2]
+        assert len(buffer) == 3
+        assert buffer.getResponses(released=True) == []
+        assert buffer.getResponses(released=False, keyList=["a"]) == [a, a2]
+        # released and received again, so moved but not duplicated
+        a.duration = 0.1
+        buffer.append(a)
+        assert list(buffer) == [a, b, a2]
+        assert buffer.getResponses(released=False) == [b, a2]
+        # released without being received again
+        b.duration = 0.2
+        keys = buffer.getResponses(released=True, ignoreKeys=["c"], clear=True)
+        assert [k is r for k, r in zip(keys, [a, b])] == [True, True]
+        assert list(buffer) == [a2]
+        buffer.clear()
+        assert len(buffer) == 0 and buffer.getResponses(released=False) == []
+
+    def testSameAsLinear(self):
+        import random
+        rng = random.Random(1)
+        names = ["a", "b", "space", "left", "right", "return"]
+        buffer = keyboard.KeyResponseBuffer()
+        reference = []
+        pressed = []
+        for n in range(2000):
+            action = rng.random()
+            if action < 0.4:
+                resp = _Resp(rng.choice(names))
+                pressed.append(resp)
+                buffer.append(resp)
+                reference.append(resp)
+            elif action < 0.7 and pressed:
+                resp = pressed.pop(rng.randrange(len(pressed)))
+                resp.duration = rng.random()
+                buffer.append(resp)
+                reference.append(resp)
+            else:
+                kwargs = dict(
+                    keyList=rng.choice([None, [], ["a"], ["left", "right"]]),
+                    ignoreKeys=rng.choice([None, ["space"]]),
+                    waitRelease=rng.random() < 0.5,
+                    clear=rng.random() < 0.3)
+                expected = _getKeysLinear(reference, **kwargs)
+                got = buffer.getResponses(
+                    keyList=kwargs['keyList'],
+                    ignoreKeys=kwargs['ignoreKeys'],
+                    released=kwargs['waitRelease'], clear=kwargs['clear'])
+                assert [id(r) for r in got] == [id(r) for r in expected]
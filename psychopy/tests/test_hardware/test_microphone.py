@@ -0,0 +1,83 @@
+import numpy as np
+
+from psychopy.hardware.microphone import RecordingRingBuffer
+from psychopy.sound.audioclip import AudioClip
+
+
+class TestRecordingRingBuffer:
+    """
+    Tests for the buffer which `MicrophoneDevice` stores its recordings in.
+    """
+    def setup_method(self):
+        self.rng = np.random.default_rng(0)
+
+    def _writeChunks(self, buffer, nChunks=100, maxChunk=900):
+        """Write chunks of random sizes to a buffer, as if polled from a
+        stream, returning all samples written."""
+        written = []
+        for n in range(nChunks):
+            chunk = self.rng.uniform(
+                -1, 1, (self.rng.integers(0, maxChunk), buffer._channels)
+            ).astype(np.float32)
+            buffer.write(chunk)
+            written.append(chunk)
+
+        return np.concatenate(written)
+
+    def testGrowsToFitRecording(self):
+        """
+        Test that an unbounded buffer keeps every sample, in order.
+        """
+        buffer = RecordingRingBuffer(
+            sampleRateHz=48000, channels=2, initialSecs=0.01)
+        written = self._writeChunks(buffer)
+        assert buffer.nSamples == len(written)
+        assert not buffer.isFull
+        np.testing.assert_array_equal(buffer.getSegment().samples, written)
+        # segments are views of the buffer rather than copies
+        segment = buffer.getSegment(0.1, 0.2)
+        np.testing.assert_array_equal(segment.samples, written[4800:9600])
+        assert np.shares_memory(segment.samples, buffer.samples)
+
+    def testRollingKeepsLatest(self):
+        """
+        Test that a rolling buffer keeps only the most recent samples, and that
+        segments taken earlier aren't overwritten.
+        """
+        buffer = RecordingRingBuffer(
+            sampleRateHz=48000, channels=1, maxRecordingSize=16,
+            policyWhenFull='roll')
+        written = self._writeChunks(buffer, nChunks=20)
+        kept = buffer.getSegment()
+        expected = written[-buffer.maxSamples:]
+        np.testing.assert_array_equal(kept.samples, expected)
+        assert buffer.samplesDropped == len(written) - buffer.maxSamples
+        # write enough to cycle through the whole ring again
+        self._writeChunks(buffer, nChunks=20)
+        np.testing.assert_array_equal(kept.samples, expected)
+
+    def testFullBufferDropsSamples(self):
+        """
+        Test that a bounded buffer which isn't rolling stops recording when
+        full.
+        """
+        buffer = RecordingRingBuffer(
+            sampleRateHz=48000, channels=2, maxRecordingSize=16,
+            policyWhenFull='ignore')
+        written = self._writeChunks(buffer, nChunks=20)
+        assert buffer.isFull
+        np.testing.assert_array_equal(
+            buffer.getSegment().samples, written[:buffer.maxSamples])
+
+    def testRMS(self):
+        """
+        Test that the RMS from running sums matches computing it directly.
+        """
+        buffer = RecordingRingBuffer(
+            sampleRateHz=48000, channels=2, initialSecs=0.01)
+        np.testing.assert_array_equal(buffer.getRMS(100), [0, 0])
+        written = self._writeChunks(buffer)
+        for nSamples in (1, 100, 1024, 4097, 9600, len(written) + 1):
+            expected = AudioClip(written[-nSamples:]).rms()
+            np.testing.assert_allclose(
+                buffer.getRMS(nSamples), expected, rtol=1e-5)
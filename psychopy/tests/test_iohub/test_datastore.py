@@ -0,0 +1,64 @@
+"""Tests for batched event writes in psychopy.iohub.datastore.DataStoreFile,
+run directly against a DataStoreFile rather than a running ioHub Server.
+"""
+import pytest
+
+pytest.importorskip("tables")
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.datastore import DataStoreFile
+from psychopy.iohub.devices.experiment import Experiment, MessageEvent
+
+
+@pytest.fixture
+def dsfile(tmp_path):
+    EventConstants.addClassMappings([MessageEvent.EVENT_TYPE_ID],
+                                    {'MessageEvent': MessageEvent})
+    settings = dict(multiple_sessions=False, flush_interval=32,
+                    event_buffer_length=16, event_buffer_max_age=60.0)
+    dsfile = DataStoreFile('events.hdf5', str(tmp_path), 'w', settings)
+    dsfile.updateDataStoreStructure(Experiment.__new__(Experiment),
+                                    {'MessageEvent': MessageEvent})
+    dsfile.createOrUpdateExperimentEntry([0, 'test', 'Test', '', '1.0'])
+    dsfile.createExperimentSessionEntry(dict(code='s1', name='s1', comments='',
+                                             user_variables='{}'))
+    yield dsfile
+    dsfile.close()
+
+
+def makeMessage(i):
+    return [0, 0, 0, i, MessageEvent.EVENT_TYPE_ID, i * 0.001, i * 0.001,
+            i * 0.001, 0.0, 0.0, 0, 0.0, b'cat', b'message %d' % i]
+
+
+def test_events_written_in_batches(dsfile):
+    table = dsfile.TABLES[MessageEvent.IOHUB_DATA_TABLE]
+    for i in range(40):
+        dsfile._handleEvent(makeMessage(i))
+
+    # two full buffers have been written, the rest are still staged
+    assert table.nrows == 32
+    stats = dsfile.getStats()
+    assert stats['events_received'] == 40
+    assert stats['events_written'] == 32
+    assert stats['events_pending'] == 8
+    assert stats['table_appends'] == 2
+
+    # nothing is old enough to be written yet
+    assert dsfile.checkEventBuffers() == 0
+
+    dsfile.flush()
+    assert table.nrows == 40
+    assert dsfile.getStats()['events_pending'] == 0
+    rows = table.read()
+    assert list(rows['event_id']) == list(range(40))
+    assert rows['text'][-1] == b'message 39'
+    assert all(rows['session_id'] == dsfile.active_session_id)
+
+
+def test_old_events_written(dsfile):
+    table = dsfile.TABLES[MessageEvent.IOHUB_DATA_TABLE]
+    dsfile._handleEvent(makeMessage(0))
+    dsfile.eventBufferMaxAge = 0.0
+    assert dsfile.checkEventBuffers() == 1
+    assert table.nrows == 1
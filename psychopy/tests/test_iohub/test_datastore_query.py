@@ -0,0 +1,142 @@
+"""Tests for the chunked, indexed event queries of
+psychopy.iohub.datastore.util.ExperimentDataAccessUtility, run against a
+DataStore file written directly by a DataStoreFile.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("tables")
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.datastore import DataStoreFile
+from psychopy.iohub.datastore.util import (
+    ExperimentDataAccessException, ExperimentDataAccessUtility,
+    saveEventReport)
+from psychopy.iohub.devices.experiment import (Experiment, LogEvent,
+                                               MessageEvent)
+
+EVENT_CLASSES = {'MessageEvent': MessageEvent, 'LogEvent': LogEvent}
+N_TRIALS = 5
+
+
+def baseEvent(eventID, eventType, time):
+    return [0, 0, 0, eventID, eventType, time, time, time, 0.0, 0.0, 0]
+
+
+@pytest.fixture
+def hubFile(tmp_path):
+    EventConstants.addClassMappings(
+        [cls.EVENT_TYPE_ID for cls in EVENT_CLASSES.values()], EVENT_CLASSES)
+    settings = dict(multiple_sessions=False, flush_interval=32,
+                    event_buffer_length=256, event_buffer_max_age=60.0)
+    dsfile = DataStoreFile('events.hdf5', str(tmp_path), 'w', settings)
+    dsfile.updateDataStoreStructure(Experiment.__new__(Experiment),
+                                    EVENT_CLASSES)
+    dsfile.createOrUpdateExperimentEntry([0, 'test', 'Test', '', '1.0'])
+    dsfile.createExperimentSessionEntry(dict(code='s1', name='s1', comments='',
+                                             user_variables='{}'))
+    eventID = 0
+    for trial in range(N_TRIALS):
+        for text, time in ((b'TRIAL_START', trial + 0.1005),
+                           (b'TRIAL_END', trial + 0.9005)):
+            dsfile._handleEvent(baseEvent(eventID, MessageEvent.EVENT_TYPE_ID,
+                                          time) + [0.0, b'', text])
+            eventID += 1
+    for i in range(N_TRIALS * 400):
+        text = b'' if i % 7 == 0 else b'log %d' % i
+        dsfile._handleEvent(baseEvent(eventID, LogEvent.EVENT_TYPE_ID,
+                                      i / 400) + [i % 5, text])
+        eventID += 1
+    dsfile.close()
+    yield tmp_path
+
+
+def openDataFile(hubFile, mode):
+    return ExperimentDataAccessUtility(str(hubFile), 'events.hdf5', mode=mode)
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_iterEventsInWindows(hubFile, indexed):
+    datafile = openDataFile(hubFile, 'a')
+    if indexed:
+        datafile.createEventTableIndexes('LogEvent')
+    table = datafile.getEventTable('LogEvent')
+    assert datafile.getEventTable(LogEvent.EVENT_TYPE_ID) is table
+    fields = ['time', 'log_level', 'text']
+    windows = [(trial + 0.1, trial + 0.9) for trial in range(N_TRIALS)]
+    # small enough that each window is read in several chunks
+    maxChunkBytes = table.dtype.itemsize * 50
+
+    chunks = {}
+    for window_index, events in datafile.iterEventsInWindows(
+            'LogEvent', windows, fields=fields, maxChunkBytes=maxChunkBytes):
+        assert len(events) <= 50
+        assert events.dtype.names == tuple(fields)
+        chunks.setdefault(window_index, []).append(events)
+
+    assert sorted(chunks) == list(range(N_TRIALS))
+    for window_index, (start, end) in enumerate(windows):
+        expected = table.read_where(
+            '(time >= %r) & (time <= %r)' % (start, end))
+        events = np.concatenate(chunks[window_index])
+        assert len(chunks[window_index]) > 1
+        for name in fields:
+            assert np.array_equal(events[name], expected[name])
+
+    # reading the file doesn't change it, even when it could be written to
+    assert table.cols.time.is_indexed == indexed
+
+    # everything, with an extra condition, as DataFrames
+    frames = [frame for window_index, frame in datafile.iterEventsInWindows(
+        table, condition='log_level == 2', asDataFrame=True,
+        maxChunkBytes=maxChunkBytes)]
+    everything = table.read_where('log_level == 2')
+    assert sum(len(frame) for frame in frames) == len(everything)
+    assert list(frames[0].columns) == list(table.colnames)
+    datafile.close()
+
+
+def test_createEventTableIndexes(hubFile):
+    datafile = openDataFile(hubFile, 'r')
+    with pytest.raises(ExperimentDataAccessException):
+        datafile.createEventTableIndexes('LogEvent')
+    datafile.close()
+
+    datafile = openDataFile(hubFile, 'a')
+    indexed = datafile.createEventTableIndexes('LogEvent')
+    assert indexed == ['time', 'session_id', 'experiment_id', 'type']
+    datafile.close()
+
+
+def test_saveEventReport(hubFile):
+    datafile = openDataFile(hubFile, 'r')
+    events = datafile.getEventTable('LogEvent').read()
+    messages = datafile.getEventTable('MessageEvent').read()
+    datafile.close()
+
+    # format each event as the report did before queries were chunked
+    starts = messages['time'][messages['text'] == b'TRIAL_START']
+    ends = messages['time'][messages['text'] == b'TRIAL_END']
+    fields = ['time', 'log_level', 'text']
+    expected = ['\t'.join(['TRIAL_INDEX', 'TRIAL_START', 'TRIAL_END'] + fields)]
+    for trial, (start, end) in enumerate(zip(starts, ends)):
+        for event in events[(events['time'] >= start) & (events['time'] <= end)]:
+            cells = []
+            for c in fields:
+                cv = event[c]
+                if type(cv) == np.bytes_:
+                    cv = cv.decode('utf-8')
+                if type(cv) == str and len(cv) == 0:
+                    cv = '.'
+                cells.append(str(cv))
+            expected.append('\t'.join([str(trial + 1), str(start), str(end)]
+                                      + cells))
+
+    fileName, count = saveEventReport(
+        hdf5FilePath=str(hubFile / 'events.hdf5'), eventType='LogEvent',
+        eventFields=fields, trialStart='TRIAL_START', trialStop='TRIAL_END')
+    with open(fileName) as f:
+        lines = f.read().splitlines()
+    assert count == len(expected) - 1
+    assert lines == expected
+    assert '.' in [line.split('\t')[-1] for line in lines]
@@ -0,0 +1,153 @@
+"""Tests that offline (whole array) use of the ioHub event field filters and
+eye tracker sample parser gives the same results as online use.
+"""
+import numpy as np
+import pytest
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.devices import Device, DeviceEvent, eventfilters
+from psychopy.iohub.devices.eyetracker import eye_events
+from psychopy.iohub.devices.eyetracker.filters.parser import \
+    EyeTrackerEventParser
+
+EYE_EVENT_CLASSES = {
+    'MonocularEyeSampleEvent': eye_events.MonocularEyeSampleEvent,
+    'BinocularEyeSampleEvent': eye_events.BinocularEyeSampleEvent,
+    'FixationStartEvent': eye_events.FixationStartEvent,
+    'FixationEndEvent': eye_events.FixationEndEvent,
+    'SaccadeStartEvent': eye_events.SaccadeStartEvent,
+    'SaccadeEndEvent': eye_events.SaccadeEndEvent,
+    'BlinkStartEvent': eye_events.BlinkStartEvent,
+    'BlinkEndEvent': eye_events.BlinkEndEvent,
+}
+
+FIELD_FILTERS = [
+    (eventfilters.MovingWindowFilter, dict(length=5, knot_pos='center')),
+    (eventfilters.MovingWindowFilter, dict(length=4, knot_pos='latest')),
+    (eventfilters.MovingWindowFilter, dict(length=4, knot_pos='oldest')),
+    (eventfilters.PassThroughFilter, {}),
+    (eventfilters.MedianFilter, dict(length=5, knot_pos=1)),
+    (eventfilters.WeightedAverageFilter,
+     dict(weights=[17, 33, 50, 33, 17], knot_pos='center')),
+    (eventfilters.StampFilter, dict(level=1)),
+    (eventfilters.StampFilter, dict(level=3)),
+]
+
+PARSER_FILTERS = [
+    (None, None),
+    (dict(name='MedianFilter', length=3, knot_pos='center'), None),
+    (dict(name='StampFilter', level=2),
+     dict(name='WeightedAverageFilter', weights=[1, 2, 1], knot_pos='center')),
+    (dict(name='MovingWindowFilter', length=3, knot_pos='oldest'),
+     dict(name='MedianFilter', length=3, knot_pos=2)),
+]
+
+
+@pytest.fixture(autouse=True)
+def eyeEventClasses():
+    EventConstants.addClassMappings(
+        [cls.EVENT_TYPE_ID for cls in EYE_EVENT_CLASSES.values()],
+        EYE_EVENT_CLASSES)
+
+
+def makeBinocularSamples(n, rate, seed=0):
+    """Fixations with noise and jumps between them, with some samples
+    missing data from one or both eyes."""
+    rng = np.random.default_rng(seed)
+    target = np.zeros((n, 2))
+    for i in range(1, n):
+        target[i] = target[i - 1]
+        if rng.random() < 0.01:
+            target[i] = rng.uniform(-400, 400, 2)
+    kernel = np.ones(5) / 5
+    gaze = np.column_stack([np.convolve(target[:, i], kernel, 'same')
+                            for i in range(2)])
+    gaze += rng.normal(0, 2, gaze.shape)
+    status = np.zeros(n, dtype=int)
+    i = 50
+    while i < n:
+        if rng.random() < 0.01:
+            count = rng.integers(1, 30)
+            status[i:i + count] = rng.choice([22, 22, 2, 20])
+            i += count
+        i += 1
+
+    samples = np.zeros(n, dtype=eye_events.BinocularEyeSampleEvent.NUMPY_DTYPE)
+    samples['event_id'] = np.arange(n) + 1000
+    samples['type'] = EventConstants.BINOCULAR_EYE_SAMPLE
+    samples['time'] = samples['device_time'] = np.arange(n) / rate
+    samples['status'] = status
+    for eye, offset in (('left', -1.0), ('right', 1.0)):
+        samples[eye + '_gaze_x'] = gaze[:, 0] + offset
+        samples[eye + '_gaze_y'] = gaze[:, 1] - offset
+        samples[eye + '_pupil_measure1'] = rng.normal(4.0, 0.01, n)
+    return samples
+
+
+def makeParser(positionFilter, velocityFilter, rate):
+    return EyeTrackerEventParser(
+        position_filter=dict(positionFilter) if positionFilter else None,
+        velocity_filter=dict(velocityFilter) if velocityFilter else None,
+        sampling_rate=rate,
+        display_device=dict(mm_size=dict(width=500, height=300),
+                            pixel_res=(1920, 1080), eye_distance=600))
+
+
+def assertSameEvents(events, expected):
+    assert len(events) == len(expected)
+    for event, other in zip(events, expected):
+        # compare as float arrays so that NaN thresholds match
+        assert np.array_equal(np.asarray(event, dtype=float),
+                              np.asarray(other, dtype=float), equal_nan=True)
+
+
+@pytest.mark.parametrize("filterClass, kwargs", FIELD_FILTERS)
+def test_filterArray(filterClass, kwargs):
+    fields = eye_events.MonocularEyeSampleEvent.CLASS_ATTRIBUTE_NAMES
+    kwargs = dict(kwargs, event_type=EventConstants.MONOCULAR_EYE_SAMPLE,
+                  event_field_name='angle_x', inplace=True)
+    rng = np.random.default_rng(1)
+    values = np.cumsum(rng.standard_normal(500)) * 3
+
+    onlineFilter = filterClass(**kwargs)
+    indices, filtered = [], []
+    for i, value in enumerate(values):
+        event = [0] * len(fields)
+        event[fields.index('angle_x')] = value
+        event[fields.index('event_id')] = i
+        result = onlineFilter.add(event)
+        if result:
+            indices.append(result[0][fields.index('event_id')])
+            filtered.append(result[1])
+
+    offlineIndices, offlineFiltered = filterClass(**kwargs).filterArray(values)
+    assert list(offlineIndices) == indices
+    assert np.array_equal(offlineFiltered, filtered)
+
+
+@pytest.mark.parametrize("positionFilter, velocityFilter", PARSER_FILTERS)
+def test_parseSamples(positionFilter, velocityFilter, monkeypatch):
+    rate = 100
+    samples = makeBinocularSamples(1500, rate)
+    sampleLists = [list(s) for s in samples.tolist()]
+
+    monkeypatch.setattr(Device, '_next_event_id', 1)
+    parser = makeParser(positionFilter, velocityFilter, rate)
+    expected = []
+    for sample in sampleLists:
+        parser._addInputEvent(list(sample))
+        expected.extend(list(e) for e in parser._removeOutputEvents())
+
+    eventTypes = {e[DeviceEvent.EVENT_TYPE_ID_INDEX] for e in expected}
+    assert EventConstants.FIXATION_END in eventTypes
+    assert EventConstants.SACCADE_END in eventTypes
+    assert EventConstants.BLINK_END in eventTypes
+
+    # samples given as a structured array (as read from the DataStore)
+    Device._next_event_id = 1
+    parser = makeParser(positionFilter, velocityFilter, rate)
+    assertSameEvents(parser.parseSamples(samples), expected)
+
+    # and in list form, reusing the parser
+    Device._next_event_id = 1
+    assertSameEvents(parser.parseSamples(sampleLists), expected)
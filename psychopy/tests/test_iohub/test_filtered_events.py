@@ -0,0 +1,90 @@
+"""Tests for filtered / incremental GET_EVENTS requests, handled by the
+ioHub server without needing a running ioHub process.
+"""
+from collections import deque
+
+import pytest
+
+pytest.importorskip("gevent")
+
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.server import udpServer
+
+
+class _FakeDevice:
+    def __init__(self, name, eventTypes):
+        self.name = name
+        self._event_listeners = {etype: [] for etype in eventTypes}
+
+
+class _FakeHub:
+    def __init__(self, events, devices):
+        self.eventBuffer = deque(events)
+        self.devices = devices
+
+    def processDeviceEvents(self):
+        pass
+
+
+def makeEvent(eventID, eventType, time):
+    # only the fields used for filtering need real values
+    return [0, 0, 0, eventID, eventType, time, 0, time, 0.0, 0.0, 0]
+
+
+@pytest.fixture
+def server():
+    keyTypes = [EventConstants.KEYBOARD_PRESS, EventConstants.KEYBOARD_RELEASE]
+    mouseTypes = [EventConstants.MOUSE_MOVE]
+    events = []
+    for i in range(10):
+        etype = keyTypes[i % 2] if i % 3 else mouseTypes[0]
+        events.append(makeEvent(i + 1, etype, i * 0.1))
+    devices = [_FakeDevice('keyboard', keyTypes),
+               _FakeDevice('mouse', mouseTypes)]
+
+    srv = udpServer.__new__(udpServer)
+    srv.iohub = _FakeHub(events, devices)
+    srv.replies = []
+    srv.sendResponse = lambda data, replyTo: srv.replies.append(data)
+    return srv
+
+
+def test_filter_by_device(server):
+    server.handleGetEvents(None, {'devices': ['mouse']})
+    name, events, remaining = server.replies[-1]
+    assert name == 'GET_EVENTS_RESULT'
+    assert [e[3] for e in events] == [1, 4, 7, 10]
+    assert remaining == 0
+    # only the events sent are removed from the buffer
+    assert len(server.iohub.eventBuffer) == 6
+    assert all(e[4] != EventConstants.MOUSE_MOVE
+               for e in server.iohub.eventBuffer)
+
+
+def test_filter_by_event_type(server):
+    server.handleGetEvents(None, {'event_types': ['KEYBOARD_RELEASE'],
+                                  'devices': ['keyboard']})
+    _, events, _ = server.replies[-1]
+    assert {e[4] for e in events} == {EventConstants.KEYBOARD_RELEASE}
+
+
+def test_incremental(server):
+    server.handleGetEvents(None, {'since_event_id': 6})
+    _, events, _ = server.replies[-1]
+    assert [e[3] for e in events] == [7, 8, 9, 10]
+    # incremental requests leave events in the buffer
+    assert len(server.iohub.eventBuffer) == 10
+
+    server.handleGetEvents(None, {'since_event_id': 10})
+    assert server.replies[-1] == ('GET_EVENTS_RESULT', None, 0)
+
+
+def test_chunked(server):
+    server.handleGetEvents(None, {'since_time': 0.15, 'max_events': 3})
+    _, events, remaining = server.replies[-1]
+    assert [e[3] for e in events] == [3, 4, 5]
+    assert remaining == 5
+    server.handleGetEvents(None, {'since_event_id': 5, 'max_events': 3})
+    _, events, remaining = server.replies[-1]
+    assert [e[3] for e in events] == [6, 7, 8]
+    assert remaining == 2
@@ -0,0 +1,155 @@
+"""Tests for the shared memory event transport between the ioHub Process and
+the experiment process, without needing a running ioHub process.
+"""
+import subprocess
+import sys
+from collections import deque
+
+import pytest
+
+pytest.importorskip("msgpack")
+
+from psychopy.iohub.client import ioHubConnection
+from psychopy.iohub.constants import EventConstants
+from psychopy.iohub.sharedevents import SharedEventBuffer
+
+KEY_TYPES = [EventConstants.KEYBOARD_PRESS, EventConstants.KEYBOARD_RELEASE]
+MOUSE_TYPES = [EventConstants.MOUSE_MOVE]
+
+
+def makeEvent(eventID, eventType, time, text='a'):
+    return [0, 0, 0, eventID, eventType, time, 0, time, 0.0, 0.0, 0, text]
+
+
+@pytest.fixture
+def ring():
+    buffer = SharedEventBuffer(length=8, slot_size=128)
+    yield buffer
+    buffer.close()
+
+
+def test_write_read(ring):
+    reader = SharedEventBuffer(ring.name)
+    assert (reader.length, reader.slot_size) == (8, 128)
+    assert reader.read() == []
+
+    events = [makeEvent(i, EventConstants.KEYBOARD_PRESS, i * 0.5, 'k%d' % i)
+              for i in range(5)]
+    events[0][-1] = b'bytes'
+    for event in events:
+        assert ring.write(event)
+    assert reader.read() == events
+    assert reader.read() == []
+
+    # wraps around the end of the buffer
+    more = [makeEvent(i, EventConstants.KEYBOARD_RELEASE, i) for i in range(6)]
+    for event in more:
+        ring.write(event)
+    assert reader.read() == more
+    assert reader.lost_count == 0
+    reader.close()
+
+
+def test_overrun(ring):
+    reader = SharedEventBuffer(ring.name)
+    events = [makeEvent(i, EventConstants.MOUSE_MOVE, i) for i in range(20)]
+    for event in events:
+        ring.write(event)
+    # only the newest events are kept, like a deque with a maxlen
+    assert reader.read() == events[-8:]
+    assert reader.lost_count == 12
+
+    ring.write(events[0])
+    assert reader.skip() == 1
+    assert reader.read() == []
+    reader.close()
+
+
+def test_oversize(ring):
+    reader = SharedEventBuffer(ring.name)
+    assert not ring.write(makeEvent(1, EventConstants.MOUSE_MOVE, 0, 'x' * 200))
+    assert ring.write(makeEvent(2, EventConstants.MOUSE_MOVE, 0))
+    assert reader.getOversizeCount() == 1
+    assert [e[3] for e in reader.read()] == [2]
+    reader.close()
+
+
+WRITE_EVENTS_SCRIPT = '''
+import sys
+from psychopy.iohub.sharedevents import SharedEventBuffer
+ring = SharedEventBuffer(sys.argv[1])
+for i in range(5):
+    ring.write([0, 0, 0, i, 0, float(i), 0, float(i), 0.0, 0.0, 0])
+ring.close()
+'''
+
+
+def test_other_process(ring):
+    reader = SharedEventBuffer(ring.name)
+    # written by a separate process, as the ioHub Process is started
+    subprocess.run([sys.executable, '-c', WRITE_EVENTS_SCRIPT, ring.name],
+                   check=True, timeout=60)
+    # the buffer is still usable after the writing process exits
+    assert [e[3] for e in reader.read()] == [0, 1, 2, 3, 4]
+    reader.close()
+
+
+class _Connection(ioHubConnection):
+    """ioHubConnection reading from a shared event buffer, with replies to
+    any UDP requests faked."""
+
+    def __init__(self, ring, udpEvents=()):
+        self.allEvents = []
+        self._shared_events = SharedEventBuffer(ring.name)
+        self._unread_events = deque()
+        self._oversize_count = 0
+        self._device_event_types = None
+        self.udpEvents = list(udpEvents)
+        self.requests = []
+
+    def _sendToHubServer(self, tx_data):
+        self.requests.append(tx_data)
+        if tx_data == ('RPC', 'getDeviceEventTypes'):
+            return ('RPC_RESULT', tx_data[1],
+                    {'keyboard': KEY_TYPES, 'mouse': MOUSE_TYPES})
+        if tx_data == ('GET_EVENTS',):
+            events, self.udpEvents = self.udpEvents, []
+            return ('GET_EVENTS_RESULT', events or None)
+        raise AssertionError('Unexpected request %r' % (tx_data,))
+
+
+def test_client_getEvents():
+    ring = SharedEventBuffer(length=64, slot_size=128)
+    events = []
+    for i in range(10):
+        etype = KEY_TYPES[i % 2] if i % 3 else MOUSE_TYPES[0]
+        events.append(makeEvent(i + 1, etype, i * 0.1))
+        ring.write(events[-1])
+    # events written before attaching are still read
+    conn = _Connection(ring)
+
+    # incremental requests leave events to be read again
+    got = conn.getEvents(as_type='list', since_event_id=7)
+    assert [e[3] for e in got] == [8, 9, 10]
+    got = conn.getEvents(as_type='list', device_label='keyboard',
+                         since_time=0.45)
+    assert [e[3] for e in got] == [6, 8, 9]
+
+    # filtering by type removes only the events returned
+    got = conn.getEvents(as_type='list', event_type='MOUSE_MOVE')
+    assert [e[3] for e in got] == [1, 4, 7, 10]
+    got = conn.getEvents(as_type='list')
+    assert [e[3] for e in got] == [2, 3, 5, 6, 8, 9]
+    assert conn.getEvents() == []
+    # no events were requested over UDP
+    assert conn.requests == [('RPC', 'getDeviceEventTypes')]
+
+    # events too large for the ring buffer are requested over UDP
+    big = makeEvent(11, MOUSE_TYPES[0], 1.05, 'x' * 200)
+    assert not ring.write(big)
+    ring.write(makeEvent(12, MOUSE_TYPES[0], 1.1))
+    conn.udpEvents = [big]
+    got = conn.getEvents(as_type='list')
+    assert [e[3] for e in got] == [11, 12]
+    conn._shared_events.close()
+    ring.close()
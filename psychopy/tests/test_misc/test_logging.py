@@ -0,0 +1,106 @@
+import io
+import threading
+import time
+
+from psychopy import logging
+
+
+class _Stream(io.StringIO):
+    """Text stream counting the writes made to it."""
+
+    def __init__(self):
+        io.StringIO.__init__(self)
+        self.nWrites = 0
+
+    def write(self, txt):
+        self.nWrites += 1
+        return io.StringIO.write(self, txt)
+
+
+class _BlockedStream(_Stream):
+    """Stream which doesn't return from write() until released."""
+
+    def __init__(self):
+        _Stream.__init__(self)
+        self.release = threading.Event()
+
+    def write(self, txt):
+        self.release.wait()
+        return _Stream.write(self, txt)
+
+
+def makeLogger(*levels):
+    logger = logging._Logger(format="{levelname} {message}")
+    streams = []
+    for level in levels:
+        streams.append(_Stream())
+        logging.LogFile(streams[-1], level=level, logger=logger)
+    return logger, streams
+
+
+def test_flush():
+    logger, (expStream, warnStream) = makeLogger(logging.EXP, logging.WARNING)
+    for i in range(100):
+        logger.log('msg%d' % i, level=logging.EXP, t=i)
+    logger.log('warned', level=logging.WARNING, t=100)
+    logger.log('ignored', level=logging.DEBUG, t=101)
+    assert expStream.getvalue() == ''
+    assert logger.flush()
+    lines = expStream.getvalue().splitlines()
+    assert lines == ['EXP msg%d' % i for i in range(100)] + ['WARNING warned']
+    assert warnStream.getvalue() == 'WARNING warned\n'
+    # each target is written to once, not once per message
+    assert expStream.nWrites == warnStream.nWrites == 1
+    assert len(logger.flushed) == 101 and logger.toFlush == []
+
+
+def test_async():
+    logger, (expStream, warnStream) = makeLogger(logging.EXP, logging.WARNING)
+    logger.log('before', level=logging.EXP, t=0)
+    logger.setAsync(True, interval=10)
+    assert logger.isAsync
+    # anything logged before is written straight away
+    assert expStream.getvalue() == 'EXP before\n'
+
+    for i in range(1000):
+        logger.log('msg%d' % i, level=logging.EXP, t=i)
+    logger.log('warned', level=logging.WARNING, t=1000)
+    # flush waits until everything logged so far is written
+    assert logger.flush(timeout=10)
+    lines = expStream.getvalue().splitlines()
+    assert lines == (['EXP before'] + ['EXP msg%d' % i for i in range(1000)]
+                     + ['WARNING warned'])
+    assert warnStream.getvalue() == 'WARNING warned\n'
+    assert expStream.nWrites <= 3
+
+    # written without flushing, after at most the interval
+    logger.setAsync(True, interval=0.01)
+    logger.log('later', level=logging.EXP, t=1001)
+    logger.flush(timeout=10)  # wakes the writer, which now uses the interval
+    logger.log('unflushed', level=logging.EXP, t=1002)
+    deadline = time.time() + 10
+    while 'unflushed' not in expStream.getvalue() and time.time() < deadline:
+        time.sleep(0.01)
+    assert expStream.getvalue().endswith('EXP later\nEXP unflushed\n')
+
+    logger.log('last', level=logging.EXP, t=1003)
+    logger.setAsync(False)
+    assert not logger.isAsync and logger.toFlush == []
+    assert expStream.getvalue().endswith('EXP last\n')
+    assert len(logger.flushed) == 1005
+
+
+def test_asyncTimeout():
+    logger = logging._Logger(format="{message}")
+    stream = _BlockedStream()
+    logging.LogFile(stream, level=logging.INFO, logger=logger)
+    logger.setAsync(True)
+    logger.log('blocked', level=logging.INFO, t=0)
+    # the flush is bounded by the timeout, even if writing is held up (as
+    # through the module's flush function too)
+    assert not logger.flush(timeout=0.05)
+    assert not logging.flush(logger, timeout=0.05)
+    stream.release.set()
+    assert logging.flush(logger, timeout=10)
+    assert stream.getvalue() == 'blocked\n'
+    logger.setAsync(False)
@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+
+import pytest
+
+from psychopy import plugins
+from psychopy.plugins.index import EntryPointIndex
+
+
+def makeDist(siteDir, name, entryPoints):
+    """Make the metadata folder of an installed distribution, with entry points
+    given as a dict of group: {name: value}."""
+    distInfo = siteDir / "{}-1.0.dist-info".format(name.replace("-", "_"))
+    distInfo.mkdir()
+    (distInfo / "METADATA").write_text(
+        "Metadata-Version: 2.1\nName: {}\nVersion: 1.0\n".format(name))
+    lines = []
+    for group, eps in entryPoints.items():
+        lines.append("[{}]".format(group))
+        lines += ["{} = {}".format(epName, value)
+                  for epName, value in eps.items()]
+    (distInfo / "entry_points.txt").write_text("\n".join(lines) + "\n")
+    return distInfo
+
+
+def touch(path):
+    # make sure the change shows up even on filesystems with coarse times
+    t = time.time() + 10
+    os.utime(str(path), (t, t))
+
+
+@pytest.fixture
+def siteDir(tmp_path):
+    site = tmp_path / "site-packages"
+    site.mkdir()
+    makeDist(site, "psychopy-test-plugin", {
+        "psychopy.visual": {"TestStim": "psychopy_test_plugin:TestStim"},
+        "console_scripts": {"test-plugin": "psychopy_test_plugin:main"}})
+    makeDist(site, "not-a-plugin", {
+        "console_scripts": {"not-a-plugin": "not_a_plugin:main"}})
+    return site
+
+
+def test_scan(siteDir, tmp_path):
+    indexFile = str(tmp_path / "cache" / "entryPoints.json")
+    found = EntryPointIndex(indexFile).scan([str(siteDir)])
+    assert [name for name, eps in found] == ["psychopy-test-plugin"]
+    ep, = found[0][1]
+    assert (ep.group, ep.name, ep.value) == (
+        "psychopy.visual", "TestStim", "psychopy_test_plugin:TestStim")
+    assert os.path.isfile(indexFile)
+
+    # nothing is read again while nothing changes
+    index = EntryPointIndex(indexFile)
+    assert index.scan([str(siteDir), str(tmp_path / "missing")]) == found
+    assert (index.nPathsRead, index.nDistsRead) == (0, 0)
+
+    # only new distributions are read
+    makeDist(siteDir, "psychopy-other", {
+        "psychopy.experiment.components": {"Other": "psychopy_other:Other"}})
+    touch(siteDir)
+    found = index.scan([str(siteDir)])
+    assert (index.nPathsRead, index.nDistsRead) == (1, 1)
+    assert sorted(name for name, eps in found) == [
+        "psychopy-other", "psychopy-test-plugin"]
+
+    # and removed ones are forgotten
+    for child in (siteDir / "psychopy_other-1.0.dist-info").iterdir():
+        child.unlink()
+    (siteDir / "psychopy_other-1.0.dist-info").rmdir()
+    touch(siteDir)
+    found = EntryPointIndex(indexFile).scan([str(siteDir)])
+    assert [name for name, eps in found] == ["psychopy-test-plugin"]
+
+
+def test_badIndexFile(siteDir, tmp_path):
+    indexFile = tmp_path / "entryPoints.json"
+    indexFile.write_text("{not json")
+    index = EntryPointIndex(str(indexFile))
+    assert [name for name, eps in index.scan([str(siteDir)])] == [
+        "psychopy-test-plugin"]
+    assert index.nDistsRead == 2
+
+
+def test_scanPlugins(siteDir, tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "path", sys.path + [str(siteDir)])
+    monkeypatch.setattr(plugins, "_entry_point_index_",
+                        EntryPointIndex(str(tmp_path / "entryPoints.json")))
+    monkeypatch.setattr(plugins, "_installed_plugins_", {})
+    monkeypatch.setattr(plugins, "_plugins_scanned_", False)
+
+    # scanned when first needed
+    assert "psychopy-test-plugin" in plugins.listPlugins()
+    entryPoints = plugins.pluginEntryPoints("psychopy-test-plugin")
+    assert list(entryPoints) == ["psychopy.visual"]
+    assert entryPoints["psychopy.visual"]["TestStim"].value == \
+        "psychopy_test_plugin:TestStim"
+
+    # the same plugins are found reading every package
+    indexed = {name: {group: {epName: ep.value for epName, ep in eps.items()}
+                      for group, eps in groups.items()}
+               for name, groups in plugins._installed_plugins_.items()}
+    plugins.scanPlugins(useIndex=False)
+    scanned = {name: {group: {epName: ep.value for epName, ep in eps.items()}
+                      for group, eps in groups.items()}
+               for name, groups in plugins._installed_plugins_.items()}
+    assert indexed == scanned
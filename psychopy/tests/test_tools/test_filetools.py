@@ -8,11 +8,12 @@ import os
 import sys
 import json
 import pickle
+import threading
 import pytest
 
 from tempfile import mkdtemp, mkstemp
 from psychopy.tools.filetools import (genDelimiter, genFilenameFromDelimiter,
-                                      openOutputFile, fromFile)
+                                      openOutputFile, openAtomicFile, fromFile)
 
 
 def test_genDelimiter():
@@ -66,6 +67,33 @@ class TestOpenOutputFile():
         assert f is sys.stdout
 
 
+def test_openAtomicFile(tmp_path):
+    fileName = tmp_path / 'sub' / 'data.json'
+    with openAtomicFile(fileName, encoding='utf-8') as f:
+        json.dump('first', f)
+    assert fromFile(str(fileName)) == 'first'
+    # a failed write leaves the file as it was, and no temporary file
+    with pytest.raises(ValueError):
+        with openAtomicFile(fileName, encoding='utf-8') as f:
+            f.write('"second')
+            raise ValueError
+    assert fromFile(str(fileName)) == 'first'
+    assert os.listdir(tmp_path / 'sub') == ['data.json']
+
+    # another thread writing the same file meanwhile doesn't get in the way
+    def writeOther():
+        with openAtomicFile(fileName, encoding='utf-8') as f:
+            json.dump('other', f)
+
+    with openAtomicFile(fileName, encoding='utf-8') as f:
+        thread = threading.Thread(target=writeOther)
+        thread.start()
+        thread.join()
+        json.dump('third', f)
+    assert fromFile(str(fileName)) == 'third'
+    assert os.listdir(tmp_path / 'sub') == ['data.json']
+
+
 class TestFromFile():
     def setup_method(self):
         self.tmp_dir = mkdtemp(prefix='psychopy-tests-%s' %
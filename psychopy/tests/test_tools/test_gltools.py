@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Tests for psychopy.tools.gltools
+"""
+
+import numpy as np
+import pytest
+
+import psychopy.tools.mathtools as mt
+from psychopy.tools.gltools import (
+    createUVSphere, calculateVertexNormals, mergeVertices)
+
+
+def _mergeVerticesReference(vertices, faces, textureCoords=None,
+                            vertDist=0.0001, texDist=0.0001):
+    """Brute force version of `mergeVertices`, checking every vertex against
+    every other one. Results of the optimised version must match this exactly.
+    """
+    vertsProcessed = np.zeros((vertices.shape[0],), dtype=bool)
+    faces = faces.flatten()
+    newFaces = np.zeros_like(faces, dtype=np.uint32)
+    newVerts = []
+    newTexCoords = []
+    lastProcIdx = 0
+    for i, vertex in enumerate(vertices):
+        if vertsProcessed[i]:
+            continue
+        vertDists = mt.distance(vertex, vertices)
+        toProcess = np.where(vertDists <= vertDist)[0]
+        if len(toProcess) > 1:
+            if textureCoords is not None:
+                texCoordDists = mt.distance(textureCoords[i, :],
+                                            textureCoords[toProcess, :])
+                toMerge = toProcess[texCoordDists <= texDist]
+                toMove = toProcess[texCoordDists > texDist]
+                newPos = np.mean(vertices[toMerge, :], axis=0)
+                newVerts.append(newPos)
+                newTexCoords.append(np.mean(textureCoords[toMerge, :], axis=0))
+                newFaces[np.isin(faces, toMerge)] = lastProcIdx
+                for j, idx in enumerate(toMove):
+                    newVerts.append(newPos)
+                    newTexCoords.append(textureCoords[idx, :])
+                    newFaces[faces == idx] = lastProcIdx + j
+                lastProcIdx += len(toMove)
+            else:
+                newVerts.append(np.mean(vertices[toProcess, :], axis=0))
+                newFaces[np.isin(faces, toProcess)] = lastProcIdx
+            vertsProcessed[toProcess] = True
+        else:
+            newVerts.append(vertex)
+            if textureCoords is not None:
+                newTexCoords.append(textureCoords[i, :])
+            vertsProcessed[i] = True
+            newFaces[faces == i] = lastProcIdx
+        lastProcIdx += 1
+
+    newVerts = np.ascontiguousarray(np.vstack(newVerts), dtype=np.float32)
+    newFaces = np.ascontiguousarray(newFaces.reshape((-1, 3)), dtype=np.uint32)
+    newNormals = calculateVertexNormals(newVerts, newFaces, 'smooth')
+    if textureCoords is not None:
+        newTexCoords = np.ascontiguousarray(
+            np.vstack(newTexCoords), dtype=np.float32)
+        return newVerts, newTexCoords, newNormals, newFaces
+
+    return newVerts, newNormals, newFaces
+
+
+def _unweldedMesh():
+    """Sphere with each triangle given its own vertices, jittered slightly so
+    that not all doubles are at exactly the same position.
+    """
+    vertices, textureCoords, _, faces = createUVSphere(sectors=12, stacks=8)
+    faces = np.asarray(faces)
+    vertices = np.asarray(vertices, dtype=np.float32)[faces.flatten()]
+    textureCoords = np.asarray(textureCoords, dtype=np.float32)[faces.flatten()]
+    rng = np.random.default_rng(9)
+    vertices += rng.uniform(-2e-5, 2e-5, vertices.shape).astype(np.float32)
+    newFaces = np.arange(len(vertices), dtype=np.uint32).reshape((-1, 3))
+
+    return vertices, textureCoords, newFaces
+
+
+@pytest.mark.parametrize("vertDist", [0.0, 0.0001, 0.2])
+def test_mergeVertices(vertDist):
+    """Check that merging vertices gives the same result as comparing every
+    vertex against every other one, with and without texture coordinates.
+    """
+    vertices, textureCoords, faces = _unweldedMesh()
+
+    got = mergeVertices(vertices, faces, vertDist=vertDist)
+    expected = _mergeVerticesReference(vertices, faces, vertDist=vertDist)
+    assert len(got) == len(expected) == 3
+    for gotArr, expectedArr in zip(got, expected):
+        assert gotArr.dtype == expectedArr.dtype
+        np.testing.assert_array_equal(gotArr, expectedArr)
+
+    # texture coordinates split vertices which can't be merged
+    got = mergeVertices(
+        vertices, faces, textureCoords, vertDist=vertDist, texDist=0.01)
+    expected = _mergeVerticesReference(
+        vertices, faces, textureCoords, vertDist=vertDist, texDist=0.01)
+    assert len(got) == len(expected) == 4
+    for gotArr, expectedArr in zip(got, expected):
+        assert gotArr.dtype == expectedArr.dtype
+        np.testing.assert_array_equal(gotArr, expectedArr)
+
+
+def test_mergeVerticesReducesMesh():
+    """Check that welding an unwelded mesh removes its doubled vertices."""
+    vertices, _, faces = _unweldedMesh()
+    newVerts, newNormals, newFaces = mergeVertices(vertices, faces)
+    assert len(newVerts) < len(vertices)
+    assert newNormals.shape == newVerts.shape
+    assert newFaces.shape == faces.shape
+    assert newFaces.max() < len(newVerts)
+
+
+@pytest.mark.parametrize("shading", ['smooth', 'flat'])
+def test_calculateVertexNormals(shading):
+    """Check vertex normals against searching all faces for each vertex."""
+    vertices, _, _, faces = createUVSphere(sectors=12, stacks=8)
+    vertices = np.asarray(vertices)
+    faces = np.asarray(faces)
+
+    faceNormals = mt.surfaceNormal(vertices[faces])
+    expected = []
+    for vertexIdx in np.unique(faces):
+        match, _ = np.where(faces == vertexIdx)
+        if shading == 'flat':
+            expected.append(faceNormals[match, :])
+        else:
+            expected.append(mt.vertexNormal(faceNormals[match, :]))
+    expected = np.ascontiguousarray(np.vstack(expected), np.float32) + 0.0
+
+    got = calculateVertexNormals(vertices, faces, shading=shading)
+    np.testing.assert_array_equal(got, expected)
@@ -0,0 +1,102 @@
+"""Tests for streaming captured frames to disk with
+:class:`psychopy.tools.movietools.FrameStreamWriter`. Frames are made up as
+arrays, as they would be read from a window, so no window is needed.
+"""
+import threading
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from psychopy.tools.movietools import FrameStreamWriter, MovieFileWriter
+
+SIZE = (16, 12)
+
+
+def makeFrame(value):
+    # RGBA, bottom row first, like Window._getPixels()
+    pixels = np.full((SIZE[1], SIZE[0], 4), value, dtype=np.uint8)
+    pixels[0, :, 0] = 255  # mark the bottom row
+    return pixels
+
+
+def test_imageSequence(tmp_path):
+    stream = FrameStreamWriter(str(tmp_path / 'frame.png'), SIZE)
+    assert stream.isImageSequence
+    stream.open()
+    for i in range(5):
+        assert stream.addFrame(makeFrame(i * 10))
+    stream.close()
+    assert not stream.isOpen
+    assert (stream.framesOut, stream.framesWaiting) == (5, 0)
+
+    for i in range(5):
+        image = np.array(Image.open(str(tmp_path / ('frame%05d.png' % (i + 1)))))
+        # the right way up, without the alpha channel
+        assert image.shape == (SIZE[1], SIZE[0], 3)
+        assert image[-1, 0, 0] == 255
+        assert image[0, 0, 0] == image[0, 0, 2] == i * 10
+
+    with pytest.raises(RuntimeError):
+        stream.addFrame(makeFrame(0))
+    with pytest.raises(ValueError):
+        stream.open()
+        try:
+            stream.addFrame(np.zeros((SIZE[0], SIZE[1], 4), dtype=np.uint8))
+        finally:
+            stream.close()
+
+
+class _BlockedWriter:
+    """Stands in for a MovieFileWriter, holding frames until released."""
+
+    def __init__(self):
+        self.frames = []
+        self.release = threading.Event()
+
+    def open(self):
+        pass
+
+    def addFrame(self, image):
+        self.release.wait()
+        self.frames.append(image)
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize('dropFrames', [True, False])
+def test_movieBounded(tmp_path, dropFrames):
+    stream = FrameStreamWriter(str(tmp_path / 'movie.mp4'), SIZE,
+                               maxFramesWaiting=3, dropFrames=dropFrames)
+    assert not stream.isImageSequence
+    assert isinstance(stream._movieWriter, MovieFileWriter)
+    assert stream._movieWriter._frameQueue.maxsize == 3
+    writer = stream._movieWriter = _BlockedWriter()
+    stream.open()
+
+    for i in range(3):
+        assert stream.addFrame(makeFrame(i))
+    if dropFrames:
+        # no room, so the frame is dropped without waiting
+        assert not stream.addFrame(makeFrame(3))
+        assert stream.framesDropped == 1
+        writer.release.set()
+    else:
+        # waits for room
+        threading.Timer(0.1, writer.release.set).start()
+        assert stream.addFrame(makeFrame(3))
+    stream.close()
+
+    values = [frame[0, 0, 1] for frame in writer.frames]
+    assert values == ([0, 1, 2] if dropFrames else [0, 1, 2, 3])
+    assert all(frame.shape == (SIZE[1], SIZE[0], 3) for frame in writer.frames)
+    assert writer.frames[0][-1, 0, 0] == 255
+
+
+def test_encodeError(tmp_path):
+    stream = FrameStreamWriter(str(tmp_path / 'missing' / 'frame.png'), SIZE)
+    stream.open()
+    stream.addFrame(makeFrame(0))
+    with pytest.raises(OSError):
+        stream.close()
@@ -8,6 +8,7 @@ from psychopy import visual, monitors, layout
 from psychopy.tests import utils
 from psychopy.visual import helpers
 from numpy import sqrt
+import numpy as np
 import matplotlib
 
 mon = monitors.Monitor('testMonitor')
@@ -234,6 +235,74 @@ def test_line_contains():
     assert (line.contains(point_2) is False)
 
 
+def test_pointsInPolygons():
+    rng = np.random.default_rng(1)
+    # squares, a concave and a self-crossing polygon, and random ones
+    polys = [
+        [(1, 1), (1, -1), (-1, -1), (-1, 1)],
+        [(12, 12), (12, 10), (10, 10), (10, 12)],
+        [(0, 0), (4, 0), (4, 4), (2, 1), (0, 4)],
+        [(0, 0), (2, 2), (2, 0), (0, 2)],
+    ] + [rng.uniform(-5, 5, (n, 2)) for n in (3, 7, 20)]
+    points = [(-0.5, -0.5), (11, 11), (2, 3), (0.9, 0.5), (0.5, 0.9),
+              (1.8, 0.8)]
+    inside = helpers.pointsInPolygons(points, polys)
+    assert inside.shape == (len(points), len(polys))
+    assert inside[:, :4].tolist() == [
+        [True, False, False, False],
+        [False, True, False, False],
+        [False, False, False, False],
+        [True, False, True, False],
+        [True, False, True, True],
+        [False, False, True, True]]
+
+    # same as testing each point and polygon in turn
+    points = np.vstack([points, rng.uniform(-6, 13, (500, 2))])
+    inside = helpers.pointsInPolygons(points, polys)
+    matplotlib.__version__ = '0.0'  # pure python
+    try:
+        expected = [[helpers.pointInPolygon(x, y, poly) for poly in polys]
+                    for x, y in points]
+    finally:
+        matplotlib.__version__ = mpl_version
+    assert inside.tolist() == expected
+
+    # lines contain nothing
+    assert not helpers.pointsInPolygons(points, [[(0, 0), (1, 1)]]).any()
+    assert helpers.pointsInPolygons([], polys).shape == (0, len(polys))
+    assert helpers.pointsInPolygons(points, []).shape == (len(points), 0)
+
+
+def test_containsPoints():
+    win.units = 'pix'
+    rect = visual.Rect(win, size=(100, 50), pos=(50, 0), units='pix',
+                       autoLog=False)
+    points = [(0, 0), (50, 0), (99, 24), (101, 0), (50, 26)]
+    assert rect.containsPoints(points).tolist() == [
+        True, True, True, False, False]
+    assert rect.containsPoints(points).tolist() == [
+        rect.contains(p) for p in points]
+    # the polygon is kept until the stimulus changes
+    edges = rect._hitEdges
+    rect.contains(0, 0)
+    assert rect._hitEdges is edges
+    rect.pos = (200, 0)
+    assert rect.containsPoints(points).tolist() == [False] * 5
+    assert rect._hitEdges is not edges
+
+    win.units = 'height'
+    assert rect.containsPoints(
+        [(0, 0), (100 / win.size[1], 0)], units='height').tolist() == [
+        False, False]
+    assert rect.containsPoints([(200, 0)], units='pix').tolist() == [True]
+
+    # several stimuli at once
+    circle = visual.Circle(win, radius=0.1, units='height', autoLog=False)
+    hits = helpers.pointsInPolygons([(0, 0), (200, 0), (500, 500)],
+                                    [rect, circle])
+    assert hits.tolist() == [[False, True], [True, False], [False, False]]
+
+
 if __name__ == '__main__':
     test_overlaps()
     test_contains()
@@ -152,4 +152,34 @@ class TestDots:
         # If dots have moved, then there should be more white on the compound screen than on either original
         assert compound.mean() > screen1.mean() and compound.mean() > screen2.mean(), (
             "Dot stimulus does not appear to have moved across two frames."
-        )
\ No newline at end of file
+        )
+
+    def test_element_instanced(self):
+        """
+        Check that drawing a shape element instanced gives the same frame as drawing it once per dot.
+        """
+        self.win.color = "black"
+        # the new background color is used from the next flip
+        self.win.flip()
+        element = visual.Rect(
+            self.win, units="pix", size=(6, 6), fillColor="white", lineColor="red", lineWidth=2
+        )
+        frames = []
+        for useInstancing in (False, True):
+            obj = visual.DotStim(
+                self.win, nDots=20, units="pix", fieldSize=(100, 100),
+                dotLife=0, speed=0, element=element, useInstancing=useInstancing
+            )
+            # use the same dot positions for both
+            np.random.seed(0)
+            obj.refreshDots()
+            obj.draw()
+            assert obj.useInstancing == useInstancing, (
+                "DotStim fell back to drawing element dot-by-dot."
+            )
+            frames.append(np.array(self.win._getFrame(buffer="back"), dtype=float))
+            self.win.flip()
+        # allow for small differences in rasterization between drivers
+        assert np.allclose(frames[0], frames[1], atol=2), (
+            "Instanced DotStim element differs from drawing it once per dot."
+        )
@@ -0,0 +1,96 @@
+"""Tests for recording the time taken by each stimulus and phase of a flip with
+:class:`psychopy.visual.flipprofiler.FlipProfiler`, without needing a window.
+"""
+import csv
+
+import numpy as np
+
+from psychopy.visual.flipprofiler import FLIP_PHASES, FlipProfiler
+
+
+class _Stim:
+    def __init__(self, name):
+        self.name = name
+
+
+def profileFrames(profiler, nFrames, stims):
+    for frameN in range(nFrames):
+        profiler.startFrame()
+        for stim in stims:
+            profiler.addStimulus(stim, profiler.now())
+        for phase in FLIP_PHASES:
+            profiler.endPhase(phase)
+
+
+def test_records():
+    profiler = FlipProfiler(maxRecords=1000)
+    stims = [_Stim('fixation'), _Stim('target'), _Stim(''), object()]
+    profileFrames(profiler, 3, stims)
+    nPerFrame = len(stims) + len(FLIP_PHASES)
+    assert len(profiler) == 3 * nPerFrame
+
+    records = profiler.getRecords()
+    assert list(records['frame']) == sorted([1, 2, 3] * nPerFrame)
+    assert (records['duration'] >= 0).all()
+    names = [profiler.names[i] for i in records['name'][:nPerFrame]]
+    # unnamed stimuli are identified by their class
+    assert names == (['fixation', 'target', '_Stim', 'object']
+                     + list(FLIP_PHASES))
+
+
+def test_ringBuffer():
+    nPerFrame = 1 + len(FLIP_PHASES)
+    profiler = FlipProfiler(maxRecords=nPerFrame * 2)
+    profileFrames(profiler, 5, [_Stim('target')])
+    # only the most recent frames are kept, oldest first
+    assert len(profiler) == nPerFrame * 2
+    assert list(np.unique(profiler.getRecords()['frame'])) == [4, 5]
+    assert profiler.getRecords()['frame'][0] == 4
+
+    profiler.clear()
+    assert len(profiler) == 0
+    assert profiler.getSummary() == {'phase': {}, 'stimulus': {}}
+
+
+def test_summary():
+    profiler = FlipProfiler()
+    # made up durations, so the statistics are known
+    for frameN, duration in enumerate(np.arange(1, 101) / 1000.):
+        profiler.frameN = frameN + 1
+        profiler._add(1, profiler._getStimIndex('slow'), duration)
+        profiler._add(1, profiler._getStimIndex('fast'), duration / 10)
+        profiler._add(0, 0, 0.001)
+    summary = profiler.getSummary(percentiles=(50, 99))
+    assert list(summary['phase']) == ['autoDraw']
+    # longest total time first
+    assert list(summary['stimulus']) == ['slow', 'fast']
+    slow = summary['stimulus']['slow']
+    assert slow['n'] == 100
+    assert np.isclose(slow['mean'], 0.0505)
+    assert np.isclose(slow['max'], 0.1)
+    assert np.isclose(slow['p50'], np.percentile(np.arange(1, 101), 50) / 1000)
+    assert np.isclose(slow['p99'], np.percentile(np.arange(1, 101), 99) / 1000)
+    assert np.isclose(summary['stimulus']['fast']['total'], slow['total'] / 10)
+
+
+def test_stimulusNamedAsPhase():
+    profiler = FlipProfiler()
+    profileFrames(profiler, 3, [_Stim('log')])
+    summary = profiler.getSummary()
+    # kept apart from the phase of the same name
+    assert summary['stimulus']['log']['n'] == 3
+    assert summary['phase']['log']['n'] == 3
+
+
+def test_save(tmp_path):
+    profiler = FlipProfiler()
+    profileFrames(profiler, 2, [_Stim('target, left')])
+    fileName = str(tmp_path / 'profile.csv')
+    profiler.save(fileName)
+    with open(fileName) as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == len(profiler)
+    assert rows[0]['frame'] == '1'
+    assert (rows[0]['kind'], rows[0]['name']) == ('stimulus', 'target, left')
+    assert (rows[1]['kind'], rows[1]['name']) == ('phase', 'autoDraw')
+    assert float(rows[1]['duration']) >= 0
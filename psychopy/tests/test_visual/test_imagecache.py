@@ -0,0 +1,146 @@
+"""Tests for decoding images ahead of time with
+:class:`psychopy.visual.imagecache.ImagePrefetcher`. These don't need a window,
+as only the upload of the decoded image is done by the stimulus.
+"""
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from psychopy import data
+from psychopy.visual.imagecache import (GL, ImagePrefetcher,
+                                        loadImageTexture)
+
+
+@pytest.fixture
+def images(tmp_path):
+    rng = np.random.default_rng(0)
+    names = []
+    for i in range(4):
+        name = str(tmp_path / ('image%d.png' % i))
+        pixels = rng.integers(0, 256, (30, 40, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(name)
+        names.append(name)
+    grey = str(tmp_path / 'grey.png')
+    Image.fromarray(rng.integers(0, 256, (20, 10), dtype=np.uint8)).save(grey)
+    names.append(grey)
+    return names
+
+
+def test_loadImageTexture(images):
+    pixels = np.array(Image.open(images[0]))
+    image = loadImageTexture(images[0], GL.GL_RGB, GL.GL_UNSIGNED_BYTE,
+                             forcePOW2=False)
+    assert image.size == (40, 30)
+    assert not image.wasLum and image.notSqr
+    assert image.dataType == GL.GL_UNSIGNED_BYTE
+    # flipped so the first row is at the bottom, with an alpha channel added
+    assert image.data.shape == (30, 40, 4)
+    assert np.array_equal(image.data[::-1, :, :3], pixels)
+
+    # luminance images are copied to each channel, as floats -1:1
+    pixels = np.array(Image.open(images[-1]))
+    image = loadImageTexture(images[-1], GL.GL_RGB, GL.GL_UNSIGNED_BYTE,
+                             forcePOW2=False)
+    assert image.wasLum and image.dataType == GL.GL_FLOAT
+    assert image.data.shape == (20, 10, 3)
+    assert np.allclose(image.data[::-1, :, 1], pixels / 127.5 - 1, atol=1e-6)
+
+    # masks need a single channel, resized if need be
+    image = loadImageTexture(images[0], GL.GL_ALPHA, GL.GL_UNSIGNED_BYTE,
+                             forcePOW2=True)
+    assert image.wasLum and image.data.shape == (64, 64)
+
+    with pytest.raises(IOError):
+        loadImageTexture(images[0] + '.missing', GL.GL_RGB, GL.GL_FLOAT)
+
+
+def test_prefetch(images):
+    prefetcher = ImagePrefetcher()
+    assert prefetcher.prefetch(images[:2]) == 2
+    # already requested
+    assert prefetcher.prefetch(images[0]) == 0
+    prefetcher.wait()
+    assert prefetcher.isCached(images[0])
+    assert not prefetcher.isCached(images[2])
+
+    # the same decoded image is given each time it's needed
+    image = prefetcher.get(images[0], GL.GL_RGB, GL.GL_UNSIGNED_BYTE)
+    assert prefetcher.get(images[0], GL.GL_RGB, GL.GL_UNSIGNED_BYTE) is image
+    expected = loadImageTexture(images[0], GL.GL_RGB, GL.GL_UNSIGNED_BYTE,
+                                forcePOW2=False)
+    assert np.array_equal(image.data, expected.data)
+    assert image[1:] == expected[1:]
+
+    # images which weren't prefetched aren't kept
+    prefetcher.get(images[2], GL.GL_RGB, GL.GL_UNSIGNED_BYTE)
+    assert not prefetcher.isCached(images[2])
+
+    # images changed on disk are loaded again
+    Image.new('RGB', (8, 8)).save(images[0])
+    os.utime(images[0], ns=(0, 0))
+    assert not prefetcher.isCached(images[0])
+    assert prefetcher.get(
+        images[0], GL.GL_RGB, GL.GL_UNSIGNED_BYTE).size == (8, 8)
+
+
+def test_get_findsFileOnce(images, monkeypatch):
+    from psychopy.visual import imagecache
+    calls = []
+    origFindImageFile = imagecache.findImageFile
+
+    def findImageFile(tex, **kwargs):
+        calls.append(tex)
+        return origFindImageFile(tex, **kwargs)
+
+    monkeypatch.setattr(imagecache, 'findImageFile', findImageFile)
+    prefetcher = ImagePrefetcher()
+    # nothing prefetched, so the image is just loaded
+    prefetcher.get(images[0], GL.GL_RGB, GL.GL_UNSIGNED_BYTE)
+    assert calls == [images[0]]
+    # looked up in the cache, then loaded without finding the file again
+    prefetcher.prefetch(images[1])
+    prefetcher.wait()
+    del calls[:]
+    prefetcher.get(images[2], GL.GL_RGB, GL.GL_UNSIGNED_BYTE)
+    assert calls == [images[2]]
+
+
+def test_prefetch_lru(images):
+    imageBytes = 30 * 40 * 4
+    prefetcher = ImagePrefetcher(maxBytes=imageBytes * 2)
+    for name in images[:3]:
+        prefetcher.prefetch(name)
+        prefetcher.wait()
+        # use the first image, so it stays in the cache
+        prefetcher.get(images[0], GL.GL_RGB, GL.GL_UNSIGNED_BYTE)
+    assert prefetcher.nBytes == imageBytes * 2
+    assert prefetcher.isCached(images[0])
+    assert not prefetcher.isCached(images[1])
+    assert prefetcher.isCached(images[2])
+
+    prefetcher.clear()
+    assert prefetcher.nBytes == 0
+    assert not prefetcher.isCached(images[0])
+
+
+def test_prefetchTrials(images):
+    conditions = [{'image': name, 'word': 'text%d' % i}
+                  for i, name in enumerate(images[:4])]
+    trials = data.TrialHandler2(conditions, nReps=1, method='sequential')
+    prefetcher = ImagePrefetcher()
+    # outside a loop, or before it starts, there's nothing to do
+    exp = data.ExperimentHandler(savePickle=False, saveWideText=False)
+    assert prefetcher.prefetchTrials(exp) == 0
+    assert prefetcher.prefetchTrials(trials) == 0
+
+    trials.next()
+    assert prefetcher.prefetchTrials(trials, n=2) == 2
+    prefetcher.wait()
+    assert [prefetcher.isCached(name) for name in images[:4]] == [
+        False, True, True, False]
+    # past the last trial
+    for trial in trials:
+        pass
+    assert prefetcher.prefetchTrials(trials) == 0
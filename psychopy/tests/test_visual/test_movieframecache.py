@@ -0,0 +1,146 @@
+"""Tests for the stores of preloaded movie frames and the cache of them shared
+by movie stimuli. These use frames made up here, so need neither a window nor
+a movie decoder.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from psychopy.visual.movies import framecache
+from psychopy.visual.movies.framecache import MovieFrameCache, MovieFrameStore
+
+SIZE = (8, 6)
+METADATA = {'duration': 0.5, 'frame_rate': (20, 1)}
+
+
+def makeFrames(nFrames, frameRate=20.0, seed=0):
+    """Color data and timestamps of frames, as a decoder gives them."""
+    rng = np.random.default_rng(seed)
+    return [(rng.integers(0, 256, SIZE[0] * SIZE[1] * 4, dtype=np.uint8),
+             i / frameRate) for i in range(nFrames)]
+
+
+@pytest.mark.parametrize('memmap', [False, True])
+def test_fromFrames(memmap):
+    frames = makeFrames(10)
+    # frames may be given as they're decoded
+    store = MovieFrameStore.fromFrames(
+        (frame for frame in frames), SIZE, METADATA, memmap=memmap)
+    assert store.isMemoryMapped == memmap
+    assert store.nFrames == 10
+    assert store.nBytes == 10 * SIZE[0] * SIZE[1] * 4
+    for i, (colorData, pts) in enumerate(frames):
+        assert np.array_equal(store.getFrame(i), colorData)
+        assert store.pts[i] == pts
+    assert store.duration == 0.5
+    assert store.frameInterval == 0.05
+
+    with pytest.raises(RuntimeError):
+        MovieFrameStore.fromFrames([], SIZE, METADATA, memmap=memmap)
+    with pytest.raises(ValueError):
+        MovieFrameStore.fromFrames(frames, (4, 4), METADATA, memmap=memmap)
+
+
+def test_getFrameIndex():
+    store = MovieFrameStore.fromFrames(makeFrames(10), SIZE, METADATA)
+    times = [-1.0, 0.0, 0.049, 0.05, 0.26, 0.45, 0.5, 10.0]
+    assert [store.getFrameIndex(t) for t in times] == [0, 0, 0, 1, 5, 9, 9, 9]
+
+
+def test_metadataFallback():
+    # no valid duration or frame rate, so worked out from the timestamps
+    store = MovieFrameStore.fromFrames(
+        makeFrames(5, frameRate=25.0), SIZE,
+        {'duration': None, 'frame_rate': (0, 0)})
+    assert store.frameInterval == pytest.approx(0.04)
+    assert store.duration == pytest.approx(0.2)
+
+
+@pytest.fixture
+def movies(tmp_path):
+    names = []
+    for i in range(4):
+        name = str(tmp_path / ('movie%d.mp4' % i))
+        with open(name, 'wb') as f:
+            f.write(b'not really a movie %d' % i)
+        names.append(name)
+    return names
+
+
+class _Decoder:
+    """Decode function which counts its calls."""
+
+    def __init__(self, nFrames=10):
+        self.nFrames = nFrames
+        self.decoded = []
+
+    def __call__(self, filename, memmap=False):
+        self.decoded.append(filename)
+        return MovieFrameStore.fromFrames(
+            makeFrames(self.nFrames, seed=len(self.decoded)), SIZE, METADATA,
+            memmap=memmap)
+
+
+def test_movieFrameCache(movies):
+    decode = _Decoder()
+    nBytes = decode(movies[0]).nBytes
+    decode.decoded.clear()
+    cache = MovieFrameCache(maxBytes=3 * nBytes)
+
+    first = cache.get(movies[0], decode)
+    assert cache.get(movies[0], decode) is first
+    assert decode.decoded == [movies[0]]
+    assert cache.isCached(movies[0]) and cache.nBytes == nBytes
+
+    # least recently used are removed when over the budget
+    cache.get(movies[1], decode)
+    cache.get(movies[2], decode)
+    cache.get(movies[0], decode)
+    cache.get(movies[3], decode)
+    assert [cache.isCached(name) for name in movies] == [
+        True, False, True, True]
+    assert cache.nBytes == 3 * nBytes
+
+    # changed files are decoded again
+    with open(movies[0], 'ab') as f:
+        f.write(b' now changed')
+    assert cache.get(movies[0], decode) is not first
+    assert decode.decoded.count(movies[0]) == 2
+
+    # memory-mapped movies are kept apart from those in memory
+    mapped = cache.get(movies[3], decode, memmap=True)
+    assert mapped.isMemoryMapped
+    assert cache.get(movies[3], decode, memmap=True) is mapped
+    assert cache.isCached(movies[3], memmap=True)
+    assert not cache.get(movies[3], decode).isMemoryMapped
+    assert decode.decoded.count(movies[3]) == 2
+
+    # streams aren't cached, nor movies bigger than the budget
+    cache.get('rtsp://example.com/stream', decode)
+    assert len(cache._cache) == 3
+    cache.clear()
+    assert cache.nBytes == 0 and not cache.isCached(movies[3])
+    cache.maxBytes = nBytes // 2
+    cache.get(movies[1], decode)
+    assert not cache.isCached(movies[1])
+
+
+def test_memmapFileRemoved(movies):
+    store = _Decoder()(movies[0], memmap=True)
+    fileno = store._file.fileno()
+    assert os.fstat(fileno).st_size == store.nBytes
+    del store
+    with pytest.raises(OSError):
+        os.fstat(fileno)
+
+
+def test_setFrameCacheSize(movies, monkeypatch):
+    decode = _Decoder()
+    monkeypatch.setattr(framecache, 'movieFrameCache', MovieFrameCache())
+    for name in movies:
+        framecache.movieFrameCache.get(name, decode)
+    assert all(framecache.movieFrameCache.isCached(name) for name in movies)
+    framecache.setFrameCacheSize(2 * framecache.movieFrameCache.nBytes // 4)
+    assert [framecache.movieFrameCache.isCached(name) for name in movies] == [
+        False, False, True, True]
@@ -366,6 +366,38 @@ class Test_textbox(_TestColorMixin, _TestUnitsMixin, _TestBoilerplateMixin, _Tes
         # Set editable back to start value
         self.textbox.editable = wasEditable
 
+    def test_glyph_run_cache(self):
+        """Check that cached and partial layouts match laying out from scratch"""
+        from psychopy.visual.textbox2.textbox2 import glyphRunCache
+        self.textbox.text = "A PsychoPy zealot knows a smidge of wx,\nbut JavaScript is the question."
+        # setting the same text again reuses its layout
+        run = self.textbox._glyphRun
+        self.textbox.text = "something else"
+        self.textbox.text = "A PsychoPy zealot knows a smidge of wx,\nbut JavaScript is the question."
+        assert self.textbox._glyphRun is run
+        # the cached layout is shared, so can't be changed through the textbox
+        assert not self.textbox._texcoords.flags.writeable
+        assert not self.textbox._lineNs.flags.writeable
+        # edit text part way through, then compare to a fresh layout
+        self.textbox.caret.index = 20
+        for letter in "extremely ":
+            self.textbox._onText(letter)
+        self.textbox.caret.index = 5
+        self.textbox._onCursorKeys('MOTION_BACKSPACE')
+        edited = self.textbox.vertices.copy()
+        editedLines = list(self.textbox._lineNs)
+        glyphRunCache.clear()
+        self.textbox._glyphRun = None
+        self.textbox._layout()
+        assert np.array_equal(self.textbox.vertices, edited)
+        assert list(self.textbox._lineNs) == editedLines
+        # changing colour doesn't change the layout
+        run = self.textbox._glyphRun
+        self.textbox.color = "red"
+        assert self.textbox._glyphRun is run
+        assert np.array_equal(self.textbox._colors[0], self.textbox._foreColor.render('rgba1'))
+        assert len(self.textbox._colors) == len(self.textbox.vertices)
+
     def test_basic(self):
         pass
 
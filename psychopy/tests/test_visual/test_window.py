@@ -2,6 +2,8 @@ import importlib
 from copy import copy
 from pathlib import Path
 
+import pytest
+
 from psychopy import visual, colors
 from psychopy.tests import utils
 from psychopy.tests.test_visual.test_basevisual import _TestColorMixin
@@ -122,3 +124,30 @@ class TestWindow:
                     coord=(0, 0),
                     context=f"win_{color}_{colorSpace}")
 
+    def test_getPixelsAsync(self):
+        try:
+            win = visual.Window(size=(64, 48), units='pix')
+        except Exception as err:
+            pytest.skip("Needs an OpenGL context: %s" % err)
+        rect = visual.Rect(win, size=(32, 24), lineWidth=0)
+        expected = []
+        got = []
+        for color in ['white', 'black', 'red', 'blue', 'green']:
+            rect.fillColor = color
+            rect.draw()
+            # pixels read asynchronously are those of earlier reads
+            expected.append((win._getPixels(buffer='back'), win._frameTimes[-1]
+                             if win._frameTimes else None))
+            pixels, frameTime = win._getPixelsAsync(buffer='back')
+            if pixels is not None:
+                got.append((pixels, frameTime))
+            win.flip()
+        got.extend(win._flushPixelsAsync(buffer='back'))
+        assert len(got) == len(expected)
+        for (pixels, frameTime), (wantPixels, wantTime) in zip(got, expected):
+            assert (pixels == wantPixels).all()
+            assert frameTime == wantTime
+        lum, _ = win._getPixelsAsync(buffer='back', makeLum=True)
+        assert lum is None  # a new read, so nothing back yet
+        assert win._flushPixelsAsync(buffer='back', makeLum=True)[0][0].ndim == 2
+        win.close()
@@ -0,0 +1,171 @@
+"""Test making the meshes for window warps (without needing a window)
+"""
+import numpy as np
+import pytest
+
+from psychopy.visual import windowwarp
+from psychopy.visual.windowwarp import Warper
+
+
+def _quadsLoop(grid):
+    """Corners of the quads of a grid, as the warper used to make them."""
+    rows, cols = grid.shape[:2]
+    quads = np.zeros(((cols - 1) * (rows - 1) * 4, grid.shape[2]))
+    vdex = 0
+    for y in range(0, rows - 1):
+        for x in range(0, cols - 1):
+            quads[vdex + 0] = grid[y, x]
+            quads[vdex + 1] = grid[y, x + 1]
+            quads[vdex + 2] = grid[y + 1, x + 1]
+            quads[vdex + 3] = grid[y + 1, x]
+            vdex += 4
+    return quads
+
+
+def _sphericalTexCoords(grid, eyepoint, widthCm, heightCm, distCm,
+                        isCylindrical):
+    """Texture coords on the grid, as the warper used to work them out."""
+    x = np.zeros((grid, grid), dtype='float32')
+    y = np.zeros((grid, grid), dtype='float32')
+    x[:, :] = np.linspace(0, widthCm, grid) - eyepoint[0] * widthCm
+    y[:, :] = np.linspace(0, heightCm, grid) - eyepoint[1] * heightCm
+    y = np.transpose(y)
+    r = np.sqrt(np.square(x) + np.square(y) + np.square(distCm))
+    azimuth = np.arctan(x / distCm)
+    altitude = np.arcsin(y / r)
+    if isCylindrical:
+        tx = distCm * np.sin(azimuth)
+        ty = distCm * np.sin(altitude)
+    else:
+        tx = distCm * (1 + x/r) - distCm
+        ty = distCm * (1 + y/r) - distCm
+    azimuth[azimuth == 0] = np.finfo(np.float32).eps
+    altitude[altitude == 0] = np.finfo(np.float32).eps
+    if isCylindrical:
+        tx = tx * azimuth / np.sin(azimuth)
+        ty = ty * altitude / np.sin(altitude)
+    else:
+        arcLength = np.arccos(
+            np.cos(altitude) * np.cos(np.abs(azimuth))) * distCm
+        theta = np.arctan2(ty, tx)
+        tx = arcLength * np.cos(theta)
+        ty = arcLength * np.sin(theta)
+    return np.dstack([tx / widthCm + 0.5, ty / heightCm + 0.5])
+
+
+def makeWarpfile(fileName, cols, rows):
+    rng = np.random.default_rng(0)
+    data = rng.uniform(-1, 1, (cols * rows, 5))
+    data[:, 4] = rng.uniform(0, 1, cols * rows)
+    with open(fileName, 'w') as f:
+        f.write("2\n%d %d\n" % (cols, rows))
+        np.savetxt(f, data, fmt='%.6f')
+    return np.loadtxt(fileName, skiprows=2)
+
+
+class _Warper(Warper):
+    """Warper which records its arrays rather than making GL buffers."""
+
+    def __init__(self, meshCache=False):
+        self.meshCache = meshCache
+        self._meshes = {}
+        self.warpGridsize = 20
+        self.eyepoint = [0.5, 0.5]
+        self.mon_width_cm = 40.0
+        self.mon_height_cm = 30.0
+        self.dist_cm = 57.0
+        self.flipHorizontal = self.flipVertical = False
+        self.initDefaultWarpSize()
+
+    def createVertexAndTextureBuffers(self, vertices, tcoords, opacity=None):
+        self.buffers = (vertices, tcoords, opacity)
+
+
+def test_gridToQuads():
+    grid = np.arange(5 * 7 * 3).reshape((5, 7, 3))
+    assert np.array_equal(windowwarp.gridToQuads(grid), _quadsLoop(grid))
+
+
+@pytest.mark.parametrize('isCylindrical', [False, True])
+def test_sphericalMesh(isCylindrical):
+    vertices, tcoords = windowwarp.makeSphericalMesh(
+        30, 30, (0.3, 0.6), 40.0, 30.0, 57.0, isCylindrical)
+    assert vertices.dtype == tcoords.dtype == np.float32
+    assert vertices.shape == tcoords.shape == (29 * 29 * 4, 2)
+    xy = np.dstack(np.meshgrid(np.linspace(-1, 1, 30),
+                               np.linspace(-1, 1, 30)))
+    assert np.array_equal(vertices, _quadsLoop(xy).astype('float32'))
+    uv = _sphericalTexCoords(30, (0.3, 0.6), 40.0, 30.0, 57.0, isCylindrical)
+    assert np.allclose(tcoords, _quadsLoop(uv), atol=1e-6)
+
+
+def test_warpfileMesh(tmp_path):
+    fileName = str(tmp_path / 'dome.data')
+    data = makeWarpfile(fileName, 9, 6)
+    filetype, cols, rows, warpdata = windowwarp.readWarpfile(fileName)
+    assert (filetype, cols, rows) == (2, 9, 6)
+    assert np.array_equal(warpdata, data)
+
+    vertices, tcoords, opacity = windowwarp.makeWarpfileMesh(
+        warpdata, cols, rows)
+    expected = _quadsLoop(data.reshape((6, 9, 5))).astype('float32')
+    assert np.array_equal(vertices, expected[:, 0:2])
+    assert np.array_equal(tcoords, expected[:, 2:4])
+    assert np.array_equal(opacity[:, 3], expected[:, 4])
+    assert (opacity[:, :3] == 1).all()
+
+
+def test_meshCache(tmp_path, monkeypatch):
+    made = []
+    makeSphericalMesh = windowwarp.makeSphericalMesh
+
+    def countedMakeSphericalMesh(*args):
+        made.append(args)
+        return makeSphericalMesh(*args)
+
+    monkeypatch.setattr(windowwarp, 'makeSphericalMesh',
+                        countedMakeSphericalMesh)
+    cacheDir = tmp_path / 'cache'
+
+    warper = _Warper(meshCache=str(cacheDir))
+    warper.changeProjection('spherical', eyepoint=(0.5, 0.5))
+    spherical = warper.buffers
+    assert len(made) == 1 and len(list(cacheDir.iterdir())) == 1
+    # switching back is kept in memory
+    warper.changeProjection('cylindrical', eyepoint=(0.5, 0.5))
+    warper.changeProjection('spherical', eyepoint=(0.5, 0.5))
+    assert len(made) == 2
+    assert warper.buffers[0] is spherical[0]
+
+    # a new warper (e.g. next session) loads the mesh from the cache
+    warper = _Warper(meshCache=str(cacheDir))
+    warper.changeProjection('spherical', eyepoint=(0.5, 0.5))
+    assert len(made) == 2
+    assert np.array_equal(warper.buffers[0], spherical[0])
+    assert np.array_equal(warper.buffers[1], spherical[1])
+    # but not for different parameters
+    warper.dist_cm = 30.0
+    warper.changeProjection('spherical', eyepoint=(0.5, 0.5))
+    assert len(made) == 3
+
+    # warpfiles are cached by their contents
+    fileName = str(tmp_path / 'dome.data')
+    makeWarpfile(fileName, 9, 6)
+    warper.changeProjection('warpfile', fileName)
+    vertices, tcoords, opacity = warper.buffers
+    assert (warper.xgrid, warper.ygrid, warper.nverts) == (9, 6, 8 * 5 * 4)
+    warper = _Warper(meshCache=str(cacheDir))
+    monkeypatch.setattr(windowwarp, 'parseWarpfile', None)  # not needed
+    warper.changeProjection('warpfile', fileName)
+    assert (warper.xgrid, warper.ygrid, warper.nverts) == (9, 6, 8 * 5 * 4)
+    assert np.array_equal(warper.buffers[2], opacity)
+
+
+def test_badWarpfile(tmp_path):
+    fileName = tmp_path / 'bad.data'
+    fileName.write_text("2\n3 3\n0 0 0 0 1\n")
+    warper = _Warper()
+    warper.changeProjection('warpfile', str(fileName))
+    assert not hasattr(warper, 'buffers')
+    warper.changeProjection('warpfile', str(tmp_path / 'missing.data'))
+    assert not hasattr(warper, 'buffers')
@@ -11,8 +11,10 @@ import os
 import shutil
 import subprocess
 import sys
+import threading
 import atexit
 import codecs
+from contextlib import contextmanager
 import numpy as np
 import json
 import json_tricks
@@ -254,6 +256,48 @@ def openOutputFile(fileName=None, append=False, fileCollisionMethod='rename',
     return f
 
 
+@contextmanager
+def openAtomicFile(fileName, mode='w', encoding=None):
+    """Open a file to write which replaces `fileName` all in one go once
+    it's closed, so other processes never see it partly written.
+
+    The data go to a temporary file beside `fileName` (making its folder if
+    need be), which is removed again if anything fails before it's in place.
+
+    :Parameters:
+
+    fileName : str
+        Path of the file to write.
+    mode : str, optional
+        Mode to open the temporary file in, `'w'` or `'wb'`.
+    encoding : str or None, optional
+        The encoding to use when writing text.
+
+    :Returns:
+
+    f : file
+        A writable file handle, to use in a `with` statement.
+
+    """
+    fileName = str(fileName)
+    folder = os.path.dirname(fileName)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    # unique to this thread, so threads writing the same file don't clash
+    tmpName = '{}.{}.{}.tmp'.format(
+        fileName, os.getpid(), threading.get_ident())
+    try:
+        with open(tmpName, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmpName, fileName)
+    except BaseException:
+        try:
+            os.remove(tmpName)
+        except OSError:
+            pass
+        raise
+
+
 def genDelimiter(fileName):
     """Return a delimiter based on a filename.
 
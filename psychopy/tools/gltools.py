@@ -87,6 +87,7 @@ __all__ = [
     'mappedBuffer',
     'updateVBO',
     'deleteVBO',
+    'PixelReadback',
     'setVertexAttribPointer',
     'enableVertexAttribArray',
     'disableVertexAttribArray',
@@ -129,7 +130,7 @@ __all__ = [
 
 import ctypes
 from io import StringIO
-from collections import namedtuple
+from collections import namedtuple, deque
 import pyglet.gl as GL  # using Pyglet for now
 from contextlib import contextmanager
 from PIL import Image
@@ -3326,7 +3327,8 @@ def createVAO(attribBuffers, indexBuffer=None, attribDivisors=None, legacy=False
         Attribute divisors to set. Keys are vertex attribute pointer indices,
         values are the number of instances that will pass between updates of an
         attribute. Setting attribute divisors is only permitted if `legacy` is
-        `False`.
+        `False`. Attributes with a non-zero divisor are per-instance, so are not
+        used to work out the number of vertices (`count`) in the VAO.
     legacy : bool, optional
         Use legacy attribute pointer functions when setting the VAO state. This
         is for compatibility with older GL implementations. Key specified to
@@ -3394,6 +3396,9 @@ def createVAO(attribBuffers, indexBuffer=None, attribDivisors=None, legacy=False
         GL.glGenVertexArraysAPPLE(1, ctypes.byref(vaoId))
         GL.glBindVertexArrayAPPLE(vaoId)
 
+    # per-instance attributes don't count towards the number of vertices
+    instanced = {key for key, val in (attribDivisors or {}).items() if val}
+
     # add attribute pointers
     activeAttribs = {}
     bufferIndices = []
@@ -3429,7 +3434,8 @@ def createVAO(attribBuffers, indexBuffer=None, attribDivisors=None, legacy=False
         setVertexAttribPointer(i, buffer, size, offset, normalize, legacy)
 
         activeAttribs[i] = buffer
-        bufferIndices.append(buffer.shape[0])
+        if i not in instanced:
+            bufferIndices.append(buffer.shape[0])
 
     # bind the EBO if available
     if indexBuffer is not None:
@@ -3442,6 +3448,9 @@ def createVAO(attribBuffers, indexBuffer=None, attribDivisors=None, legacy=False
         else:
             raise ValueError(
                 'Index buffer does not have target `GL_ELEMENT_ARRAY_BUFFER`.')
+    elif not bufferIndices:
+        raise ValueError(
+            'At least one attribute must not be per-instance (divisor of 0).')
     else:
         if bufferIndices.count(bufferIndices[0]) != len(bufferIndices):
             warnings.warn(
@@ -4281,6 +4290,145 @@ def deleteVBO(vbo):
         vbo.name = GL.GLuint(0)  # reset the object to invalidate it
 
 
+class PixelReadback:
+    """Ring of pixel buffer objects (PBOs) for reading pixels from the
+    framebuffer without waiting for the GPU.
+
+    :func:`glReadPixels` into client memory waits until all drawing before it
+    has finished. Here each read goes into a PBO instead and returns straight
+    away, with a fence marking when the copy is done. The pixels of a read are
+    fetched some time later (usually a frame or more), by which time the copy
+    has finished and mapping the buffer doesn't stall. Reads are fetched in the
+    order they were made.
+
+    Parameters
+    ----------
+    width, height : int
+        Size of the region to read in pixels.
+    nBuffers : int
+        Number of buffers in the ring, which is the most reads which can be
+        waiting to be fetched.
+
+    Examples
+    --------
+    Read the window each frame, getting the pixels of earlier frames::
+
+        readback = PixelReadback(width, height)
+        while running:
+            drawStimuli()
+            win.flip()
+            if readback.isFull:  # fetch the oldest read to free a buffer
+                pixels, frameN = readback.getPixels(wait=True)
+            readback.read(0, 0, userData=win.frames)
+            pixels, frameN = readback.getPixels()  # `None` if not ready yet
+
+    """
+    def __init__(self, width, height, nBuffers=3):
+        self.width = int(width)
+        self.height = int(height)
+        self._buffers = [
+            createVBO(np.zeros((self.height, self.width * 4), dtype=np.uint8),
+                      target=GL.GL_PIXEL_PACK_BUFFER,
+                      usage=GL.GL_STREAM_READ)
+            for _ in range(nBuffers)]
+        self._free = deque(self._buffers)
+        self._pending = deque()  # (buffer, fence, userData), oldest first
+
+    @property
+    def nPending(self):
+        """Number of reads waiting to be fetched (`int`)."""
+        return len(self._pending)
+
+    @property
+    def isFull(self):
+        """`True` if every buffer holds a read waiting to be fetched, so the
+        oldest must be fetched before reading again (`bool`)."""
+        return not self._free
+
+    def read(self, x, y, userData=None):
+        """Start reading pixels from the current read buffer into the ring.
+
+        Parameters
+        ----------
+        x, y : int
+            Bottom-left corner of the region to read in pixels.
+        userData : object
+            Anything to give back with the pixels, e.g. a timestamp of the
+            frame being read.
+
+        """
+        if not self._free:
+            raise RuntimeError(
+                "No free pixel buffers, fetch earlier reads with `getPixels` "
+                "first.")
+
+        pbo = self._free.popleft()
+        bindVBO(pbo)
+        # with a PBO bound the data pointer is an offset into the buffer
+        GL.glReadPixels(x, y, self.width, self.height,
+                        GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, None)
+        unbindVBO(pbo)  # or reads into client memory go to the buffer
+        fence = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        self._pending.append((pbo, fence, userData))
+
+    def isReady(self):
+        """`True` if the oldest read has been copied and can be fetched without
+        waiting (`bool`)."""
+        if not self._pending:
+            return False
+
+        _, fence, _ = self._pending[0]
+        status = GL.glClientWaitSync(fence, GL.GL_SYNC_FLUSH_COMMANDS_BIT, 0)
+
+        return status in (GL.GL_ALREADY_SIGNALED, GL.GL_CONDITION_SATISFIED)
+
+    def getPixels(self, wait=False):
+        """Fetch the pixels of the oldest read.
+
+        Parameters
+        ----------
+        wait : bool
+            Wait for the read to be copied if it hasn't been yet. If `False`,
+            nothing is fetched until it has.
+
+        Returns
+        -------
+        tuple
+            Pixels as an array of `uint8` with shape (height, width, 4), and
+            the `userData` given to :meth:`read`. Both are `None` if there are
+            no reads, or the oldest isn't ready and `wait` is `False`.
+
+        """
+        if not self._pending or not (wait or self.isReady()):
+            return None, None
+
+        pbo, fence, userData = self._pending.popleft()
+        GL.glDeleteSync(fence)
+        # mapping waits for the copy to finish if it hasn't
+        pixels = mapBuffer(pbo, read=True, write=False).reshape(
+            (self.height, self.width, 4)).copy()
+        unmapBuffer(pbo)
+        unbindVBO(pbo)
+        self._free.append(pbo)
+
+        return pixels, userData
+
+    def clear(self):
+        """Discard all reads waiting to be fetched."""
+        while self._pending:
+            pbo, fence, _ = self._pending.popleft()
+            GL.glDeleteSync(fence)
+            self._free.append(pbo)
+
+    def delete(self):
+        """Delete the buffers, after which the ring can't be used."""
+        self.clear()
+        for pbo in self._buffers:
+            deleteVBO(pbo)
+        self._buffers = []
+        self._free.clear()
+
+
 def setVertexAttribPointer(index,
                            vbo,
                            size=None,
@@ -6646,22 +6794,129 @@ def calculateVertexNormals(vertices, faces, shading='smooth'):
 
     """
     # compute surface normals for all faces
+    faces = np.asarray(faces)
     faceNormals = mt.surfaceNormal(vertices[faces])
 
+    # group the faces each vertex belongs to by sorting face indices, rather
+    # than searching all faces for every vertex
+    order = np.argsort(faces, axis=None, kind='stable')
+    match = order // faces.shape[1]  # face each (sorted) index belongs to
+
     normals = []  # new list of normals to return
     if shading == 'flat':
-        for vertexIdx in np.unique(faces):
-            match, _ = np.where(faces == vertexIdx)
-            normals.append(faceNormals[match, :])
+        normals.append(faceNormals[match, :])
     elif shading == 'smooth':
         # get all faces the vertex belongs to
-        for vertexIdx in np.unique(faces):
-            match, _ = np.where(faces == vertexIdx)
-            normals.append(mt.vertexNormal(faceNormals[match, :]))
+        sortedIdx = faces.ravel()[order]
+        bounds = np.flatnonzero(sortedIdx[1:] != sortedIdx[:-1]) + 1
+        bounds = [0] + bounds.tolist() + [len(sortedIdx)]
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            normals.append(mt.vertexNormal(faceNormals[match[start:stop], :]))
 
     return np.ascontiguousarray(np.vstack(normals), np.float32) + 0.0
 
 
+def _findCloseVertices(vertices, maxDist):
+    """Find all pairs of vertices within some distance of each other.
+
+    Vertices are binned into a uniform grid (spatial hash) with cells at least
+    `maxDist` wide, so only vertices in the same or adjacent cells need their
+    distances checking. This takes roughly linear time in the number of
+    vertices, rather than quadratic.
+
+    Parameters
+    ----------
+    vertices : ndarray
+        Nx3 array of vertex positions.
+    maxDist : float
+        Maximum distance between vertices, computed as
+        :func:`~psychopy.tools.mathtools.distance` does.
+
+    Returns
+    -------
+    tuple
+        Arrays `indptr` and `indices` (compressed sparse row layout) where
+        `indices[indptr[i]:indptr[i + 1]]` are the indices of all vertices
+        within `maxDist` of vertex `i` (including itself), in ascending order.
+
+    """
+    nVerts = vertices.shape[0]
+    positions = np.asarray(vertices, dtype=np.float64).reshape((nVerts, -1))
+
+    # non-finite positions are never within any distance of anything
+    finite = np.flatnonzero(np.all(np.isfinite(positions), axis=1))
+    pairsA = [np.zeros((0,), dtype=np.intp)]
+    pairsB = [np.zeros((0,), dtype=np.intp)]
+
+    if maxDist >= 0.0 and len(finite):
+        points = positions[finite]
+        lower = points.min(axis=0)
+        extent = float(np.max(points.max(axis=0) - lower))
+        # cells must be a little wider than the search distance to be safe
+        # from rounding, and coarse enough that cell keys fit into an int64
+        cellSize = max(maxDist * (1.0 + 1e-6), extent / 2 ** 20)
+        if cellSize <= 0.0:
+            cellSize = 1.0
+        cells = np.floor((points - lower) / cellSize).astype(np.int64) + 1
+        dims = cells.max(axis=0) + 2
+        strides = np.ones_like(dims)
+        for axis in range(len(dims) - 2, -1, -1):
+            strides[axis] = strides[axis + 1] * dims[axis + 1]
+        keys = cells @ strides
+
+        # sort points by cell so each cell is a contiguous run
+        order = np.argsort(keys, kind='stable')
+        sortedKeys = keys[order]
+        cellKeys, cellStarts, cellCounts = np.unique(
+            sortedKeys, return_index=True, return_counts=True)
+
+        # check each cell against itself and half of its neighbours, the other
+        # half are covered when checking from the neighbouring cell
+        offsets = np.stack(np.meshgrid(
+            *[(-1, 0, 1)] * len(dims), indexing='ij'), -1).reshape(-1, len(dims))
+        offsets = offsets @ strides
+        for offset in offsets[offsets >= 0]:
+            nbrKeys = cellKeys + offset
+            nbrCells = np.searchsorted(cellKeys, nbrKeys)
+            nbrCells[nbrCells == len(cellKeys)] = 0
+            found = np.flatnonzero(cellKeys[nbrCells] == nbrKeys)
+            if not len(found):
+                continue
+            nbrCells = nbrCells[found]
+            countA = cellCounts[found]
+            countB = cellCounts[nbrCells]
+            nPairs = countA * countB
+            # enumerate every combination of points between the two cells
+            pairCell = np.repeat(np.arange(len(found)), nPairs)
+            local = np.arange(pairCell.shape[0]) - np.repeat(
+                np.cumsum(nPairs) - nPairs, nPairs)
+            idxA = cellStarts[found][pairCell] + local // countB[pairCell]
+            idxB = cellStarts[nbrCells][pairCell] + local % countB[pairCell]
+            if offset == 0:  # same cell, only need each pair once
+                keep = idxA < idxB
+                idxA, idxB = idxA[keep], idxB[keep]
+            idxA = finite[order[idxA]]
+            idxB = finite[order[idxB]]
+            close = mt.distance(vertices[idxA], vertices[idxB]) <= maxDist
+            pairsA.append(idxA[close])
+            pairsB.append(idxB[close])
+
+        # vertices are always within range of themselves
+        pairsA.append(finite)
+        pairsB.append(finite)
+
+    pairsA = np.concatenate(pairsA)
+    pairsB = np.concatenate(pairsB)
+    isSelf = pairsA == pairsB
+    rows = np.concatenate([pairsA, pairsB[~isSelf]])
+    cols = np.concatenate([pairsB, pairsA[~isSelf]])
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros((nVerts + 1,), dtype=np.intp)
+    np.cumsum(np.bincount(rows, minlength=nVerts), out=indptr[1:])
+
+    return indptr, cols[order]
+
+
 def mergeVertices(vertices, faces, textureCoords=None, vertDist=0.0001,
                   texDist=0.0001):
     """Simplify a mesh by removing redundant vertices.
@@ -6718,37 +6973,42 @@ def mergeVertices(vertices, faces, textureCoords=None, vertDist=0.0001,
         vertices, normals, faces = gltools.removeDoubles(vertices, faces)
 
     """
-    # keep track of vertices that we merged
-    vertsProcessed = np.zeros((vertices.shape[0],), dtype=np.bool)
+    vertices = np.asarray(vertices)
+    faces = np.asarray(faces).flatten()  # existing faces but flattened
+    if textureCoords is not None:
+        textureCoords = np.asarray(textureCoords)
 
-    faces = faces.flatten()  # existing faces but flattened
-    # new array of faces that will get updated
-    newFaces = np.zeros_like(faces, dtype=np.uint32)
+    # find all vertices within merging distance of each other up front, rather
+    # than checking every vertex against every other one
+    indptr, neighbours = _findCloseVertices(vertices, vertDist)
+    indptr = indptr.tolist()
 
-    # loop over all vertices in the original mesh
+    # keep track of vertices that we merged
+    vertsProcessed = np.zeros((vertices.shape[0],), dtype=bool)
+    # new index of each original vertex, used to reindex faces at the end
+    vertMap = np.zeros((vertices.shape[0],), dtype=np.int64)
+
+    # vertices which are copied over as-is, and their new indices
+    keptIdx = []
+    keptNewIdx = []
+    # new vertices created by merging, and their new indices
     newVerts = []
     newTexCoords = []
+    newIdx = []
     lastProcIdx = 0  # last index processed, used to reindex
-    for i, vertex in enumerate(vertices):
+    for i in range(vertices.shape[0]):
         if vertsProcessed[i]:  # don't do merge check if already processed
             continue
 
-        # get the distance to all other vertices in mesh
-        vertDists = mt.distance(vertex, vertices)
-
         # get vertices that fall with the threshold distance
-        toProcess = np.where(vertDists <= vertDist)[0]
+        start, stop = indptr[i], indptr[i + 1]
 
-        # if all adjacent vertices were processed, move on to the next
-        if np.all(vertsProcessed[toProcess]):
-            continue
-
-        # if we have close verts and they have not been processed, merge them
-        if len(toProcess) > 1:
+        # if we have close verts, merge them
+        if stop - start > 1:
+            toProcess = neighbours[start:stop]
             # If we have texture coords, merge those whose texture coords are
             # close. Move the vertex to the new location for any that are not.
             if textureCoords is not None:
-                # create a new vertex by averaging out positions
                 texCoordDists = mt.distance(textureCoords[i, :],
                                             textureCoords[toProcess, :])
 
@@ -6762,46 +7022,52 @@ def mergeVertices(vertices, faces, textureCoords=None, vertDist=0.0001,
 
                 newVerts.append(newPos)
                 newTexCoords.append(newTexCoord)
-                newFaces[np.in1d(faces, toMerge).nonzero()[0]] = lastProcIdx
+                newIdx.append(lastProcIdx)
+                vertMap[toMerge] = lastProcIdx
 
-                # handle vertices that were moved
+                # handle vertices that were moved, note the first of these
+                # shares the index of the merged vertex
                 for j, idx in enumerate(toMove):
                     newVerts.append(newPos)
                     newTexCoords.append(textureCoords[idx, :])
-                    newFaces[np.argwhere(faces == idx)] = lastProcIdx + j
+                    newIdx.append(lastProcIdx + j + 1)
+                    vertMap[idx] = lastProcIdx + j
 
                 lastProcIdx += len(toMove)
 
-                vertsProcessed[toProcess] = 1  # update verts we processed
-
             else:
-                newPos = np.mean(vertices[toProcess, :], axis=0)
-                newVerts.append(newPos)
-                newFaces[np.in1d(faces, toProcess).nonzero()[0]] = lastProcIdx
-                vertsProcessed[toProcess] = 1  # update verts we processed
+                newVerts.append(np.mean(vertices[toProcess, :], axis=0))
+                newIdx.append(lastProcIdx)
+                vertMap[toProcess] = lastProcIdx
+
+            vertsProcessed[toProcess] = True  # update verts we processed
 
         else:
             # single vertices need to be added too
-            newVerts.append(vertex)
-            if textureCoords is not None:
-                newTexCoords.append(textureCoords[i, :])
-            vertsProcessed[i] = 1  # update merged list
-            newFaces[np.argwhere(faces == i)] = lastProcIdx
+            keptIdx.append(i)
+            keptNewIdx.append(lastProcIdx)
+            vertMap[i] = lastProcIdx
+            vertsProcessed[i] = True  # update merged list
 
         lastProcIdx += 1
 
-        # all vertices have been processed, exit loop early
-        if np.all(vertsProcessed):
-            break
-
     # create new output arrays
-    newVerts = np.ascontiguousarray(np.vstack(newVerts), dtype=np.float32)
-    newFaces = np.ascontiguousarray(newFaces.reshape((-1, 3)), dtype=np.uint32)
+    outVerts = np.zeros((lastProcIdx,) + vertices.shape[1:], dtype=np.float64)
+    outVerts[keptNewIdx] = vertices[keptIdx]
+    if newVerts:
+        outVerts[newIdx] = np.vstack(newVerts)
+    newVerts = np.ascontiguousarray(outVerts, dtype=np.float32)
+    newFaces = np.ascontiguousarray(
+        vertMap[faces].reshape((-1, 3)), dtype=np.uint32)
     newNormals = calculateVertexNormals(newVerts, newFaces, 'smooth')
 
     if textureCoords is not None:
-        newTexCoords = np.ascontiguousarray(
-            np.vstack(newTexCoords), dtype=np.float32)
+        outTexCoords = np.zeros(
+            (lastProcIdx,) + textureCoords.shape[1:], dtype=np.float64)
+        outTexCoords[keptNewIdx] = textureCoords[keptIdx]
+        if newTexCoords:
+            outTexCoords[newIdx] = np.vstack(newTexCoords)
+        newTexCoords = np.ascontiguousarray(outTexCoords, dtype=np.float32)
         toReturn = (newVerts, newTexCoords, newNormals, newFaces)
     else:
         toReturn = (newVerts, newNormals, newFaces)
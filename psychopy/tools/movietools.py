@@ -9,6 +9,7 @@
 
 __all__ = [
     'MovieFileWriter',
+    'FrameStreamWriter',
     'closeAllMovieWriters',
     'addAudioToMovie',
     'MOVIE_WRITER_FFPYPLAYER',
@@ -22,6 +23,7 @@ import time
 import threading
 import queue
 import atexit
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import psychopy.logging as logging
 
@@ -58,6 +60,11 @@ VIDEO_RESOLUTIONS = {
 # the file is finalized. We identify movie writers by hashing the filename they 
 # are presently writing to. 
 _openMovieWriters = set()
+# frame streams feeding movie writers, closed before the writers at exit
+_openFrameStreams = set()
+
+# file extensions written as numbered images rather than as a movie
+IMAGE_SEQUENCE_EXTENSIONS = ('.png', '.tif', '.tiff', '.jpg', '.jpeg', '.bmp')
 
 
 class MovieFileWriter:
@@ -105,6 +112,10 @@ class MovieFileWriter:
         to control the quality of the movie, for example. The options depend on
         the `encoderLib` in use. If `None`, the writer will use the default
         options for the backend.
+    maxFramesWaiting : int
+        Maximum number of frames which can be waiting to be written. If the
+        queue is full, `addFrame()` blocks until a frame has been written. If
+        `0` (the default) the number of frames waiting is unlimited.
 
     Examples
     --------
@@ -163,11 +174,12 @@ class MovieFileWriter:
     PIXEL_FORMAT_RGBA32 = 'rgb32'
 
     def __init__(self, filename, size, fps, codec=None, pixelFormat='rgb24',
-                 encoderLib='ffpyplayer', encoderOpts=None):
+                 encoderLib='ffpyplayer', encoderOpts=None, maxFramesWaiting=0):
         
         # objects needed to build up the asynchronous movie writer interface
         self._writerThread = None  # thread for writing the movie file
-        self._frameQueue = queue.Queue()  # queue for frames to be written
+        # queue for frames to be written
+        self._frameQueue = queue.Queue(maxsize=maxFramesWaiting)
         self._dataLock = threading.Lock()  # lock for accessing shared data
         self._lastVideoFile = None  # last video file we wrote to
 
@@ -933,6 +945,249 @@ class MovieFileWriter:
             pass
 
 
+class FrameStreamWriter:
+    """Write captured window frames to disk as they are captured.
+
+    Frames are passed to `addFrame()` as the raw pixel arrays read from the
+    window (see :meth:`~psychopy.visual.Window._getPixels`), and are encoded in
+    the background, either into a movie file with a :class:`MovieFileWriter`
+    or as numbered image files written by a pool of threads. Unlike
+    :meth:`~psychopy.visual.Window.saveMovieFrames`, frames are not kept in
+    memory once they have been written, and at most `maxFramesWaiting` frames
+    are held at any one time, so long recordings don't need more memory than
+    short ones.
+
+    Parameters
+    ----------
+    filename : str
+        The name (or path) of the file to write. If the extension is one of
+        `IMAGE_SEQUENCE_EXTENSIONS` (e.g. `.png`) each frame is written to its
+        own file, numbered from 1 with 5 digits (e.g. `frame00001.png`).
+        Otherwise a movie file is written.
+    size : tuple
+        The size of the frames in pixels (width, height).
+    fps : float
+        The number of frames per second, for movie files.
+    codec : str or None
+        The codec to use for movie files, see :class:`MovieFileWriter`.
+    maxFramesWaiting : int
+        Maximum number of frames which can be waiting to be encoded. Movie
+        files may hold up to this many frames again in the queue of the
+        :class:`MovieFileWriter`.
+    dropFrames : bool
+        What to do if a frame is added when `maxFramesWaiting` frames are
+        already waiting. If `True` the new frame is discarded, so the caller is
+        never held up. If `False` (the default), `addFrame()` waits until there
+        is room, so every frame is written.
+    encoderLib : str
+        The library to use to encode movie files, see :class:`MovieFileWriter`.
+    encoderOpts : dict or None
+        Options for the movie encoder, see :class:`MovieFileWriter`.
+    nWorkers : int or None
+        Number of threads writing image files. If `None` up to 4 are used,
+        depending on the number of CPUs.
+
+    Examples
+    --------
+    Stream frames from a window to a movie file::
+
+        stream = FrameStreamWriter('stimuli.mp4', win.size, fps=60)
+        stream.open()
+        for frameN in range(300):
+            stim.draw()
+            win.flip()
+            stream.addFrame(win._getPixels())
+        stream.close()
+
+    :meth:`~psychopy.visual.Window.startMovieStream` does this for every call
+    to :meth:`~psychopy.visual.Window.getMovieFrame`.
+
+    """
+    def __init__(self, filename, size, fps=30, codec=None, maxFramesWaiting=60,
+                 dropFrames=False, encoderLib='ffpyplayer', encoderOpts=None,
+                 nWorkers=None):
+        self.filename = filename
+        self.size = tuple(int(v) for v in size)
+        self.maxFramesWaiting = max(1, int(maxFramesWaiting))
+        self.dropFrames = dropFrames
+        fileRoot, fileExt = os.path.splitext(filename)
+        self.isImageSequence = fileExt.lower() in IMAGE_SEQUENCE_EXTENSIONS
+        self._nameFormat = fileRoot + '%05d' + fileExt
+        if self.isImageSequence:
+            self._movieWriter = None
+            self._nWorkers = nWorkers or min(4, os.cpu_count() or 1)
+        else:
+            self._movieWriter = MovieFileWriter(
+                filename, self.size, fps, codec=codec,
+                encoderLib=encoderLib, encoderOpts=encoderOpts,
+                maxFramesWaiting=self.maxFramesWaiting)
+
+        self._slots = None  # limits the number of frames waiting
+        self._executor = None  # thread pool writing image files
+        self._frameQueue = None  # frames waiting for the movie writer
+        self._encoderThread = None
+        self._dataLock = threading.Lock()
+        self._error = None  # first error raised while encoding
+        self._framesIn = 0
+        self._framesOut = 0
+        self._framesDropped = 0
+
+    @property
+    def isOpen(self):
+        """Whether frames can be added to the stream (`bool`)."""
+        return self._slots is not None
+
+    @property
+    def framesOut(self):
+        """Number of frames encoded so far (`int`). For movie files these may
+        still be waiting in the queue of the movie writer.
+        """
+        with self._dataLock:
+            return self._framesOut
+
+    @property
+    def framesWaiting(self):
+        """Number of frames added but not yet encoded (`int`)."""
+        with self._dataLock:
+            return self._framesIn - self._framesOut
+
+    @property
+    def framesDropped(self):
+        """Number of frames discarded because too many were waiting (`int`).
+        Frames are only discarded if `dropFrames` is `True`.
+        """
+        with self._dataLock:
+            return self._framesDropped
+
+    def open(self):
+        """Start the background threads, after which frames can be added."""
+        if self.isOpen:
+            raise RuntimeError('Frame stream is already open.')
+        self._error = None
+        self._framesIn = self._framesOut = self._framesDropped = 0
+        if self.isImageSequence:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._nWorkers,
+                thread_name_prefix='FrameStreamWriter')
+        else:
+            self._movieWriter.open()
+            self._frameQueue = queue.Queue()
+            self._encoderThread = threading.Thread(
+                target=self._encodeFrames, daemon=True)
+            self._encoderThread.start()
+        self._slots = threading.BoundedSemaphore(self.maxFramesWaiting)
+        _openFrameStreams.add(self)
+        logging.info("Streaming frames to '{}'.".format(self.filename))
+
+    @staticmethod
+    def _toImage(pixels):
+        """Flip window pixels (bottom row first) to the right way up and
+        remove any alpha channel."""
+        return np.ascontiguousarray(pixels[::-1, :, :3])
+
+    def _frameDone(self, error=None):
+        with self._dataLock:
+            self._framesOut += 1
+            if error is not None and self._error is None:
+                self._error = error
+        self._slots.release()
+
+    def _writeImage(self, pixels, fileName):
+        """Write a single frame as an image file, run by the thread pool."""
+        from PIL import Image
+        try:
+            Image.fromarray(self._toImage(pixels)).save(fileName)
+        except Exception as err:  # reported by close()
+            self._frameDone(err)
+        else:
+            self._frameDone()
+
+    def _encodeFrames(self):
+        """Pass frames to the movie writer, run in a background thread."""
+        while True:
+            pixels = self._frameQueue.get()
+            if pixels is None:
+                break
+            try:
+                self._movieWriter.addFrame(self._toImage(pixels))
+            except Exception as err:  # reported by close()
+                self._frameDone(err)
+            else:
+                self._frameDone()
+
+    def addFrame(self, pixels):
+        """Add a frame to be written.
+
+        This only queues the frame, encoding is done in the background. The
+        array is kept until the frame is written, so it shouldn't be changed
+        afterwards.
+
+        Parameters
+        ----------
+        pixels : ndarray
+            Frame as an array of shape (height, width, 3 or 4) of `uint8`, with
+            the bottom row first as returned by `Window._getPixels()`.
+
+        Returns
+        -------
+        bool
+            `True` if the frame was queued, `False` if it was dropped.
+
+        """
+        if not self.isOpen:
+            raise RuntimeError('Frame stream is not open.')
+        if pixels.shape[1::-1] != self.size:
+            raise ValueError(
+                'Frame size {} does not match the stream size {}.'.format(
+                    pixels.shape[1::-1], self.size))
+        if not self._slots.acquire(blocking=not self.dropFrames):
+            with self._dataLock:
+                self._framesDropped += 1
+            return False
+        with self._dataLock:
+            self._framesIn += 1
+            frameN = self._framesIn
+        if self.isImageSequence:
+            self._executor.submit(
+                self._writeImage, pixels, self._nameFormat % frameN)
+        else:
+            self._frameQueue.put(pixels)
+        return True
+
+    def close(self):
+        """Write any frames still waiting and close the stream.
+
+        This blocks until all frames are written, so should be called outside
+        any time-critical code. Any error raised while encoding frames is
+        raised here.
+
+        """
+        if not self.isOpen:
+            return
+        if self.isImageSequence:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        else:
+            self._frameQueue.put(None)
+            self._encoderThread.join()
+            self._encoderThread = self._frameQueue = None
+            self._movieWriter.close()
+        self._slots = None
+        _openFrameStreams.discard(self)
+
+        logging.info("Wrote {} frames to '{}' ({} dropped).".format(
+            self._framesOut, self.filename, self._framesDropped))
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
 def closeAllMovieWriters():
     """Signal all movie writers to close.
 
@@ -949,6 +1204,14 @@ def closeAllMovieWriters():
     """
     global _openMovieWriters
 
+    # frame streams pass frames to movie writers, so need closing first
+    for frameStream in _openFrameStreams.copy():
+        try:
+            frameStream.close()
+        except Exception as err:
+            logging.error("Error writing frames to '{}': {}".format(
+                frameStream.filename, err))
+
     if not _openMovieWriters:  # do nothing if no movie writers are open
         return
 
@@ -40,13 +40,16 @@ from psychopy.tools.attributetools import (attributeSetter, logAttrib,
                                            setAttribute, AttributeGetSetMixin)
 from psychopy.tools.monitorunittools import (cm2pix, deg2pix, pix2cm,
                                              pix2deg, convertToPix)
-from psychopy.visual.helpers import (pointInPolygon, polygonsOverlap,
-                                     setColor, findImageFile)
+from psychopy.visual.helpers import (pointInPolygon, pointsInPolygons,
+                                     polygonsOverlap, setColor, findImageFile)
 from psychopy.tools.typetools import float_uint8
 from psychopy.tools.arraytools import makeRadialMatrix, createLumPattern
 from psychopy.event import Mouse
 from psychopy.tools.colorspacetools import dkl2rgb, lms2rgb  # pylint: disable=W0611
 
+from psychopy.visual.imagecache import (imagePrefetcher, lumToRGB,
+                                        prepareImageTexture)
+from psychopy.visual.imagecache import reportNImageResizes  # pylint: disable=W0611
 from . import globalVars
 
 import numpy
@@ -54,8 +57,6 @@ from numpy import pi
 
 from psychopy.constants import NOT_STARTED, STARTED, STOPPED
 
-reportNImageResizes = 5  # permitted number of resizes
-
 """
 There are several base and mix-in visual classes for multiple inheritance:
   - MinimalStim:       non-visual house-keeping code common to all visual stim
@@ -919,21 +920,57 @@ class ContainerMixin:
                 units = self.units
         if units != 'pix':
             xy = convertToPix(xy, pos=(0, 0), units=units, win=self.win)
-        # ourself in pixels
+        if numpy.shape(xy) != (2,):
+            # not a single point, e.g. the vertices of another stimulus
+            return pointInPolygon(xy[0], xy[1], poly=self._hitPolygon)
+        # ourself in pixels, along with our bounding box, are kept until we
+        # next change
+        return bool(pointsInPolygons([xy], [self])[0, 0])
+
+    def containsPoints(self, points, units=None):
+        """Returns which of several points are inside the stimulus' border.
+
+        Tests all the points at once, which is much faster than calling
+        :meth:`contains` for each, e.g. for all the gaze samples from a
+        frame.
+
+        Parameters
+        ----------
+        points : array_like
+            Points to test, as an array of (x, y) pairs.
+        units : str or None
+            Units of the points. If `None`, the units of the stimulus are
+            used.
+
+        Returns
+        -------
+        ndarray
+            Boolean array which is `True` for points inside the stimulus.
+
+        """
+        points = numpy.asarray(points, dtype=float).reshape((-1, 2))
+        if units is None:
+            units = self.units
+        if units != 'pix':
+            points = convertToPix(points, pos=(0, 0), units=units,
+                                  win=self.win)
+        return pointsInPolygons(points, [self])[:, 0]
+
+    @property
+    def _hitPolygon(self):
+        """Vertices (in pixels) of the polygon used by :meth:`contains`."""
         if hasattr(self, 'border'):
-            poly = self._borderPix  # e.g., outline vertices
+            return self._borderPix  # e.g., outline vertices
         elif hasattr(self, 'boundingBox'):
             if abs(self.ori) > 0.1:
                 raise RuntimeError("TextStim.contains() doesn't currently "
                                    "support rotated text.")
             w, h = self.boundingBox  # e.g., outline vertices
             x, y = self.posPix
-            poly = numpy.array([[x+w/2, y-h/2], [x-w/2, y-h/2],
+            return numpy.array([[x+w/2, y-h/2], [x-w/2, y-h/2],
                                 [x-w/2, y+h/2], [x+w/2, y+h/2]])
         else:
-            poly = self.verticesPix  # e.g., tessellated vertices
-
-        return pointInPolygon(xy[0], xy[1], poly=poly)
+            return self.verticesPix  # e.g., tessellated vertices
 
     def overlaps(self, polygon):
         """Returns `True` if this stimulus intersects another one.
@@ -1055,22 +1092,9 @@ class TextureMixin:
             wasLum = True
         else:
             if isinstance(tex, (str, Path)):
-                # maybe tex is the name of a file:
-                filename = findImageFile(tex, checkResources=True)
-                if not filename:
-                    msg = "Couldn't find image %s; check path? (tried: %s)"
-                    logging.error(msg % (tex, os.path.abspath(tex)))
-                    logging.flush()
-                    raise IOError(msg % (tex, os.path.abspath(tex)))
-                try:
-                    im = Image.open(filename)
-                    im = im.transpose(Image.FLIP_TOP_BOTTOM)
-                except IOError:
-                    msg = "Found file '%s', failed to load as an image"
-                    logging.error(msg % (filename))
-                    logging.flush()
-                    msg = "Found file '%s' [= %s], failed to load as an image"
-                    raise IOError(msg % (tex, os.path.abspath(tex)))
+                # maybe tex is the name of a file, which may have been decoded
+                # already by the image prefetcher
+                image = imagePrefetcher.get(tex, pixFormat, dataType, forcePOW2)
             elif hasattr(tex, 'getVideoFrame'):  # camera or movie textures
                 # get an image to configure the initial texture store
                 if hasattr(tex, 'frameSize'):
@@ -1092,6 +1116,8 @@ class TextureMixin:
                     logging.error(msg)
                     logging.flush()
                     raise AttributeError(msg)
+                image = prepareImageTexture(im, pixFormat, dataType, forcePOW2,
+                                            name=tex)
             else:
                 # can't be a file; maybe its an image already in memory?
                 try:
@@ -1101,52 +1127,16 @@ class TextureMixin:
                     logging.error(msg)
                     logging.flush()
                     raise AttributeError(msg)
-            # at this point we have a valid im
-            stim._origSize = im.size
+                image = prepareImageTexture(im, pixFormat, dataType, forcePOW2,
+                                            name=tex)
+            # at this point we have a valid image, already converted to the
+            # array to upload
+            stim._origSize = image.size
             wasImage = True
-            # is it 1D?
-            if im.size[0] == 1 or im.size[1] == 1:
-                logging.error("Only 2D textures are supported at the moment")
-            else:
-                maxDim = max(im.size)
-                powerOf2 = int(2**numpy.ceil(numpy.log2(maxDim)))
-                if im.size[0] != powerOf2 or im.size[1] != powerOf2:
-                    if not forcePOW2:
-                        notSqr = True
-                    elif globalVars.nImageResizes < reportNImageResizes:
-                        msg = ("Image '%s' was not a square power-of-two ' "
-                               "'image. Linearly interpolating to be %ix%i")
-                        logging.warning(msg % (tex, powerOf2, powerOf2))
-                        globalVars.nImageResizes += 1
-                        im = im.resize([powerOf2, powerOf2], Image.BILINEAR)
-                    elif globalVars.nImageResizes == reportNImageResizes:
-                        logging.warning("Multiple images have needed resizing"
-                                        " - I'll stop bothering you!")
-                        im = im.resize([powerOf2, powerOf2], Image.BILINEAR)
-
-            # is it Luminance or RGB?
-            if pixFormat == GL.GL_ALPHA and im.mode != 'L':
-                # we have RGB and need Lum
-                wasLum = True
-                im = im.convert("L")  # force to intensity (need if was rgb)
-            elif im.mode == 'L':  # we have lum and no need to change
-                wasLum = True
-                dataType = GL.GL_FLOAT
-            elif pixFormat == GL.GL_RGB:
-                # we want RGB and might need to convert from CMYK or Lm
-                # texture = im.tostring("raw", "RGB", 0, -1)
-                im = im.convert("RGBA")
-                wasLum = False
-            else:
-                raise ValueError('cannot determine if image is luminance or RGB')
-
-            if dataType == GL.GL_FLOAT:
-                # convert from ubyte to float
-                # much faster to avoid division 2/255
-                intensity = numpy.array(im).astype(
-                    numpy.float32) * 0.0078431372549019607 - 1.0
-            else:
-                intensity = numpy.array(im)
+            wasLum = image.wasLum
+            dataType = image.dataType
+            notSqr = image.notSqr
+            intensity = image.data
 
         if pixFormat == GL.GL_RGB and wasLum and dataType == GL.GL_FLOAT:
             # grating stim on good machine
@@ -1161,23 +1151,21 @@ class TextureMixin:
                 # 32bit float textures
                 # could use GL_LUMINANCE32F_ARB here but check shader code?
                 internalFormat = GL.GL_RGB32F
-            # initialise data array as a float
-            data = numpy.ones((intensity.shape[0], intensity.shape[1], 3),
-                              numpy.float32)
-            data[:, :, 0] = intensity  # R
-            data[:, :, 1] = intensity  # G
-            data[:, :, 2] = intensity  # B
+            if wasImage:
+                # images are converted to RGB already
+                data = intensity
+            else:
+                # initialise data array as a float
+                data = lumToRGB(intensity, numpy.float32)
         elif (pixFormat == GL.GL_RGB and
                 wasLum and
                 dataType != GL.GL_FLOAT):
             # was a lum image: stick with ubyte for speed
             internalFormat = GL.GL_RGB
-            # initialise data array as a float
-            data = numpy.ones((intensity.shape[0], intensity.shape[1], 3),
-                              numpy.ubyte)
-            data[:, :, 0] = intensity  # R
-            data[:, :, 1] = intensity  # G
-            data[:, :, 2] = intensity  # B
+            if wasImage:
+                data = intensity
+            else:
+                data = lumToRGB(intensity, numpy.ubyte)
         elif pixFormat == GL.GL_RGB and dataType == GL.GL_FLOAT:
             # probably a custom rgb array or rgb image
             internalFormat = GL.GL_RGB32F
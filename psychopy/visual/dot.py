@@ -38,7 +38,9 @@ from psychopy.tools.arraytools import val2array
 from psychopy.tools import gltools as gt
 from psychopy.visual.basevisual import (BaseVisualStim, ColorMixin,
                                         ContainerMixin, WindowMixin)
+from psychopy.visual.shape import BaseShapeStim, ShapeStim
 from psychopy.layout import Size
+from psychopy.colors import Color
 
 import numpy as np
 
@@ -107,6 +109,18 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         ``.setPos([x,y])`` method (e.g. a GratingStim, TextStim...)!! DotStim
         assumes that the element uses pixels as units. ``None`` defaults to
         dots.
+    useInstancing : bool
+        If True (default) and `element` is a shape (e.g. a Circle, Rect or
+        Polygon) in pixel units, all dots are drawn in a single instanced call
+        rather than by moving and drawing the element once per dot. Set to
+        False to always use the per-dot loop.
+    dotColors : array_like or None
+        Color of each dot when drawing an `element` instanced, in the
+        stimulus' `colorSpace` (Nx3, or a single color). None to use the
+        element's own fill color.
+    dotOpacities : array_like or None
+        Opacity of each dot when drawing an `element` instanced (Nx1, or a
+        single value). None to use the element's own opacity.
     fieldPos : array_like
         Specifying the location of the centre of the stimulus using a
         :ref:`x,y-pair <attrib-xy>`. See e.g. :class:`.ShapeStim` for more
@@ -151,7 +165,10 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
                  signalDots='same',
                  noiseDots='direction',
                  name=None,
-                 autoLog=None):
+                 autoLog=None,
+                 useInstancing=True,
+                 dotColors=None,
+                 dotOpacities=None):
         """
         Parameters
         ----------
@@ -230,6 +247,14 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
             Optional name to use for logging.
         autoLog : bool
             Enable automatic logging.
+        useInstancing : bool
+            Draw a shape `element` for every dot in a single instanced draw
+            call where possible, rather than looping over dots in Python.
+        dotColors : array_like or None
+            Color of each dot when drawing `element` instanced, in the
+            stimulus' `colorSpace`.
+        dotOpacities : array_like or None
+            Opacity of each dot when drawing `element` instanced.
 
         """
         # what local vars are defined (these are the init params) for use by
@@ -255,6 +280,9 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         self.__dict__['dir'] = dir
         self.speed = speed
         self.element = element
+        self.useInstancing = useInstancing
+        # GL objects for drawing the element instanced, made on first draw
+        self._instanceBuffers = {}
         self.dotLife = dotLife
         self.signalDots = signalDots
 
@@ -269,6 +297,8 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         self.opacity = opacity
         self.contrast = float(contrast)
         self.depth = depth
+        self.dotColors = dotColors
+        self.dotOpacities = dotOpacities
 
         # initialise the dots themselves - give them all random dir and then
         # fix the first n in the array to have the direction specified
@@ -379,6 +409,38 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
         """
         self.__dict__['element'] = element
 
+    @property
+    def dotColors(self):
+        """Color of each dot (Nx3 array, or None) used when drawing a shape
+        `element` instanced, in the stimulus' `colorSpace`. None to use the
+        element's own fill color.
+        """
+        if getattr(self, '_dotColors', None) is not None:
+            return self._dotColors.render(self.colorSpace)
+
+    @dotColors.setter
+    def dotColors(self, value):
+        if value is None:
+            self._dotColors = None
+        else:
+            self._dotColors = Color(value, self.colorSpace, self.contrast)
+
+    def setDotColors(self, colors, colorSpace=None, log=None):
+        """Set the color of each dot, see `dotColors`."""
+        if colorSpace is not None:
+            self.colorSpace = colorSpace
+        self.dotColors = colors
+
+    @attributeSetter
+    def dotOpacities(self, value):
+        """Opacity of each dot (Nx1 array, single value, or None) used when
+        drawing a shape `element` instanced. None to use the element's own
+        opacity.
+        """
+        if value is not None:
+            value = np.asarray(value, dtype=float).flatten()
+        self.__dict__['dotOpacities'] = value
+
     @attributeSetter
     def fieldPos(self, pos):
         """Specifying the location of the centre of the stimulus
@@ -519,7 +581,8 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
             GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
             GL.glDrawArrays(GL.GL_POINTS, 0, self.nDots)
             GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
-        else:
+        elif not (self._canDrawInstanced(win) and
+                  self._drawElementInstanced(win)):
             # we don't want to do the screen scaling twice so for each dot
             # subtract the screen centre
             initialDepth = self.element.depth
@@ -594,7 +657,8 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
                 'GL_POINTS')
 
             gt.useProgram(None)
-        else:
+        elif not (self._canDrawInstanced(win) and
+                  self._drawElementInstanced(win)):
             # we don't want to do the screen scaling twice so for each dot
             # subtract the screen centre
             initialDepth = self.element.depth
@@ -606,6 +670,171 @@ class DotStim(BaseVisualStim, ColorMixin, ContainerMixin):
             # reset depth before going to next frame
             self.element.setDepth(initialDepth)
 
+    def _canDrawInstanced(self, win):
+        """Can `element` be drawn for all dots in one instanced call?
+
+        Only shapes in pixel units can be, as their geometry is just vertices
+        with a fill and border color. Anything else (e.g. textured stimuli)
+        is drawn dot by dot.
+        """
+        return (self.useInstancing and
+                getattr(win, '_progInstancedColor', None) is not None and
+                isinstance(self.element, BaseShapeStim) and
+                self.element.units == 'pix')
+
+    def _getElementLayers(self):
+        """Get the geometry of `element` relative to its position, as a list
+        of (name, vertices, mode, rgba) for its fill and border, replicating
+        what `element.draw()` would draw.
+        """
+        el = self.element
+        posPix = np.asarray(el.pos, dtype=float)
+        layers = []
+        if isinstance(el, ShapeStim):
+            # fill vertices are already split into triangles
+            fillVerts = el.verticesPix
+            fillMode = GL.GL_TRIANGLES
+            borderVerts = el._borderPix
+            drawFill = (el.closeShape and fillVerts.shape[0] > 2 and
+                        el._fillColor != None)
+        else:
+            fillVerts = borderVerts = el.verticesPix
+            if USE_LEGACY_GL:
+                # same as the GL_POLYGON used by the legacy draw (for the
+                # convex shapes it's fit for), but can be drawn instanced
+                fillMode = GL.GL_TRIANGLE_FAN
+                drawFill = fillVerts.shape[0] > 2 and el._fillColor != None
+            else:
+                fillMode = GL.GL_TRIANGLES
+                drawFill = fillVerts.shape[0] >= 2 and el._fillColor != None
+        if drawFill:
+            layers.append(
+                ('fill', fillVerts - posPix, fillMode,
+                 el._fillColor.render('rgba1')))
+        if el._borderColor != None and el.lineWidth:
+            borderRGBA = el._borderColor.render('rgba1')
+            if not isinstance(el, ShapeStim) and el.opacity is not None:
+                borderRGBA[-1] = el.opacity  # as BaseShapeStim.draw does
+            layers.append(
+                ('border', borderVerts - posPix,
+                 GL.GL_LINE_LOOP if el.closeShape else GL.GL_LINE_STRIP,
+                 borderRGBA))
+
+        return layers
+
+    def _getInstanceColors(self, rgba):
+        """Get an Nx4 array of the color of each dot, starting from the
+        element's own color `rgba` and applying `dotColors` and `dotOpacities`.
+        """
+        colors = np.empty((self.nDots, 4), dtype=np.float32)
+        colors[:] = rgba
+        if self._dotColors is not None:
+            colors[:, :3] = np.reshape(
+                self._dotColors.render('rgb1'), (-1, 3))
+        if self.dotOpacities is not None:
+            colors[:, 3] = self.dotOpacities
+
+        return colors
+
+    def _updateInstanceBuffer(self, key, data):
+        """Write `data` to the named VBO, creating it if it doesn't exist
+        or has changed shape. Returns True if the buffer was (re)created.
+        """
+        data = np.ascontiguousarray(data, dtype=np.float32)
+        vbo = self._instanceBuffers.get(key)
+        if vbo is not None and vbo.shape == data.shape:
+            gt.updateVBO(vbo, data)
+            return False
+        if vbo is not None:
+            gt.deleteVBO(vbo)
+        self._instanceBuffers[key] = gt.createVBO(
+            data, usage=GL.GL_DYNAMIC_DRAW)
+
+        return True
+
+    def _drawElementInstanced(self, win):
+        """Draw `element` at every dot position in one instanced draw call
+        per layer (fill and border) of the element.
+
+        Returns False (and turns off `useInstancing`) if instanced drawing
+        isn't supported by the graphics driver, so the caller can fall back to
+        drawing dot by dot.
+        """
+        try:
+            self._drawElementLayersInstanced(win)
+        except Exception as err:
+            gt.useProgram(None)
+            logging.warning(
+                "Could not draw DotStim element instanced, drawing one dot at "
+                "a time instead ({})".format(err))
+            self.useInstancing = False
+            return False
+
+        return True
+
+    def _drawElementLayersInstanced(self, win):
+        el = self.element
+        win.setScale('pix')
+        if not win.USE_LEGACY_GL:
+            win.setOrthographicView()
+
+        _prog = win._progInstancedColor
+        gt.useProgram(_prog)
+        if not win.USE_LEGACY_GL:
+            gt.setUniformMatrix(
+                _prog, b'uProjectionMatrix', win._projectionMatrix,
+                transpose=True)
+            gt.setUniformMatrix(
+                _prog, b'uModelViewMatrix', win._viewMatrix, transpose=True)
+        posLoc = GL.glGetAttribLocation(_prog, b'aPosition')
+        offsetLoc = GL.glGetAttribLocation(_prog, b'aOffset')
+        colorLoc = GL.glGetAttribLocation(_prog, b'aColor')
+
+        if el.interpolate:
+            gt.enable('GL_LINE_SMOOTH')
+            gt.enable('GL_MULTISAMPLE')
+        else:
+            gt.disable('GL_LINE_SMOOTH')
+            gt.disable('GL_MULTISAMPLE')
+
+        # positions of every dot are uploaded once for all layers
+        offsets = self.verticesPix + self.fieldPos
+        newBuffers = self._updateInstanceBuffer('offsets', offsets)
+        for name, verts, mode, rgba in self._getElementLayers():
+            changed = self._updateInstanceBuffer(name + 'Verts', verts)
+            changed |= self._updateInstanceBuffer(
+                name + 'Colors', self._getInstanceColors(rgba))
+            vao = self._instanceBuffers.get(name + 'VAO')
+            if vao is None or changed or newBuffers:
+                if vao is not None:
+                    gt.deleteVAO(vao)
+                vao = self._instanceBuffers[name + 'VAO'] = gt.createVAO(
+                    {posLoc: self._instanceBuffers[name + 'Verts'],
+                     offsetLoc: self._instanceBuffers['offsets'],
+                     colorLoc: self._instanceBuffers[name + 'Colors']},
+                    attribDivisors={offsetLoc: 1, colorLoc: 1})
+            if name == 'border':
+                gt.setLineWidth(el.lineWidth)
+            gt.drawVAO(vao, mode, instanceCount=self.nDots)
+
+        gt.useProgram(None)
+
+    def _freeInstanceBuffers(self):
+        """Delete the GL objects used to draw `element` instanced."""
+        for key, obj in self._instanceBuffers.items():
+            if key.endswith('VAO'):
+                gt.deleteVAO(obj)
+            else:
+                gt.deleteVBO(obj)
+        self._instanceBuffers = {}
+
+    def __del__(self):
+        # remove buffers from graphics card to prevent OpenGL memory leak
+        try:
+            self._freeInstanceBuffers()
+        except (ImportError, ModuleNotFoundError, TypeError, AttributeError):
+            pass  # has probably been garbage-collected already
+
     def _newDotsXY(self, nDots):
         """Returns a uniform spread of dots, according to the `fieldShape` and
         `fieldSize`.
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Timing of the work done by :py:meth:`~psychopy.visual.Window.flip`, per
+stimulus and per phase, to find out what is taking up the frame when frames
+are dropped.
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2025 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = ['FlipProfiler']
+
+import time
+
+import numpy
+
+# the phases of a flip, in the order they happen
+FLIP_PHASES = (
+    'autoDraw',  # drawing autoDraw stimuli (and the splash screen)
+    'editables',  # finding which editable stimulus has focus
+    'fboRender',  # rendering the framebuffer object to the back buffer
+    'swap',  # swapping buffers and resetting the view for the next frame
+    'waitBlanking',  # waiting for the graphics card to finish drawing
+    'callOnFlip',  # functions scheduled with callOnFlip()
+    'frameIntervals',  # recording frame intervals and dropped frames
+    'log',  # logging messages scheduled with logOnFlip()
+    'nextFrame',  # preparing the background etc. for the next frame
+)
+
+# kinds of record
+PHASE = 0
+STIMULUS = 1
+KIND_NAMES = ('phase', 'stimulus')
+
+
+class FlipProfiler:
+    """Record how long each stimulus and each phase of a window flip takes.
+
+    Timings are stored in a fixed size ring buffer, so profiling can be left on
+    for a whole experiment: once it is full, the oldest timings are replaced.
+    Each record holds the frame number, whether it's a phase of the flip or an
+    autoDraw stimulus, the index of the phase or stimulus name in
+    :py:attr:`names`, and the duration in seconds.
+
+    Usually this is used through the window, by setting
+    :py:attr:`~psychopy.visual.Window.profileFlips` to `True`.
+
+    Parameters
+    ----------
+    maxRecords : int
+        Number of records to keep. Each frame uses one record per phase plus
+        one per autoDraw stimulus.
+
+    Examples
+    --------
+    Find the stimuli which take longest to draw::
+
+        win.profileFlips = True
+        ...  # run trials
+        summary = win.flipProfiler.getSummary()
+        for name, stats in summary['stimulus'].items():
+            print(name, stats['p99'])
+
+    """
+    dtype = numpy.dtype([
+        ('frame', numpy.int64),
+        ('kind', numpy.int8),
+        ('name', numpy.int32),
+        ('duration', numpy.float64)])
+
+    def __init__(self, maxRecords=100000):
+        self.maxRecords = int(maxRecords)
+        self._records = numpy.zeros((self.maxRecords,), dtype=self.dtype)
+        self._nRecords = 0  # total number ever added
+        self.names = list(FLIP_PHASES)
+        self._phaseIndex = {name: i for i, name in enumerate(self.names)}
+        # stimuli get their own indices, even if named the same as a phase
+        self._stimIndex = {}
+        self.frameN = 0
+        self._phaseStart = 0.0
+
+    def __len__(self):
+        return min(self._nRecords, self.maxRecords)
+
+    @staticmethod
+    def now():
+        """High resolution time in seconds, for timing stimuli."""
+        return time.perf_counter()
+
+    def _add(self, kind, nameIndex, duration):
+        self._records[self._nRecords % self.maxRecords] = (
+            self.frameN, kind, nameIndex, duration)
+        self._nRecords += 1
+
+    def _getStimIndex(self, name):
+        try:
+            return self._stimIndex[name]
+        except KeyError:
+            self._stimIndex[name] = index = len(self.names)
+            self.names.append(name)
+            return index
+
+    def startFrame(self):
+        """Start timing a new frame, at the start of the flip."""
+        self.frameN += 1
+        self._phaseStart = time.perf_counter()
+
+    def endPhase(self, phase):
+        """Record the time since the end of the last phase (or the start of
+        the frame) as the duration of `phase`, one of `FLIP_PHASES`."""
+        now = time.perf_counter()
+        self._add(PHASE, self._phaseIndex[phase], now - self._phaseStart)
+        self._phaseStart = now
+
+    def addStimulus(self, stim, startTime):
+        """Record the time since `startTime` (from :py:meth:`now`) as the
+        time taken to draw `stim`. Stimuli are identified by their `name`, or
+        their class if they don't have one."""
+        duration = time.perf_counter() - startTime
+        name = getattr(stim, 'name', None) or type(stim).__name__
+        self._add(STIMULUS, self._getStimIndex(name), duration)
+
+    def getRecords(self):
+        """Get the records held, oldest first.
+
+        Returns
+        -------
+        ndarray
+            Structured array with fields `frame`, `kind`, `name` (index into
+            :py:attr:`names`) and `duration`.
+
+        """
+        n = self._nRecords
+        if n <= self.maxRecords:
+            return self._records[:n].copy()
+        start = n % self.maxRecords
+        return numpy.concatenate(
+            (self._records[start:], self._records[:start]))
+
+    def getSummary(self, percentiles=(50, 90, 99)):
+        """Summarise the time taken by each phase and stimulus.
+
+        Parameters
+        ----------
+        percentiles : tuple of float
+            Percentiles of the durations to give.
+
+        Returns
+        -------
+        dict
+            With keys 'phase' and 'stimulus', each a dict mapping names to
+            statistics (in seconds): `n` (number of times recorded), `mean`,
+            `max`, `total`, and each percentile as `'p<percentile>'`, e.g.
+            `p99`. Phases are in the order they happen, stimuli are ordered by
+            total time, longest first.
+
+        """
+        records = self.getRecords()
+        summary = {'phase': {}, 'stimulus': {}}
+        if not len(records):
+            return summary
+        # sort by name then duration, so each name's durations are together
+        order = numpy.lexsort((records['duration'], records['name']))
+        names = records['name'][order]
+        durations = records['duration'][order]
+        kinds = records['kind'][order]
+        nameIDs, starts, counts = numpy.unique(
+            names, return_index=True, return_counts=True)
+        totals = numpy.add.reduceat(durations, starts)
+        for nameID, start, count, total in zip(nameIDs, starts, counts, totals):
+            thisDurations = durations[start:start + count]
+            stats = {
+                'n': int(count),
+                'mean': float(total / count),
+                'max': float(thisDurations[-1]),
+                'total': float(total)}
+            for p, value in zip(percentiles, numpy.percentile(
+                    thisDurations, percentiles)):
+                stats['p%g' % p] = float(value)
+            summary[KIND_NAMES[kinds[start]]][self.names[nameID]] = stats
+        summary['stimulus'] = dict(sorted(
+            summary['stimulus'].items(), key=lambda item: -item[1]['total']))
+        return summary
+
+    def save(self, fileName):
+        """Save the records held to a comma-separated values file, with
+        columns frame, kind, name and duration (in seconds)."""
+        records = self.getRecords()
+        with open(fileName, 'w', encoding='utf-8') as f:
+            f.write('frame,kind,name,duration\n')
+            for frameN, kind, nameID, duration in records.tolist():
+                name = self.names[nameID]
+                if ',' in name or '"' in name:
+                    name = '"%s"' % name.replace('"', '""')
+                f.write('%d,%s,%s,%.9f\n' % (
+                    frameN, KIND_NAMES[kind], name, duration))
+
+    def clear(self):
+        """Remove all records."""
+        self._nRecords = 0
+        self.frameN = 0
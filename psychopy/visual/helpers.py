@@ -86,6 +86,152 @@ def pointInPolygon(x, y, poly):
     return inside
 
 
+# largest number of point-edge pairs tested at once by pointsInPolygons
+_maxHitTestSize = 2 ** 18
+
+
+def _getPolygonEdges(poly):
+    """Get the bounding box and edges of a polygon, for hit testing.
+
+    Stimuli keep the result (in `_hitEdges`) until their vertices in pixels
+    change, so it is only worked out again after a change to their pos, size,
+    ori etc.
+
+    Returns
+    -------
+    tuple
+        Bounding box as (xMin, yMin, xMax, yMax) and the edges as an array
+        with rows yMin, yMax, y1, x1 and dx/dy of each edge, or `None` for
+        both if `poly` has fewer than 3 vertices.
+
+    """
+    obj = None
+    try:  # a stimulus, using the same vertices as its .contains()
+        obj, poly = poly, poly._hitPolygon
+    except AttributeError:
+        try:
+            obj, poly = poly, poly.verticesPix
+        except AttributeError:
+            obj = None
+    if obj is not None:
+        cached = obj.__dict__.get('_hitEdges')
+        # the vertices are a new array whenever they are updated
+        if cached is not None and cached[0] is poly:
+            return cached[1], cached[2]
+
+    verts = np.asarray(poly, dtype=float)
+    if verts.ndim != 2 or len(verts) < 3:
+        bbox = edges = None
+    else:
+        bbox = np.concatenate([verts.min(axis=0), verts.max(axis=0)])
+        x1, y1 = np.roll(verts, 1, axis=0).T
+        x2, y2 = verts.T
+        dy = y2 - y1
+        # horizontal edges are never crossed, so their slope doesn't matter
+        slope = np.divide(x2 - x1, dy, out=np.zeros_like(dy), where=dy != 0)
+        edges = np.array(
+            [np.minimum(y1, y2), np.maximum(y1, y2), y1, x1, slope])
+    if obj is not None:
+        obj.__dict__['_hitEdges'] = (poly, bbox, edges)
+    return bbox, edges
+
+
+def pointsInPolygons(points, polygons):
+    """Determine which of several points are inside each of several polygons.
+
+    This is the same test as :func:`pointInPolygon`, but vectorised so that
+    testing many points (e.g. gaze samples) against many polygons (e.g. ROIs)
+    takes a single call. Points outside the bounding box of a polygon are
+    ruled out before its edges are tested.
+
+    Parameters
+    ----------
+    points : array_like
+        Points to test, as an array of (x, y) pairs in pixels.
+    polygons : list
+        Polygons to test the points against. Each is either an array of (x, y)
+        vertices in pixels or a stimulus, in which case the vertices its
+        `.contains()` method uses are taken (and kept by the stimulus until it
+        next changes).
+
+    Returns
+    -------
+    ndarray
+        Boolean array of shape (len(points), len(polygons)) which is `True`
+        where a point is inside a polygon. Polygons with fewer than 3 vertices
+        contain no points.
+
+    Examples
+    --------
+    Find which ROIs each of the gaze samples from the last frame fell in::
+
+        gazePix = convertToPix(samples, pos=(0, 0), units=win.units, win=win)
+        lookedIn = pointsInPolygons(gazePix, [roi1, roi2, roi3]).any(axis=0)
+
+    """
+    points = np.asarray(points, dtype=float).reshape((-1, 2))
+    nPolys = len(polygons)
+    inside = np.zeros((len(points), nPolys), dtype=bool)
+    if not len(points) or not nPolys:
+        return inside
+    if inside.size == 1:
+        # e.g. from .contains(), where whole-array indexing costs more than
+        # it saves
+        bbox, edges = _getPolygonEdges(polygons[0])
+        if bbox is None:
+            logging.warning(
+                'pointsInPolygons expects polygons with 3 or more vertices')
+            return inside
+        x, y = points[0]
+        if bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
+            yMin, yMax, y1, x1, slope = edges
+            crosses = (y > yMin) & (y <= yMax) & (x <= (y - y1) * slope + x1)
+            inside[0, 0] = np.count_nonzero(crosses) % 2 == 1
+        return inside
+
+    # bounding boxes and edges of each polygon
+    bboxes = np.full((nPolys, 4), np.nan)
+    allEdges = [None] * nPolys
+    for i, poly in enumerate(polygons):
+        bbox, edges = _getPolygonEdges(poly)
+        if bbox is None:
+            logging.warning(
+                'pointsInPolygons expects polygons with 3 or more vertices')
+            continue
+        bboxes[i] = bbox
+        allEdges[i] = edges
+    maxEdges = max(edges.shape[1] if edges is not None else 0
+                   for edges in allEdges)
+    if not maxEdges:
+        return inside
+    # pad to the same number of edges with NaN, which is never crossed
+    padded = np.full((nPolys, 5, maxEdges), np.nan)
+    for i, edges in enumerate(allEdges):
+        if edges is not None:
+            padded[i, :, :edges.shape[1]] = edges
+
+    # only test the edges of polygons whose bounding box holds the point
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    inBox = ((x >= bboxes[:, 0]) & (y >= bboxes[:, 1]) &
+             (x <= bboxes[:, 2]) & (y <= bboxes[:, 3]))
+    pointIdx, polyIdx = np.nonzero(inBox)
+
+    # trace horizontal rays, each edge crossed flips whether inside
+    chunkSize = max(1, _maxHitTestSize // maxEdges)
+    for start in range(0, len(pointIdx), chunkSize):
+        pIdx = pointIdx[start:start + chunkSize]
+        mIdx = polyIdx[start:start + chunkSize]
+        edges = padded[mIdx]
+        yMin, yMax, y1, x1, slope = (edges[:, j] for j in range(5))
+        px = points[pIdx, 0:1]
+        py = points[pIdx, 1:2]
+        crosses = (py > yMin) & (py <= yMax) & (px <= (py - y1) * slope + x1)
+        inside[pIdx, mIdx] = np.count_nonzero(crosses, axis=1) % 2 == 1
+
+    return inside
+
+
 def polygonsOverlap(poly1, poly2):
     """Determine if two polygons intersect; can fail for very pointy polygons.
 
@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Decoding of image files into arrays ready to upload as textures, and a cache
+which does this ahead of time on a worker thread, so that setting the image of
+a stimulus at the start of a trial only needs to upload it to the graphics card.
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2025 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy
+import pyglet
+GL = pyglet.gl
+
+try:
+    from PIL import Image
+except ImportError:
+    from . import Image
+
+from psychopy import logging
+from psychopy.visual.helpers import findImageFile
+from . import globalVars
+
+__all__ = [
+    'ImageTextureData',
+    'loadImageTexture',
+    'prepareImageTexture',
+    'lumToRGB',
+    'ImagePrefetcher',
+    'imagePrefetcher'
+]
+
+reportNImageResizes = 5  # permitted number of resizes
+
+#: Image data ready to be uploaded as a texture. `data` is the array to upload,
+#: `wasLum` whether the image was luminance only, `dataType` the GL data type of
+#: `data`, `size` the size of the original image and `notSqr` whether it is not
+#: a square power of two.
+ImageTextureData = namedtuple(
+    'ImageTextureData', ['data', 'wasLum', 'dataType', 'size', 'notSqr'])
+
+
+def lumToRGB(intensity, dtype):
+    """Copy a luminance array into each channel of an RGB array.
+
+    Parameters
+    ----------
+    intensity : ndarray
+        2D array of luminance values.
+    dtype : numpy dtype
+        Data type of the array to create.
+
+    Returns
+    -------
+    ndarray
+        Array with shape (height, width, 3).
+    """
+    data = numpy.empty((intensity.shape[0], intensity.shape[1], 3), dtype)
+    data[:, :, 0] = intensity  # R
+    data[:, :, 1] = intensity  # G
+    data[:, :, 2] = intensity  # B
+    return data
+
+
+def prepareImageTexture(im, pixFormat, dataType, forcePOW2=True, name=None):
+    """Convert an image (already flipped to have its first row at the bottom)
+    to the array which `TextureMixin._createTexture` will upload.
+
+    Parameters
+    ----------
+    im : :class:`PIL.Image.Image`
+        Image to convert.
+    pixFormat : int
+        Pixel format of the texture, `GL_ALPHA` or `GL_RGB`.
+    dataType : int
+        Requested data type, `GL_UNSIGNED_BYTE` or `GL_FLOAT`. Luminance
+        images are always converted to `GL_FLOAT`.
+    forcePOW2 : bool
+        Resize the image to be a square power of two.
+    name : str or None
+        Name of the image, for any warnings.
+
+    Returns
+    -------
+    ImageTextureData
+        The converted image.
+    """
+    notSqr = False
+    size = im.size
+    # is it 1D?
+    if im.size[0] == 1 or im.size[1] == 1:
+        logging.error("Only 2D textures are supported at the moment")
+    else:
+        maxDim = max(im.size)
+        powerOf2 = int(2**numpy.ceil(numpy.log2(maxDim)))
+        if im.size[0] != powerOf2 or im.size[1] != powerOf2:
+            if not forcePOW2:
+                notSqr = True
+            elif globalVars.nImageResizes < reportNImageResizes:
+                msg = ("Image '%s' was not a square power-of-two ' "
+                       "'image. Linearly interpolating to be %ix%i")
+                logging.warning(msg % (name, powerOf2, powerOf2))
+                globalVars.nImageResizes += 1
+                im = im.resize([powerOf2, powerOf2], Image.BILINEAR)
+            elif globalVars.nImageResizes == reportNImageResizes:
+                logging.warning("Multiple images have needed resizing"
+                                " - I'll stop bothering you!")
+                im = im.resize([powerOf2, powerOf2], Image.BILINEAR)
+
+    # is it Luminance or RGB?
+    if pixFormat == GL.GL_ALPHA and im.mode != 'L':
+        # we have RGB and need Lum
+        wasLum = True
+        im = im.convert("L")  # force to intensity (need if was rgb)
+    elif im.mode == 'L':  # we have lum and no need to change
+        wasLum = True
+        dataType = GL.GL_FLOAT
+    elif pixFormat == GL.GL_RGB:
+        # we want RGB and might need to convert from CMYK or Lm
+        im = im.convert("RGBA")
+        wasLum = False
+    else:
+        raise ValueError('cannot determine if image is luminance or RGB')
+
+    if dataType == GL.GL_FLOAT:
+        # convert from ubyte to float
+        # much faster to avoid division 2/255
+        data = numpy.array(im).astype(
+            numpy.float32) * 0.0078431372549019607 - 1.0
+    else:
+        data = numpy.array(im)
+
+    if pixFormat == GL.GL_RGB and wasLum:
+        data = lumToRGB(data, numpy.float32 if dataType == GL.GL_FLOAT
+                        else numpy.ubyte)
+
+    return ImageTextureData(data, wasLum, dataType, size, notSqr)
+
+
+def loadImageTexture(tex, pixFormat, dataType, forcePOW2=True, filename=None):
+    """Load an image file and convert it to the array which
+    `TextureMixin._createTexture` will upload.
+
+    Parameters
+    ----------
+    tex : str or Path
+        Image file name, see :func:`~psychopy.visual.helpers.findImageFile`.
+    pixFormat, dataType, forcePOW2
+        As for :func:`prepareImageTexture`.
+    filename : str or None
+        Path of the file, if already found by `findImageFile`.
+
+    Returns
+    -------
+    ImageTextureData
+        The converted image.
+    """
+    if not filename:
+        filename = findImageFile(tex, checkResources=True)
+    if not filename:
+        msg = "Couldn't find image %s; check path? (tried: %s)"
+        logging.error(msg % (tex, os.path.abspath(tex)))
+        logging.flush()
+        raise IOError(msg % (tex, os.path.abspath(tex)))
+    try:
+        im = Image.open(filename)
+        im = im.transpose(Image.FLIP_TOP_BOTTOM)
+    except IOError:
+        msg = "Found file '%s', failed to load as an image"
+        logging.error(msg % (filename))
+        logging.flush()
+        msg = "Found file '%s' [= %s], failed to load as an image"
+        raise IOError(msg % (tex, os.path.abspath(tex)))
+
+    return prepareImageTexture(im, pixFormat, dataType, forcePOW2, name=tex)
+
+
+def _isImageFileName(value):
+    """Does this value look like the name of an image file?"""
+    if not isinstance(value, (str, Path)):
+        return False
+    ext = os.path.splitext(str(value))[1].lower()
+    return bool(ext) and ext in Image.registered_extensions()
+
+
+class ImagePrefetcher:
+    """Decodes image files on a worker thread before they're needed, keeping
+    the results in a cache of limited size, so that setting the image of an
+    :class:`~psychopy.visual.ImageStim` only needs to upload it.
+
+    Images are requested with :meth:`prefetch`, or :meth:`prefetchTrials` to
+    get any images named in the upcoming trials of a
+    :class:`~psychopy.data.TrialHandler2`, e.g. during a static period.
+    Images which are set without having been prefetched are loaded as usual,
+    and aren't cached.
+
+    Cached images are looked up by file name, modification time and size, so
+    a file which is changed after being prefetched is loaded again. Once the
+    total size of cached images is more than `maxBytes`, the least recently
+    used are removed.
+
+    Parameters
+    ----------
+    maxBytes : int
+        Memory budget for cached images, in bytes.
+    nWorkers : int
+        Number of threads to decode images on.
+    """
+    # texture settings used by ImageStim
+    defaultPixFormat = GL.GL_RGB
+    defaultDataType = GL.GL_UNSIGNED_BYTE
+
+    def __init__(self, maxBytes=256 * 2 ** 20, nWorkers=1):
+        self.maxBytes = maxBytes
+        self.nWorkers = nWorkers
+        self.nBytes = 0
+        self._executor = None
+        self._lock = threading.Lock()
+        # finished images, most recently used last
+        self._cache = OrderedDict()
+        # images still being decoded
+        self._pending = {}
+
+    @staticmethod
+    def _getKey(filename, pixFormat, dataType, forcePOW2):
+        """Key of an image file (as found by `findImageFile`) in the cache,
+        or None if it wasn't found."""
+        if not filename:
+            return None
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size,
+                pixFormat, dataType, forcePOW2)
+
+    def prefetch(self, images, pixFormat=None, dataType=None, forcePOW2=False):
+        """Start decoding image files on the worker thread(s), if they aren't
+        already cached. Returns immediately.
+
+        Parameters
+        ----------
+        images : str, Path or list
+            Image file name(s).
+        pixFormat : int or None
+            Pixel format of the texture, default is the one used by ImageStim.
+        dataType : int or None
+            Data type of the texture, default is the one used by ImageStim.
+        forcePOW2 : bool
+            Whether the texture will be resized to a square power of two (as
+            for textures of a GratingStim).
+
+        Returns
+        -------
+        int
+            Number of images which will be decoded.
+        """
+        if isinstance(images, (str, Path)):
+            images = [images]
+        if pixFormat is None:
+            pixFormat = self.defaultPixFormat
+        if dataType is None:
+            dataType = self.defaultDataType
+
+        nStarted = 0
+        for tex in images:
+            filename = findImageFile(tex, checkResources=True)
+            key = self._getKey(filename, pixFormat, dataType, forcePOW2)
+            if key is None:
+                continue
+            with self._lock:
+                if key in self._cache or key in self._pending:
+                    continue
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.nWorkers,
+                        thread_name_prefix="ImagePrefetcher")
+                self._pending[key] = self._executor.submit(
+                    self._decode, key, tex, filename, pixFormat, dataType,
+                    forcePOW2)
+            nStarted += 1
+
+        return nStarted
+
+    def prefetchTrials(self, trials, n=1, pixFormat=None, dataType=None,
+                       forcePOW2=False):
+        """Start decoding any image files named in the conditions of the next
+        `n` trials of a trial handler.
+
+        Parameters
+        ----------
+        trials : :class:`~psychopy.data.TrialHandler2`
+            Trial handler to look ahead in. Any object without a
+            `getFutureTrials` method (such as an ExperimentHandler) is
+            ignored, so the current loop of a Builder experiment can always be
+            given.
+        n : int
+            Number of trials to look ahead.
+        pixFormat, dataType, forcePOW2
+            As for :meth:`prefetch`.
+
+        Returns
+        -------
+        int
+            Number of images which will be decoded.
+        """
+        getFutureTrials = getattr(trials, 'getFutureTrials', None)
+        if getFutureTrials is None:
+            return 0
+        images = []
+        for trial in getFutureTrials(n):
+            if not trial:
+                continue
+            for value in trial.values():
+                if _isImageFileName(value) and value not in images:
+                    images.append(value)
+
+        return self.prefetch(images, pixFormat, dataType, forcePOW2)
+
+    def _decode(self, key, tex, filename, pixFormat, dataType, forcePOW2):
+        try:
+            image = loadImageTexture(tex, pixFormat, dataType, forcePOW2,
+                                     filename=filename)
+        except Exception as err:
+            logging.debug("Failed to prefetch image %s: %s" % (tex, err))
+            with self._lock:
+                self._pending.pop(key, None)
+            raise
+        with self._lock:
+            self._pending.pop(key, None)
+            self._cache[key] = image
+            self.nBytes += image.data.nbytes
+            self._evict()
+
+        return image
+
+    def _evict(self):
+        """Remove least recently used images until within the memory budget,
+        always keeping the most recent."""
+        while self.nBytes > self.maxBytes and len(self._cache) > 1:
+            _, image = self._cache.popitem(last=False)
+            self.nBytes -= image.data.nbytes
+
+    def get(self, tex, pixFormat, dataType, forcePOW2=False):
+        """Get an image ready to upload as a texture, from the cache if it was
+        prefetched (waiting for it to finish decoding if need be), otherwise
+        by loading it now.
+
+        Parameters
+        ----------
+        tex : str or Path
+            Image file name.
+        pixFormat, dataType, forcePOW2
+            As for :func:`prepareImageTexture`.
+
+        Returns
+        -------
+        ImageTextureData
+            The image, the array of which should not be modified.
+        """
+        with self._lock:
+            prefetched = bool(self._cache or self._pending)
+        if not prefetched:
+            # nothing to look up, so don't spend time finding the file twice
+            return loadImageTexture(tex, pixFormat, dataType, forcePOW2)
+
+        filename = findImageFile(tex, checkResources=True)
+        key = self._getKey(filename, pixFormat, dataType, forcePOW2)
+        if key is not None:
+            with self._lock:
+                image = self._cache.get(key)
+                if image is not None:
+                    self._cache.move_to_end(key)
+                    return image
+                pending = self._pending.get(key)
+            if pending is not None:
+                try:
+                    return pending.result()
+                except Exception:
+                    # load again below, so errors are raised from here
+                    pass
+
+        return loadImageTexture(tex, pixFormat, dataType, forcePOW2,
+                                filename=filename)
+
+    def isCached(self, tex, pixFormat=None, dataType=None, forcePOW2=False):
+        """Has this image been decoded and cached?"""
+        if pixFormat is None:
+            pixFormat = self.defaultPixFormat
+        if dataType is None:
+            dataType = self.defaultDataType
+        filename = findImageFile(tex, checkResources=True)
+        key = self._getKey(filename, pixFormat, dataType, forcePOW2)
+        with self._lock:
+            return key in self._cache
+
+    def wait(self):
+        """Block until all requested images have been decoded."""
+        with self._lock:
+            pending = list(self._pending.values())
+        for future in pending:
+            try:
+                future.result()
+            except Exception:
+                pass
+
+    def clear(self):
+        """Remove all cached images (any still being decoded are kept)."""
+        with self._lock:
+            self._cache.clear()
+            self.nBytes = 0
+
+
+#: Prefetcher used when creating textures from image files.
+imagePrefetcher = ImagePrefetcher()
@@ -80,6 +80,15 @@ class MovieStim(BaseVisualStim, DraggingMixin, ColorMixin, ContainerMixin):
         the movie is done. Default is `False`.
     autoStart : bool
         Automatically begin playback of the video when `flip()` is called.
+    preload : bool or str
+        Decode every frame of the movie when it's loaded and play it from
+        memory, so that replaying, seeking and looping it take no time. This
+        suits short clips which are shown many times, as decoded movies are
+        kept in a cache shared by all movie stimuli (see
+        :func:`~psychopy.visual.movies.framecache.setFrameCacheSize`) and only
+        need decoding once. Loading takes about as long as the movie lasts and
+        no audio is played. Use `'memmap'` to keep the frames in a
+        memory-mapped temporary file rather than in memory. Default is `False`.
 
     """
     def __init__(self,
@@ -105,7 +114,8 @@ class MovieStim(BaseVisualStim, DraggingMixin, ColorMixin, ContainerMixin):
                  depth=0.0,
                  noAudio=False,
                  interpolate=True,
-                 autoStart=True):
+                 autoStart=True,
+                 preload=False):
 
         # # check if we have the VLC lib
         # if not haveFFPyPlayer:
@@ -137,6 +147,7 @@ class MovieStim(BaseVisualStim, DraggingMixin, ColorMixin, ContainerMixin):
         self._filename = pathToString(filename)
         self._volume = volume
         self._noAudio = noAudio  # cannot be changed
+        self._preload = preload  # cannot be changed
         self.loop = loop
         self._recentFrame = None
         self._autoStart = autoStart
@@ -0,0 +1,300 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Stores of movie frames decoded ahead of time, and a cache of them shared by
+all movie stimuli, so that short clips which are shown many times only need to
+be decoded once.
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2025 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'MovieFrameStore',
+    'MovieFrameCache',
+    'movieFrameCache',
+    'setFrameCacheSize'
+]
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from psychopy import logging
+
+
+class MovieFrameStore:
+    """Every frame of a movie, decoded to an array ready to upload as a
+    texture, with their presentation times.
+
+    Parameters
+    ----------
+    frames : ndarray
+        Array of `uint8` with a row of color data for each frame.
+    pts : ArrayLike
+        Presentation timestamp of each frame in seconds, in increasing order.
+    size : tuple
+        Width and height of the frames in pixels.
+    metadata : dict
+        Metadata of the movie as given by the decoder. The duration is taken
+        from `'duration'` and the frame rate from `'frame_rate'` (as a
+        numerator and denominator).
+
+    """
+    def __init__(self, frames, pts, size, metadata):
+        self.frames = frames
+        self.pts = np.asarray(pts, dtype=float)
+        self.size = tuple(size)
+        self.metadata = metadata
+        self._file = None  # backing file of memory-mapped frames
+
+    @classmethod
+    def fromFrames(cls, frames, size, metadata, memmap=False):
+        """Make a store from frames as they are decoded.
+
+        Parameters
+        ----------
+        frames : iterable
+            Color data (any object supporting the buffer protocol) and
+            presentation timestamp of each frame, as tuples.
+        size, metadata
+            As for :class:`MovieFrameStore`.
+        memmap : bool
+            Write the frames to a temporary file and memory-map it, rather than
+            keeping them in memory. The file is removed once the store is no
+            longer used.
+
+        Returns
+        -------
+        MovieFrameStore
+            Store holding the frames.
+
+        """
+        nBytes = size[0] * size[1] * 4
+        pts = []
+        if memmap:
+            data = tempfile.TemporaryFile(prefix='psychopy_movie_')
+            for colorData, framePts in frames:
+                data.write(colorData)
+                pts.append(framePts)
+            data.flush()
+            dataSize = data.tell()
+        else:
+            data = bytearray()
+            for colorData, framePts in frames:
+                data.extend(colorData)
+                pts.append(framePts)
+            dataSize = len(data)
+
+        if not pts:
+            raise RuntimeError("No frames were decoded from the movie.")
+        if dataSize != len(pts) * nBytes:
+            raise ValueError(
+                "Size of the frame data does not match the frame size "
+                "{}x{}.".format(*size))
+
+        if memmap:
+            frameArray = np.memmap(data, dtype=np.uint8, mode='r',
+                                   shape=(len(pts), nBytes))
+        else:
+            frameArray = np.frombuffer(data, dtype=np.uint8).reshape(
+                (len(pts), nBytes))
+
+        store = cls(frameArray, pts, size, metadata)
+        if memmap:
+            store._file = data
+
+        return store
+
+    @property
+    def nFrames(self):
+        """Number of frames in the store (`int`)."""
+        return len(self.pts)
+
+    @property
+    def nBytes(self):
+        """Size of the frame data in bytes (`int`)."""
+        return self.frames.nbytes
+
+    @property
+    def isMemoryMapped(self):
+        """`True` if the frames are kept in a memory-mapped file (`bool`)."""
+        return self._file is not None
+
+    @property
+    def frameInterval(self):
+        """Time each frame is presented for in seconds (`float`), from the
+        frame rate in the metadata, or the times of the frames if that isn't
+        valid.
+        """
+        try:
+            numer, denom = self.metadata['frame_rate']
+            return float(denom) / numer
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            pass
+
+        if self.nFrames > 1:
+            return float(np.median(np.diff(self.pts)))
+
+        return 0.0
+
+    @property
+    def duration(self):
+        """Duration of the movie in seconds (`float`), taken as the end of the
+        last frame if the metadata doesn't give it.
+        """
+        duration = self.metadata.get('duration')
+        if not duration or duration <= 0.0:
+            duration = self.pts[-1] + self.frameInterval
+
+        return float(duration)
+
+    def getFrameIndex(self, movieTime):
+        """Index of the frame to present at a movie time.
+
+        Parameters
+        ----------
+        movieTime : float
+            Time in seconds from the start of the movie.
+
+        Returns
+        -------
+        int
+            Index of the last frame with a timestamp not after `movieTime`,
+            which is the first frame for times before the start of the movie.
+
+        """
+        index = int(np.searchsorted(self.pts, movieTime, side='right')) - 1
+
+        return min(max(index, 0), self.nFrames - 1)
+
+    def getFrame(self, index):
+        """Color data of a frame (`ndarray`), which must not be modified."""
+        return self.frames[index]
+
+
+class MovieFrameCache:
+    """Decoded movies shared between movie stimuli.
+
+    Movies are looked up by file name, modification time and size, so a file
+    which is changed is decoded again, and by whether they're memory-mapped,
+    so each is given as it was asked for. Once the total size of cached movies is
+    more than `maxBytes`, the least recently used are removed from the cache
+    (players presently using them keep them until they load another movie).
+    Memory-mapped movies count towards the budget too, as their frames are held
+    in the file cache of the operating system while they're used.
+
+    Parameters
+    ----------
+    maxBytes : int
+        Budget for cached movies, in bytes.
+
+    """
+    def __init__(self, maxBytes=512 * 2 ** 20):
+        self.maxBytes = maxBytes
+        self.nBytes = 0
+        self._lock = threading.Lock()
+        # decoded movies, most recently used last
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def _getKey(filename, memmap=False):
+        """Key of a movie in the cache, or None if the file can't be found."""
+        try:
+            stat = os.stat(filename)
+        except (OSError, TypeError, ValueError):
+            return None
+
+        return (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size,
+                bool(memmap))
+
+    def get(self, filename, decode, memmap=False):
+        """Get a movie from the cache, decoding it if it isn't there.
+
+        Parameters
+        ----------
+        filename : str
+            Path to the movie file.
+        decode : callable
+            Function called as `decode(filename, memmap=memmap)` to decode the
+            movie, returning a :class:`MovieFrameStore`.
+        memmap : bool
+            Keep the frames of the movie in a memory-mapped file. Movies
+            cached in memory and memory-mapped are kept apart.
+
+        Returns
+        -------
+        MovieFrameStore
+            The decoded movie.
+
+        """
+        key = self._getKey(filename, memmap)
+        if key is not None:
+            with self._lock:
+                store = self._cache.get(key)
+                if store is not None:
+                    self._cache.move_to_end(key)
+                    return store
+
+        # decode without holding the lock, this can take as long as the movie
+        store = decode(filename, memmap=memmap)
+        if key is None:  # not a file, e.g. a stream
+            return store
+
+        if store.nBytes > self.maxBytes:
+            logging.warning(
+                "Decoded movie `{}` ({:.1f} MB) is larger than the movie frame "
+                "cache, so it will be decoded again if it's loaded again. See "
+                "`psychopy.visual.movies.framecache.setFrameCacheSize`.".format(
+                    filename, store.nBytes / 2 ** 20))
+            return store
+
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = store
+                self.nBytes += store.nBytes
+                self._evict()
+
+        return store
+
+    def _evict(self):
+        """Remove least recently used movies until within the budget, always
+        keeping the most recent."""
+        while self.nBytes > self.maxBytes and len(self._cache) > 1:
+            _, store = self._cache.popitem(last=False)
+            self.nBytes -= store.nBytes
+
+    def isCached(self, filename, memmap=False):
+        """Has this movie been decoded and cached (memory-mapped or not)?"""
+        key = self._getKey(filename, memmap)
+        with self._lock:
+            return key in self._cache
+
+    def clear(self):
+        """Remove all movies from the cache."""
+        with self._lock:
+            self._cache.clear()
+            self.nBytes = 0
+
+
+#: Cache of decoded movies, used by movie stimuli in preload mode.
+movieFrameCache = MovieFrameCache()
+
+
+def setFrameCacheSize(maxBytes):
+    """Set the budget for decoded movies shared by movie stimuli in preload
+    mode, removing the least recently used if over it.
+
+    Parameters
+    ----------
+    maxBytes : int
+        Budget in bytes.
+
+    """
+    with movieFrameCache._lock:
+        movieFrameCache.maxBytes = maxBytes
+        movieFrameCache._evict()
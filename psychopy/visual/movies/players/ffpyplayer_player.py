@@ -25,6 +25,7 @@ from psychopy.core import getTime
 from ._base import BaseMoviePlayer
 from ..metadata import MovieMetadata
 from ..frame import MovieFrame, NULL_MOVIE_FRAME_INFO
+from ..framecache import MovieFrameStore, movieFrameCache
 from psychopy.constants import (
     FINISHED, NOT_STARTED, PAUSED, PLAYING, STOPPED, STOPPING, INVALID, SEEKING)
 from psychopy.tools.filetools import pathToString
@@ -40,6 +41,18 @@ DEFAULT_FF_OPTS = {
     'loop': 0           # enable looping
 }
 
+# Options for decoding every frame of a movie ahead of time, without audio and
+# without dropping any frames
+PRELOAD_FF_OPTS = {
+    'sync': 'video',
+    'paused': False,
+    'autoexit': False,
+    'framedrop': False,
+    'an': True,
+    'loop': 1,
+    'out_fmt': 'bgra'
+}
+
 # default queue size for the stream reader
 DEFAULT_FRAME_QUEUE_SIZE = 1
 
@@ -214,6 +227,70 @@ class StreamData:
         return u''
 
 
+def decodeMovieFrames(filename, memmap=False):
+    """Decode every frame of a movie into a store, for playback in preload
+    mode.
+
+    FFPyPlayer gives frames at the rate they are to be presented, so this takes
+    about as long as the movie lasts.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the movie file.
+    memmap : bool
+        Keep the frames in a memory-mapped temporary file rather than in memory.
+
+    Returns
+    -------
+    `~psychopy.visual.movies.framecache.MovieFrameStore`
+        The decoded frames of the movie.
+
+    """
+    handle = MediaPlayer(filename, ff_opts=PRELOAD_FF_OPTS.copy())
+    try:
+        # get the first frame for the size of the frames and the metadata
+        frameData, val = handle.get_frame()
+        while frameData is None and val != 'eof':
+            time.sleep(0.001)
+            frameData, val = handle.get_frame()
+        if frameData is None:
+            raise RuntimeError(
+                "Cannot preload movie `{}`, no frames were decoded.".format(
+                    filename))
+        metadata = handle.get_metadata()
+
+        # give up if decoding takes much longer than the movie should
+        timeout = getTime() + 2.0 * (metadata['duration'] or 0.0) + 5.0
+
+        def iterFrames(frameData, val):
+            while val != 'eof':
+                if frameData is not None:
+                    frameImage, pts = frameData
+                    yield frameImage.to_memoryview()[0].memview, pts
+                elif getTime() > timeout:
+                    logging.warning(
+                        "Timed out preloading movie `{}`, it may be "
+                        "cut short.".format(filename))
+                    return
+                else:  # wait for the next frame, `val` is the time until then
+                    time.sleep(min(val, 0.01) if isinstance(val, float)
+                               else 0.001)
+                frameData, val = handle.get_frame()
+
+        store = MovieFrameStore.fromFrames(
+            iterFrames(frameData, val), frameData[0].get_size(), metadata,
+            memmap=memmap)
+    finally:
+        handle.close_player()
+
+    logging.info(
+        "Preloaded movie `{}` ({} frames, {:.1f} MB)".format(
+            filename, store.nFrames, store.nBytes / 2 ** 20))
+
+    return store
+
+
 class MovieStreamThreadFFPyPlayer(threading.Thread):
     """Class for reading movie streams asynchronously.
 
@@ -715,6 +792,13 @@ class FFPyPlayer(BaseMoviePlayer):
     player classes which closely replicate the behaviour of this one should
     allow them to smoothly plug into `MovieStim`.
 
+    If the `preload` attribute of the parent is set, the whole movie is decoded
+    when it's loaded (see `decodeMovieFrames`) and kept in the cache shared by
+    all players, `~psychopy.visual.movies.framecache.movieFrameCache`. Frames
+    are then presented from there by the time since playback started, so
+    seeking, looping and replaying take no time. Audio is not played in this
+    mode.
+
     """
     _movieLib = 'ffpyplayer'
 
@@ -729,6 +813,12 @@ class FFPyPlayer(BaseMoviePlayer):
         # thread for reading frames asynchronously
         self._tStream = None
 
+        # decoded frames and playback position when preloading
+        self._preload = getattr(self.parent, '_preload', False)
+        self._frameStore = None
+        self._movieTime = 0.0  # position when not playing
+        self._playStartTime = 0.0  # experiment time movie time 0 was at
+
         # data from stream thread
         self._lastFrame = NULL_MOVIE_FRAME_INFO
         self._frameIndex = -1
@@ -760,6 +850,10 @@ class FFPyPlayer(BaseMoviePlayer):
         self._lastFrame = None
         self._frameIndex = -1
 
+        if self._preload:
+            self._startPreloaded()
+            return
+
         # open the media player
         handle = MediaPlayer(self._filename, ff_opts=self._lastPlayerOpts)
         handle.set_pause(True)
@@ -778,6 +872,56 @@ class FFPyPlayer(BaseMoviePlayer):
         # make sure we have metadata
         self.update()
 
+    def _startPreloaded(self):
+        """Get the decoded frames of the movie from the cache (decoding them
+        if need be) and show the first one.
+        """
+        self._frameStore = movieFrameCache.get(
+            self._filename, decodeMovieFrames,
+            memmap=self._preload == 'memmap')
+        self._metadata = self._frameStore.metadata
+        self._loopCount = 0
+        self._status = NOT_STARTED
+        self._seekPreloaded(0.0)
+
+    def _getPreloadedTime(self):
+        """Current movie time when preloaded, not yet wrapped for looping.
+        """
+        if self._status == PLAYING:
+            return getTime() - self._playStartTime
+
+        return self._movieTime
+
+    def _seekPreloaded(self, movieTime):
+        """Move to a movie time when preloaded and show the frame there.
+        """
+        movieTime = min(max(movieTime, 0.0), self._frameStore.duration)
+        self._movieTime = movieTime
+        self._playStartTime = getTime() - movieTime
+        self._showStoredFrame(self._frameStore.getFrameIndex(movieTime))
+
+    def _showStoredFrame(self, frameIndex):
+        """Make a preloaded frame the current one, if it isn't already.
+        """
+        if frameIndex == self._frameIndex and self._lastFrame is not None:
+            return
+
+        store = self._frameStore
+        self._frameIndex = frameIndex
+        self._streamTime = store.pts[frameIndex]
+        self._lastFrame = MovieFrame(
+            frameIndex=frameIndex,
+            absTime=self._streamTime,
+            displayTime=store.frameInterval,
+            size=store.size,
+            colorData=store.getFrame(frameIndex),
+            audioChannels=0,
+            audioSamples=None,
+            metadata=self.metadata,
+            movieLib=u'ffpyplayer',
+            userData=None,
+            keepAlive=store)
+
     def load(self, pathToMovie):
         """Load a movie file from disk.
 
@@ -793,7 +937,7 @@ class FFPyPlayer(BaseMoviePlayer):
 
         # Check if the player is already started. Close it and load a new
         # instance if so.
-        if self._tStream is not None:  # player already started
+        if self.isLoaded:  # player already started
             # make sure it's the correct type
             # if not isinstance(self._handle, MediaPlayer):
             #     raise TypeError(
@@ -813,9 +957,11 @@ class FFPyPlayer(BaseMoviePlayer):
     def unload(self):
         """Unload the video stream and reset.
         """
-        self._tStream.shutdown()
-        self._tStream.join()  # wait until thread exits
-        self._tStream = None
+        if self._tStream is not None:
+            self._tStream.shutdown()
+            self._tStream.join()  # wait until thread exits
+            self._tStream = None
+        self._frameStore = None  # stays in the cache
 
         # if self._handle is not None:
         #     self._handle.close_player()
@@ -834,7 +980,7 @@ class FFPyPlayer(BaseMoviePlayer):
 
     @property
     def isLoaded(self):
-        return self._tStream is not None
+        return self._tStream is not None or self._frameStore is not None
 
     @property
     def metadata(self):
@@ -876,7 +1022,7 @@ class FFPyPlayer(BaseMoviePlayer):
         """Ensure the media player instance is available. Raises a
         `RuntimeError` if no movie is loaded.
         """
-        if self._tStream is not None:
+        if self._tStream is not None or self._frameStore is not None:
             return  # nop if we're good
 
         raise RuntimeError(
@@ -923,6 +1069,9 @@ class FFPyPlayer(BaseMoviePlayer):
     def isFinished(self):
         """`True` if the video is finished (`bool`).
         """
+        if self._frameStore is not None:
+            return self._status == FINISHED
+
         return self._tStream.isFinished
 
     def play(self, log=False):
@@ -943,6 +1092,14 @@ class FFPyPlayer(BaseMoviePlayer):
         """
         self._assertMediaPlayer()
 
+        if self._frameStore is not None:
+            if self._status == FINISHED:  # play again from the start
+                self._seekPreloaded(0.0)
+            elif self._status != PLAYING:
+                self._playStartTime = getTime() - self._movieTime
+            self._status = PLAYING
+            return
+
         self._tStream.play()
         self._status = PLAYING
 
@@ -959,6 +1116,12 @@ class FFPyPlayer(BaseMoviePlayer):
             Log the stop event.
 
         """
+        if self._frameStore is not None:
+            self._status = STOPPED
+            self._loopCount = 0
+            self._seekPreloaded(0.0)
+            return
+
         self._tStream.stop()
         self._status = STOPPED
 
@@ -974,6 +1137,13 @@ class FFPyPlayer(BaseMoviePlayer):
         """
         self._assertMediaPlayer()
 
+        if self._frameStore is not None:
+            if self._status == PLAYING:
+                self.update()  # wrap around if looping
+                self._movieTime = self._getPreloadedTime()
+                self._status = PAUSED
+            return False
+
         self._tStream.pause()
         self._enqueueFrame()
 
@@ -993,6 +1163,10 @@ class FFPyPlayer(BaseMoviePlayer):
 
         """
         self._assertMediaPlayer()
+        if self._frameStore is not None:
+            self._seekPreloaded(timestamp)
+            return
+
         self._tStream.seek(timestamp, relative=False)
         self._enqueueFrame()
 
@@ -1014,6 +1188,11 @@ class FFPyPlayer(BaseMoviePlayer):
 
         """
         self._assertMediaPlayer()
+        if self._frameStore is not None:
+            self.update()
+            self._seekPreloaded(self._getPreloadedTime() - seconds)
+            return
+
         self._tStream.seek(-seconds, relative=True)
 
     def fastForward(self, seconds=5, log=False):
@@ -1029,6 +1208,11 @@ class FFPyPlayer(BaseMoviePlayer):
 
         """
         self._assertMediaPlayer()
+        if self._frameStore is not None:
+            self.update()
+            self._seekPreloaded(self._getPreloadedTime() + seconds)
+            return
+
         self._tStream.seek(seconds, relative=True)
 
     def replay(self, autoStart=False, log=False):
@@ -1120,14 +1304,20 @@ class FFPyPlayer(BaseMoviePlayer):
     @property
     def volume(self):
         """Volume for the audio track for this movie (`int` or `float`).
+        Always `0.0` when preloaded, as audio isn't played.
         """
         self._assertMediaPlayer()
+        if self._tStream is None:
+            return 0.0
 
         return self._tStream.getVolume()
 
     @volume.setter
     def volume(self, value):
         self._assertMediaPlayer()
+        if self._tStream is None:
+            return
+
         self._tStream.setVolume(max(min(value, 1.0), 0.0))
 
     @property
@@ -1154,7 +1344,7 @@ class FFPyPlayer(BaseMoviePlayer):
         value of `-1.0` is invalid.
 
         """
-        if self._tStream is None:
+        if not self.isLoaded:
             return -1.0
 
         return self._lastFrame.absTime
@@ -1366,6 +1556,10 @@ class FFPyPlayer(BaseMoviePlayer):
         """
         self._assertMediaPlayer()
 
+        if self._frameStore is not None:
+            self._updatePreloaded()
+            return
+
         # check if the stream reader thread is present and alive, if not the
         # movie is finished
         self._enqueueFrame()
@@ -1373,6 +1567,23 @@ class FFPyPlayer(BaseMoviePlayer):
         if self._tStream.isFinished:  # are we done?
             self._status = FINISHED
 
+    def _updatePreloaded(self):
+        """Show the preloaded frame for the current movie time.
+        """
+        movieTime = self._getPreloadedTime()
+        duration = self._frameStore.duration
+        if self._status == PLAYING and movieTime >= duration > 0.0:
+            if self.parent.loop:
+                nLoops = int(movieTime // duration)
+                self._loopCount += nLoops
+                self._playStartTime += nLoops * duration
+                movieTime -= nLoops * duration
+            else:
+                self._movieTime = movieTime = duration
+                self._status = FINISHED
+
+        self._showStoredFrame(self._frameStore.getFrameIndex(movieTime))
+
     def getMovieFrame(self):
         """Get the movie frame scheduled to be displayed at the current time.
 
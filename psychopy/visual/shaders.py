@@ -288,6 +288,31 @@ if USE_LEGACY_GL:
         }
         """
 
+    # for drawing many copies of the same (untextured) geometry in one call,
+    # each instance has its own offset and color
+    vertInstancedColor = """
+        attribute vec2 aPosition;
+        attribute vec2 aOffset;  // per-instance
+        attribute vec4 aColor;  // per-instance
+        void main() {
+                gl_FrontColor = aColor;
+                gl_Position = gl_ModelViewProjectionMatrix *
+                    vec4(aPosition + aOffset, 0.0, 1.0);
+        }
+        """
+    fragInstancedColor = """
+        void main() {
+            gl_FragColor.rgb = ((gl_Color.rgb * 2.0 - 1.0) + 1.0) / 2.0;
+            gl_FragColor.a = gl_Color.a;
+        }
+        """
+    fragInstancedColor_adding = """
+        void main() {
+            gl_FragColor.rgb = (gl_Color.rgb * 2.0 - 1.0) / 2.0;
+            gl_FragColor.a = gl_Color.a;
+        }
+        """
+
     vertPhongLighting = """
     // Vertex shader for the Phong Shading Model
     // 
@@ -608,6 +633,33 @@ else:
         }
     """
 
+    # for drawing many copies of the same (untextured) geometry in one call,
+    # each instance has its own offset and color
+    vertInstancedColor = """
+        attribute vec2 aPosition;
+        attribute vec2 aOffset;  // per-instance
+        attribute vec4 aColor;  // per-instance
+        uniform mat4 uModelViewMatrix;
+        uniform mat4 uProjectionMatrix;
+        void main() {
+                gl_FrontColor = aColor;
+                gl_Position = uProjectionMatrix * uModelViewMatrix *
+                    vec4(aPosition + aOffset, 0.0, 1.0);
+        }
+    """
+    fragInstancedColor = """
+        void main() {
+            gl_FragColor.rgb = ((gl_Color.rgb * 2.0 - 1.0) + 1.0) / 2.0;
+            gl_FragColor.a = gl_Color.a;
+        }
+        """
+    fragInstancedColor_adding = """
+        void main() {
+            gl_FragColor.rgb = (gl_Color.rgb * 2.0 - 1.0) / 2.0;
+            gl_FragColor.a = gl_Color.a;
+        }
+        """
+
     vertPhongLighting = """
     // Vertex shader for the Phong Shading Model
     // 
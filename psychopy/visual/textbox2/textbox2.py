@@ -16,7 +16,10 @@ some more added:
 
 """
 from ast import literal_eval
+from collections import OrderedDict
 
+import bisect
+import os
 import numpy as np
 import sys
 from arabic_reshaper import ArabicReshaper
@@ -72,6 +75,413 @@ debug = False
 # If text is ". " we don't want to start next line with single space?
 
 
+class GlyphRunCache:
+    """Least-recently-used cache of laid out text (:class:`GlyphRun`), keyed
+    by the font, layout settings, text and styles, so that text which is shown
+    repeatedly (e.g. a countdown) doesn't need laying out again.
+
+    Parameters
+    ----------
+    maxSize : int
+        Maximum number of glyph runs to keep
+    """
+    def __init__(self, maxSize=128):
+        self.maxSize = maxSize
+        self._runs = OrderedDict()
+
+    def __len__(self):
+        return len(self._runs)
+
+    def get(self, key):
+        """Get the run stored for `key` (or None), marking it as recently used"""
+        run = self._runs.get(key)
+        if run is not None:
+            self._runs.move_to_end(key)
+        return run
+
+    def put(self, key, run):
+        """Store a run, removing the least recently used if the cache is full"""
+        self._runs[key] = run
+        self._runs.move_to_end(key)
+        while len(self._runs) > self.maxSize:
+            self._runs.popitem(last=False)
+
+    def clear(self):
+        self._runs.clear()
+
+
+# glyph runs are shared by all textboxes
+glyphRunCache = GlyphRunCache()
+
+
+class GlyphRun:
+    """The layout of some text in pixels, before alignment: the vertices and
+    texture coordinates of each character's glyph, the line each character is
+    on and the width and bottom of each line. This depends only on the text,
+    its bold/italic styles, the font and the layout settings, so is cached in
+    :data:`glyphRunCache`.
+
+    When laying out with the default line breaking, the state of the layout is
+    also stored at the start of each line (once any word wrapped onto it has
+    finished), so that text which has been edited can be laid out again from
+    the line where it changed rather than from the start.
+    """
+    def __init__(self, text, bold, italic):
+        self.text = text
+        self.bold = bold
+        self.italic = italic
+        nChars = len(text)
+        self.vertices = np.zeros((nChars * 4, 2), dtype=np.float32)
+        self.texcoords = np.zeros((nChars * 4, 2), dtype=np.double)
+        self.lineNs = np.zeros(nChars, dtype=int)
+        self.lineBottoms = []
+        self.lineLenChars = []
+        self.lineWidths = []
+        self.renderChars = []
+        self.current = [0, 0]
+        # index of the character each saved state is from, and the states
+        self.checkpointIndices = []
+        self.checkpoints = []
+        # the font and settings this was laid out with
+        self.settings = None
+
+    def changedFrom(self, text, bold, italic):
+        """Index of the first character which is different in the given text
+        and styles to this run's."""
+        n = len(os.path.commonprefix([self.text, text]))
+        if self.bold[:n] != bold[:n] or self.italic[:n] != italic[:n]:
+            for i in range(n):
+                if self.bold[i] != bold[i] or self.italic[i] != italic[i]:
+                    return i
+        return n
+
+
+def _layoutDefault(text, bold, italic, font, lineMax, letterSpacing,
+                   alphaCorrection, previous=None):
+    """Lay out text with the default line breaking, wrapping at spaces and
+    hyphens. If a previous run with the same font and settings is given, its
+    layout is reused up to the last line which starts before the first changed
+    character.
+    """
+    run = GlyphRun(text, bold, italic)
+    vertices = run.vertices
+    start = 0
+    current = [0, 0 - font.ascender]
+    wordLen = 0
+    charsThisLine = 0
+    wordsThisLine = 0
+    lineN = 0
+    if previous is not None:
+        changed = previous.changedFrom(text, bold, italic)
+        nCheckpoints = bisect.bisect_right(previous.checkpointIndices, changed)
+        if nCheckpoints:
+            # resume from the state at the last checkpoint before the change
+            nCheckpoints -= 1
+            start = previous.checkpointIndices[nCheckpoints]
+            (current, charsThisLine, wordsThisLine, lineN,
+             nBottoms, nLines, nWidths, nRender) = previous.checkpoints[nCheckpoints]
+            current = list(current)
+            vertices[:start * 4] = previous.vertices[:start * 4]
+            run.texcoords[:start * 4] = previous.texcoords[:start * 4]
+            run.lineNs[:start] = previous.lineNs[:start]
+            run.lineBottoms = previous.lineBottoms[:nBottoms]
+            run.lineLenChars = previous.lineLenChars[:nLines]
+            run.lineWidths = previous.lineWidths[:nWidths]
+            run.renderChars = previous.renderChars[:nRender]
+            run.checkpointIndices = previous.checkpointIndices[:nCheckpoints]
+            run.checkpoints = previous.checkpoints[:nCheckpoints]
+    _lineBottoms = run.lineBottoms
+    _lineWidths = run.lineWidths
+    lastCheckpointLine = -1
+
+    for i in range(start, len(text)):
+        charcode = text[i]
+        if wordLen == 0 and lineN != lastCheckpointLine:
+            # nothing before here can move now, so we could resume from here
+            run.checkpointIndices.append(i)
+            run.checkpoints.append((
+                tuple(current), charsThisLine, wordsThisLine, lineN,
+                len(_lineBottoms), len(run.lineLenChars), len(_lineWidths),
+                len(run.renderChars)))
+            lastCheckpointLine = lineN
+
+        printable = True  # unless we decide otherwise
+        # handle formatting codes
+        fakeItalic = 0.0
+        fakeBold = 0.0
+        if italic[i]:
+            fakeItalic = 0.1 * font.size
+        if bold[i]:
+            fakeBold = 0.3 * font.size
+
+        # handle newline
+        if charcode == '\n':
+            printable = False
+
+        # handle printable characters
+        if printable:
+            glyph = font[charcode]
+            if showWhiteSpace and charcode == " ":
+                glyph = font[u"·"]
+            elif charcode == " ":
+                # glyph size of space is smaller than actual size, so use size of dot instead
+                glyph.size = font[u"·"].size
+            # Get top and bottom coords
+            yTop = current[1] + glyph.offset[1]
+            yBot = yTop - glyph.size[1]
+            # Get x mid point
+            xMid = current[0] + glyph.offset[0] + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
+            # Get left and right corners from midpoint
+            xBotL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeItalic - fakeBold / 2
+            xBotR = xMid + glyph.size[0] * alphaCorrection / 2 - fakeItalic + fakeBold / 2
+            xTopL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeBold / 2
+            xTopR = xMid + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
+
+            u0 = glyph.texcoords[0]
+            v0 = glyph.texcoords[1]
+            u1 = glyph.texcoords[2]
+            v1 = glyph.texcoords[3]
+        else:
+            glyph = font[u"·"]
+            x = current[0] + glyph.offset[0]
+            yTop = current[1] + glyph.offset[1]
+            yBot = yTop - glyph.size[1]
+            xBotL = x
+            xTopL = x
+            xBotR = x
+            xTopR = x
+            u0 = glyph.texcoords[0]
+            v0 = glyph.texcoords[1]
+            u1 = glyph.texcoords[2]
+            v1 = glyph.texcoords[3]
+
+        theseVertices = [[xTopL, yTop], [xBotL, yBot],
+                         [xBotR, yBot], [xTopR, yTop]]
+        texcoords = [[u0, v0], [u0, v1],
+                     [u1, v1], [u1, v0]]
+
+        vertices[i * 4:i * 4 + 4] = theseVertices
+        run.texcoords[i * 4:i * 4 + 4] = texcoords
+        run.lineNs[i] = lineN
+        current[0] = current[0] + (glyph.advance[0] + fakeBold / 2) * letterSpacing
+        current[1] = current[1] + glyph.advance[1]
+
+        # are we wrapping the line?
+        if charcode == "\n":
+            # check if we have stored the top/bottom of the previous line yet
+            if lineN + 1 > len(_lineBottoms):
+                _lineBottoms.append(current[1])
+            lineWPix = current[0]
+            current[0] = 0
+            current[1] -= font.height
+            lineN += 1
+            charsThisLine += 1
+            run.lineLenChars.append(charsThisLine)
+            _lineWidths.append(lineWPix)
+            charsThisLine = 0
+            wordsThisLine = 0
+        elif charcode in wordBreaks:
+            wordLen = 0
+            charsThisLine += 1
+            wordsThisLine += 1
+        elif printable:
+            wordLen += 1
+            charsThisLine += 1
+
+        # end line with auto-wrap on space
+        if current[0] >= lineMax and wordLen > 0:
+            # move the current word to next line
+            lineBreakPt = vertices[(i - wordLen + 1) * 4, 0]
+            if wordsThisLine <= 1:
+                # if whole line is just 1 word, wrap regardless of presence of wordbreak
+                wordLen = 0
+                charsThisLine += 1
+                wordsThisLine += 1
+                # add hyphen
+                run.renderChars.append({
+                    "i": i,
+                    "current": (current[0], current[1]),
+                    "glyph": font["-"]
+                })
+                # store linebreak point
+                lineBreakPt = current[0]
+            wordWidth = current[0] - lineBreakPt
+            # shift all chars of the word left by wordStartX
+            vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 0] -= lineBreakPt
+            vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 1] -= font.height
+            # update line values
+            run.lineNs[i - wordLen + 1: i + 1] += 1
+            run.lineLenChars.append(charsThisLine - wordLen)
+            _lineWidths.append(lineBreakPt)
+            lineN += 1
+            # and set current to correct location
+            current[0] = wordWidth
+            current[1] -= font.height
+            charsThisLine = wordLen
+            wordsThisLine = 1
+
+        # have we stored the top/bottom of this line yet
+        if lineN + 1 > len(_lineBottoms):
+            _lineBottoms.append(current[1])
+
+    # add length of this (unfinished) line
+    _lineWidths.append(current[0])
+    run.lineLenChars.append(charsThisLine)
+    run.current = current
+
+    return run
+
+
+def _layoutUAX14(text, bold, italic, font, lineMax, alphaCorrection):
+    """Lay out text, breaking lines in accordance with UAX#14 (Unicode Line
+    Breaking Algorithm).
+    """
+    run = GlyphRun(text, bold, italic)
+    vertices = run.vertices
+    current = [0, 0 - font.ascender]
+    _lineBottoms = run.lineBottoms
+    _lineWidths = run.lineWidths
+
+    # get a list of line-breakable points according to UAX#14
+    breakable_points = list(get_breakable_points(text))
+    text_seg = list(break_units(text, breakable_points))
+
+    lineN = 0
+    charwidth_list = []
+    segwidth_list = []
+    y_advance_list = []
+    vertices_list = []
+    texcoords_list = []
+
+    # calculate width of each segments
+    for this_seg in range(len(text_seg)):
+
+        thisSegWidth = 0 # width of this segment
+
+        for i, charcode in enumerate(text_seg[this_seg]):
+            printable = True  # unless we decide otherwise
+            # handle formatting codes
+            fakeItalic = 0.0
+            fakeBold = 0.0
+            if italic[i]:
+                fakeItalic = 0.1 * font.size
+            if bold[i]:
+                fakeBold = 0.3 * font.size
+
+            # handle newline
+            if charcode == '\n':
+                printable = False
+
+            # handle printable characters
+            if printable:
+                if showWhiteSpace and charcode == " ":
+                    glyph = font[u"·"]
+                else:
+                    glyph = font[charcode]
+                xBotL = glyph.offset[0] - fakeItalic - fakeBold / 2
+                xTopL = glyph.offset[0] - fakeBold / 2
+                yTop = glyph.offset[1]
+                xBotR = xBotL + glyph.size[0] * alphaCorrection + fakeBold
+                xTopR = xTopL + glyph.size[0] * alphaCorrection + fakeBold
+                yBot = yTop - glyph.size[1]
+                u0 = glyph.texcoords[0]
+                v0 = glyph.texcoords[1]
+                u1 = glyph.texcoords[2]
+                v1 = glyph.texcoords[3]
+            else:
+                glyph = font[u"·"]
+                x = glyph.offset[0]
+                yTop = glyph.offset[1]
+                yBot = yTop - glyph.size[1]
+                xBotL = x
+                xTopL = x
+                xBotR = x
+                xTopR = x
+                u0 = glyph.texcoords[0]
+                v0 = glyph.texcoords[1]
+                u1 = glyph.texcoords[2]
+                v1 = glyph.texcoords[3]
+
+            # calculate width and update segment width
+            w = glyph.advance[0] + fakeBold / 2
+            thisSegWidth += w
+
+            # keep vertices, texcoords, width and y_advance of this character
+            vertices_list.append([[xTopL, yTop], [xBotL, yBot],
+                                  [xBotR, yBot], [xTopR, yTop]])
+            texcoords_list.append([[u0, v0], [u0, v1],
+                                   [u1, v1], [u1, v0]])
+            charwidth_list.append(w)
+            y_advance_list.append(glyph.advance[1])
+
+        # append width of this segment to the list
+        segwidth_list.append(thisSegWidth)
+
+    # concatenate segments to build line
+    lines = []
+    while text_seg:
+        line_width = 0
+        for i in range(len(text_seg)):
+            # if this segment is \n, break line here.
+            if text_seg[i][-1] == '\n':
+                i+=1 # increment index to include \n to current line
+                break
+            # concatenate next segment
+            line_width += segwidth_list[i]
+            # break if line_width is greater than lineMax
+            if lineMax < line_width:
+                break
+        else:
+            # if for sentence finished without break, all segments
+            # should be concatenated.
+            i = len(text_seg)
+        p = max(1, i)
+        # concatenate segments and remove from segment list
+        lines.append("".join(text_seg[:p]))
+        del text_seg[:p], segwidth_list[:p] #, avoid[:p]
+
+    # build lines
+    i = 0 # index of the current character
+    if lines:
+        for line in lines:
+            for c in line:
+                theseVertices = vertices_list[i]
+                #update vertices
+                for j in range(4):
+                    theseVertices[j][0] += current[0]
+                    theseVertices[j][1] += current[1]
+                texcoords = texcoords_list[i]
+
+                vertices[i * 4:i * 4 + 4] = theseVertices
+                run.texcoords[i * 4:i * 4 + 4] = texcoords
+                run.lineNs[i] = lineN
+
+                current[0] = current[0] + charwidth_list[i]
+                current[1] = current[1] + y_advance_list[i]
+
+                # have we stored the top/bottom of this line yet
+                if lineN + 1 > len(_lineBottoms):
+                    _lineBottoms.append(current[1])
+
+                # next chacactor
+                i += 1
+
+            # prepare for next line
+            current[0] = 0
+            current[1] -= font.height
+
+            lineBreakPt = vertices[(i-1) * 4, 0]
+            run.lineLenChars.append(len(line))
+            _lineWidths.append(lineBreakPt)
+
+            # need not increase lineN when the last line doesn't end with '\n'
+            if lineN < len(lines)-1 or line[-1] == '\n' :
+                lineN += 1
+    run.current = current
+
+    return run
+
+
 class TextBox2(BaseVisualStim, PointerMixin, DraggingMixin, ContainerMixin, ColorMixin):
     def __init__(self, win, text,
                  font="Noto Sans",
@@ -365,7 +775,11 @@ class TextBox2(BaseVisualStim, PointerMixin, DraggingMixin, ContainerMixin, Colo
     @foreColor.setter
     def foreColor(self, value):
         ColorMixin.foreColor.fset(self, value)
-        self._layout()
+        if getattr(self, '_glyphRun', None) is not None:
+            # only the colours need updating, not the layout
+            self._updateColors()
+        else:
+            self._layout()
         if hasattr(self, "foreColor") and hasattr(self, 'caret'):
             self.caret.color = self._foreColor
 
@@ -802,7 +1216,6 @@ class TextBox2(BaseVisualStim, PointerMixin, DraggingMixin, ContainerMixin, Colo
         self._styles.insert(self.caret.index, cstyle)
         self.caret.index += 1
         self.text = txt
-        self._layout()
 
     def deleteCaretLeft(self):
         """Deletes 1 character to the left of the caret"""
@@ -813,7 +1226,6 @@ class TextBox2(BaseVisualStim, PointerMixin, DraggingMixin, ContainerMixin, Colo
             self._styles = self._styles[:ci-1]+self._styles[ci:]
             self.caret.index -= 1
             self.text = txt
-            self._layout()
 
     def deleteCaretRight(self):
         """Deletes 1 character to the right of the caret"""
@@ -823,326 +1235,33 @@ class TextBox2(BaseVisualStim, PointerMixin, DraggingMixin, ContainerMixin, Colo
             txt = txt[:ci] + txt[ci+1:]
             self._styles = self._styles[:ci]+self._styles[ci+1:]
             self.text = txt
-            self._layout()
         
     def _layout(self):
         """Layout the text, calculating the vertex locations
         """
-        
-        rgb = self._foreColor.render('rgba1')
         font = self.glFont
 
         # the vertices are initially pix (natural for freetype)
         # then we convert them to the requested units for self._vertices
         # then they are converted back during rendering using standard BaseStim
-        visible_text = self._text
-        vertices = np.zeros((len(visible_text) * 4, 2), dtype=np.float32)
-        self._charIndices = np.zeros((len(visible_text)), dtype=int)
-        self._colors = np.zeros((len(visible_text) * 4, 4), dtype=np.double)
-        self._texcoords = np.zeros((len(visible_text) * 4, 2), dtype=np.double)
-        self._glIndices = np.zeros((len(visible_text) * 4), dtype=int)
-        self._renderChars = []
-
-        # the following are used internally for layout
-        self._lineNs = np.zeros(len(visible_text), dtype=int)
-        _lineBottoms = []
-        self._lineLenChars = []  #
-        _lineWidths = []  # width in stim units of each line
-
         lineMax = self.contentBox._size.pix[0]
-        current = [0, 0 - font.ascender]
-        fakeItalic = 0.0
-        fakeBold = 0.0
         # for some reason glyphs too wide when using alpha channel only
         if font.atlas.format == 'alpha':
             alphaCorrection = 1 / 3.0
         else:
             alphaCorrection = 1
 
-        if self._lineBreaking == 'default':
-
-            wordLen = 0
-            charsThisLine = 0
-            wordsThisLine = 0
-            lineN = 0
-
-            for i, charcode in enumerate(self._text):
-                printable = True  # unless we decide otherwise
-                # handle formatting codes
-                fakeItalic = 0.0
-                fakeBold = 0.0
-                if self._styles.i[i]:
-                    fakeItalic = 0.1 * font.size
-                if self._styles.b[i]:
-                    fakeBold = 0.3 * font.size
-
-                # handle newline
-                if charcode == '\n':
-                    printable = False
-
-                # handle printable characters
-                if printable:
-                    glyph = font[charcode]
-                    if showWhiteSpace and charcode == " ":
-                        glyph = font[u"·"]
-                    elif charcode == " ":
-                        # glyph size of space is smaller than actual size, so use size of dot instead
-                        glyph.size = font[u"·"].size
-                    # Get top and bottom coords
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    # Get x mid point
-                    xMid = current[0] + glyph.offset[0] + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-                    # Get left and right corners from midpoint
-                    xBotL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeItalic - fakeBold / 2
-                    xBotR = xMid + glyph.size[0] * alphaCorrection / 2 - fakeItalic + fakeBold / 2
-                    xTopL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeBold / 2
-                    xTopR = xMid + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-                else:
-                    glyph = font[u"·"]
-                    x = current[0] + glyph.offset[0]
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    xBotL = x
-                    xTopL = x
-                    xBotR = x
-                    xTopR = x
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-
-                theseVertices = [[xTopL, yTop], [xBotL, yBot],
-                                 [xBotR, yBot], [xTopR, yTop]]
-                texcoords = [[u0, v0], [u0, v1],
-                             [u1, v1], [u1, v0]]
-
-                vertices[i * 4:i * 4 + 4] = theseVertices
-                self._texcoords[i * 4:i * 4 + 4] = texcoords
-                # handle character color
-                rgb_ = self._styles.c[i]
-                if len(rgb_) > 0:
-                    self._colors[i*4 : i*4+4, :4] = rgb_ # set custom color
-                else:
-                    self._colors[i*4 : i*4+4, :4] = rgb # set default color
-                self._lineNs[i] = lineN
-                current[0] = current[0] + (glyph.advance[0] + fakeBold / 2) * self.letterSpacing
-                current[1] = current[1] + glyph.advance[1]
-
-                # are we wrapping the line?
-                if charcode == "\n":
-                    # check if we have stored the top/bottom of the previous line yet
-                    if lineN + 1 > len(_lineBottoms):
-                        _lineBottoms.append(current[1])
-                    lineWPix = current[0]
-                    current[0] = 0
-                    current[1] -= font.height
-                    lineN += 1
-                    charsThisLine += 1
-                    self._lineLenChars.append(charsThisLine)
-                    _lineWidths.append(lineWPix)
-                    charsThisLine = 0
-                    wordsThisLine = 0
-                elif charcode in wordBreaks:
-                    wordLen = 0
-                    charsThisLine += 1
-                    wordsThisLine += 1
-                elif printable:
-                    wordLen += 1
-                    charsThisLine += 1
-
-                # end line with auto-wrap on space
-                if current[0] >= lineMax and wordLen > 0:
-                    # move the current word to next line
-                    lineBreakPt = vertices[(i - wordLen + 1) * 4, 0]
-                    if wordsThisLine <= 1:
-                        # if whole line is just 1 word, wrap regardless of presence of wordbreak
-                        wordLen = 0
-                        charsThisLine += 1
-                        wordsThisLine += 1
-                        # add hyphen
-                        self._renderChars.append({
-                            "i": i,
-                            "current": (current[0], current[1]),
-                            "glyph": font["-"]
-                        })
-                        # store linebreak point
-                        lineBreakPt = current[0]
-                    wordWidth = current[0] - lineBreakPt
-                    # shift all chars of the word left by wordStartX
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 0] -= lineBreakPt
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 1] -= font.height
-                    # update line values
-                    self._lineNs[i - wordLen + 1: i + 1] += 1
-                    self._lineLenChars.append(charsThisLine - wordLen)
-                    _lineWidths.append(lineBreakPt)
-                    lineN += 1
-                    # and set current to correct location
-                    current[0] = wordWidth
-                    current[1] -= font.height
-                    charsThisLine = wordLen
-                    wordsThisLine = 1
-
-                # have we stored the top/bottom of this line yet
-                if lineN + 1 > len(_lineBottoms):
-                    _lineBottoms.append(current[1])
-
-            # add length of this (unfinished) line
-            _lineWidths.append(current[0])
-            self._lineLenChars.append(charsThisLine)
-
-        elif self._lineBreaking == 'uax14':
-
-            # get a list of line-breakable points according to UAX#14
-            breakable_points = list(get_breakable_points(self._text))
-            text_seg = list(break_units(self._text, breakable_points))
-            styles_seg = list(break_units(self._styles, breakable_points))
-
-            lineN = 0
-            charwidth_list = []
-            segwidth_list = []
-            y_advance_list = []
-            vertices_list = []
-            texcoords_list = []
-
-            # calculate width of each segments
-            for this_seg in range(len(text_seg)):
-
-                thisSegWidth = 0 # width of this segment
-
-                for i, charcode in enumerate(text_seg[this_seg]):
-                    printable = True  # unless we decide otherwise
-                    # handle formatting codes
-                    fakeItalic = 0.0
-                    fakeBold = 0.0
-                    if self._styles.i[i]:
-                        fakeItalic = 0.1 * font.size
-                    if self._styles.b[i]:
-                        fakeBold = 0.3 * font.size
-
-                    # handle newline
-                    if charcode == '\n':
-                        printable = False
-
-                    # handle printable characters
-                    if printable:
-                        if showWhiteSpace and charcode == " ":
-                            glyph = font[u"·"]
-                        else:
-                            glyph = font[charcode]
-                        xBotL = glyph.offset[0] - fakeItalic - fakeBold / 2
-                        xTopL = glyph.offset[0] - fakeBold / 2
-                        yTop = glyph.offset[1]
-                        xBotR = xBotL + glyph.size[0] * alphaCorrection + fakeBold
-                        xTopR = xTopL + glyph.size[0] * alphaCorrection + fakeBold
-                        yBot = yTop - glyph.size[1]
-                        u0 = glyph.texcoords[0]
-                        v0 = glyph.texcoords[1]
-                        u1 = glyph.texcoords[2]
-                        v1 = glyph.texcoords[3]
-                    else:
-                        glyph = font[u"·"]
-                        x = glyph.offset[0]
-                        yTop = glyph.offset[1]
-                        yBot = yTop - glyph.size[1]
-                        xBotL = x
-                        xTopL = x
-                        xBotR = x
-                        xTopR = x
-                        u0 = glyph.texcoords[0]
-                        v0 = glyph.texcoords[1]
-                        u1 = glyph.texcoords[2]
-                        v1 = glyph.texcoords[3]
-
-                    # calculate width and update segment width
-                    w = glyph.advance[0] + fakeBold / 2
-                    thisSegWidth += w
-
-                    # keep vertices, texcoords, width and y_advance of this character
-                    vertices_list.append([[xTopL, yTop], [xBotL, yBot],
-                                          [xBotR, yBot], [xTopR, yTop]])
-                    texcoords_list.append([[u0, v0], [u0, v1],
-                                           [u1, v1], [u1, v0]])
-                    charwidth_list.append(w)
-                    y_advance_list.append(glyph.advance[1])
-
-                # append width of this segment to the list
-                segwidth_list.append(thisSegWidth)
-
-            # concatenate segments to build line
-            lines = []
-            while text_seg:
-                line_width = 0
-                for i in range(len(text_seg)):
-                    # if this segment is \n, break line here.
-                    if text_seg[i][-1] == '\n':
-                        i+=1 # increment index to include \n to current line
-                        break
-                    # concatenate next segment
-                    line_width += segwidth_list[i]
-                    # break if line_width is greater than lineMax
-                    if lineMax < line_width:
-                        break
-                else:
-                    # if for sentence finished without break, all segments 
-                    # should be concatenated.
-                    i = len(text_seg)
-                p = max(1, i)
-                # concatenate segments and remove from segment list
-                lines.append("".join(text_seg[:p]))
-                del text_seg[:p], segwidth_list[:p] #, avoid[:p]
-
-            # build lines
-            i = 0 # index of the current character
-            if lines:
-                for line in lines:
-                    for c in line:
-                        theseVertices = vertices_list[i]
-                        #update vertices
-                        for j in range(4):
-                            theseVertices[j][0] += current[0]
-                            theseVertices[j][1] += current[1]
-                        texcoords = texcoords_list[i]
-
-                        vertices[i * 4:i * 4 + 4] = theseVertices
-                        self._texcoords[i * 4:i * 4 + 4] = texcoords
-                        # handle character color
-                        rgb_ = self._styles.c[i]
-                        if len(rgb_) > 0:
-                            self._colors[i*4 : i*4+4, :4] = rgb_ # set custom color
-                        else:
-                            self._colors[i*4 : i*4+4, :4] = rgb # set default color
-                        self._lineNs[i] = lineN
-
-                        current[0] = current[0] + charwidth_list[i]
-                        current[1] = current[1] + y_advance_list[i]
-                        
-                        # have we stored the top/bottom of this line yet
-                        if lineN + 1 > len(_lineBottoms):
-                            _lineBottoms.append(current[1])
-
-                        # next chacactor
-                        i += 1
-
-                    # prepare for next line
-                    current[0] = 0
-                    current[1] -= font.height
-                    
-                    lineBreakPt = vertices[(i-1) * 4, 0]
-                    self._lineLenChars.append(len(line))
-                    _lineWidths.append(lineBreakPt)
-
-                    # need not increase lineN when the last line doesn't end with '\n'
-                    if lineN < len(lines)-1 or line[-1] == '\n' :
-                        lineN += 1
-        else:
-            raise ValueError("Unknown lineBreaking option ({}) is"
-                "specified.".format(self._lineBreaking))
+        # get the positions of each glyph (reusing a previous layout if we can)
+        run = self._getGlyphRun(lineMax, alphaCorrection)
+        self._glyphRun = run
+        vertices = run.vertices.copy()
+        self._texcoords = run.texcoords
+        self._lineNs = run.lineNs
+        self._lineLenChars = list(run.lineLenChars)
+        self._renderChars = list(run.renderChars)
+        _lineBottoms = list(run.lineBottoms)
+        _lineWidths = list(run.lineWidths)
+        current = list(run.current)
 
         # Add render-only characters
         for rend in self._renderChars:
@@ -1154,6 +1273,7 @@ class TextBox2(BaseVisualStim, PointerMixin, DraggingMixin, ContainerMixin, Colo
                 glyph=rend['glyph'],
                 alphaCorrection=alphaCorrection
             )
+        self._updateColors()
 
         # Apply vertical alignment
         if self.alignment[1] in ("bottom", "center"):
@@ -1206,6 +1326,61 @@ class TextBox2(BaseVisualStim, PointerMixin, DraggingMixin, ContainerMixin, Colo
             self.glFont._dirty = False
         self._needVertexUpdate = True
 
+    def _getGlyphRun(self, lineMax, alphaCorrection):
+        """Get the layout of the current text before alignment. Text which has
+        been laid out before with the same font and settings is fetched from
+        the glyph run cache, otherwise (with the default line breaking) the
+        last layout of this textbox is reused up to the line where the text
+        changed.
+        """
+        settings = (self.glFont, float(lineMax), self.letterSpacing,
+                    self._lineBreaking, alphaCorrection, showWhiteSpace)
+        text = self._text
+        bold = list(self._styles.b)
+        italic = list(self._styles.i)
+        key = settings + (text, tuple(bold), tuple(italic))
+        run = glyphRunCache.get(key)
+        if run is not None:
+            return run
+
+        if self._lineBreaking == 'default':
+            previous = getattr(self, '_glyphRun', None)
+            if previous is not None and previous.settings != settings:
+                previous = None
+            run = _layoutDefault(text, bold, italic, self.glFont, lineMax,
+                                 self.letterSpacing, alphaCorrection,
+                                 previous=previous)
+        elif self._lineBreaking == 'uax14':
+            run = _layoutUAX14(text, bold, italic, self.glFont, lineMax,
+                               alphaCorrection)
+        else:
+            raise ValueError("Unknown lineBreaking option ({}) is"
+                "specified.".format(self._lineBreaking))
+        run.settings = settings
+        # the run is shared through the cache, so its arrays mustn't change
+        for arr in (run.vertices, run.texcoords, run.lineNs):
+            arr.setflags(write=False)
+        glyphRunCache.put(key, run)
+
+        return run
+
+    def _updateColors(self):
+        """Set the colour of each vertex from the style of each character (or
+        the textbox color), without changing the layout.
+        """
+        rgb = self._foreColor.render('rgba1')
+        colors = np.empty((len(self._text), 4), dtype=np.double)
+        colors[:] = rgb
+        for i, rgb_ in enumerate(self._styles.c[:len(self._text)]):
+            if len(rgb_) > 0:
+                colors[i] = rgb_  # set custom color
+        colors = np.repeat(colors, 4, axis=0)
+        # render-only characters are the same colour as other text
+        for rend in self._renderChars:
+            i4 = rend['i'] * 4
+            colors = np.vstack([colors[:i4], [rgb] * 4, colors[i4:]])
+        self._colors = colors
+
     @attributeSetter
     def ori(self, value):
         # get previous orientaiton
@@ -1403,6 +1578,11 @@ class TextBox2(BaseVisualStim, PointerMixin, DraggingMixin, ContainerMixin, Colo
         else:
             return self.box.contains(x, y, units)
 
+    @property
+    def _hitPolygon(self):
+        """Vertices (in pixels) of the box used by :meth:`contains`."""
+        return self.box._hitPolygon
+
     def overlaps(self, polygon, tight=False):
         """Returns `True` if this stimulus intersects another one.
 
@@ -1453,15 +1633,6 @@ class TextBox2(BaseVisualStim, PointerMixin, DraggingMixin, ContainerMixin, Colo
             [right, top],
             vertices[i4:]
         ])
-        # Make same colour as other text
-        self._colors = np.vstack([
-            self._colors[:i4],
-            self._foreColor.render('rgba1'),
-            self._foreColor.render('rgba1'),
-            self._foreColor.render('rgba1'),
-            self._foreColor.render('rgba1'),
-            self._colors[i4:]
-        ])
         # Extend line numbers array
         self._lineNs = np.hstack([
             self._lineNs[:i],
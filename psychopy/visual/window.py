@@ -87,7 +87,7 @@ import psychopy.tools.gltools as gltools
 import psychopy.tools.mathtools as mathtools
 from .text import TextStim
 from .grating import GratingStim
-from .helpers import setColor
+from .helpers import setColor, pointsInPolygons
 from . import globalVars
 
 try:
@@ -582,8 +582,14 @@ class Window():
         self.frameClock = core.Clock()  # from psycho/core
         self.frames = 0  # frames since last fps calc
         self.movieFrames = []  # list of captured frames (Image objects)
+        self.movieStream = None  # writes captured frames as they're captured
+        self._movieStreamAsync = False
+        # rings of pixel buffers for `_getPixelsAsync`, by region and buffer
+        self._pixelReadbacks = {}
 
         self.recordFrameIntervals = False
+        self.flipProfiler = None  # created when profileFlips is first set
+        self.profileFlips = False
         # Be able to omit the long timegap that follows each time turn it off
         self.recordFrameIntervalsJustTurnedOn = False
         self.nDroppedFrames = 0
@@ -889,6 +895,87 @@ class Window():
         """
         setAttribute(self, 'recordFrameIntervals', value, log)
 
+    @attributeSetter
+    def profileFlips(self, value):
+        """Record how long each autoDraw stimulus and each phase of
+        :py:attr:`~Window.flip()` takes.
+
+        Use this to find out which stimulus, or which part of the flip (e.g.
+        drawing, rendering the framebuffer, swapping buffers, functions
+        scheduled with :py:attr:`~Window.callOnFlip()`) uses up the time of
+        each frame when frames are dropped. Timings are kept by
+        :py:attr:`~Window.flipProfiler`, a
+        :class:`~psychopy.visual.flipprofiler.FlipProfiler` holding the most
+        recent 100000 records (one per phase and per stimulus drawn, each
+        frame), created the first time this is set to `True`. Turning this off
+        keeps the timings recorded so far.
+
+        Examples
+        --------
+        Profile the flips of a trial, then print the 99th percentile of the
+        time taken to draw each stimulus::
+
+            win.profileFlips = True
+            ...  # run the trial
+            win.profileFlips = False
+            summary = win.getFlipProfile()
+            for name, stats in summary['stimulus'].items():
+                print(name, stats['p99'])
+
+        The timings can be saved with :py:attr:`~Window.saveFlipProfile()`.
+
+        """
+        if value and self.flipProfiler is None:
+            from .flipprofiler import FlipProfiler
+            self.flipProfiler = FlipProfiler()
+        self.__dict__['profileFlips'] = value
+
+    def getFlipProfile(self, percentiles=(50, 90, 99)):
+        """Summarise the time taken by each stimulus and each phase of
+        :py:attr:`~Window.flip()`, recorded while
+        :py:attr:`~Window.profileFlips` was `True`.
+
+        Parameters
+        ----------
+        percentiles : tuple of float
+            Percentiles of the times to give.
+
+        Returns
+        -------
+        dict
+            With keys 'phase' and 'stimulus', each a dict mapping phase or
+            stimulus names to statistics (in seconds): `n`, `mean`, `max`,
+            `total` and the percentiles (e.g. `p99`). See
+            :py:meth:`~psychopy.visual.flipprofiler.FlipProfiler.getSummary`.
+
+        """
+        if self.flipProfiler is None:
+            return {'phase': {}, 'stimulus': {}}
+        return self.flipProfiler.getSummary(percentiles)
+
+    def saveFlipProfile(self, fileName=None, clear=True):
+        """Save the timings recorded while :py:attr:`~Window.profileFlips`
+        was `True` to disk, as comma-separated values with one row per phase
+        and per stimulus drawn, each frame.
+
+        Parameters
+        ----------
+        fileName : *None* or str
+            *None* or the filename (including path if necessary) in which to
+            store the data. If None then 'lastFlipProfile.csv' will be used.
+        clear : bool
+            Clear the recorded timings after saving. Default is `True`.
+
+        """
+        if self.flipProfiler is None:
+            return
+        if not fileName:
+            fileName = 'lastFlipProfile.csv'
+        if len(self.flipProfiler):
+            self.flipProfiler.save(fileName)
+        if clear:
+            self.flipProfiler.clear()
+
     def saveFrameIntervals(self, fileName=None, clear=True):
         """Save recorded screen frame intervals to disk, as comma-separated
         values.
@@ -1086,6 +1173,25 @@ class Window():
                             "In this case it was called with obj={}"
                             .format(repr(obj)))
 
+    def _getObjectsAtPointer(self, objs):
+        """Get which of several objects contain the mouse pointer.
+
+        Objects with the usual polygon hit test are tested together in one
+        call to :func:`~psychopy.visual.helpers.pointsInPolygons`, others
+        through their own `contains()` method.
+        """
+        batched = [obj for obj in objs if hasattr(type(obj), '_hitPolygon')]
+        inside = set()
+        if batched:
+            posPix = convertToPix(self._mouse.getPos(), pos=(0, 0),
+                                  units=self._mouse.units, win=self)
+            hits = pointsInPolygons([posPix], batched)[0]
+            inside = {id(obj) for obj, hit in zip(batched, hits) if hit}
+        return [obj for obj in objs
+                if id(obj) in inside or
+                (not hasattr(type(obj), '_hitPolygon') and
+                 obj.contains(self._mouse))]
+
     def _cleanEditables(self):
         """
         Make sure there are no dead refs in the editables list
@@ -1257,12 +1363,18 @@ class Window():
             win.flip(clearBuffer=False)
 
         """
+        profiler = self.flipProfiler if self.profileFlips else None
+        if profiler is not None:
+            profiler.startFrame()
+
         # draw message/splash if needed
         if self._showSplash:
             self._splashTextbox.draw()
 
         if self._toDraw:
             for thisStim in self._toDraw:
+                if profiler is not None:
+                    stimStart = profiler.now()
                 # draw
                 thisStim.draw()
                 # draw validation rect if needed
@@ -1274,6 +1386,8 @@ class Window():
                     
                 if getattr(thisStim, "clickable", False):
                     thisStim.doPointerActions()
+                if profiler is not None:
+                    profiler.addStimulus(thisStim, stimStart)
 
         else:
             self.backend.setCurrent()
@@ -1295,11 +1409,14 @@ class Window():
 
         # disable lighting
         self.useLights = False
+        if profiler is not None:
+            profiler.endPhase('autoDraw')
 
         # Check for mouse clicks on editables
         if hasattr(self, '_editableChildren'):
             # Make sure _editableChildren has actually been created
             editablesOnScreen = []
+            editables = []
             for thisObj in self._editableChildren:
                 # Iterate through editables and decide which one should have focus
                 if isinstance(thisObj, weakref.ref):
@@ -1312,12 +1429,17 @@ class Window():
                     editablesOnScreen.append(thisObj.autoDraw)
                 else:
                     editablesOnScreen.append(False)
-                if self._mouse.isPressedIn(thisObj):
-                    # If editable was clicked on, give it focus
+                editables.append(thisObj)
+            if editables and any(self._mouse.getPressed()):
+                # If an editable was clicked on, give it focus (testing the
+                # pointer against all of them at once)
+                for thisObj in self._getObjectsAtPointer(editables):
                     self.currentEditable = thisObj
             # If there is only one editable on screen, make sure it starts off with focus
             if sum(editablesOnScreen) == 1:
                 self.currentEditable = self._editableChildren[editablesOnScreen.index(True)]()
+        if profiler is not None:
+            profiler.endPhase('editables')
 
         flipThisFrame = self._startOfFlip()
         if self.useFBO and flipThisFrame:
@@ -1351,6 +1473,8 @@ class Window():
 
         # call this before flip() whether FBO was used or not
         self._afterFBOrender()
+        if profiler is not None:
+            profiler.endPhase('fboRender')
 
         self.backend.swapBuffers(flipThisFrame)
 
@@ -1402,6 +1526,8 @@ class Window():
 
         # reset returned buffer for next frame
         self._endOfFlip(clearBuffer)
+        if profiler is not None:
+            profiler.endPhase('swap')
 
         # waitBlanking
         if self.waitBlanking and flipThisFrame:
@@ -1417,6 +1543,8 @@ class Window():
                     pass
                 GL.glEnd()
             GL.glFinish()
+        if profiler is not None:
+            profiler.endPhase('waitBlanking')
 
         # get timestamp
         self._frameTime = now = logging.defaultClock.getTime()
@@ -1428,6 +1556,8 @@ class Window():
             self._toCall[i]['function'](*self._toCall[i]['args'], **self._toCall[i]['kwargs'])
         # leave newly scheduled functions for next flip
         del self._toCall[:n_items]
+        if profiler is not None:
+            profiler.endPhase('callOnFlip')
 
         # do bookkeeping
         if self.recordFrameIntervals:
@@ -1449,6 +1579,8 @@ class Window():
                         logging.warning("Multiple dropped frames have "
                                         "occurred - I'll stop bothering you "
                                         "about them!")
+        if profiler is not None:
+            profiler.endPhase('frameIntervals')
 
         # log events
         for logEntry in self._toLog:
@@ -1458,6 +1590,8 @@ class Window():
                         t=now,
                         obj=logEntry['obj'])
         del self._toLog[:]
+        if profiler is not None:
+            profiler.endPhase('log')
 
         # keep the system awake (prevent screen-saver or sleep)
         platform_specific.sendStayAwake()
@@ -1469,6 +1603,8 @@ class Window():
         # draw piloting indicator (if piloting) for next frame
         if self._showPilotingIndicator:
             self._pilotingIndicator.draw()
+        if profiler is not None:
+            profiler.endPhase('nextFrame')
 
         #    If self.waitBlanking is True, then return the time that
         # GL.glFinish() returned, set as the 'now' variable. Otherwise
@@ -2516,16 +2652,138 @@ class Window():
         buffer : str, optional
             Buffer to capture.
 
+        While a movie stream is running (see
+        :py:attr:`~Window.startMovieStream()`) the frame is instead passed
+        straight to the stream to be written in the background, and is not
+        stored or returned.
+
         Returns
         -------
-        Image
-            Buffer pixel contents as a PIL/Pillow image object.
+        Image or None
+            Buffer pixel contents as a PIL/Pillow image object, or `None` while
+            a movie stream is running.
 
         """
+        if self.movieStream is not None and self._movieStreamAsync:
+            # pixels of an earlier frame, if any have been read yet
+            self._movieStreamBuffers.add(buffer)
+            pixels, _ = self._getPixelsAsync(buffer=buffer)
+            if pixels is not None:
+                self.movieStream.addFrame(pixels)
+            return None
+        if self.movieStream is not None:
+            self.movieStream.addFrame(self._getPixels(buffer=buffer))
+            return None
         im = self._getFrame(buffer=buffer)
         self.movieFrames.append(im)
         return im
 
+    def startMovieStream(self, fileName, fps=30, codec=None,
+                         maxFramesWaiting=60, dropFrames=False,
+                         encoderLib='ffpyplayer', encoderOpts=None,
+                         asyncReadback=False):
+        """Start writing frames to disk as they are captured.
+
+        Until :py:attr:`~Window.stopMovieStream()` is called, each call to
+        :py:attr:`~Window.getMovieFrame()` passes the window's pixels to a
+        :class:`~psychopy.tools.movietools.FrameStreamWriter`, which encodes
+        them in the background, rather than keeping an image of every frame
+        in memory for :py:attr:`~Window.saveMovieFrames()`. Memory use stays
+        the same however long the recording is.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file, including path. If the extension is an image type
+            (e.g. .png or .tif) each frame is written as a numbered image
+            (frame00001.png, frame00002.png, ...). Otherwise a movie file is
+            written with :class:`~psychopy.tools.movietools.MovieFileWriter`,
+            which needs `ffpyplayer` (or `opencv` if `encoderLib='opencv'`).
+        fps : int, optional
+            The frame rate of movie files. Default is `30`.
+        codec : str, optional
+            The codec for movie files. If `None` the default of the encoder
+            library is used.
+        maxFramesWaiting : int, optional
+            Maximum number of captured frames waiting to be encoded. Default is
+            `60`.
+        dropFrames : bool, optional
+            If `True`, frames captured while `maxFramesWaiting` frames are
+            waiting are discarded, so the frame loop is never held up by
+            encoding. If `False` (default) every frame is written, and
+            :py:attr:`~Window.getMovieFrame()` waits if encoding falls behind.
+        encoderLib : str, optional
+            Library used to encode movie files, 'ffpyplayer' or 'opencv'.
+        encoderOpts : dict, optional
+            Options passed to the movie encoder.
+        asyncReadback : bool, optional
+            If `True`, frames are read from the window with
+            :py:attr:`~Window._getPixelsAsync()` so capturing doesn't wait for
+            the GPU to finish drawing. Each frame is then passed to the stream
+            a frame or two after it's captured, and the last few when the
+            stream is stopped. Default is `False`.
+
+        Returns
+        -------
+        FrameStreamWriter
+            The stream the frames are written to.
+
+        Examples
+        --------
+        Write a movie of a trial as it runs::
+
+            win.startMovieStream('trial.mp4', fps=60)
+            for frameN in range(600):
+                stim.draw()
+                win.flip()
+                win.getMovieFrame()
+            win.stopMovieStream()
+
+        """
+        if self.movieStream is not None:
+            raise RuntimeError("A movie stream is already running, call "
+                               "`stopMovieStream()` first.")
+        from psychopy.tools.movietools import FrameStreamWriter
+        stream = FrameStreamWriter(
+            fileName, self.size, fps=fps, codec=codec,
+            maxFramesWaiting=maxFramesWaiting, dropFrames=dropFrames,
+            encoderLib=encoderLib, encoderOpts=encoderOpts)
+        stream.open()
+        self.movieStream = stream
+        self._movieStreamAsync = asyncReadback
+        self._movieStreamBuffers = set()  # read asynchronously
+        return stream
+
+    def stopMovieStream(self):
+        """Stop the movie stream started by
+        :py:attr:`~Window.startMovieStream()`, waiting for any frames still
+        being encoded to be written.
+
+        Returns
+        -------
+        int
+            Number of frames written.
+
+        """
+        stream, self.movieStream = self.movieStream, None
+        if stream is None:
+            return 0
+        if self._movieStreamAsync:
+            # frames captured but not yet read back
+            frames = []
+            for buffer in self._movieStreamBuffers:
+                frames.extend(self._flushPixelsAsync(buffer=buffer))
+            frames.sort(key=lambda frame: frame[1] or 0.0)
+            for pixels, _ in frames:
+                stream.addFrame(pixels)
+            self._movieStreamAsync = False
+        stream.close()
+        if stream.framesDropped:
+            logging.warning(
+                "%i frames were dropped from '%s' as encoding fell behind." % (
+                    stream.framesDropped, stream.filename))
+        return stream.framesOut
+
     def _getPixels(self, rect=None, buffer='front', includeAlpha=True,
                    makeLum=False):
         """Return an array of pixel values from the current window buffer or
@@ -2564,19 +2822,6 @@ class Window():
             average = pix.mean()
 
         """
-        # do the reading of the pixels
-        if buffer == 'back' and self.useFBO:
-            GL.glReadBuffer(GL.GL_COLOR_ATTACHMENT0)
-        elif buffer == 'back':
-            GL.glReadBuffer(GL.GL_BACK)
-        elif buffer == 'front':
-            if self.useFBO:
-                GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
-            GL.glReadBuffer(GL.GL_FRONT)
-        else:
-            raise ValueError("Requested read from buffer '{}' but should be "
-                             "'front' or 'back'".format(buffer))
-
         if rect:
             # box corners in pix
             left, bottom, w, h = rect
@@ -2585,50 +2830,163 @@ class Window():
             w, h = self.size
 
         # get pixel data
+        self._setReadBuffer(buffer)
         bufferDat = (GL.GLubyte * (4 * w * h))()
         GL.glReadPixels(
             left, bottom, w, h,
             GL.GL_RGBA,
             GL.GL_UNSIGNED_BYTE,
             bufferDat)
+        self._resetReadBuffer(buffer)
 
         # convert to array
         toReturn = numpy.frombuffer(bufferDat, dtype=numpy.uint8)
         toReturn = toReturn.reshape((h, w, 4))
 
-        # rebind front buffer if needed
+        return self._convertPixels(toReturn, includeAlpha, makeLum)
+
+    def _getPixelsAsync(self, rect=None, buffer='front', includeAlpha=True,
+                        makeLum=False):
+        """Read pixel values without waiting for the GPU, returning those of
+        an earlier read.
+
+        Pixels are read into a ring of pixel buffer objects (see
+        :class:`~psychopy.tools.gltools.PixelReadback`), so unlike
+        :py:attr:`~Window._getPixels()` this doesn't stall until drawing has
+        finished. Called once per frame after :py:attr:`~Window.flip()`, the
+        pixels of frame N are usually returned while frame N+1 is drawn. Each
+        read is tagged with the time of the last flip, so the pixels can be
+        matched to the frame they came from. If every buffer of the ring is
+        waiting, the oldest is fetched first, waiting for it if needed.
+
+        Parameters
+        ----------
+        rect, buffer, includeAlpha, makeLum
+            As for :py:attr:`~Window._getPixels()`. Each `rect` and `buffer`
+            has its own ring of buffers.
+
+        Returns
+        -------
+        tuple
+            Pixel values of the oldest read which has finished, as returned by
+            :py:attr:`~Window._getPixels()`, and the time of the flip before it
+            was read (on `logging.defaultClock`, as in `_frameTimes`). Both are
+            `None` if no read has finished yet.
+
+        Examples
+        --------
+        Get the average luminance of a frame after it was shown::
+
+            win.flip()
+            pix, frameTime = win._getPixelsAsync(makeLum=True)
+            if pix is not None:
+                average = pix.mean()
+
+        """
+        if rect:
+            left, bottom, w, h = rect
+        else:
+            left = bottom = 0
+            w, h = self.size
+
+        key = (left, bottom, w, h, buffer)
+        readback = self._pixelReadbacks.get(key)
+        if readback is None:
+            readback = self._pixelReadbacks[key] = gltools.PixelReadback(w, h)
+
+        toReturn, frameTime = readback.getPixels()
+        if toReturn is None and readback.isFull:
+            # fall back to waiting for the oldest read rather than dropping it
+            toReturn, frameTime = readback.getPixels(wait=True)
+
+        self._setReadBuffer(buffer)
+        readback.read(
+            left, bottom,
+            userData=self._frameTimes[-1] if self._frameTimes else None)
+        self._resetReadBuffer(buffer)
+
+        if toReturn is None:
+            return None, None
+
+        return self._convertPixels(toReturn, includeAlpha, makeLum), frameTime
+
+    def _flushPixelsAsync(self, rect=None, buffer='front', includeAlpha=True,
+                          makeLum=False):
+        """Wait for all reads made by :py:attr:`~Window._getPixelsAsync()`
+        which haven't been returned yet, e.g. at the end of a recording.
+
+        Parameters
+        ----------
+        rect, buffer, includeAlpha, makeLum
+            As given to :py:attr:`~Window._getPixelsAsync()`.
+
+        Returns
+        -------
+        list
+            Pixel values and flip times of the reads, oldest first.
+
+        """
+        if rect:
+            left, bottom, w, h = rect
+        else:
+            left = bottom = 0
+            w, h = self.size
+
+        readback = self._pixelReadbacks.get((left, bottom, w, h, buffer))
+        if readback is None:
+            return []
+
+        toReturn = []
+        while readback.nPending:
+            pixels, frameTime = readback.getPixels(wait=True)
+            toReturn.append(
+                (self._convertPixels(pixels, includeAlpha, makeLum),
+                 frameTime))
+
+        return toReturn
+
+    def _setReadBuffer(self, buffer):
+        """Select the buffer which pixels are read from."""
+        if buffer == 'back' and self.useFBO:
+            GL.glReadBuffer(GL.GL_COLOR_ATTACHMENT0)
+        elif buffer == 'back':
+            GL.glReadBuffer(GL.GL_BACK)
+        elif buffer == 'front':
+            if self.useFBO:
+                GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
+            GL.glReadBuffer(GL.GL_FRONT)
+        else:
+            raise ValueError("Requested read from buffer '{}' but should be "
+                             "'front' or 'back'".format(buffer))
+
+    def _resetReadBuffer(self, buffer):
+        """Rebind the window's framebuffer after reading pixels, if needed."""
         if buffer == 'front' and self.useFBO:
             GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.frameBuffer)
 
+    @staticmethod
+    def _convertPixels(pixels, includeAlpha=True, makeLum=False):
+        """Convert an array of RGBA pixel values as requested of
+        :py:attr:`~Window._getPixels()`."""
         # if we want the color data without an alpha channel, we need to
         # convert the data to a numpy array and remove the alpha channel
         if not includeAlpha:
-            toReturn = toReturn[:, :, :3]  # remove alpha channel
+            pixels = pixels[:, :, :3]  # remove alpha channel
 
         # convert to luminance if requested
         if makeLum:
             coeffs = [0.2989, 0.5870, 0.1140]
-            toReturn = numpy.rint(numpy.dot(toReturn[:, :, :3], coeffs)).astype(
+            pixels = numpy.rint(numpy.dot(pixels[:, :, :3], coeffs)).astype(
                 numpy.uint8)
 
-        return toReturn
+        return pixels
 
     def _getFrame(self, rect=None, buffer='front'):
         """Return the current Window as an image.
         """
         # GL.glLoadIdentity()
         # do the reading of the pixels
-        if buffer == 'back' and self.useFBO:
-            GL.glReadBuffer(GL.GL_COLOR_ATTACHMENT0)
-        elif buffer == 'back':
-            GL.glReadBuffer(GL.GL_BACK)
-        elif buffer == 'front':
-            if self.useFBO:
-                GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
-            GL.glReadBuffer(GL.GL_FRONT)
-        else:
-            raise ValueError("Requested read from buffer '{}' but should be "
-                             "'front' or 'back'".format(buffer))
+        self._setReadBuffer(buffer)
 
         if rect:
             x, y = self.size  # of window, not image
@@ -2657,8 +3015,7 @@ class Window():
         im = im.transpose(Image.FLIP_TOP_BOTTOM)
         im = im.convert('RGB')
 
-        if self.useFBO and buffer == 'front':
-            GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.frameBuffer)
+        self._resetReadBuffer(buffer)
         return im
 
     @property
@@ -2789,6 +3146,20 @@ class Window():
         except Exception:
             pass
 
+        # the GL context is needed to read back any frames still in flight
+        if getattr(self, 'movieStream', None) is not None:
+            try:
+                self.stopMovieStream()
+            except Exception as err:
+                logging.error("Failed to write movie frames: %s" % err)
+        pixelReadbacks = getattr(self, '_pixelReadbacks', {})
+        for readback in pixelReadbacks.values():
+            try:
+                readback.delete()
+            except Exception:
+                pass
+        pixelReadbacks.clear()
+
         self.backend.close()  # moved here, dereferencing the window prevents
                               # backend specific actions to take place
 
@@ -2959,6 +3330,7 @@ class Window():
                 self._progSignedTexMask = self._shaders['signedTexMask']
                 self._progSignedTexMask1D = self._shaders['signedTexMask1D']
                 self._progImageStim = self._shaders['imageStim']
+                self._progInstancedColor = self._shaders.get('instancedColor')
         elif blendMode == 'add':
             GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE)
             if hasattr(self, '_shaders'):
@@ -2968,6 +3340,8 @@ class Window():
                 tmp = self._shaders['signedTexMask1D_adding']
                 self._progSignedTexMask1D = tmp
                 self._progImageStim = self._shaders['imageStim_adding']
+                self._progInstancedColor = self._shaders.get(
+                    'instancedColor_adding')
         else:
             raise ValueError("Window blendMode should be set to 'avg' or 'add'"
                              " but we received the value {}"
@@ -3381,6 +3755,10 @@ class Window():
             _shaders.vertSimple, _shaders.fragImageStim)
         self._shaders['imageStim_adding'] = _shaders.compileProgram(
             _shaders.vertSimple, _shaders.fragImageStim_adding)
+        self._shaders['instancedColor'] = _shaders.compileProgram(
+            _shaders.vertInstancedColor, _shaders.fragInstancedColor)
+        self._shaders['instancedColor_adding'] = _shaders.compileProgram(
+            _shaders.vertInstancedColor, _shaders.fragInstancedColor_adding)
         # self._shaders['stim3d_phong'] = {}
 
         # # Create shader flags, these are used as keys to pick the appropriate
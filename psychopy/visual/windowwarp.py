@@ -15,11 +15,165 @@ with this program. If not, see http://www.gnu.org/licenses/
 """
 
 import ctypes
+import hashlib
+import io
+import os
 import numpy as np
 from psychopy import logging
+from psychopy.preferences import prefs
+from psychopy.tools.filetools import openAtomicFile
 import pyglet
 GL = pyglet.gl
 
+# increase if the way meshes are made changes, so cached meshes are remade
+_meshVersion = 1
+# number of warps whose arrays are kept in memory, for switching between them
+_nMeshesKept = 4
+
+
+def getMeshCacheDir():
+    """Get the default folder for cached warp meshes (in the user's cache
+    folder).
+    """
+    return os.path.join(prefs.paths['userCacheDir'], 'warpMeshes')
+
+
+def gridToQuads(grid):
+    """Arrange values on a grid of points as the corners of quads.
+
+    Parameters
+    ----------
+    grid : ndarray
+        Values at each point, with shape (rows, cols, n).
+
+    Returns
+    -------
+    ndarray
+        Values at the corners of each quad, with shape
+        ((rows - 1) * (cols - 1) * 4, n). Quads go along each row in turn and
+        their corners are at (y, x), (y, x + 1), (y + 1, x + 1) and (y + 1, x).
+
+    """
+    quads = np.stack(
+        [grid[:-1, :-1], grid[:-1, 1:], grid[1:, 1:], grid[1:, :-1]], axis=2)
+    return quads.reshape((-1, grid.shape[2]))
+
+
+def makeSphericalMesh(xgrid, ygrid, eyepoint, widthCm, heightCm, distCm,
+                      isCylindrical=False):
+    """Make the quads of a spherical or cylindrical warp.
+
+    Returns
+    -------
+    tuple
+        Arrays of vertices and texture coordinates, each with shape
+        (nVertices, 2).
+
+    """
+    # eye position in cm
+    xEye = eyepoint[0] * widthCm
+    yEye = eyepoint[1] * heightCm
+
+    equalDistanceX = np.linspace(0, widthCm, xgrid)
+    equalDistanceY = np.linspace(0, heightCm, ygrid)
+
+    # vertex coordinates
+    x_c = np.linspace(-1.0, 1.0, xgrid)
+    y_c = np.linspace(-1.0, 1.0, ygrid)
+    x_coords, y_coords = np.meshgrid(x_c, y_c)
+
+    x, y = np.meshgrid((equalDistanceX - xEye).astype('float32'),
+                       (equalDistanceY - yEye).astype('float32'))
+
+    r = np.sqrt(np.square(x) + np.square(y) + np.square(distCm))
+
+    azimuth = np.arctan(x / distCm)
+    altitude = np.arcsin(y / r)
+
+    # calculate the texture coordinates
+    if isCylindrical:
+        tx = distCm * np.sin(azimuth)
+        ty = distCm * np.sin(altitude)
+    else:
+        tx = distCm * (1 + x/r) - distCm
+        ty = distCm * (1 + y/r) - distCm
+
+    # prevent div0
+    azimuth[azimuth == 0] = np.finfo(np.float32).eps
+    altitude[altitude == 0] = np.finfo(np.float32).eps
+
+    # the texture coordinates (which are now lying on the sphere)
+    # need to be remapped back onto the plane of the display.
+    # This effectively stretches the coordinates away from the eyepoint.
+
+    if isCylindrical:
+        tx = tx * azimuth / np.sin(azimuth)
+        ty = ty * altitude / np.sin(altitude)
+    else:
+        centralAngle = np.arccos(
+            np.cos(altitude) * np.cos(np.abs(azimuth)))
+        # distance from eyepoint to texture vertex
+        arcLength = centralAngle * distCm
+        # remap the texture coordinate
+        theta = np.arctan2(ty, tx)
+        tx = arcLength * np.cos(theta)
+        ty = arcLength * np.sin(theta)
+
+    u_coords = tx / widthCm + 0.5
+    v_coords = ty / heightCm + 0.5
+
+    vertices = gridToQuads(np.dstack([x_coords, y_coords]))
+    tcoords = gridToQuads(np.dstack([u_coords, v_coords]))
+    return vertices.astype('float32'), tcoords.astype('float32')
+
+
+def readWarpfile(warpfile):
+    """Read a warp definition file.
+
+    See: http://paulbourke.net/dome/warpingfisheye/
+
+    Returns
+    -------
+    tuple
+        The file type, number of columns and rows, and the data as an array
+        with a row of x, y, u, v and opacity for each point.
+
+    """
+    with open(warpfile, 'rb') as fh:
+        return parseWarpfile(fh.read())
+
+
+def parseWarpfile(contents):
+    """Parse the contents (bytes) of a warp definition file, as for
+    :func:`readWarpfile`.
+    """
+    lines = contents.split(b'\n', 2)
+    filetype = int(lines[0])
+    rc = list(map(int, lines[1].split()))
+    cols, rows = rc[0], rc[1]
+    warpdata = np.loadtxt(io.BytesIO(lines[2]), ndmin=2)
+    return filetype, cols, rows, warpdata
+
+
+def makeWarpfileMesh(warpdata, cols, rows):
+    """Make the quads of a warp from warp file data.
+
+    Returns
+    -------
+    tuple
+        Arrays of vertices, texture coordinates and opacity (as RGBA), with
+        shapes (nVertices, 2), (nVertices, 2) and (nVertices, 4).
+
+    """
+    grid = np.asarray(warpdata, dtype='float32').reshape((rows, cols, 5))
+    quads = gridToQuads(grid)
+    vertices = np.ascontiguousarray(quads[:, 0:2])
+    tcoords = np.ascontiguousarray(quads[:, 2:4])
+    # opacity is RGBA
+    opacity = np.ones((len(quads), 4), dtype='float32')
+    opacity[:, 3] = quads[:, 4]
+    return vertices, tcoords, opacity
+
 
 class Warper:
     """Class to perform warps.
@@ -34,7 +188,8 @@ class Warper:
                  warpGridsize=300,
                  eyepoint=(0.5, 0.5),
                  flipHorizontal=False,
-                 flipVertical=False):
+                 flipVertical=False,
+                 meshCache=False):
         """Warping is a final operation which can be optionally performed on
         each frame just before transmission to the display. It is useful
         for perspective correction when the eye to monitor distance is
@@ -81,6 +236,13 @@ class Warper:
             flipVertical: True or *False*
                 Flip the entire output vertically. useful if projector is
                 flipped upside down.
+            meshCache: True, *False* or a folder
+                Keep the meshes made for each warp on disk, so that later
+                sessions (and changeProjection() calls) with the same warp
+                parameters or warpfile contents load them rather than
+                making them again. If True the meshes are kept in the user's
+                cache folder (see getMeshCacheDir()). Meshes are always kept
+                in memory for as long as the Warper exists.
 
         :notes:
             1) The eye distance from the screen is initialized from the
@@ -112,6 +274,8 @@ class Warper:
         self.eyepoint = eyepoint
         self.flipHorizontal = flipHorizontal
         self.flipVertical = flipVertical
+        self.meshCache = meshCache
+        self._meshes = {}  # arrays for each warp made so far
         self.initDefaultWarpSize()
 
         #   get the eye distance from the monitor object,
@@ -225,186 +389,123 @@ class Warper:
         """
         self.nverts = (self.xgrid - 1) * (self.ygrid - 1) * 4
 
-        # eye position in cm
-        xEye = self.eyepoint[0] * self.mon_width_cm
-        yEye = self.eyepoint[1] * self.mon_height_cm
-
-        # create vertex grid array, and texture coords
-        # times 4 for quads
-        vertices = np.zeros(
-            ((self.xgrid - 1) * (self.ygrid - 1) * 4, 2), dtype='float32')
-        tcoords = np.zeros(
-            ((self.xgrid - 1) * (self.ygrid - 1) * 4, 2), dtype='float32')
-
-        equalDistanceX = np.linspace(0, self.mon_width_cm, self.xgrid)
-        equalDistanceY = np.linspace(0, self.mon_height_cm, self.ygrid)
-
-        # vertex coordinates
-        x_c = np.linspace(-1.0, 1.0, self.xgrid)
-        y_c = np.linspace(-1.0, 1.0, self.ygrid)
-        x_coords, y_coords = np.meshgrid(x_c, y_c)
-
-        x = np.zeros(((self.xgrid), (self.ygrid)), dtype='float32')
-        y = np.zeros(((self.xgrid), (self.ygrid)), dtype='float32')
-
-        x[:, :] = equalDistanceX - xEye
-        y[:, :] = equalDistanceY - yEye
-        y = np.transpose(y)
-
-        r = np.sqrt(np.square(x) + np.square(y) + np.square(self.dist_cm))
-
-        azimuth = np.arctan(x / self.dist_cm)
-        altitude = np.arcsin(y / r)
-
-        # calculate the texture coordinates
-        if isCylindrical:
-            tx = self.dist_cm * np.sin(azimuth)
-            ty = self.dist_cm * np.sin(altitude)
-        else:
-            tx = self.dist_cm * (1 + x/r) - self.dist_cm
-            ty = self.dist_cm * (1 + y/r) - self.dist_cm
-
-        # prevent div0
-        azimuth[azimuth == 0] = np.finfo(np.float32).eps
-        altitude[altitude == 0] = np.finfo(np.float32).eps
-
-        # the texture coordinates (which are now lying on the sphere)
-        # need to be remapped back onto the plane of the display.
-        # This effectively stretches the coordinates away from the eyepoint.
-
-        if isCylindrical:
-            tx = tx * azimuth / np.sin(azimuth)
-            ty = ty * altitude / np.sin(altitude)
-        else:
-            centralAngle = np.arccos(
-                np.cos(altitude) * np.cos(np.abs(azimuth)))
-            # distance from eyepoint to texture vertex
-            arcLength = centralAngle * self.dist_cm
-            # remap the texture coordinate
-            theta = np.arctan2(ty, tx)
-            tx = arcLength * np.cos(theta)
-            ty = arcLength * np.sin(theta)
-
-        u_coords = tx / self.mon_width_cm + 0.5
-        v_coords = ty / self.mon_height_cm + 0.5
-
-        # loop to create quads
-        vdex = 0
-        for y in range(0, self.ygrid - 1):
-            for x in range(0, self.xgrid - 1):
-                index = y * (self.xgrid) + x
-
-                vertices[vdex + 0, 0] = x_coords[y, x]
-                vertices[vdex + 0, 1] = y_coords[y, x]
-                vertices[vdex + 1, 0] = x_coords[y, x + 1]
-                vertices[vdex + 1, 1] = y_coords[y, x + 1]
-                vertices[vdex + 2, 0] = x_coords[y + 1, x + 1]
-                vertices[vdex + 2, 1] = y_coords[y + 1, x + 1]
-                vertices[vdex + 3, 0] = x_coords[y + 1, x]
-                vertices[vdex + 3, 1] = y_coords[y + 1, x]
-
-                tcoords[vdex + 0, 0] = u_coords[y, x]
-                tcoords[vdex + 0, 1] = v_coords[y, x]
-                tcoords[vdex + 1, 0] = u_coords[y, x + 1]
-                tcoords[vdex + 1, 1] = v_coords[y, x + 1]
-                tcoords[vdex + 2, 0] = u_coords[y + 1, x + 1]
-                tcoords[vdex + 2, 1] = v_coords[y + 1, x + 1]
-                tcoords[vdex + 3, 0] = u_coords[y + 1, x]
-                tcoords[vdex + 3, 1] = v_coords[y + 1, x]
-
-                vdex += 4
-        self.createVertexAndTextureBuffers(vertices, tcoords)
+        params = ('cylindrical' if isCylindrical else 'spherical',
+                  self.xgrid, self.ygrid, tuple(self.eyepoint),
+                  self.mon_width_cm, self.mon_height_cm, self.dist_cm)
+        meshes = self._getMeshes(
+            repr(params).encode('utf-8'),
+            lambda: makeSphericalMesh(
+                self.xgrid, self.ygrid, self.eyepoint, self.mon_width_cm,
+                self.mon_height_cm, self.dist_cm, isCylindrical))
+        self.createVertexAndTextureBuffers(*meshes)
 
     def projectionWarpfile(self):
         """Use a warp definition file to create the projection.
             See: http://paulbourke.net/dome/warpingfisheye/
         """
         try:
-            fh = open(self.warpfile)
-            lines = fh.readlines()
-            fh.close()
-            filetype = int(lines[0])
-            rc = list(map(int, lines[1].split()))
-            cols, rows = rc[0], rc[1]
-            warpdata = np.loadtxt(self.warpfile, skiprows=2)
+            with open(self.warpfile, 'rb') as fh:
+                contents = fh.read()
         except Exception:
-            error = 'Unable to read warpfile: ' + self.warpfile
+            error = 'Unable to read warpfile: ' + str(self.warpfile)
             logging.warning(error)
             print(error)
             return
 
-        if (cols * rows != warpdata.shape[0] or
-                warpdata.shape[1] != 5 or
-                filetype != 2):
-            error = 'warpfile data incorrect: ' + self.warpfile
-            logging.warning(error)
-            print(error)
+        def makeMeshes():
+            try:
+                filetype, cols, rows, warpdata = parseWarpfile(contents)
+            except Exception:
+                error = 'Unable to read warpfile: ' + str(self.warpfile)
+                logging.warning(error)
+                print(error)
+                return None
+
+            if (cols * rows != warpdata.shape[0] or
+                    warpdata.shape[1] != 5 or
+                    filetype != 2):
+                error = 'warpfile data incorrect: ' + str(self.warpfile)
+                logging.warning(error)
+                print(error)
+                return None
+
+            return makeWarpfileMesh(warpdata, cols, rows) + (
+                np.array([cols, rows]),)
+
+        # keyed by the contents, so an edited file is read again
+        meshes = self._getMeshes(b'warpfile' + contents, makeMeshes)
+        if meshes is None:
             return
+        vertices, tcoords, opacity, (cols, rows) = meshes
 
-        self.xgrid = cols
-        self.ygrid = rows
+        self.xgrid = int(cols)
+        self.ygrid = int(rows)
 
         self.nverts = (self.xgrid - 1) * (self.ygrid - 1) * 4
-
-        # create vertex grid array, and texture coords times 4 for quads
-        vertices = np.zeros(
-            ((self.xgrid - 1) * (self.ygrid - 1) * 4, 2), dtype='float32')
-        tcoords = np.zeros(
-            ((self.xgrid - 1) * (self.ygrid - 1) * 4, 2), dtype='float32')
-        # opacity is RGBA
-        opacity = np.ones(
-            ((self.xgrid - 1) * (self.ygrid - 1) * 4, 4), dtype='float32')
-
-        # loop to create quads
-        vdex = 0
-        for y in range(0, self.ygrid - 1):
-            for x in range(0, self.xgrid - 1):
-                index = y * (self.xgrid) + x
-
-                vertices[vdex + 0, 0] = warpdata[index, 0]  # x_coords[y,x]
-                vertices[vdex + 0, 1] = warpdata[index, 1]  # y_coords[y,x]
-                # x_coords[y,x+1]
-                vertices[vdex + 1, 0] = warpdata[index + 1, 0]
-                # y_coords[y,x+1]
-                vertices[vdex + 1, 1] = warpdata[index + 1, 1]
-                # x_coords[y+1,x+1]
-                vertices[vdex + 2, 0] = warpdata[index + cols + 1, 0]
-                # y_coords[y+1,x+1]
-                vertices[vdex + 2, 1] = warpdata[index + cols + 1, 1]
-                # x_coords[y+1,x]
-                vertices[vdex + 3, 0] = warpdata[index + cols, 0]
-                # y_coords[y+1,x]
-                vertices[vdex + 3, 1] = warpdata[index + cols, 1]
-
-                # u_coords[y,x]
-                tcoords[vdex + 0, 0] = warpdata[index, 2]
-                # v_coords[y,x]
-                tcoords[vdex + 0, 1] = warpdata[index, 3]
-                # u_coords[y,x+1]:
-                tcoords[vdex + 1, 0] = warpdata[index + 1, 2]
-                # v_coords[y,x+1]:
-                tcoords[vdex + 1, 1] = warpdata[index + 1, 3]
-                # u_coords[y+1,x+1]:
-                tcoords[vdex + 2, 0] = warpdata[index + cols + 1, 2]
-                # v_coords[y+1,x+1]:
-                tcoords[vdex + 2, 1] = warpdata[index + cols + 1, 3]
-                # u_coords[y+1,x]
-                tcoords[vdex + 3, 0] = warpdata[index + cols, 2]
-                # v_coords[y+1,x]:
-                tcoords[vdex + 3, 1] = warpdata[index + cols, 3]
-
-                opacity[vdex, 3] = warpdata[index, 4]
-                opacity[vdex + 1, 3] = warpdata[index + 1, 4]
-                opacity[vdex + 2, 3] = warpdata[index + cols + 1, 4]
-                opacity[vdex + 3, 3] = warpdata[index + cols, 4]
-
-                vdex += 4
         self.createVertexAndTextureBuffers(vertices, tcoords, opacity)
 
+    def _getMeshes(self, key, makeMeshes):
+        """Get the arrays for a warp, from those made already, those in the
+        mesh cache (if used), or by calling `makeMeshes`.
+
+        Parameters
+        ----------
+        key : bytes
+            Everything the warp depends on.
+        makeMeshes : callable
+            Makes the arrays if they aren't cached, returning a tuple of
+            arrays or `None` if they can't be made.
+
+        """
+        key = hashlib.sha1(b'%d\n' % _meshVersion + key).hexdigest()
+        if key in self._meshes:
+            return self._meshes[key]
+
+        cacheFile = None
+        if self.meshCache:
+            cacheDir = (getMeshCacheDir() if self.meshCache is True
+                        else str(self.meshCache))
+            cacheFile = os.path.join(cacheDir, key + '.npz')
+            try:
+                with np.load(cacheFile) as data:
+                    meshes = tuple(data['arr_%d' % i]
+                                   for i in range(len(data.files)))
+            except Exception:
+                pass  # not cached yet (or unreadable), so make it
+            else:
+                self._keepMeshes(key, meshes)
+                return meshes
+
+        meshes = makeMeshes()
+        if meshes is None:
+            return None
+        self._keepMeshes(key, meshes)
+
+        if cacheFile is not None:
+            try:
+                with openAtomicFile(cacheFile, 'wb') as f:
+                    np.savez(f, *meshes)
+            except OSError as err:
+                logging.warning(
+                    "Couldn't save warp mesh to `{}`: {}".format(
+                        cacheFile, err))
+
+        return meshes
+
+    def _keepMeshes(self, key, meshes):
+        """Keep the arrays for a warp in memory, forgetting the oldest if
+        there are too many."""
+        self._meshes[key] = meshes
+        while len(self._meshes) > _nMeshesKept:
+            del self._meshes[next(iter(self._meshes))]
+
     def createVertexAndTextureBuffers(self, vertices, tcoords, opacity=None):
         """Allocate hardware buffers for vertices, texture coordinates,
         and optionally opacity.
         """
+        if self.flipHorizontal or self.flipVertical:
+            # copy, as the unflipped vertices may be used again
+            vertices = vertices.copy()
         if self.flipHorizontal:
             vertices[:, 0] = -vertices[:, 0]
         if self.flipVertical: